@@ -0,0 +1,146 @@
+"""
+Contadores incrementales del almacén de familias
+Mantienen la cantidad de familias por problema comunitario, por sector (total,
+alto riesgo social y sanitario, y problemas) y por nivel de riesgo. El almacén
+los actualiza al agregar, modificar o eliminar filas y al reasignar riesgos,
+con un costo proporcional a las filas afectadas: las consultas no recorren
+los datos.
+"""
+
+import numpy as np
+
+from almacen_familias import PROBLEMAS_COMUNITARIOS
+
+# Columnas de la matriz de indicadores: los problemas comunitarios y otros
+# factores que muestran el diagnóstico y los reportes
+INDICADORES = PROBLEMAS_COMUNITARIOS + ["red_apoyo_debil"]
+_POSICION = {indicador: posicion for posicion, indicador in enumerate(INDICADORES)}
+
+
+def _crecer(arreglo, filas):
+    """Agrega filas con ceros a un arreglo de conteos (por código de sector)"""
+    if filas <= len(arreglo):
+        return arreglo
+    nuevo = np.zeros((max(filas, len(arreglo) * 2),) + arreglo.shape[1:], dtype=arreglo.dtype)
+    nuevo[:len(arreglo)] = arreglo
+    return nuevo
+
+
+class AgregadosFamilias:
+    """Conteos de un AlmacenFamilias (los enteros son exactos; no se recalculan)"""
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self.problemas = np.zeros(len(INDICADORES), dtype=np.int64)
+        self.sector_problemas = np.zeros((0, len(INDICADORES)), dtype=np.int64)
+        self.sector_total = np.zeros(0, dtype=np.int64)
+        self.sector_alto_riesgo = np.zeros(0, dtype=np.int64)
+        self.sector_alto = {nombre: np.zeros(0, dtype=np.int64) for nombre in ("riesgo_social", "riesgo_sanitario")}
+        self.riesgo = {nombre: np.zeros(0, dtype=np.int64) for nombre in ("riesgo_social", "riesgo_sanitario")}
+        self.alto_riesgo = 0
+
+    # --- Mantenimiento ---
+
+    def _indicadores(self, seleccion):
+        """Matriz booleana (filas × INDICADORES) de las filas seleccionadas"""
+        almacen = self.almacen
+        enfermedades = almacen.columna("enfermedades")[seleccion]
+        extras = almacen._extras[seleccion] if isinstance(seleccion, slice) else [almacen._extras[i] for i in seleccion]
+
+        def enfermedad(nombre):
+            codigo = almacen.enfermedades.codigo(nombre, agregar=False)
+            if not 0 <= codigo < 63:
+                return np.zeros(len(enfermedades), dtype=bool)
+            return (enfermedades >> codigo) & 1 == 1
+
+        def categoria(nombre, *valores):
+            codigos = almacen.columna(nombre)[seleccion]
+            return np.isin(codigos, [almacen.codigo(nombre, valor) for valor in valores])
+
+        columnas = {
+            "diabetes": enfermedad("Diabetes"),
+            "hipertension": enfermedad("Hipertensión"),
+            "obesidad": enfermedad("Obesidad"),
+            "hacinamiento": categoria("hacinamiento", "Alto"),
+            "baja_escolaridad": np.array([
+                bool(extra and isinstance(extra.get("educacion"), dict) and extra["educacion"].get("baja_escolaridad"))
+                for extra in extras
+            ], dtype=bool),
+            "acceso_salud": categoria("acceso_aps", "Difícil", "Muy difícil"),
+            "red_apoyo_debil": categoria("red_apoyo", "Débil"),
+        }
+        for factor in ("violencia_intrafamiliar", "consumo_drogas", "embarazo_adolescente", "desempleo"):
+            columnas[factor] = almacen.columna(factor)[seleccion]
+        return np.column_stack([columnas[indicador] for indicador in INDICADORES]).astype(np.int64)
+
+    def _alto(self, nombre, seleccion):
+        return self.almacen.columna(nombre)[seleccion] == self.almacen.codigo(nombre, "Alto")
+
+    def _sectores(self, seleccion):
+        """Códigos de sector de la selección y máscara de los válidos; crece las tablas si hace falta"""
+        sectores = self.almacen.columna("sector")[seleccion]
+        validos = sectores >= 0
+        if validos.any():
+            filas = int(sectores[validos].max()) + 1
+            self.sector_problemas = _crecer(self.sector_problemas, filas)
+            self.sector_total = _crecer(self.sector_total, filas)
+            self.sector_alto_riesgo = _crecer(self.sector_alto_riesgo, filas)
+            for nombre, conteos in self.sector_alto.items():
+                self.sector_alto[nombre] = _crecer(conteos, filas)
+        return sectores[validos], validos
+
+    def _sumar_riesgos(self, seleccion, signo):
+        for nombre in self.riesgo:
+            codigos = self.almacen.columna(nombre)[seleccion]
+            codigos = codigos[codigos >= 0]
+            if len(codigos):
+                self.riesgo[nombre] = _crecer(self.riesgo[nombre], int(codigos.max()) + 1)
+                np.add.at(self.riesgo[nombre], codigos, signo)
+        sectores, validos = self._sectores(seleccion)
+        altos = {nombre: self._alto(nombre, seleccion) for nombre in self.sector_alto}
+        for nombre, alto in altos.items():
+            np.add.at(self.sector_alto[nombre], sectores[alto[validos]], signo)
+        alto = altos["riesgo_social"] | altos["riesgo_sanitario"]
+        self.alto_riesgo += signo * int(alto.sum())
+        np.add.at(self.sector_alto_riesgo, sectores[alto[validos]], signo)
+
+    def _sumar(self, seleccion, signo):
+        indicadores = self._indicadores(seleccion)
+        self.problemas += signo * indicadores.sum(axis=0)
+        sectores, validos = self._sectores(seleccion)
+        np.add.at(self.sector_total, sectores, signo)
+        np.add.at(self.sector_problemas, sectores, signo * indicadores[validos])
+        self._sumar_riesgos(seleccion, signo)
+
+    def agregar(self, seleccion):
+        """Suma las filas seleccionadas (slice o posiciones) ya escritas en el almacén"""
+        self._sumar(seleccion, 1)
+
+    def quitar(self, seleccion):
+        """Resta las filas seleccionadas antes de modificarlas o eliminarlas"""
+        self._sumar(seleccion, -1)
+
+    def agregar_riesgos(self, seleccion):
+        self._sumar_riesgos(seleccion, 1)
+
+    def quitar_riesgos(self, seleccion):
+        self._sumar_riesgos(seleccion, -1)
+
+    # --- Consultas ---
+
+    def conteo(self, indicador):
+        return int(self.problemas[_POSICION[indicador]])
+
+    def conteos(self, indicadores=PROBLEMAS_COMUNITARIOS):
+        return {indicador: int(self.problemas[_POSICION[indicador]]) for indicador in indicadores}
+
+    def prevalencias(self, indicadores=PROBLEMAS_COMUNITARIOS):
+        """Porcentaje de familias afectadas por cada indicador"""
+        total = len(self.almacen)
+        return {indicador: (cantidad / total) * 100 if total else 0.0
+                for indicador, cantidad in self.conteos(indicadores).items()}
+
+    def niveles(self, nombre):
+        """Familias por nivel de 'riesgo_social' o 'riesgo_sanitario'"""
+        categorias = self.almacen.categorias[nombre].categorias
+        return {categoria: int(conteo) for categoria, conteo in zip(categorias, self.riesgo[nombre]) if conteo}
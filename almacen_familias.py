@@ -0,0 +1,492 @@
+"""
+Almacén columnar de familias
+Mantiene las familias registradas en arreglos NumPy por columna (códigos
+categóricos, banderas booleanas y puntajes enteros) para que los análisis
+no recorran diccionarios anidados. Ofrece además una vista por fila
+compatible con diccionarios para el código que espera el formato original.
+"""
+
+import itertools
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from instrumentacion import contar
+
+HACINAMIENTO = ["Bajo", "Medio", "Alto", "Crítico"]
+RED_APOYO = ["Fuerte", "Regular", "Débil"]
+PARTICIPACION_SOCIAL = ["Alta", "Media", "Baja", "Nula"]
+ACCESO_APS = ["Fácil", "Regular", "Difícil", "Muy difícil"]
+TIPOS_VIVIENDA = ["Casa", "Departamento", "Mediagua", "Otro"]
+NIVELES_RIESGO = ["Bajo", "Medio", "Alto"]
+
+ENFERMEDADES_CRONICAS = [
+    "Diabetes", "Hipertensión", "Obesidad", "Enfermedad pulmonar",
+    "Enfermedad cardíaca", "Artritis", "Asma", "Tuberculosis"
+]
+
+OCUPACIONES = ["Empleado", "Obrero", "Profesional", "Dueño de casa", "Jubilado", "Desempleado", "Estudiante", "Otro"]
+
+# Límites de validación del registro (formulario e importación masiva)
+EDAD_MINIMA_JEFE = 18
+EDAD_MAXIMA_JEFE = 100
+MAX_INTEGRANTES_HABITUAL = 10
+
+FACTORES_RIESGO = [
+    "embarazo_adolescente", "violencia_intrafamiliar", "consumo_drogas",
+    "desempleo", "discapacidad", "adulto_mayor"
+]
+
+# Columnas categóricas con sus categorías conocidas (las nuevas se agregan al vuelo)
+COLUMNAS_CATEGORICAS = {
+    "sector": [],
+    "ocupacion_jefe": [],
+    "tipo_vivienda": TIPOS_VIVIENDA,
+    "hacinamiento": HACINAMIENTO,
+    "red_apoyo": RED_APOYO,
+    "participacion_social": PARTICIPACION_SOCIAL,
+    "acceso_aps": ACCESO_APS,
+    "riesgo_social": NIVELES_RIESGO,
+    "riesgo_sanitario": NIVELES_RIESGO,
+    "version_riesgo": [],
+}
+COLUMNAS_ENTERAS = ["num_integrantes", "edad_jefe", "puntaje_social", "puntaje_sanitario"]
+COLUMNAS_TEXTO = ["apellido", "nombre_jefe", "observaciones", "fecha_registro", "responsable"]
+
+# Problemas comunitarios que cuenta el análisis inteligente
+PROBLEMAS_COMUNITARIOS = [
+    "diabetes", "hipertension", "obesidad", "hacinamiento", "violencia_intrafamiliar",
+    "consumo_drogas", "embarazo_adolescente", "desempleo", "baja_escolaridad", "acceso_salud"
+]
+
+_CLAVES_BASE = {
+    "sector", "apellido", "num_integrantes", "jefe_hogar", "vivienda", "salud",
+    "riesgos", "observaciones", "fecha_registro", "responsable"
+}
+
+
+def valor_familia(familia, grupo, campo, defecto=None):
+    """Lee un campo en esquema anidado (familia[grupo][campo]) o plano (familia[campo])"""
+    subgrupo = familia.get(grupo)
+    if isinstance(subgrupo, Mapping) and campo in subgrupo:
+        return subgrupo[campo]
+    return familia.get(campo, defecto)
+
+
+def factor_presente(valor):
+    """Un factor de riesgo está presente si su valor es verdadero; None, NaN y NA cuentan como ausentes"""
+    if valor is None or valor is pd.NA or isinstance(valor, float) and np.isnan(valor):
+        return False
+    return bool(valor)
+
+
+def _riesgo(familia, tipo, campo):
+    riesgo = familia.get("riesgos", {}).get(tipo)
+    return riesgo.get(campo) if isinstance(riesgo, Mapping) else None
+
+
+def _version_riesgo(familia):
+    riesgos = familia.get("riesgos")
+    return riesgos.get("version") if isinstance(riesgos, Mapping) else None
+
+
+class _Categorias:
+    """Diccionario de codificación de una columna categórica"""
+
+    def __init__(self, categorias):
+        self.categorias = list(categorias)
+        self.indice = {categoria: codigo for codigo, categoria in enumerate(self.categorias)}
+
+    def codigo(self, valor, agregar=True):
+        if valor is None:
+            return -1
+        codigo = self.indice.get(valor)
+        if codigo is None:
+            if not agregar:
+                return -2
+            codigo = len(self.categorias)
+            self.categorias.append(valor)
+            self.indice[valor] = codigo
+        return codigo
+
+
+_IDENTIFICADORES = itertools.count(1)
+
+
+class AlmacenFamilias:
+    """Familias en columnas NumPy con crecimiento amortizado"""
+
+    def __init__(self, familias=()):
+        self._n = 0
+        self._capacidad = 0
+        self.categorias = {nombre: _Categorias(valores) for nombre, valores in COLUMNAS_CATEGORICAS.items()}
+        self.enfermedades = _Categorias(ENFERMEDADES_CRONICAS)
+        self._columnas = {}
+        self._texto = {nombre: [] for nombre in COLUMNAS_TEXTO}
+        self._extras = []
+        self.origen = None
+        # Identifican el contenido para las cachés de análisis: el identificador es
+        # único en el proceso y la revisión aumenta con cada modificación
+        self.identificador = next(_IDENTIFICADORES)
+        self.revision = 0
+        # Reglas de riesgo con que ya se verificaron las primeras 'verificadas' filas
+        self.version_verificada = None
+        self.verificadas = 0
+        self._indice = None
+        self._busqueda = None
+        self._marco = None
+        from agregados_familias import AgregadosFamilias
+        self.agregados = AgregadosFamilias(self)
+        self._reservar(max(16, len(familias)))
+        self.extender(familias)
+
+    def _reservar(self, capacidad):
+        if capacidad <= self._capacidad:
+            return
+        especificacion = {nombre: (np.int16, -1) for nombre in COLUMNAS_CATEGORICAS}
+        especificacion.update({nombre: (np.int32, -1) for nombre in COLUMNAS_ENTERAS})
+        especificacion.update({nombre: (np.bool_, False) for nombre in FACTORES_RIESGO})
+        especificacion["enfermedades"] = (np.int64, 0)
+        for nombre, (tipo, relleno) in especificacion.items():
+            nueva = np.full(capacidad, relleno, dtype=tipo)
+            if nombre in self._columnas:
+                nueva[:self._n] = self._columnas[nombre][:self._n]
+            self._columnas[nombre] = nueva
+        self._capacidad = capacidad
+
+    def __len__(self):
+        return self._n
+
+    def agregar(self, familia):
+        self.extender([familia])
+
+    def extender(self, familias):
+        familias = list(familias)
+        if not familias:
+            return
+        inicio, fin = self._n, self._n + len(familias)
+        if fin > self._capacidad:
+            self._reservar(max(fin, self._capacidad * 2))
+        self._escribir(inicio, familias)
+        self._n = fin
+        self.agregados.agregar(slice(inicio, fin))
+        self.revision += 1
+        if self._indice is not None:
+            self._indice.extender(inicio, fin)
+        if self._busqueda is not None:
+            self._busqueda.extender(inicio, fin)
+
+    def actualizar(self, posicion, familia):
+        """
+        Reemplaza la familia en 'posicion'. Los contadores se ajustan solo con esa
+        fila; los índices secundarios se reconstruyen al próximo uso.
+        """
+        posicion = self._posicion(posicion)
+        fila = slice(posicion, posicion + 1)
+        self.agregados.quitar(fila)
+        self._escribir(posicion, [familia])
+        self.agregados.agregar(fila)
+        self._modificado(posicion)
+
+    def eliminar(self, posicion):
+        """Elimina la familia en 'posicion'; las siguientes se desplazan una posición"""
+        posicion = self._posicion(posicion)
+        self.agregados.quitar(slice(posicion, posicion + 1))
+        for columna in self._columnas.values():
+            columna[posicion:self._n - 1] = columna[posicion + 1:self._n]
+        for lista in self._texto.values():
+            del lista[posicion]
+        del self._extras[posicion]
+        self._n -= 1
+        self._modificado(posicion)
+
+    def _posicion(self, posicion):
+        if not -self._n <= posicion < self._n:
+            raise IndexError(posicion)
+        return posicion % self._n
+
+    def _modificado(self, posicion):
+        """Tras modificar o eliminar una fila: se vuelve a verificar su riesgo y se descartan los índices"""
+        self.verificadas = min(self.verificadas, posicion)
+        self._indice = None
+        self._busqueda = None
+        self.revision += 1
+
+    def _escribir(self, inicio, familias):
+        """Escribe las familias en las filas [inicio, inicio + len(familias)) ya reservadas"""
+        fin = inicio + len(familias)
+        jefes = [f.get("jefe_hogar") or {} for f in familias]
+        valores = {
+            "sector": [f.get("sector") for f in familias],
+            "ocupacion_jefe": [j.get("ocupacion") for j in jefes],
+            "tipo_vivienda": [valor_familia(f, "vivienda", "tipo") for f in familias],
+            "riesgo_social": [_riesgo(f, "social", "nivel") for f in familias],
+            "riesgo_sanitario": [_riesgo(f, "sanitario", "nivel") for f in familias],
+            "version_riesgo": [_version_riesgo(f) for f in familias],
+        }
+        for campo in ["hacinamiento", "red_apoyo", "participacion_social", "acceso_aps"]:
+            valores[campo] = [valor_familia(f, "vivienda", campo) for f in familias]
+        for nombre, lista in valores.items():
+            categorias = self.categorias[nombre]
+            self._columnas[nombre][inicio:fin] = [categorias.codigo(valor) for valor in lista]
+
+        enteros = {
+            "num_integrantes": [f.get("num_integrantes") for f in familias],
+            "edad_jefe": [j.get("edad") for j in jefes],
+            "puntaje_social": [_riesgo(f, "social", "puntaje") for f in familias],
+            "puntaje_sanitario": [_riesgo(f, "sanitario", "puntaje") for f in familias],
+        }
+        for nombre, lista in enteros.items():
+            self._columnas[nombre][inicio:fin] = [-1 if valor is None else valor for valor in lista]
+
+        for factor in FACTORES_RIESGO:
+            self._columnas[factor][inicio:fin] = [factor_presente(valor_familia(f, "salud", factor)) for f in familias]
+
+        mascaras = []
+        for f in familias:
+            mascara = 0
+            for enfermedad in valor_familia(f, "salud", "enfermedades_cronicas", None) or []:
+                codigo = self.enfermedades.codigo(enfermedad)
+                if codigo < 63:
+                    mascara |= 1 << codigo
+            mascaras.append(mascara)
+        self._columnas["enfermedades"][inicio:fin] = mascaras
+
+        self._texto["apellido"][inicio:fin] = [f.get("apellido", "") for f in familias]
+        self._texto["nombre_jefe"][inicio:fin] = [j.get("nombre", "") for j in jefes]
+        self._texto["observaciones"][inicio:fin] = [f.get("observaciones", "") for f in familias]
+        self._texto["fecha_registro"][inicio:fin] = [f.get("fecha_registro", "") for f in familias]
+        self._texto["responsable"][inicio:fin] = [f.get("responsable", "") for f in familias]
+        self._extras[inicio:fin] = [
+            {clave: valor for clave, valor in f.items() if clave not in _CLAVES_BASE} or None
+            for f in familias
+        ]
+
+    def asignar_riesgos(self, resultado, posiciones=None, version=None):
+        """
+        Reemplaza niveles y puntajes de riesgo con el resultado de un cálculo por lotes
+        (de todas las filas o solo de 'posiciones') y registra la versión de reglas usada
+        """
+        seleccion = slice(0, self._n) if posiciones is None else np.asarray(posiciones)
+        self.agregados.quitar_riesgos(seleccion)
+        for tipo in ("social", "sanitario"):
+            categorias = self.categorias[f"riesgo_{tipo}"]
+            tabla = np.array([categorias.codigo(nivel) for nivel in NIVELES_RIESGO] + [-1], dtype=np.int16)
+            niveles = pd.Categorical(resultado[f"riesgo_{tipo}"], categories=NIVELES_RIESGO).codes
+            self._columnas[f"riesgo_{tipo}"][seleccion] = tabla[niveles]
+            self._columnas[f"puntaje_{tipo}"][seleccion] = resultado[f"puntaje_{tipo}"]
+        if version is not None:
+            self._columnas["version_riesgo"][seleccion] = self.categorias["version_riesgo"].codigo(version)
+        self.agregados.agregar_riesgos(seleccion)
+        self.revision += 1
+        if self._indice is not None:
+            self._indice.reconstruir_riesgos(posiciones)
+
+    def indice(self):
+        """Índices secundarios (mapas de bits); se crean al primer uso y luego se mantienen"""
+        if self._indice is None:
+            from indice_familias import IndiceFamilias
+            self._indice = IndiceFamilias(self)
+        return self._indice
+
+    def busqueda(self):
+        """Índice de texto por apellido y nombre del jefe de hogar (se crea al primer uso)"""
+        if self._busqueda is None:
+            from busqueda_familias import IndiceBusqueda
+            self._busqueda = IndiceBusqueda(self)
+        return self._busqueda
+
+    # --- Acceso por columna ---
+
+    def columna(self, nombre):
+        """Retorna la columna (vista sin copia) de las familias almacenadas"""
+        if nombre in self._texto:
+            return self._texto[nombre]
+        return self._columnas[nombre][:self._n]
+
+    def valores(self, nombre):
+        """Retorna una columna categórica decodificada como arreglo de textos (None si falta)"""
+        categorias = np.array(self.categorias[nombre].categorias + [None], dtype=object)
+        return categorias[self.columna(nombre)]
+
+    def codigo(self, nombre, valor):
+        """Código de 'valor' en la columna categórica (-2 si nunca se ha visto)"""
+        return self.categorias[nombre].codigo(valor, agregar=False)
+
+    def mascara(self, nombre, valor):
+        return self.columna(nombre) == self.codigo(nombre, valor)
+
+    def mascara_enfermedades(self, enfermedades):
+        """Familias que tienen al menos una de las enfermedades indicadas"""
+        bits = 0
+        for enfermedad in enfermedades:
+            codigo = self.enfermedades.codigo(enfermedad, agregar=False)
+            if 0 <= codigo < 63:
+                bits |= 1 << codigo
+        return (self.columna("enfermedades") & bits) != 0
+
+    def mascara_alto_riesgo(self):
+        """Familias con riesgo social o sanitario Alto"""
+        return self.mascara("riesgo_social", "Alto") | self.mascara("riesgo_sanitario", "Alto")
+
+    def contar_alto_riesgo(self):
+        """Cantidad de familias con riesgo social o sanitario Alto (contador incremental)"""
+        return self.agregados.alto_riesgo
+
+    def contar(self, nombre):
+        """Conteo por categoría de una columna categórica (solo categorías presentes)"""
+        codigos = self.columna(nombre)
+        conteos = np.bincount(codigos[codigos >= 0], minlength=len(self.categorias[nombre].categorias))
+        return {
+            categoria: int(conteo)
+            for categoria, conteo in zip(self.categorias[nombre].categorias, conteos)
+            if conteo
+        }
+
+    def contar_problemas(self):
+        """Cantidad de familias afectadas por cada problema comunitario (contadores incrementales)"""
+        return self.agregados.conteos()
+
+    def enfermedades_fila(self, posicion):
+        mascara = int(self._columnas["enfermedades"][posicion])
+        return [enfermedad for codigo, enfermedad in enumerate(self.enfermedades.categorias) if mascara >> codigo & 1]
+
+    # --- Vistas ---
+
+    def fila(self, posicion):
+        return FilaFamilia(self, self._posicion(posicion))
+
+    def __getitem__(self, posicion):
+        return self.fila(posicion)
+
+    def __iter__(self):
+        for posicion in range(self._n):
+            yield FilaFamilia(self, posicion)
+
+    def filas(self, posiciones):
+        return [FilaFamilia(self, int(posicion)) for posicion in posiciones]
+
+    def a_dataframe(self, posiciones=None):
+        """DataFrame plano con dtypes categóricos (opcionalmente solo algunas filas)"""
+        seleccion = slice(None) if posiciones is None else np.asarray(posiciones, dtype=np.intp)
+        datos = {}
+        for nombre in COLUMNAS_CATEGORICAS:
+            datos[nombre] = pd.Categorical.from_codes(
+                self.columna(nombre)[seleccion], categories=pd.Index(self.categorias[nombre].categorias, dtype=object)
+            )
+        for nombre in COLUMNAS_ENTERAS + FACTORES_RIESGO:
+            datos[nombre] = self.columna(nombre)[seleccion]
+        for nombre in COLUMNAS_TEXTO:
+            columna = self._texto[nombre]
+            datos[nombre] = columna if posiciones is None else [columna[int(p)] for p in posiciones]
+        # Un texto por combinación distinta de enfermedades (son pocas)
+        mascaras, inversa = np.unique(self.columna("enfermedades")[seleccion], return_inverse=True)
+        textos = np.array([
+            ", ".join(enfermedad for codigo, enfermedad in enumerate(self.enfermedades.categorias) if int(mascara) >> codigo & 1)
+            for mascara in mascaras
+        ], dtype=object)
+        datos["enfermedades_cronicas"] = textos[inversa.reshape(-1)]
+        contar("dataframes")
+        return pd.DataFrame(datos)
+
+    def marco(self):
+        """
+        DataFrame plano de todas las familias, construido una vez por revisión y
+        compartido por páginas y exportaciones (no modificar)
+        """
+        if self._marco is None or self._marco[0] != self.revision:
+            self._marco = (self.revision, self.a_dataframe())
+        return self._marco[1]
+
+
+class FilaFamilia(Mapping):
+    """
+    Vista de una familia con la forma del registro original (esquema anidado).
+    También responde a las claves planas antiguas (p. ej. fila["hacinamiento"]).
+    """
+
+    __slots__ = ("_almacen", "_posicion")
+
+    def __init__(self, almacen, posicion):
+        self._almacen = almacen
+        self._posicion = posicion
+
+    def _categoria(self, nombre):
+        codigo = self._almacen.columna(nombre)[self._posicion]
+        return self._almacen.categorias[nombre].categorias[codigo] if codigo >= 0 else None
+
+    def _entero(self, nombre):
+        valor = int(self._almacen.columna(nombre)[self._posicion])
+        return None if valor < 0 else valor
+
+    def _texto(self, nombre):
+        return self._almacen.columna(nombre)[self._posicion]
+
+    def _claves(self):
+        claves = ["sector", "apellido", "num_integrantes", "jefe_hogar", "vivienda", "salud"]
+        if self._categoria("riesgo_social") is not None or self._categoria("riesgo_sanitario") is not None:
+            claves.append("riesgos")
+        claves += ["observaciones", "fecha_registro", "responsable"]
+        extra = self._almacen._extras[self._posicion]
+        return claves + (list(extra) if extra else [])
+
+    def __iter__(self):
+        return iter(self._claves())
+
+    def __len__(self):
+        return len(self._claves())
+
+    def __getitem__(self, clave):
+        if clave in ("sector",):
+            return self._categoria("sector")
+        if clave in ("apellido", "observaciones", "fecha_registro", "responsable"):
+            return self._texto(clave)
+        if clave == "num_integrantes":
+            return self._entero("num_integrantes")
+        if clave == "jefe_hogar":
+            return {
+                "nombre": self._texto("nombre_jefe"),
+                "edad": self._entero("edad_jefe"),
+                "ocupacion": self._categoria("ocupacion_jefe"),
+            }
+        if clave == "vivienda":
+            return {
+                "tipo": self._categoria("tipo_vivienda"),
+                "hacinamiento": self._categoria("hacinamiento"),
+                "red_apoyo": self._categoria("red_apoyo"),
+                "participacion_social": self._categoria("participacion_social"),
+                "acceso_aps": self._categoria("acceso_aps"),
+            }
+        if clave == "salud":
+            salud = {"enfermedades_cronicas": self._almacen.enfermedades_fila(self._posicion)}
+            salud.update({factor: bool(self._almacen.columna(factor)[self._posicion]) for factor in FACTORES_RIESGO})
+            return salud
+        if clave == "riesgos" and "riesgos" in self._claves():
+            riesgos = {
+                "social": {"nivel": self._categoria("riesgo_social"), "puntaje": self._entero("puntaje_social")},
+                "sanitario": {"nivel": self._categoria("riesgo_sanitario"), "puntaje": self._entero("puntaje_sanitario")},
+            }
+            version = self._categoria("version_riesgo")
+            if version is not None:
+                riesgos["version"] = version
+            return riesgos
+        # Claves del esquema plano antiguo
+        if clave in ("hacinamiento", "red_apoyo", "participacion_social", "acceso_aps"):
+            return self._categoria(clave)
+        if clave in FACTORES_RIESGO:
+            return bool(self._almacen.columna(clave)[self._posicion])
+        if clave == "enfermedades_cronicas":
+            return self._almacen.enfermedades_fila(self._posicion)
+        extra = self._almacen._extras[self._posicion]
+        if extra and clave in extra:
+            return extra[clave]
+        raise KeyError(clave)
+
+    def a_dict(self):
+        """Copia de la familia como diccionario anidado"""
+        return {clave: self[clave] for clave in self}
+
+    def __repr__(self):
+        return f"FilaFamilia({self.a_dict()!r})"
+
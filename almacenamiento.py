@@ -0,0 +1,502 @@
+"""
+Backends de almacenamiento para el sistema de usuarios del Simulador Comunitario
+Incluye el almacén JSON heredado (un archivo por usuario) y un almacén SQLite
+con una fila por entidad (sector, familia, actividad del plan, etc.)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from rastreo_cambios import cambios_completos
+from registros import a_json
+
+DIRECTORIO_USUARIOS = "datos_usuarios"
+ARCHIVO_SQLITE = "simulador.db"
+ARCHIVO_CATALOGO = "catalogo.idx"
+
+# Líneas sobrantes (guardados repetidos de un mismo usuario) toleradas antes de compactar el catálogo
+COMPACTAR_CATALOGO = int(os.environ.get("SIMULADOR_COMPACTAR_CATALOGO", "1000"))
+
+# Clave de la tabla metadatos que marca la migración desde JSON como terminada
+MARCA_MIGRACION = "migracion_json"
+
+# Colecciones del proyecto que se guardan como listas de entidades
+COLECCIONES_LISTA = ["sectores", "equipos", "familias", "instituciones", "plan_intervencion"]
+
+# Colecciones del proyecto que se guardan como un único objeto
+COLECCIONES_OBJETO = ["diagnostico", "autoevaluacion", "evaluacion_mais"]
+
+CAMPOS_PERFIL = ["user_id", "nombre", "email", "curso", "fecha_registro"]
+
+# Campos del catálogo compacto de usuarios (perfil + metadatos de guardado)
+CAMPOS_CATALOGO = CAMPOS_PERFIL + ["ultimo_guardado", "tamano_datos"]
+
+
+def _ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def datos_iniciales():
+    """Retorna la estructura de datos vacía de un usuario nuevo"""
+    datos = {coleccion: [] for coleccion in COLECCIONES_LISTA}
+    datos.update({coleccion: None for coleccion in COLECCIONES_OBJETO})
+    return datos
+
+
+class AlmacenamientoJSON:
+    """Almacén heredado: un archivo JSON por usuario en el directorio de usuarios"""
+
+    def __init__(self, directorio=DIRECTORIO_USUARIOS):
+        self.directorio = directorio
+        if not os.path.exists(self.directorio):
+            os.makedirs(self.directorio)
+        self.ruta_catalogo = os.path.join(self.directorio, ARCHIVO_CATALOGO)
+        self._bloqueo_catalogo = threading.Lock()
+        # Líneas del archivo y usuarios distintos según la última lectura (None = aún no leído)
+        self._lineas_catalogo = None
+        self._usuarios_catalogo = 0
+
+    def _ruta(self, user_id):
+        return os.path.join(self.directorio, f"{user_id}.json")
+
+    def _leer(self, user_id):
+        with open(self._ruta(user_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _escribir(self, user_id, datos_usuario):
+        """Escribe el archivo del usuario de forma atómica (temporal + rename)"""
+        ruta = self._ruta(user_id)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos_usuario, f, indent=2, ensure_ascii=False, default=a_json)
+        os.replace(temporal, ruta)
+        self._actualizar_catalogo(datos_usuario, os.path.getsize(ruta))
+
+    def _leer_catalogo(self):
+        """
+        Lee el catálogo (una entrada JSON por línea, la última de cada usuario prevalece)
+        y lo compacta si acumula demasiadas líneas; si no existe (directorio heredado)
+        lo reconstruye una vez
+        """
+        if os.path.exists(self.ruta_catalogo):
+            catalogo = {}
+            lineas = 0
+            reescribir = False
+            with open(self.ruta_catalogo, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    if not linea.strip():
+                        continue
+                    lineas += 1
+                    try:
+                        entrada = json.loads(linea)
+                    except json.JSONDecodeError:
+                        # Línea cortada por una escritura interrumpida
+                        reescribir = True
+                        continue
+                    if "user_id" in entrada:
+                        catalogo[entrada["user_id"]] = entrada
+                    else:
+                        # Formato anterior: todo el catálogo en un único objeto
+                        catalogo.update(entrada)
+                        reescribir = True
+            self._lineas_catalogo = lineas
+            self._usuarios_catalogo = len(catalogo)
+            if reescribir or lineas > 2 * len(catalogo) + COMPACTAR_CATALOGO:
+                self._escribir_catalogo(catalogo)
+            return catalogo
+        catalogo = {}
+        for archivo in os.listdir(self.directorio):
+            if archivo.endswith('.json'):
+                ruta = os.path.join(self.directorio, archivo)
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    datos_usuario = json.load(f)
+                entrada = {campo: datos_usuario.get(campo) for campo in CAMPOS_PERFIL}
+                entrada["ultimo_guardado"] = datetime.fromtimestamp(os.path.getmtime(ruta)).strftime("%Y-%m-%d %H:%M:%S")
+                entrada["tamano_datos"] = os.path.getsize(ruta)
+                catalogo[entrada["user_id"]] = entrada
+        self._escribir_catalogo(catalogo)
+        return catalogo
+
+    def _escribir_catalogo(self, catalogo):
+        """Reescribe el catálogo compacto, con una línea por usuario"""
+        temporal = f"{self.ruta_catalogo}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            for entrada in catalogo.values():
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        os.replace(temporal, self.ruta_catalogo)
+        self._lineas_catalogo = self._usuarios_catalogo = len(catalogo)
+
+    def _actualizar_catalogo(self, datos_usuario, tamano):
+        """Agrega al final del catálogo solo la entrada del usuario guardado"""
+        with self._bloqueo_catalogo:
+            if self._lineas_catalogo is None or not os.path.exists(self.ruta_catalogo):
+                self._leer_catalogo()
+            entrada = {campo: datos_usuario.get(campo) for campo in CAMPOS_PERFIL}
+            entrada["ultimo_guardado"] = _ahora()
+            entrada["tamano_datos"] = tamano
+            with open(self.ruta_catalogo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            self._lineas_catalogo += 1
+            if self._lineas_catalogo > 2 * self._usuarios_catalogo + COMPACTAR_CATALOGO:
+                self._leer_catalogo()
+
+    def existe_usuario(self, user_id):
+        return os.path.exists(self._ruta(user_id))
+
+    def crear_usuario(self, perfil, datos=None):
+        datos_usuario = dict(perfil)
+        datos_usuario["datos"] = datos if datos is not None else datos_iniciales()
+        self._escribir(perfil["user_id"], datos_usuario)
+
+    def cargar_perfil(self, user_id):
+        if not self.existe_usuario(user_id):
+            return None
+        datos_usuario = self._leer(user_id)
+        return {campo: datos_usuario.get(campo) for campo in CAMPOS_PERFIL}
+
+    def cargar_datos(self, user_id, colecciones=None):
+        if not self.existe_usuario(user_id):
+            return None
+        datos = self._leer(user_id).get("datos", {})
+        if colecciones is None:
+            return datos
+        return {coleccion: datos[coleccion] for coleccion in colecciones if coleccion in datos}
+
+    def guardar_datos(self, user_id, datos):
+        """Actualiza las colecciones indicadas, conservando el resto del archivo"""
+        return self.aplicar_cambios(user_id, cambios_completos(datos))
+
+    def aplicar_cambios(self, user_id, cambios):
+        """Aplica los cambios sobre el archivo del usuario; el formato JSON siempre reescribe el archivo completo"""
+        if not self.existe_usuario(user_id):
+            return False
+        if not cambios:
+            return True
+        datos_usuario = self._leer(user_id)
+        datos = datos_usuario.setdefault("datos", {})
+        for coleccion, cambio in cambios.items():
+            if cambio["tipo"] == "lista":
+                registros = datos.get(coleccion)
+                if not isinstance(registros, list):
+                    registros = []
+                registros = (registros + [None] * cambio["longitud"])[:cambio["longitud"]]
+                for posicion, registro in cambio["registros"].items():
+                    registros[posicion] = registro
+                datos[coleccion] = registros
+            else:
+                datos[coleccion] = cambio["valor"]
+        self._escribir(user_id, datos_usuario)
+        return True
+
+    def listar_perfiles(self, limite=None, desplazamiento=0):
+        """Lista el catálogo de usuarios (más recientes primero) sin abrir los archivos de datos"""
+        with self._bloqueo_catalogo:
+            catalogo = self._leer_catalogo()
+        perfiles = sorted(catalogo.values(), key=lambda p: (p.get("fecha_registro") or "", p["user_id"]), reverse=True)
+        fin = None if limite is None else desplazamiento + limite
+        return perfiles[desplazamiento:fin]
+
+    def estadisticas_catalogo(self):
+        with self._bloqueo_catalogo:
+            catalogo = self._leer_catalogo()
+        fechas = [p["fecha_registro"] for p in catalogo.values() if p.get("fecha_registro")]
+        return {
+            "total_usuarios": len(catalogo),
+            "cursos": len({p.get("curso") for p in catalogo.values()}),
+            "ultimo_registro": max(fechas) if fechas else None
+        }
+
+
+class AlmacenamientoSQLite:
+    """Almacén SQLite en modo WAL con una fila por entidad y upserts transaccionales"""
+
+    def __init__(self, ruta=None):
+        if ruta is None:
+            ruta = os.path.join(DIRECTORIO_USUARIOS, ARCHIVO_SQLITE)
+        directorio = os.path.dirname(ruta)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+        self.ruta = ruta
+        self._local = threading.local()
+        self._crear_esquema()
+
+    def _conexion(self):
+        """Retorna la conexión del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.execute("PRAGMA foreign_keys=ON")
+            self._local.conexion = conexion
+        return conexion
+
+    def _crear_esquema(self):
+        self._conexion().executescript("""
+            CREATE TABLE IF NOT EXISTS usuarios (
+                user_id TEXT PRIMARY KEY,
+                nombre TEXT NOT NULL,
+                email TEXT NOT NULL,
+                curso TEXT,
+                fecha_registro TEXT,
+                ultimo_guardado TEXT,
+                tamano_datos INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS colecciones (
+                user_id TEXT NOT NULL REFERENCES usuarios(user_id) ON DELETE CASCADE,
+                coleccion TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                PRIMARY KEY (user_id, coleccion)
+            );
+            CREATE TABLE IF NOT EXISTS metadatos (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+            CREATE TABLE IF NOT EXISTS registros (
+                user_id TEXT NOT NULL,
+                coleccion TEXT NOT NULL,
+                posicion INTEGER NOT NULL,
+                datos TEXT NOT NULL,
+                PRIMARY KEY (user_id, coleccion, posicion),
+                FOREIGN KEY (user_id, coleccion) REFERENCES colecciones(user_id, coleccion) ON DELETE CASCADE
+            );
+        """)
+        # Bases creadas antes del catálogo no tienen las columnas de metadatos
+        columnas = {fila[1] for fila in self._conexion().execute("PRAGMA table_info(usuarios)")}
+        if "ultimo_guardado" not in columnas:
+            self._conexion().execute("ALTER TABLE usuarios ADD COLUMN ultimo_guardado TEXT")
+        if "tamano_datos" not in columnas:
+            self._conexion().execute("ALTER TABLE usuarios ADD COLUMN tamano_datos INTEGER NOT NULL DEFAULT 0")
+            self._conexion().execute(
+                "UPDATE usuarios SET tamano_datos = "
+                "(SELECT COALESCE(SUM(LENGTH(datos)), 0) FROM registros WHERE registros.user_id = usuarios.user_id)"
+            )
+        self._conexion().executescript("""
+            CREATE INDEX IF NOT EXISTS idx_usuarios_fecha ON usuarios (fecha_registro);
+
+            -- El tamaño de datos del catálogo se mantiene por fila, sin recorrer los registros del usuario
+            CREATE TRIGGER IF NOT EXISTS registros_tamano_insert AFTER INSERT ON registros BEGIN
+                UPDATE usuarios SET tamano_datos = tamano_datos + LENGTH(NEW.datos) WHERE user_id = NEW.user_id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS registros_tamano_update AFTER UPDATE OF datos ON registros BEGIN
+                UPDATE usuarios SET tamano_datos = tamano_datos + LENGTH(NEW.datos) - LENGTH(OLD.datos)
+                WHERE user_id = NEW.user_id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS registros_tamano_delete AFTER DELETE ON registros BEGIN
+                UPDATE usuarios SET tamano_datos = tamano_datos - LENGTH(OLD.datos) WHERE user_id = OLD.user_id;
+            END;
+        """)
+
+    def _actualizar_catalogo(self, conexion, user_id):
+        """Actualiza la hora de guardado del usuario (dentro de la transacción)"""
+        conexion.execute("UPDATE usuarios SET ultimo_guardado = ? WHERE user_id = ?", (_ahora(), user_id))
+
+    def _transaccion(self):
+        """Abre una transacción de escritura; BEGIN IMMEDIATE evita guardados concurrentes perdidos"""
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        return conexion
+
+    def _aplicar_cambio(self, conexion, user_id, coleccion, cambio):
+        """Escribe solo los registros modificados de una colección"""
+        conexion.execute(
+            "INSERT INTO colecciones (user_id, coleccion, tipo) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, coleccion) DO UPDATE SET tipo = excluded.tipo",
+            (user_id, coleccion, cambio["tipo"])
+        )
+        if cambio["tipo"] == "lista":
+            registros, longitud = cambio["registros"], cambio["longitud"]
+        else:
+            registros, longitud = {0: cambio["valor"]}, 1
+        conexion.executemany(
+            "INSERT INTO registros (user_id, coleccion, posicion, datos) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id, coleccion, posicion) DO UPDATE SET datos = excluded.datos",
+            [(user_id, coleccion, posicion, json.dumps(registro, ensure_ascii=False, default=a_json))
+             for posicion, registro in registros.items()]
+        )
+        conexion.execute(
+            "DELETE FROM registros WHERE user_id = ? AND coleccion = ? AND posicion >= ?",
+            (user_id, coleccion, longitud)
+        )
+
+    def _crear_usuario(self, conexion, perfil, datos):
+        conexion.execute(
+            "INSERT INTO usuarios (user_id, nombre, email, curso, fecha_registro) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET nombre = excluded.nombre, email = excluded.email, "
+            "curso = excluded.curso, fecha_registro = excluded.fecha_registro",
+            tuple(perfil.get(campo) for campo in CAMPOS_PERFIL)
+        )
+        for coleccion, cambio in cambios_completos(datos).items():
+            self._aplicar_cambio(conexion, perfil["user_id"], coleccion, cambio)
+        self._actualizar_catalogo(conexion, perfil["user_id"])
+
+    def migracion_completa(self):
+        """True si la migración desde el almacén JSON terminó (su marca se guarda en la misma transacción)"""
+        fila = self._conexion().execute(
+            "SELECT 1 FROM metadatos WHERE clave = ?", (MARCA_MIGRACION,)
+        ).fetchone()
+        return fila is not None
+
+    def migrar_desde(self, origen):
+        """
+        Copia los usuarios del almacén 'origen' que aún no existen aquí y deja la marca
+        de migración completa, todo en una transacción: si se interrumpe no queda nada
+        a medias y la próxima ejecución la repite. Retorna el número de usuarios migrados.
+        """
+        migrados = 0
+        conexion = self._transaccion()
+        try:
+            for perfil in origen.listar_perfiles():
+                if conexion.execute("SELECT 1 FROM usuarios WHERE user_id = ?", (perfil["user_id"],)).fetchone():
+                    continue
+                datos = origen.cargar_datos(perfil["user_id"])
+                self._crear_usuario(conexion, perfil, datos if datos is not None else datos_iniciales())
+                migrados += 1
+            conexion.execute(
+                "INSERT INTO metadatos (clave, valor) VALUES (?, ?) "
+                "ON CONFLICT (clave) DO UPDATE SET valor = excluded.valor",
+                (MARCA_MIGRACION, _ahora())
+            )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+        return migrados
+
+    def existe_usuario(self, user_id):
+        fila = self._conexion().execute(
+            "SELECT 1 FROM usuarios WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return fila is not None
+
+    def crear_usuario(self, perfil, datos=None):
+        if datos is None:
+            datos = datos_iniciales()
+        conexion = self._transaccion()
+        try:
+            self._crear_usuario(conexion, perfil, datos)
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+
+    def cargar_perfil(self, user_id):
+        fila = self._conexion().execute(
+            f"SELECT {', '.join(CAMPOS_PERFIL)} FROM usuarios WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return dict(zip(CAMPOS_PERFIL, fila)) if fila else None
+
+    def cargar_datos(self, user_id, colecciones=None):
+        if not self.existe_usuario(user_id):
+            return None
+        conexion = self._conexion()
+        consulta_colecciones = "SELECT coleccion, tipo FROM colecciones WHERE user_id = ?"
+        consulta_registros = "SELECT coleccion, datos FROM registros WHERE user_id = ?"
+        parametros = [user_id]
+        if colecciones is not None:
+            marcadores = ", ".join("?" for _ in colecciones)
+            consulta_colecciones += f" AND coleccion IN ({marcadores})"
+            consulta_registros += f" AND coleccion IN ({marcadores})"
+            parametros += list(colecciones)
+
+        tipos = dict(conexion.execute(consulta_colecciones, parametros).fetchall())
+        datos = {coleccion: [] for coleccion in tipos}
+        for coleccion, registro in conexion.execute(consulta_registros + " ORDER BY coleccion, posicion", parametros):
+            datos[coleccion].append(json.loads(registro))
+        for coleccion, tipo in tipos.items():
+            if tipo == "objeto":
+                datos[coleccion] = datos[coleccion][0] if datos[coleccion] else None
+        return datos
+
+    def guardar_datos(self, user_id, datos):
+        """Upsert transaccional de las colecciones indicadas"""
+        return self.aplicar_cambios(user_id, cambios_completos(datos))
+
+    def aplicar_cambios(self, user_id, cambios):
+        """Aplica en una sola transacción los cambios calculados por RastreadorCambios"""
+        if not self.existe_usuario(user_id):
+            return False
+        if not cambios:
+            return True
+        conexion = self._transaccion()
+        try:
+            for coleccion, cambio in cambios.items():
+                self._aplicar_cambio(conexion, user_id, coleccion, cambio)
+            self._actualizar_catalogo(conexion, user_id)
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+        return True
+
+    def listar_perfiles(self, limite=None, desplazamiento=0):
+        """Lista el catálogo de usuarios (más recientes primero) sin leer sus registros"""
+        filas = self._conexion().execute(
+            f"SELECT {', '.join(CAMPOS_CATALOGO)} FROM usuarios "
+            "ORDER BY fecha_registro DESC, user_id LIMIT ? OFFSET ?",
+            (-1 if limite is None else limite, desplazamiento)
+        ).fetchall()
+        return [dict(zip(CAMPOS_CATALOGO, fila)) for fila in filas]
+
+    def estadisticas_catalogo(self):
+        total, cursos, ultimo = self._conexion().execute(
+            "SELECT COUNT(*), COUNT(DISTINCT curso), MAX(fecha_registro) FROM usuarios"
+        ).fetchone()
+        return {"total_usuarios": total, "cursos": cursos, "ultimo_registro": ultimo}
+
+
+def migrar_json_a_sqlite(origen, destino):
+    """
+    Migra a un almacén SQLite los usuarios de un almacén JSON que aún no están en él.
+    Retorna el número de usuarios migrados.
+    """
+    return destino.migrar_desde(origen)
+
+
+_ALMACENAMIENTOS = {}
+_BLOQUEO_ALMACENAMIENTOS = threading.Lock()
+
+
+def crear_almacenamiento(tipo=None, directorio=DIRECTORIO_USUARIOS):
+    """
+    Retorna el backend configurado en SIMULADOR_ALMACENAMIENTO ("sqlite" por defecto o "json"),
+    compartido por todas las sesiones del proceso.
+    Mientras la base SQLite no tenga la marca de migración completa se migran los
+    archivos JSON existentes (así se retoma una migración interrumpida).
+    """
+    tipo = (tipo or os.environ.get("SIMULADOR_ALMACENAMIENTO", "sqlite")).lower()
+    if tipo not in ("json", "sqlite"):
+        raise ValueError(f"Tipo de almacenamiento desconocido: {tipo}")
+
+    with _BLOQUEO_ALMACENAMIENTOS:
+        clave = (tipo, os.path.abspath(directorio))
+        if clave in _ALMACENAMIENTOS:
+            return _ALMACENAMIENTOS[clave]
+
+        if tipo == "json":
+            almacenamiento = AlmacenamientoJSON(directorio)
+        else:
+            almacenamiento = AlmacenamientoSQLite(os.path.join(directorio, ARCHIVO_SQLITE))
+            if not almacenamiento.migracion_completa() and any(
+                archivo.endswith('.json') for archivo in os.listdir(directorio)
+            ):
+                migrar_json_a_sqlite(AlmacenamientoJSON(directorio), almacenamiento)
+        _ALMACENAMIENTOS[clave] = almacenamiento
+        return almacenamiento
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "migrar":
+        directorio = sys.argv[2] if len(sys.argv) > 2 else DIRECTORIO_USUARIOS
+        total = migrar_json_a_sqlite(
+            AlmacenamientoJSON(directorio),
+            AlmacenamientoSQLite(os.path.join(directorio, ARCHIVO_SQLITE))
+        )
+        print(f"✅ {total} usuarios migrados a {os.path.join(directorio, ARCHIVO_SQLITE)}")
+    else:
+        print("Uso: python almacenamiento.py migrar [directorio_usuarios]")
@@ -0,0 +1,218 @@
+"""
+Autoguardado en segundo plano
+El hilo del script copia solo lo marcado en cada sesión; un hilo por proceso del
+servidor calcula las huellas de esas copias, agrupa las ráfagas dentro de una
+ventana configurable y las escribe en el almacenamiento, de modo que el hilo del
+script no calcula huellas ni espera al disco.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+import streamlit as st
+
+VENTANA_SEGUNDOS = float(os.environ.get("SIMULADOR_AUTOGUARDADO_VENTANA", "2.0"))
+CAPACIDAD_COLA = int(os.environ.get("SIMULADOR_AUTOGUARDADO_CAPACIDAD", "256"))
+
+
+def combinar_cambios(pendientes, nuevos):
+    """Combina dos descripciones de cambios; los registros más recientes prevalecen"""
+    for coleccion, cambio in nuevos.items():
+        anterior = pendientes.get(coleccion)
+        if cambio["tipo"] == "lista" and anterior and anterior["tipo"] == "lista":
+            registros = {
+                posicion: registro for posicion, registro in anterior["registros"].items()
+                if posicion < cambio["longitud"]
+            }
+            registros.update(cambio["registros"])
+            pendientes[coleccion] = {"tipo": "lista", "registros": registros, "longitud": cambio["longitud"]}
+        else:
+            pendientes[coleccion] = cambio
+    return pendientes
+
+
+class GestorAutoguardado:
+    """Hilo de escritura con cola acotada, agrupación por usuario y métricas de contrapresión"""
+
+    def __init__(self, almacenamiento, ventana=VENTANA_SEGUNDOS, capacidad=CAPACIDAD_COLA):
+        self.almacenamiento = almacenamiento
+        self.ventana = ventana
+        self.cola = queue.Queue(maxsize=capacidad)
+        self._pendientes = {}  # user_id -> {"cambios", "rastreador", "limite"}
+        self._bloqueo = threading.Lock()
+        self._metricas = {
+            "notificaciones": 0,
+            "rechazadas": 0,
+            "agrupadas": 0,
+            "escrituras": 0,
+            "errores": 0,
+            "max_profundidad_cola": 0,
+            "ultima_escritura_ms": 0.0,
+        }
+        self._hilo = threading.Thread(target=self._ejecutar, name="autoguardado", daemon=True)
+        self._hilo.start()
+
+    def notificar(self, user_id, cambios, rastreador=None):
+        """
+        Encola sin bloquear. Con 'rastreador', 'cambios' es un pedido ya copiado con
+        rastreador.copiar() y las huellas se calculan en el hilo de escritura; sin
+        él, son cambios ya calculados. Retorna False si la cola está llena: el
+        llamador debe devolver el pedido para reintentar en la próxima ejecución.
+        """
+        try:
+            self.cola.put_nowait(("cambios", user_id, cambios, rastreador))
+        except queue.Full:
+            with self._bloqueo:
+                self._metricas["rechazadas"] += 1
+            return False
+        with self._bloqueo:
+            self._metricas["notificaciones"] += 1
+            self._metricas["max_profundidad_cola"] = max(self._metricas["max_profundidad_cola"], self.cola.qsize())
+        return True
+
+    def vaciar(self, timeout=10):
+        """Escribe de inmediato todo lo pendiente y espera a que termine"""
+        listo = threading.Event()
+        try:
+            self.cola.put(("vaciar", None, None, listo), timeout=timeout)
+        except queue.Full:
+            return False
+        return listo.wait(timeout)
+
+    def detener(self, timeout=10):
+        """Escribe lo pendiente y termina el hilo (la señal se encola después de lo ya notificado)"""
+        try:
+            self.cola.put(("detener", None, None, None), timeout=timeout)
+        except queue.Full:
+            return False
+        self._hilo.join(timeout)
+        return not self._hilo.is_alive()
+
+    def metricas(self):
+        with self._bloqueo:
+            metricas = dict(self._metricas)
+            metricas["usuarios_pendientes"] = len(self._pendientes)
+        metricas["profundidad_cola"] = self.cola.qsize()
+        metricas["capacidad_cola"] = self.cola.maxsize
+        metricas["ventana_segundos"] = self.ventana
+        return metricas
+
+    def _ejecutar(self):
+        while True:
+            with self._bloqueo:
+                limites = [pendiente["limite"] for pendiente in self._pendientes.values()]
+            espera = max(0.0, min(limites) - time.monotonic()) if limites else None
+            try:
+                tipo, user_id, cambios, extra = self.cola.get(timeout=espera)
+            except queue.Empty:
+                self._escribir_vencidos()
+                continue
+
+            if tipo == "vaciar":
+                self._escribir_vencidos(todos=True)
+                extra.set()
+                continue
+            if tipo == "detener":
+                self._escribir_vencidos(todos=True)
+                return
+
+            if extra is not None:
+                cambios = self._calcular(extra, cambios)
+                if not cambios:
+                    self._escribir_vencidos()
+                    continue
+
+            with self._bloqueo:
+                pendiente = self._pendientes.get(user_id)
+                if pendiente is None:
+                    self._pendientes[user_id] = {
+                        "cambios": cambios,
+                        "rastreador": extra,
+                        "limite": time.monotonic() + self.ventana,
+                    }
+                else:
+                    combinar_cambios(pendiente["cambios"], cambios)
+                    pendiente["rastreador"] = extra or pendiente["rastreador"]
+                    self._metricas["agrupadas"] += 1
+            self._escribir_vencidos()
+
+    def _calcular(self, rastreador, pedido):
+        """Calcula los cambios de un pedido copiado y confirma sus huellas (la escritura ya queda en manos del hilo)"""
+        try:
+            cambios, huellas_nuevas = rastreador.calcular_cambios(pedido, copiar=False)
+        except Exception:
+            # Por ejemplo, un registro que no se puede serializar: se reintenta en el próximo guardado
+            rastreador.devolver(pedido)
+            with self._bloqueo:
+                self._metricas["errores"] += 1
+            return {}
+        rastreador.confirmar(huellas_nuevas)
+        return cambios
+
+    def _escribir_vencidos(self, todos=False):
+        ahora = time.monotonic()
+        with self._bloqueo:
+            vencidos = [
+                user_id for user_id, pendiente in self._pendientes.items()
+                if todos or pendiente["limite"] <= ahora
+            ]
+            lotes = [(user_id, self._pendientes.pop(user_id)) for user_id in vencidos]
+
+        for user_id, pendiente in lotes:
+            inicio = time.perf_counter()
+            try:
+                self.almacenamiento.aplicar_cambios(user_id, pendiente["cambios"])
+            except Exception:
+                # Se olvida la base de esas colecciones para reescribirlas completas en el próximo guardado
+                if pendiente["rastreador"] is not None:
+                    pendiente["rastreador"].olvidar(list(pendiente["cambios"]))
+                with self._bloqueo:
+                    self._metricas["errores"] += 1
+                continue
+            with self._bloqueo:
+                self._metricas["escrituras"] += 1
+                self._metricas["ultima_escritura_ms"] = (time.perf_counter() - inicio) * 1000
+
+
+_GESTOR = None
+_BLOQUEO_GESTOR = threading.Lock()
+
+
+def obtener_gestor():
+    """Retorna el gestor de autoguardado del proceso (se crea la primera vez)"""
+    global _GESTOR
+    with _BLOQUEO_GESTOR:
+        if _GESTOR is None:
+            from almacenamiento import crear_almacenamiento
+            _GESTOR = GestorAutoguardado(crear_almacenamiento())
+            atexit.register(_GESTOR.detener)
+        return _GESTOR
+
+
+def vaciar_pendientes():
+    """Escribe lo pendiente del autoguardado si el gestor ya está en marcha"""
+    if _GESTOR is not None:
+        _GESTOR.vaciar()
+
+
+def autoguardar_sesion():
+    """Retira lo marcado en la sesión actual y lo envía al hilo de autoguardado"""
+    if "user_id" not in st.session_state:
+        return
+
+    from rastreo_cambios import RastreadorCambios
+    from sistema_usuarios import SistemaUsuarios
+
+    rastreador = st.session_state.get("_rastreador_cambios") or RastreadorCambios()
+    st.session_state._rastreador_cambios = rastreador
+    # Se copian aquí solo las posiciones marcadas, antes de que la próxima ejecución
+    # modifique la sesión; las huellas se calculan en el hilo de escritura
+    pedido = rastreador.pendientes(SistemaUsuarios.datos_sesion())
+    if not pedido:
+        return
+    pedido = rastreador.copiar(pedido)
+    if not obtener_gestor().notificar(st.session_state.user_id, pedido, rastreador):
+        rastreador.devolver(pedido)
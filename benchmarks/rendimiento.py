@@ -0,0 +1,383 @@
+"""
+Benchmarks de las rutas críticas de análisis
+Ejecuta las funciones de análisis, riesgo, diagnóstico, exportación y
+almacenamiento con poblaciones sintéticas de 1k a 1M familias, sin navegador
+(Streamlit se reemplaza por un simulado). Cada ejecución se agrega al historial
+con el commit actual; --comparar marca las regresiones respecto de la ejecución
+anterior en la misma máquina.
+
+Uso:
+    python benchmarks/rendimiento.py                          # 1k, 10k y 100k familias
+    python benchmarks/rendimiento.py --tamanos 1000000        # un millón (requiere varios GB de memoria)
+    python benchmarks/rendimiento.py --solo riesgo --comparar
+    python benchmarks/rendimiento.py --importaciones --solo importar   # solo el arranque en frío
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DIRECTORIO_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_REPOSITORIO = os.path.dirname(DIRECTORIO_BENCHMARKS)
+sys.path.insert(0, DIRECTORIO_REPOSITORIO)
+sys.path.insert(0, DIRECTORIO_BENCHMARKS)
+
+import streamlit_simulado  # noqa: E402
+
+st = streamlit_simulado.instalar()
+
+TAMANOS = [1000, 10000, 100000]
+ARCHIVO_HISTORIAL = os.path.join(DIRECTORIO_BENCHMARKS, "historial.jsonl")
+SEMILLA = 42
+FAMILIAS_POR_SECTOR = 2000
+FAMILIAS_POR_USUARIO = 100  # tamaño del catálogo para listar_usuarios
+
+BENCHMARKS = []
+
+
+def benchmark(nombre):
+    """Registra una función benchmark(contexto) que ejecuta una vez la operación medida"""
+    def registrar(funcion):
+        BENCHMARKS.append((nombre, funcion))
+        return funcion
+    return registrar
+
+
+# --- Rutas medidas ---
+
+@benchmark("construir_almacen")
+def _construir_almacen(contexto):
+    from sesion_familias import obtener_almacen_familias
+    st.session_state.pop("_almacen_familias", None)
+    obtener_almacen_familias()
+
+
+@benchmark("analizar_datos_comunidad")
+def _analizar_datos_comunidad(contexto):
+    from sistema_inteligente import CACHE_ANALISIS, analizar_datos_comunidad
+    CACHE_ANALISIS.invalidar()
+    analizar_datos_comunidad()
+
+
+@benchmark("generar_recomendaciones_personalizadas")
+def _generar_recomendaciones(contexto):
+    from sistema_inteligente import CACHE_ANALISIS, generar_recomendaciones_personalizadas
+    CACHE_ANALISIS.invalidar()
+    random.seed(SEMILLA)
+    generar_recomendaciones_personalizadas()
+
+
+@benchmark("recomendaciones_en_cache")
+def _recomendaciones_en_cache(contexto):
+    from sistema_inteligente import generar_recomendaciones_personalizadas
+    generar_recomendaciones_personalizadas()
+
+
+@benchmark("riesgo_lote_familias")
+def _riesgo_lote_familias(contexto):
+    from motor_riesgo import calcular_riesgos_lote
+    calcular_riesgos_lote(st.session_state.familias)
+
+
+@benchmark("riesgo_lote_almacen")
+def _riesgo_lote_almacen(contexto):
+    from sesion_familias import obtener_almacen_familias
+    from motor_riesgo import calcular_riesgos_lote
+    calcular_riesgos_lote(obtener_almacen_familias())
+
+
+@benchmark("riesgo_escalar")
+def _riesgo_escalar(contexto):
+    from motor_riesgo import riesgo_sanitario, riesgo_social
+    for familia in st.session_state.familias:
+        riesgo_social(familia)
+        riesgo_sanitario(familia)
+
+
+@benchmark("diagnostico_sectores")
+def _diagnostico_sectores(contexto):
+    from cache_figuras import CACHE_FIGURAS
+    from diagnostico import mostrar_diagnostico
+    CACHE_FIGURAS.invalidar()
+    mostrar_diagnostico()
+
+
+@benchmark("analisis_avanzado")
+def _analisis_avanzado(contexto):
+    from cache_figuras import CACHE_FIGURAS
+    from registro_familias import mostrar_analisis_avanzado
+    CACHE_FIGURAS.invalidar()
+    mostrar_analisis_avanzado()
+
+
+@benchmark("dashboard_familias")
+def _dashboard_familias(contexto):
+    from cache_figuras import CACHE_FIGURAS
+    from registro_familias import mostrar_dashboard_familias
+    CACHE_FIGURAS.invalidar()
+    mostrar_dashboard_familias()
+
+
+@benchmark("dashboard_familias_en_cache")
+def _dashboard_familias_en_cache(contexto):
+    from registro_familias import mostrar_dashboard_familias
+    mostrar_dashboard_familias()
+
+
+@benchmark("generar_pdf")
+def _generar_pdf(contexto):
+    from evaluacion import generar_pdf
+    generar_pdf()
+
+
+@benchmark("exportar_excel")
+def _exportar_excel(contexto):
+    import importlib.util
+    if importlib.util.find_spec("openpyxl") is None:
+        raise ImportError("openpyxl no está instalado")
+    from evaluacion import generar_excel
+    generar_excel()
+
+
+@benchmark("exportar_json")
+def _exportar_json(contexto):
+    from evaluacion import generar_json
+    generar_json()
+
+
+@benchmark("listar_usuarios")
+def _listar_usuarios(contexto):
+    contexto["sistema"].listar_usuarios()
+
+
+@benchmark("guardar_usuario_completo")
+def _guardar_usuario_completo(contexto):
+    st.session_state.pop("_rastreador_cambios", None)
+    contexto["sistema"].guardar_datos_usuario(contexto["user_id"])
+
+
+@benchmark("guardar_usuario_incremental")
+def _guardar_usuario_incremental(contexto):
+    from persistencia import marcar_cambios
+
+    contexto["cambios"] = contexto.get("cambios", 0) + 1
+    st.session_state.familias[0]["observaciones"] = f"Cambio {contexto['cambios']}"
+    marcar_cambios("familias", [0])
+    contexto["sistema"].guardar_datos_usuario(contexto["user_id"])
+
+
+@benchmark("cargar_usuario")
+def _cargar_usuario(contexto):
+    contexto["sistema"].cargar_datos_usuario(contexto["user_id"])
+
+
+# --- Preparación y medición ---
+
+def preparar(tamano, directorio):
+    """Carga una población sintética en la sesión y crea los usuarios del almacenamiento"""
+    from almacenamiento import crear_almacenamiento
+    from datos_ejemplo import DIAGNOSTICO_EJEMPLO, PLAN_INTERVENCION_EJEMPLO
+    from generador_poblacion import estado_sesion, generar_poblacion
+    from sistema_usuarios import SistemaUsuarios
+
+    poblacion = generar_poblacion(tamano, max(1, tamano // FAMILIAS_POR_SECTOR), SEMILLA)
+    sesion = streamlit_simulado.reiniciar_sesion(estado_sesion(poblacion))
+    sesion.plan_intervencion = list(PLAN_INTERVENCION_EJEMPLO)
+    sesion.diagnostico = dict(DIAGNOSTICO_EJEMPLO)
+
+    almacenamiento = crear_almacenamiento(directorio=os.path.join(directorio, str(tamano)))
+    sistema = SistemaUsuarios(almacenamiento)
+    for i in range(max(1, tamano // FAMILIAS_POR_USUARIO)):
+        user_id = sistema.registrar_usuario(f"Usuario {i}", f"usuario{i}@ejemplo.cl", "Benchmark")
+    return {"tamano": tamano, "sistema": sistema, "user_id": user_id}
+
+
+def medir(funcion, contexto, repeticiones, tiempo_maximo):
+    """Tiempos de varias ejecuciones (al menos una; se detiene al superar tiempo_maximo)"""
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones:
+        comienzo = time.perf_counter()
+        funcion(contexto)
+        tiempos.append(time.perf_counter() - comienzo)
+        if time.perf_counter() - inicio > tiempo_maximo:
+            break
+    return {"mediana_s": statistics.median(tiempos), "minimo_s": min(tiempos), "repeticiones": len(tiempos)}
+
+
+# --- Tiempos de importación ---
+
+def modulos_importacion():
+    """app.py y los módulos de sus páginas, en el orden del menú"""
+    from paginas import PAGINAS, Menu
+    return ["app"] + [pagina.modulo for pagina in Menu(PAGINAS.values()).hojas()]
+
+
+def importar_en_frio(modulo):
+    """
+    Importa 'modulo' en un intérprete nuevo con -X importtime (Streamlit real,
+    sin servidor). Retorna los segundos acumulados del módulo y los de cada
+    dependencia directa que cargó por primera vez.
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=DIRECTORIO_REPOSITORIO, capture_output=True, text=True, check=True
+    )
+    # Cada módulo se informa al terminar de importarse, después de sus dependencias
+    # (un nivel más de sangría); lo anterior es el arranque del intérprete
+    dependencias = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        nombre = nombre.strip()
+        if nivel == 0 and nombre == modulo:
+            return int(acumulado) / 1e6, dependencias
+        if nivel == 0:
+            dependencias = {}
+        elif nivel == 1:
+            dependencias[nombre] = int(acumulado) / 1e6
+    raise RuntimeError(f"{modulo} no aparece en la salida de -X importtime")
+
+
+def medir_importacion(modulo, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        total, dependencias = importar_en_frio(modulo)
+        tiempos.append(total)
+    pesadas = sorted(dependencias.items(), key=lambda item: item[1], reverse=True)[:3]
+    return {
+        "mediana_s": statistics.median(tiempos),
+        "minimo_s": min(tiempos),
+        "repeticiones": len(tiempos),
+        "dependencias": {nombre: round(segundos, 4) for nombre, segundos in pesadas},
+        "reportlab": any(nombre.startswith("reportlab") for nombre in dependencias),
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=DIRECTORIO_REPOSITORIO,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def maquina():
+    return f"{platform.node()} · {platform.machine()} · Python {platform.python_version()}"
+
+
+def leer_historial(ruta):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo if linea.strip()]
+
+
+def comparar(resultados, anterior, tolerancia):
+    """Retorna las mediciones más lentas que la ejecución anterior en más de 'tolerancia'"""
+    regresiones = []
+    for clave, actual in resultados.items():
+        base = anterior["resultados"].get(clave)
+        if not base or "mediana_s" not in actual or "mediana_s" not in base:
+            continue
+        # Se ignoran diferencias de menos de un milisegundo (ruido del reloj)
+        if actual["mediana_s"] > base["mediana_s"] * (1 + tolerancia) and actual["mediana_s"] - base["mediana_s"] > 1e-3:
+            regresiones.append((clave, base["mediana_s"], actual["mediana_s"]))
+    return regresiones
+
+
+def formatear(segundos):
+    return f"{segundos * 1000:10.2f} ms" if segundos < 1 else f"{segundos:10.2f} s "
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de análisis")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)), help="familias, separadas por comas")
+    parser.add_argument("--solo", help="ejecuta solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--tiempo-maximo", type=float, default=10.0, help="segundos por benchmark y tamaño")
+    parser.add_argument("--historial", default=ARCHIVO_HISTORIAL)
+    parser.add_argument("--comparar", action="store_true", help="falla si hay regresiones respecto de la ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="aumento relativo permitido (0.2 = 20%%)")
+    parser.add_argument("--sin-historial", action="store_true", help="no agrega la ejecución al historial")
+    parser.add_argument("--importaciones", action="store_true",
+                        help="mide también el tiempo de importación en frío de app.py y de cada página")
+    argumentos = parser.parse_args()
+
+    tamanos = [int(tamano) for tamano in argumentos.tamanos.split(",")]
+    seleccion = [(nombre, funcion) for nombre, funcion in BENCHMARKS if not argumentos.solo or argumentos.solo in nombre]
+    resultados = {}
+
+    if argumentos.importaciones:
+        print("\n== Importación en un intérprete nuevo ==")
+        for modulo in modulos_importacion():
+            nombre = f"importar_{modulo}"
+            if argumentos.solo and argumentos.solo not in nombre:
+                continue
+            resultados[nombre] = resultado = medir_importacion(modulo, argumentos.repeticiones)
+            pesadas = ", ".join(f"{dependencia} {segundos * 1000:.0f} ms" for dependencia, segundos in resultado["dependencias"].items())
+            aviso = "  ⚠️ carga reportlab" if resultado["reportlab"] else ""
+            print(f"{nombre:40s}{formatear(resultado['mediana_s'])}  ({pesadas}){aviso}")
+        if not seleccion:
+            tamanos = []
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # SistemaUsuarios crea su directorio de datos relativo al directorio actual
+        os.chdir(directorio)
+        for tamano in tamanos:
+            print(f"\n== {tamano:,} familias ==")
+            inicio = time.perf_counter()
+            contexto = preparar(tamano, directorio)
+            print(f"{'preparación':40s}{formatear(time.perf_counter() - inicio)}")
+            for nombre, funcion in seleccion:
+                clave = f"{nombre}@{tamano}"
+                try:
+                    resultados[clave] = medir(funcion, contexto, argumentos.repeticiones, argumentos.tiempo_maximo)
+                except ImportError as error:
+                    resultados[clave] = {"omitido": str(error)}
+                    print(f"{nombre:40s}   omitido ({error})")
+                    continue
+                resultado = resultados[clave]
+                print(f"{nombre:40s}{formatear(resultado['mediana_s'])}  (mín {formatear(resultado['minimo_s']).strip()}, n={resultado['repeticiones']})")
+        os.chdir(DIRECTORIO_REPOSITORIO)
+
+    ejecucion = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "maquina": maquina(),
+        "resultados": resultados
+    }
+
+    codigo_salida = 0
+    anteriores = [registro for registro in leer_historial(argumentos.historial) if registro["maquina"] == ejecucion["maquina"]]
+    if anteriores:
+        anterior = anteriores[-1]
+        regresiones = comparar(resultados, anterior, argumentos.tolerancia)
+        print(f"\nComparación con {anterior['commit']} ({anterior['fecha']}):")
+        for clave, antes, ahora in regresiones:
+            print(f"  ⚠️ {clave}: {formatear(antes).strip()} → {formatear(ahora).strip()} (+{(ahora / antes - 1) * 100:.0f}%)")
+        if not regresiones:
+            print("  ✅ Sin regresiones")
+        elif argumentos.comparar:
+            codigo_salida = 1
+
+    if not argumentos.sin_historial:
+        with open(argumentos.historial, "a", encoding="utf-8") as archivo:
+            archivo.write(json.dumps(ejecucion, ensure_ascii=False) + "\n")
+    return codigo_salida
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Streamlit simulado para ejecutar páginas y funciones sin navegador
+Reemplaza el módulo 'streamlit' por uno que guarda session_state en un
+diccionario, devuelve el valor inicial de cada widget (los botones no se
+presionan) y no dibuja nada. Se instala antes de importar los módulos de la
+aplicación.
+"""
+
+import sys
+import types
+from datetime import date
+
+
+class EstadoSesion(dict):
+    """session_state con acceso por atributo, como en Streamlit"""
+
+    def __getattr__(self, clave):
+        try:
+            return self[clave]
+        except KeyError:
+            raise AttributeError(clave)
+
+    def __setattr__(self, clave, valor):
+        self[clave] = valor
+
+    def __delattr__(self, clave):
+        del self[clave]
+
+
+class _Contenedor:
+    """Columnas, pestañas, expanders y demás contenedores: delegan en el módulo"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __getattr__(self, nombre):
+        return getattr(modulo, nombre)
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+def _nada(*args, **kwargs):
+    return None
+
+
+def _widget(kwargs, valor):
+    """Valor de un widget: el de session_state si tiene clave, o su valor inicial"""
+    clave = kwargs.get("key")
+    if clave is None:
+        return valor
+    return modulo.session_state.setdefault(clave, valor)
+
+
+def _selectbox(etiqueta, options=(), index=0, **kwargs):
+    opciones = list(options)
+    return _widget(kwargs, opciones[index] if opciones and index is not None else None)
+
+
+def _multiselect(etiqueta, options=(), default=None, **kwargs):
+    return _widget(kwargs, list(default or []))
+
+
+def _texto(etiqueta, value="", **kwargs):
+    return _widget(kwargs, value)
+
+
+def _numero(etiqueta, min_value=None, max_value=None, value=None, *args, **kwargs):
+    if value is None or value == "min":
+        value = min_value if min_value is not None else 0
+    return _widget(kwargs, value)
+
+
+def _checkbox(etiqueta, value=False, **kwargs):
+    return _widget(kwargs, value)
+
+
+def _fecha(etiqueta, value=None, **kwargs):
+    return _widget(kwargs, value or date.today())
+
+
+def _boton(*args, **kwargs):
+    return False
+
+
+def _columnas(spec, *args, **kwargs):
+    return [_Contenedor() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+
+def _pestanas(nombres, *args, **kwargs):
+    return [_Contenedor() for _ in nombres]
+
+
+def _contenedor(*args, **kwargs):
+    return _Contenedor()
+
+
+def _cache(funcion=None, **kwargs):
+    """@st.cache_data y @st.cache_data(...) sin caché"""
+    if funcion is None:
+        return lambda funcion: funcion
+    return funcion
+
+
+class _Rerun(Exception):
+    pass
+
+
+def _rerun(*args, **kwargs):
+    raise _Rerun()
+
+
+modulo = types.ModuleType("streamlit")
+modulo.session_state = EstadoSesion()
+modulo.selectbox = modulo.radio = modulo.select_slider = _selectbox
+modulo.multiselect = _multiselect
+modulo.text_input = modulo.text_area = _texto
+modulo.number_input = modulo.slider = _numero
+modulo.checkbox = modulo.toggle = _checkbox
+modulo.date_input = modulo.time_input = _fecha
+modulo.button = modulo.download_button = modulo.form_submit_button = _boton
+modulo.file_uploader = _nada
+modulo.columns = _columnas
+modulo.tabs = _pestanas
+modulo.expander = modulo.container = modulo.form = modulo.spinner = modulo.empty = modulo.progress = _contenedor
+modulo.sidebar = _Contenedor()
+modulo.cache_data = modulo.cache_resource = _cache
+modulo.rerun = modulo.stop = _rerun
+modulo.__getattr__ = lambda nombre: _nada  # markdown, metric, plotly_chart, dataframe, ...
+
+
+def instalar():
+    """Registra el módulo simulado como 'streamlit' (antes de importar la aplicación)"""
+    sys.modules["streamlit"] = modulo
+    return modulo
+
+
+def reiniciar_sesion(valores=None):
+    """Vacía session_state y carga los valores indicados"""
+    modulo.session_state.clear()
+    modulo.session_state.update(valores or {})
+    return modulo.session_state
@@ -0,0 +1,160 @@
+"""
+Búsqueda de familias por apellido y nombre del jefe de hogar
+Índice de trigramas insensible a tildes y mayúsculas que se actualiza al
+registrar familias. Las consultas de una o dos letras buscan por inicio de
+palabra; las más largas buscan el texto en cualquier parte. Los resultados
+se ordenan por relevancia para sugerir coincidencias mientras se escribe.
+"""
+
+import heapq
+import unicodedata
+from array import array
+
+import numpy as np
+
+CAMPOS_BUSQUEDA = ["apellido", "nombre_jefe"]
+SIN_COINCIDENCIA = 99999
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con espacios simples"""
+    descompuesto = unicodedata.normalize("NFKD", str(texto or ""))
+    sin_tildes = "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return " ".join(sin_tildes.lower().split())
+
+
+def _trigramas_palabra(palabra):
+    """Trigramas de una palabra con relleno inicial (para buscar por prefijo) y final"""
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def _claves_consulta(consulta):
+    claves = set()
+    for palabra in consulta.split():
+        if len(palabra) < 3:
+            claves.add(("  " + palabra)[-3:])
+        else:
+            claves.update(palabra[i:i + 3] for i in range(len(palabra) - 2))
+    return claves
+
+
+class IndiceBusqueda:
+    """
+    Listas invertidas trigrama -> posiciones de familias (ordenadas y sin repetir).
+    Los textos se guardan una sola vez en un vocabulario: los apellidos y nombres
+    repetidos comparten trigramas y relevancia.
+    """
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self._vocabulario = {}  # texto original -> id
+        self._textos = []  # id -> texto normalizado
+        self._claves_texto = []  # id -> trigramas del texto
+        self._ids = {campo: array("I") for campo in CAMPOS_BUSQUEDA}
+        self._listas = {}
+        self.extender(0, len(almacen))
+
+    def __len__(self):
+        return len(self._ids[CAMPOS_BUSQUEDA[0]])
+
+    def _id_texto(self, texto):
+        identificador = self._vocabulario.get(texto)
+        if identificador is None:
+            normalizado = normalizar(texto)
+            claves = set()
+            for palabra in normalizado.split():
+                claves |= _trigramas_palabra(palabra)
+            identificador = self._vocabulario[texto] = len(self._textos)
+            self._textos.append(normalizado)
+            self._claves_texto.append(frozenset(claves))
+        return identificador
+
+    def extender(self, inicio, fin):
+        """Indexa las filas [inicio, fin) del almacén"""
+        columnas = [self.almacen.columna(campo) for campo in CAMPOS_BUSQUEDA]
+        listas = self._listas
+        for posicion in range(inicio, fin):
+            claves = None
+            for campo, columna in zip(CAMPOS_BUSQUEDA, columnas):
+                identificador = self._id_texto(columna[posicion])
+                self._ids[campo].append(identificador)
+                claves = self._claves_texto[identificador] if claves is None else claves | self._claves_texto[identificador]
+            for clave in claves:
+                lista = listas.get(clave)
+                if lista is None:
+                    lista = listas[clave] = array("I")
+                lista.append(posicion)
+
+    def _candidatos(self, consulta):
+        listas = []
+        for clave in _claves_consulta(consulta):
+            lista = self._listas.get(clave)
+            if lista is None:
+                return np.zeros(0, dtype=np.uint32)
+            listas.append(np.frombuffer(lista, dtype=np.uint32))
+        if not listas:
+            return np.zeros(0, dtype=np.uint32)
+        listas.sort(key=len)
+        # Copia: una vista sobre la lista impediría que crezca al registrar familias
+        candidatos = listas[0].copy()
+        for lista in listas[1:]:
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+            if not len(candidatos):
+                break
+        return candidatos
+
+    @staticmethod
+    def _relevancia(consulta, texto):
+        """
+        Menor es mejor: coincidencia exacta, inicio del campo, todas las palabras por
+        su inicio, o palabras largas contenidas en el texto; a igual tipo, el texto
+        más corto. Retorna SIN_COINCIDENCIA si no coincide.
+        """
+        partes = consulta.split()
+        palabras = texto.split()
+        if texto == consulta:
+            orden = 0
+        elif texto.startswith(consulta):
+            orden = 1
+        elif all(any(palabra.startswith(parte) for palabra in palabras) for parte in partes):
+            orden = 2
+        elif all(parte in texto if len(parte) >= 3 else any(palabra.startswith(parte) for palabra in palabras)
+                 for parte in partes):
+            orden = 3
+        else:
+            return SIN_COINCIDENCIA
+        return orden * 10000 + min(len(texto), 9999)
+
+    def buscar(self, texto, limite=None, posiciones=None):
+        """
+        Retorna las posiciones de las familias que coinciden con 'texto', de la más
+        relevante a la menos. 'limite' entrega solo las k mejores; 'posiciones'
+        restringe la búsqueda a un conjunto (p. ej. el resultado de otros filtros).
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+        candidatos = self._candidatos(consulta)
+        if posiciones is not None:
+            candidatos = np.intersect1d(candidatos, np.asarray(posiciones, dtype=np.uint32), assume_unique=True)
+
+        # Relevancia por texto distinto; cada familia toma la mejor de sus campos
+        relevancias = {}
+        mejores = np.full(len(candidatos), SIN_COINCIDENCIA, dtype=np.int64)
+        for campo in CAMPOS_BUSQUEDA:
+            ids = np.frombuffer(self._ids[campo], dtype=np.uint32)[candidatos]
+            unicos, inversos = np.unique(ids, return_inverse=True)
+            for identificador in unicos.tolist():
+                if identificador not in relevancias:
+                    relevancias[identificador] = self._relevancia(consulta, self._textos[identificador])
+            rangos = np.array([relevancias[identificador] for identificador in unicos.tolist()], dtype=np.int64)
+            mejores = np.minimum(mejores, rangos[inversos])
+
+        coinciden = mejores < SIN_COINCIDENCIA
+        resultados = list(zip(mejores[coinciden].tolist(), candidatos[coinciden].tolist()))
+        if limite is not None:
+            resultados = heapq.nsmallest(limite, resultados)
+        else:
+            resultados.sort()
+        return [posicion for _, posicion in resultados]
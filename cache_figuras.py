@@ -0,0 +1,48 @@
+"""
+Caché de figuras Plotly
+Las páginas construyen cada gráfico dentro de una función y lo dibujan con
+mostrar_figura: la figura se guarda en una caché LRU compartida por las
+sesiones, con el identificador del gráfico, la revisión de los datos y los
+parámetros como clave. Una nueva ejecución de la página con los mismos datos
+reutiliza la figura en lugar de volver a armarla con Plotly.
+"""
+
+import os
+
+import streamlit as st
+
+from cache_lru import CacheLRU
+from instrumentacion import contar
+from rastreo_cambios import huella
+
+CACHE_FIGURAS = CacheLRU(int(os.environ.get("SIMULADOR_CACHE_FIGURAS", "64")))
+
+
+def revision_datos(datos):
+    """
+    Revisión de los datos de un gráfico: identificador y revisión si es un
+    almacén de familias, huella del contenido en otro caso (listas pequeñas)
+    """
+    if hasattr(datos, "revision"):
+        return datos.identificador, datos.revision
+    return huella(datos)
+
+
+def figura_cacheada(id_grafico, datos, construir, **parametros):
+    """
+    Retorna la figura de 'construir()' para esos datos y parámetros (la
+    construye solo la primera vez). La figura se comparte: no debe modificarse.
+    """
+    clave = (id_grafico, revision_datos(datos), huella(parametros) if parametros else None)
+    contar("figuras")
+
+    def construir_contando():
+        contar("figuras_construidas")
+        return construir()
+
+    return CACHE_FIGURAS.obtener(clave, construir_contando)
+
+
+def mostrar_figura(id_grafico, datos, construir, **parametros):
+    """Dibuja la figura cacheada con el ancho del contenedor"""
+    st.plotly_chart(figura_cacheada(id_grafico, datos, construir, **parametros), use_container_width=True)
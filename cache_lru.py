@@ -0,0 +1,60 @@
+"""
+Caché LRU acotada para resultados de análisis
+Compartida por todas las sesiones del proceso del servidor: las claves deben
+identificar el contenido de los datos (identificador y revisión del almacén de
+familias, huella de sectores o red), de modo que un cambio en los datos produce
+una clave nueva y las entradas antiguas salen por antigüedad de uso.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Diccionario con capacidad máxima que descarta la entrada usada hace más tiempo"""
+
+    def __init__(self, capacidad):
+        self.capacidad = max(1, int(capacidad))
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    def obtener(self, clave, calcular):
+        """
+        Retorna el valor guardado para 'clave' o lo calcula con calcular() y lo guarda.
+        El cálculo se hace fuera del candado: dos sesiones pueden calcular la misma
+        clave a la vez, pero ninguna espera por el cálculo de otra.
+        """
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self._candado:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def invalidar(self, condicion=None):
+        """Elimina las entradas cuya clave cumple condicion(clave) (todas si no se indica)"""
+        with self._candado:
+            if condicion is None:
+                self._entradas.clear()
+                return
+            for clave in [clave for clave in self._entradas if condicion(clave)]:
+                del self._entradas[clave]
+
+    def estadisticas(self):
+        return {"entradas": len(self._entradas), "capacidad": self.capacidad,
+                "aciertos": self.aciertos, "fallos": self.fallos}
@@ -0,0 +1,13 @@
+"""
+Núcleo de cálculo del simulador, sin dependencias de Streamlit
+Las funciones reciben los datos como argumentos (familias en un
+AlmacenFamilias, sectores, red, plan, ...) y no leen ni escriben
+st.session_state; las páginas son adaptadores que toman los datos de la sesión
+y dibujan los resultados. Así se pueden usar desde scripts, benchmarks y
+trabajos por lotes sin levantar la interfaz.
+
+    comunidad     diagnóstico inteligente, sugerencias y cronograma
+    diagnostico   análisis por sector y de problemas específicos
+    telemedicina  teletriage y monitoreo remoto
+    reportes      PDF, Excel y JSON
+"""
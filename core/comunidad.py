@@ -0,0 +1,360 @@
+"""
+Análisis de la comunidad sin dependencias de Streamlit
+Diagnóstico inteligente, sugerencias de intervención y cronograma a partir de
+los datos que se reciben como argumentos (familias en un AlmacenFamilias,
+sectores y red intersectorial como listas de diccionarios).
+"""
+
+import copy
+import random
+from datetime import datetime, timedelta
+
+# Intervenciones sugeridas para cada problema prioritario
+INTERVENCIONES_POR_PROBLEMA = {
+    'diabetes': [
+        {
+            'nombre': 'Programa de Educación Diabetológica',
+            'tipo': 'Preventiva',
+            'objetivo': 'Mejorar el control de la diabetes y prevenir complicaciones',
+            'poblacion': 'Personas con diabetes y sus familias',
+            'actividades': [
+                'Talleres de educación en diabetes',
+                'Grupos de apoyo para diabéticos',
+                'Control de glicemia domiciliario',
+                'Educación nutricional específica'
+            ],
+            'duracion': '6 meses',
+            'frecuencia': 'Semanal',
+            'recursos': 'Educador en diabetes, nutricionista, glucómetros',
+            'indicadores': 'Control glicémico, adherencia al tratamiento, complicaciones'
+        },
+        {
+            'nombre': 'Talleres de Cocina Saludable',
+            'tipo': 'Promocional',
+            'objetivo': 'Enseñar preparación de alimentos saludables para diabéticos',
+            'poblacion': 'Familias con miembros diabéticos',
+            'actividades': [
+                'Clases de cocina práctica',
+                'Recetarios saludables',
+                'Planificación de menús semanales'
+            ],
+            'duracion': '3 meses',
+            'frecuencia': 'Quincenal',
+            'recursos': 'Cocina equipada, nutricionista, ingredientes',
+            'indicadores': 'Cambios en hábitos alimentarios, control de peso'
+        }
+    ],
+    'hipertension': [
+        {
+            'nombre': 'Programa de Control de Hipertensión',
+            'tipo': 'Preventiva',
+            'objetivo': 'Controlar la presión arterial y prevenir complicaciones cardiovasculares',
+            'poblacion': 'Personas con hipertensión arterial',
+            'actividades': [
+                'Control de presión arterial regular',
+                'Educación sobre medicamentos',
+                'Talleres de reducción de sodio',
+                'Actividad física adaptada'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Mensual',
+            'recursos': 'Tensiómetros, educador en salud, monitor de actividad física',
+            'indicadores': 'Control de presión arterial, adherencia al tratamiento'
+        }
+    ],
+    'obesidad': [
+        {
+            'nombre': 'Programa de Actividad Física Comunitaria',
+            'tipo': 'Promocional',
+            'objetivo': 'Promover hábitos de vida saludable y control de peso',
+            'poblacion': 'Personas con sobrepeso y obesidad',
+            'actividades': [
+                'Clases de ejercicio grupal',
+                'Caminatas comunitarias',
+                'Talleres de nutrición',
+                'Seguimiento de peso y medidas'
+            ],
+            'duracion': '6 meses',
+            'frecuencia': 'Semanal',
+            'recursos': 'Instructor de actividad física, nutricionista, balanzas',
+            'indicadores': 'Pérdida de peso, mejora en condición física, adherencia'
+        }
+    ],
+    'hacinamiento': [
+        {
+            'nombre': 'Programa de Mejora Habitacional',
+            'tipo': 'Comunitaria',
+            'objetivo': 'Mejorar las condiciones de vivienda y hacinamiento',
+            'poblacion': 'Familias en situación de hacinamiento',
+            'actividades': [
+                'Asesoría en mejoras habitacionales',
+                'Gestión de subsidios habitacionales',
+                'Talleres de organización del espacio',
+                'Apoyo en trámites municipales'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Mensual',
+            'recursos': 'Asistente social, arquitecto, gestor municipal',
+            'indicadores': 'Reducción del hacinamiento, mejoras habitacionales'
+        }
+    ],
+    'violencia_intrafamiliar': [
+        {
+            'nombre': 'Programa de Prevención de Violencia Intrafamiliar',
+            'tipo': 'Preventiva',
+            'objetivo': 'Prevenir y detectar casos de violencia intrafamiliar',
+            'poblacion': 'Familias en riesgo de violencia',
+            'actividades': [
+                'Talleres de resolución pacífica de conflictos',
+                'Educación en derechos humanos',
+                'Detección temprana de violencia',
+                'Derivación a servicios especializados'
+            ],
+            'duracion': '6 meses',
+            'frecuencia': 'Quincenal',
+            'recursos': 'Psicólogo, trabajador social, abogado',
+            'indicadores': 'Reducción de casos de violencia, derivaciones exitosas'
+        }
+    ],
+    'consumo_drogas': [
+        {
+            'nombre': 'Programa de Prevención de Consumo de Drogas',
+            'tipo': 'Preventiva',
+            'objetivo': 'Prevenir el consumo de drogas y apoyar la rehabilitación',
+            'poblacion': 'Adolescentes y jóvenes en riesgo',
+            'actividades': [
+                'Talleres de prevención en colegios',
+                'Actividades deportivas y recreativas',
+                'Apoyo a familias afectadas',
+                'Derivación a centros de rehabilitación'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Semanal',
+            'recursos': 'Psicólogo, monitor deportivo, educador',
+            'indicadores': 'Reducción del consumo, participación en actividades'
+        }
+    ],
+    'embarazo_adolescente': [
+        {
+            'nombre': 'Programa de Salud Sexual y Reproductiva',
+            'tipo': 'Preventiva',
+            'objetivo': 'Prevenir embarazos adolescentes y promover salud sexual',
+            'poblacion': 'Adolescentes y jóvenes',
+            'actividades': [
+                'Educación sexual integral',
+                'Talleres de proyecto de vida',
+                'Acceso a métodos anticonceptivos',
+                'Apoyo a madres adolescentes'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Mensual',
+            'recursos': 'Matrona, psicólogo, educador en salud',
+            'indicadores': 'Reducción de embarazos adolescentes, uso de anticonceptivos'
+        }
+    ],
+    'desempleo': [
+        {
+            'nombre': 'Programa de Inserción Laboral',
+            'tipo': 'Comunitaria',
+            'objetivo': 'Mejorar las oportunidades laborales de la comunidad',
+            'poblacion': 'Personas desempleadas',
+            'actividades': [
+                'Capacitación laboral',
+                'Talleres de emprendimiento',
+                'Gestión de empleos',
+                'Apoyo en currículum vitae'
+            ],
+            'duracion': '6 meses',
+            'frecuencia': 'Semanal',
+            'recursos': 'Orientador laboral, capacitador, gestor de empleos',
+            'indicadores': 'Inserción laboral, creación de emprendimientos'
+        }
+    ],
+    'baja_escolaridad': [
+        {
+            'nombre': 'Programa de Alfabetización y Educación',
+            'tipo': 'Promocional',
+            'objetivo': 'Mejorar los niveles de educación de la comunidad',
+            'poblacion': 'Personas con baja escolaridad',
+            'actividades': [
+                'Clases de alfabetización',
+                'Apoyo escolar para niños',
+                'Talleres de computación',
+                'Preparación para exámenes libres'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Semanal',
+            'recursos': 'Profesor, computadores, material educativo',
+            'indicadores': 'Mejora en niveles de lectura, aprobación de exámenes'
+        }
+    ],
+    'acceso_salud': [
+        {
+            'nombre': 'Programa de Acceso a Servicios de Salud',
+            'tipo': 'Comunitaria',
+            'objetivo': 'Mejorar el acceso a servicios de salud de la comunidad',
+            'poblacion': 'Personas con dificultades de acceso',
+            'actividades': [
+                'Transporte comunitario a centros de salud',
+                'Atención domiciliaria',
+                'Gestión de horas médicas',
+                'Educación en derechos de salud'
+            ],
+            'duracion': '12 meses',
+            'frecuencia': 'Mensual',
+            'recursos': 'Movilización, personal de salud, gestor',
+            'indicadores': 'Mejora en acceso, satisfacción usuaria'
+        }
+    ]
+}
+
+# Sugerencia general cuando la comunidad tiene fortalezas identificadas
+FORTALECIMIENTO_COMUNITARIO = {
+    'nombre': 'Programa de Fortalecimiento Comunitario',
+    'tipo': 'Promocional',
+    'objetivo': 'Potenciar las fortalezas identificadas en la comunidad',
+    'poblacion': 'Toda la comunidad',
+    'actividades': [
+        'Talleres de liderazgo comunitario',
+        'Organización de eventos comunitarios',
+        'Fortalecimiento de redes sociales',
+        'Desarrollo de proyectos comunitarios'
+    ],
+    'duracion': '6 meses',
+    'frecuencia': 'Mensual',
+    'recursos': 'Facilitador comunitario, espacio de reunión',
+    'indicadores': 'Participación comunitaria, desarrollo de proyectos'
+}
+
+# Orden del cronograma según el tipo de intervención
+PRIORIDADES_TIPO = {
+    'Preventiva': 1,
+    'Curativa': 2,
+    'Promocional': 3,
+    'Rehabilitadora': 4,
+    'Comunitaria': 5
+}
+
+
+def analizar_datos_comunidad(almacen=None, sectores=None, red_intersectoral=None):
+    """
+    Analiza los datos de la comunidad y retorna un diagnóstico inteligente
+    """
+    diagnostico = {
+        'problemas_prioritarios': [],
+        'fortalezas_comunitarias': [],
+        'poblaciones_vulnerables': [],
+        'recursos_disponibles': [],
+        'oportunidades_intervencion': []
+    }
+
+    # Problemas más frecuentes (conteos vectorizados sobre el almacén columnar)
+    total_familias = len(almacen) if almacen is not None else 0
+    if total_familias > 0:
+        # Identificar problemas prioritarios (más del 30% de las familias)
+        for problema, cantidad in almacen.contar_problemas().items():
+            porcentaje = (cantidad / total_familias) * 100
+            if porcentaje >= 30:
+                diagnostico['problemas_prioritarios'].append({
+                    'problema': problema,
+                    'cantidad': cantidad,
+                    'porcentaje': porcentaje
+                })
+
+    # Analizar sectores
+    for sector in sectores or []:
+        if sector.get('vulnerabilidad') == 'Alta':
+            diagnostico['poblaciones_vulnerables'].append(f"Sector {sector.get('nombre', 'Desconocido')}")
+
+        # Identificar fortalezas
+        if sector.get('caracteristicas'):
+            diagnostico['fortalezas_comunitarias'].extend(sector['caracteristicas'])
+
+    # Analizar red de trabajo
+    for institucion in red_intersectoral or []:
+        if institucion.get('tipo') in ['Educación', 'Deportes', 'Cultura']:
+            diagnostico['recursos_disponibles'].append(institucion.get('nombre', 'Institución'))
+
+    return diagnostico
+
+
+def generar_sugerencias_intervenciones(diagnostico):
+    """
+    Genera sugerencias automáticas de intervenciones basadas en el diagnóstico
+    """
+    sugerencias = []
+
+    # Se copian para que quien las reciba pueda modificarlas sin alterar las tablas
+    for problema in diagnostico['problemas_prioritarios']:
+        if problema['problema'] in INTERVENCIONES_POR_PROBLEMA:
+            sugerencias.extend(copy.deepcopy(INTERVENCIONES_POR_PROBLEMA[problema['problema']]))
+
+    # Agregar sugerencias generales basadas en fortalezas y recursos
+    if diagnostico['fortalezas_comunitarias']:
+        sugerencias.append(copy.deepcopy(FORTALECIMIENTO_COMUNITARIO))
+
+    return sugerencias
+
+
+def generar_cronograma_inteligente(sugerencias, fecha_actual=None, aleatorio=None):
+    """
+    Genera un cronograma para las intervenciones sugeridas. fecha_actual y
+    aleatorio (un random.Random para los presupuestos) permiten reproducirlo.
+    """
+    cronograma = []
+    fecha_actual = fecha_actual or datetime.now()
+    aleatorio = aleatorio or random
+
+    # Ordenar sugerencias por prioridad
+    sugerencias_ordenadas = sorted(sugerencias, key=lambda x: PRIORIDADES_TIPO.get(x['tipo'], 6))
+
+    for i, sugerencia in enumerate(sugerencias_ordenadas):
+        # Comienza en 1 mes; las siguientes espaciadas cada 2 meses
+        fecha_inicio = fecha_actual + timedelta(days=30 + (i * 60))
+
+        # Calcular fecha fin basada en duración
+        duracion_meses = int(sugerencia['duracion'].split()[0])
+        fecha_fin = fecha_inicio + timedelta(days=duracion_meses * 30)
+
+        # Asignar prioridad
+        if sugerencia['tipo'] == 'Preventiva':
+            prioridad = 'Alta'
+        elif sugerencia['tipo'] in ['Curativa', 'Promocional']:
+            prioridad = 'Media'
+        else:
+            prioridad = 'Baja'
+
+        cronograma.append({
+            'nombre': sugerencia['nombre'],
+            'tipo': sugerencia['tipo'],
+            'objetivo': sugerencia['objetivo'],
+            'poblacion': sugerencia['poblacion'],
+            'prioridad': prioridad,
+            'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
+            'fecha_fin': fecha_fin.strftime('%Y-%m-%d'),
+            'frecuencia': sugerencia['frecuencia'],
+            'responsable': 'Equipo de Salud Familiar',
+            'equipo': 'Médico, TENS, Matrona, Psicólogo',
+            'recursos': sugerencia['recursos'],
+            'presupuesto': aleatorio.randint(500000, 2000000),  # Presupuesto estimado
+            'indicadores': sugerencia['indicadores'],
+            'actividades': sugerencia['actividades']
+        })
+
+    return cronograma
+
+
+def generar_recomendaciones_personalizadas(almacen=None, sectores=None, red_intersectoral=None,
+                                           fecha_actual=None, aleatorio=None):
+    """
+    Diagnóstico, sugerencias y cronograma en un solo paso
+    """
+    diagnostico = analizar_datos_comunidad(almacen, sectores, red_intersectoral)
+    sugerencias = generar_sugerencias_intervenciones(diagnostico)
+    cronograma = generar_cronograma_inteligente(sugerencias, fecha_actual, aleatorio)
+
+    return {
+        'diagnostico': diagnostico,
+        'sugerencias': sugerencias,
+        'cronograma': cronograma
+    }
@@ -0,0 +1,95 @@
+"""
+Diagnóstico por sector y de problemas específicos sin dependencias de Streamlit
+Calcula las tablas del diagnóstico comunitario sobre el almacén columnar de
+familias (AlmacenFamilias) y la lista de sectores.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agregados_familias import INDICADORES
+from instrumentacion import contar
+
+# Problemas que compiten por "Problema Principal" de cada sector (nombre → indicador)
+PROBLEMAS_SECTOR = {
+    "Hacinamiento": "hacinamiento",
+    "Violencia Intrafamiliar": "violencia_intrafamiliar",
+    "Consumo de Drogas": "consumo_drogas",
+    "Embarazo Adolescente": "embarazo_adolescente"
+}
+
+# Tabla de problemas específicos del diagnóstico (nombre → indicador)
+PROBLEMAS_ESPECIFICOS = {
+    "Violencia Intrafamiliar": "violencia_intrafamiliar",
+    "Consumo de Drogas": "consumo_drogas",
+    "Embarazo Adolescente": "embarazo_adolescente",
+    "Desempleo": "desempleo",
+    "Hacinamiento Alto": "hacinamiento",
+    "Red de Apoyo Débil": "red_apoyo_debil"
+}
+
+
+def tabla_sectores(almacen):
+    """
+    Tabla agrupada por sector (índice: nombre, solo sectores con familias) con el
+    total, las familias en alto riesgo (cualquiera, social, sanitario), la cantidad
+    por indicador de agregados_familias.INDICADORES, el porcentaje de alto riesgo y
+    el problema principal. Se arma de una vez desde los contadores incrementales.
+    """
+    agregados = almacen.agregados
+    categorias = almacen.categorias["sector"].categorias
+    totales = agregados.sector_total[:len(categorias)]
+    codigos = np.flatnonzero(totales)
+
+    contar("dataframes")
+    tabla = pd.DataFrame(
+        agregados.sector_problemas[codigos], columns=INDICADORES,
+        index=pd.Index([categorias[codigo] for codigo in codigos], name="sector")
+    )
+    tabla.insert(0, "total", totales[codigos])
+    tabla.insert(1, "alto_riesgo", agregados.sector_alto_riesgo[codigos])
+    tabla.insert(2, "alto_riesgo_social", agregados.sector_alto["riesgo_social"][codigos])
+    tabla.insert(3, "alto_riesgo_sanitario", agregados.sector_alto["riesgo_sanitario"][codigos])
+    tabla["porcentaje_alto_riesgo"] = tabla["alto_riesgo"] / tabla["total"] * 100
+
+    # Problema más frecuente (el primero de PROBLEMAS_SECTOR en caso de empate)
+    candidatos = tabla[list(PROBLEMAS_SECTOR.values())].to_numpy()
+    nombres = np.array(list(PROBLEMAS_SECTOR), dtype=object)
+    tabla["problema_principal"] = np.where(candidatos.max(axis=1, initial=0) > 0, nombres[candidatos.argmax(axis=1)], "Ninguno")
+    return tabla
+
+
+def diagnostico_por_sector(almacen, sectores):
+    """
+    Filas del análisis por sector (solo sectores con familias registradas)
+    """
+    tabla = tabla_sectores(almacen).to_dict("index")
+
+    diagnostico_data = []
+    for sector in sectores:
+        fila = tabla.get(sector["nombre"])
+        if fila:
+            diagnostico_data.append({
+                "Sector": sector["nombre"],
+                "Total Familias": fila["total"],
+                "Familias Alto Riesgo": fila["alto_riesgo"],
+                "Porcentaje Alto Riesgo": fila["porcentaje_alto_riesgo"],
+                "Problema Principal": fila["problema_principal"],
+                "Vulnerabilidad": sector["vulnerabilidad"],
+                "Tipo Territorio": sector["tipo_territorio"]
+            })
+
+    return diagnostico_data
+
+
+def problemas_especificos(almacen):
+    """
+    DataFrame con la cantidad y el porcentaje de familias por problema específico
+    """
+    conteos = almacen.agregados.conteos(PROBLEMAS_ESPECIFICOS.values())
+    df_problemas = pd.DataFrame({
+        "Problema": list(PROBLEMAS_ESPECIFICOS),
+        "Cantidad": [conteos[indicador] for indicador in PROBLEMAS_ESPECIFICOS.values()]
+    })
+    df_problemas["Porcentaje"] = (df_problemas["Cantidad"] / max(len(almacen), 1)) * 100
+    return df_problemas
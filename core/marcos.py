@@ -0,0 +1,69 @@
+"""
+Marcos de datos derivados compartidos por páginas y exportaciones
+Cada colección se convierte una sola vez en un DataFrame plano (los
+diccionarios anidados se aplanan como "grupo.campo") con dtypes categóricos en
+las columnas de pocos valores. Las familias se cachean en su almacén por
+revisión; sectores, equipos, instituciones y plan, en una caché LRU por huella
+del contenido. Los marcos se comparten entre llamadas: no deben modificarse
+(copiar antes con .copy() si hace falta).
+"""
+
+import os
+
+import pandas as pd
+
+from cache_lru import CacheLRU
+from instrumentacion import contar
+from rastreo_cambios import huella
+from registros import Registro
+
+CACHE_MARCOS = CacheLRU(int(os.environ.get("SIMULADOR_CACHE_MARCOS", "64")))
+
+# Columnas categóricas de cada colección (las demás conservan su tipo)
+CATEGORICAS = {
+    "sectores": ["tipo_territorio", "nivel_socioeconomico", "vulnerabilidad"],
+    "equipos": ["sector", "informacion.modalidad"],
+    "instituciones": ["tipo", "informacion.modalidad", "informacion.nivel_coordinacion", "informacion.frecuencia_contacto"],
+    "plan_intervencion": ["tipo", "estado", "cronograma.frecuencia"],
+}
+
+
+def familias_flat(almacen):
+    """Una fila por familia con las columnas del almacén (sector y niveles categóricos)"""
+    return almacen.marco()
+
+
+def _marco_coleccion(nombre, registros):
+    registros = registros or []
+
+    def construir():
+        contar("dataframes")
+        filas = [registro.a_dict() if isinstance(registro, Registro) else registro for registro in registros]
+        marco = pd.json_normalize(filas) if filas else pd.DataFrame()
+        for columna in CATEGORICAS[nombre]:
+            if columna in marco:
+                marco[columna] = marco[columna].astype("category")
+        return marco
+
+    return CACHE_MARCOS.obtener((nombre, len(registros), huella(registros)), construir)
+
+
+def sectores_flat(sectores):
+    return _marco_coleccion("sectores", sectores)
+
+
+def equipos_flat(equipos):
+    return _marco_coleccion("equipos", equipos)
+
+
+def instituciones_flat(instituciones):
+    return _marco_coleccion("instituciones", instituciones)
+
+
+def plan_flat(plan_intervencion):
+    return _marco_coleccion("plan_intervencion", plan_intervencion)
+
+
+def columnas(marco, nombres):
+    """Subconjunto de columnas con nombres de presentación ({columna: título})"""
+    return marco[list(nombres)].rename(columns=nombres)
@@ -0,0 +1,161 @@
+"""
+Reportes del diagnóstico comunitario sin dependencias de Streamlit
+PDF, Excel y JSON a partir de los datos recibidos como argumentos; cada página
+decide de dónde vienen (sesión, almacenamiento, población sintética). reportlab
+y openpyxl se cargan al generar el PDF o el Excel, no al importar el módulo.
+"""
+
+import io
+import json
+from datetime import datetime
+
+import pandas as pd
+
+from core.diagnostico import tabla_sectores
+from core.marcos import columnas, familias_flat, plan_flat, sectores_flat
+from registros import a_json
+
+
+def generar_pdf(sectores, almacen, diagnostico=None, plan_intervencion=None):
+    """Genera un PDF con el resumen completo del diagnóstico comunitario (almacen: AlmacenFamilias o None)"""
+    # reportlab se importa solo al exportar (demora el arranque de las páginas)
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Título
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        alignment=1
+    )
+    story.append(Paragraph("DIAGNÓSTICO COMUNITARIO EN APS", title_style))
+    story.append(Paragraph("Modelo MAIS - Salud Familiar y Comunitaria", styles['Heading2']))
+    story.append(Spacer(1, 20))
+
+    # Información general
+    story.append(Paragraph("INFORMACIÓN GENERAL", styles['Heading2']))
+    story.append(Spacer(1, 12))
+
+    if sectores:
+        story.append(Paragraph(f"Total de Sectores: {len(sectores)}", styles['Normal']))
+        total_poblacion = sum(s["poblacion_total"] for s in sectores)
+        story.append(Paragraph(f"Población Total: {total_poblacion:,}", styles['Normal']))
+        total_familias = sum(s["num_familias"] for s in sectores)
+        story.append(Paragraph(f"Total de Familias: {total_familias:,}", styles['Normal']))
+
+    if almacen is not None and len(almacen):
+        story.append(Paragraph(f"Familias Registradas: {len(almacen)}", styles['Normal']))
+        familias_alto_riesgo = almacen.contar_alto_riesgo()
+        story.append(Paragraph(f"Familias en Alto Riesgo: {familias_alto_riesgo}", styles['Normal']))
+
+        # Resumen por sector (la misma tabla agrupada del diagnóstico)
+        tabla = tabla_sectores(almacen)
+        if not tabla.empty:
+            story.append(Spacer(1, 12))
+            story.append(Paragraph("Familias por Sector:", styles['Normal']))
+            for sector, fila in tabla.iterrows():
+                story.append(Paragraph(
+                    f"• {sector}: {fila['total']} familias, {fila['alto_riesgo']} en alto riesgo "
+                    f"({fila['porcentaje_alto_riesgo']:.1f}%); problema principal: {fila['problema_principal']}",
+                    styles['Normal']
+                ))
+
+    story.append(Spacer(1, 20))
+
+    # Diagnóstico
+    if diagnostico:
+        story.append(Paragraph("DIAGNÓSTICO COMUNITARIO", styles['Heading2']))
+        story.append(Spacer(1, 12))
+
+        story.append(Paragraph(f"Problema Principal: {diagnostico['problema_principal']}", styles['Normal']))
+        story.append(Paragraph(f"Grupo Prioritario: {diagnostico['grupo_prioritario']}", styles['Normal']))
+        story.append(Paragraph(f"Enfoque de Intervención: {diagnostico['enfoque_intervencion']}", styles['Normal']))
+
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Estrategias Propuestas:", styles['Normal']))
+        for estrategia in diagnostico['estrategias_propuestas']:
+            story.append(Paragraph(f"• {estrategia}", styles['Normal']))
+
+    story.append(Spacer(1, 20))
+
+    # Plan de intervención
+    if plan_intervencion:
+        story.append(Paragraph("PLAN DE INTERVENCIÓN", styles['Heading2']))
+        story.append(Spacer(1, 12))
+
+        story.append(Paragraph(f"Total de Actividades: {len(plan_intervencion)}", styles['Normal']))
+        total_presupuesto = sum(a["presupuesto_estimado"] for a in plan_intervencion)
+        story.append(Paragraph(f"Presupuesto Total: ${total_presupuesto:,}", styles['Normal']))
+
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Actividades Planificadas:", styles['Normal']))
+        for actividad in plan_intervencion:
+            story.append(Paragraph(f"• {actividad['nombre']} ({actividad['tipo']})", styles['Normal']))
+            story.append(Paragraph(f"  Objetivo: {actividad['objetivo_general']}", styles['Normal']))
+            story.append(Paragraph(f"  Responsables: {', '.join(actividad['responsables'])}", styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Fecha de generación
+    story.append(Spacer(1, 20))
+    story.append(Paragraph(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def generar_excel(sectores, almacen, plan_intervencion=None):
+    """Genera un Excel con hojas de sectores, familias y plan de intervención"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        # Hoja de sectores
+        if sectores:
+            df_sectores = sectores_flat(sectores)
+            df_sectores.to_excel(writer, sheet_name='Sectores', index=False)
+
+        # Hoja de familias
+        if almacen is not None and len(almacen):
+            df_familias = columnas(familias_flat(almacen), {
+                "sector": "Sector",
+                "apellido": "Apellido",
+                "num_integrantes": "Integrantes",
+                "riesgo_social": "Riesgo Social",
+                "riesgo_sanitario": "Riesgo Sanitario",
+                "hacinamiento": "Hacinamiento",
+                "violencia_intrafamiliar": "Violencia Intrafamiliar",
+                "consumo_drogas": "Consumo Drogas"
+            })
+            df_familias.to_excel(writer, sheet_name='Familias', index=False)
+
+        # Hoja de plan de intervención
+        if plan_intervencion:
+            df_plan = columnas(plan_flat(plan_intervencion), {
+                "nombre": "Actividad",
+                "tipo": "Tipo",
+                "objetivo_general": "Objetivo",
+                "responsables": "Responsables",
+                "presupuesto_estimado": "Presupuesto",
+                "cronograma.fecha_inicio": "Fecha Inicio",
+                "cronograma.fecha_fin": "Fecha Fin"
+            })
+            df_plan["Responsables"] = df_plan["Responsables"].str.join(", ")
+            df_plan.to_excel(writer, sheet_name='Plan_Intervencion', index=False)
+
+    output.seek(0)
+    return output
+
+
+def generar_json(datos, fecha_exportacion=None):
+    """Serializa los datos del proyecto (diccionario por sección) agregando la fecha de exportación"""
+    datos_completos = dict(datos)
+    datos_completos["fecha_exportacion"] = fecha_exportacion or datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    return json.dumps(datos_completos, indent=2, ensure_ascii=False, default=a_json)
@@ -0,0 +1,96 @@
+"""
+Teletriage y monitoreo remoto sin dependencias de Streamlit
+Clasificación de urgencia por síntomas y factores de riesgo, y generación de
+series simuladas de monitoreo domiciliario.
+"""
+
+import random
+from datetime import timedelta
+
+
+def evaluar_urgencia_teletriage(sintoma, dolor, tiempo, fiebre, tos, dificultad_respirar,
+                               dolor_pecho, perdida_conciencia, sangrado, diabetes,
+                               hipertension, embarazo, edad_avanzada):
+    """Evalúa la urgencia del caso basado en síntomas y factores de riesgo"""
+
+    puntaje = 0
+
+    # Síntomas críticos
+    if perdida_conciencia:
+        puntaje += 10
+    if dolor_pecho:
+        puntaje += 8
+    if dificultad_respirar:
+        puntaje += 7
+    if sangrado:
+        puntaje += 6
+
+    # Síntomas moderados
+    if fiebre:
+        puntaje += 3
+    if tos:
+        puntaje += 2
+
+    # Nivel de dolor
+    if dolor >= 8:
+        puntaje += 4
+    elif dolor >= 5:
+        puntaje += 2
+
+    # Tiempo de síntomas
+    if tiempo == "Menos de 1 hora":
+        puntaje += 3
+    elif tiempo == "1-6 horas":
+        puntaje += 2
+
+    # Factores de riesgo
+    if diabetes:
+        puntaje += 2
+    if hipertension:
+        puntaje += 2
+    if embarazo:
+        puntaje += 3
+    if edad_avanzada:
+        puntaje += 2
+
+    # Determinar urgencia
+    if puntaje >= 15:
+        return "CRÍTICA", "Acudir inmediatamente al servicio de urgencias", "Inmediato"
+    elif puntaje >= 10:
+        return "ALTA", "Acudir al servicio de urgencias en las próximas 2 horas", "2 horas"
+    elif puntaje >= 6:
+        return "MODERADA", "Acudir al CESFAM en las próximas 24 horas", "24 horas"
+    else:
+        return "BAJA", "Agendar consulta médica regular", "48-72 horas"
+
+
+def generar_datos_monitoreo(tipo, fecha_inicio, dias, aleatorio=None):
+    """Genera datos simulados de monitoreo (aleatorio: un random.Random para reproducirlos)"""
+    aleatorio = aleatorio or random
+    datos = []
+
+    for i in range(dias):
+        fecha = fecha_inicio + timedelta(days=i)
+
+        if tipo == "Presión Arterial":
+            sistolica = aleatorio.randint(110, 180)
+            diastolica = aleatorio.randint(70, 110)
+            valor = f"{sistolica}/{diastolica}"
+        elif tipo == "Glucemia":
+            valor = aleatorio.randint(80, 200)
+        elif tipo == "Peso":
+            valor = aleatorio.uniform(60, 90)
+        elif tipo == "Oxigenación":
+            valor = aleatorio.randint(92, 98)
+        elif tipo == "Frecuencia Cardíaca":
+            valor = aleatorio.randint(60, 100)
+        elif tipo == "Temperatura":
+            valor = round(aleatorio.uniform(36.0, 38.5), 1)
+
+        datos.append({
+            "fecha": fecha.strftime("%Y-%m-%d"),
+            "valor": valor,
+            "alerta": valor > 140 if isinstance(valor, (int, float)) else False
+        })
+
+    return datos
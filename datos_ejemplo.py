@@ -1667,25 +1667,26 @@ def cargar_datos_ejemplo():
     Función para cargar datos de ejemplo en la aplicación
     """
     import streamlit as st
+    from registros import convertir
     
     if st.button("📋 Cargar Datos de Ejemplo", type="primary"):
         # Cargar sectores
-        st.session_state.sectores = SECTORES_EJEMPLO.copy()
+        st.session_state.sectores = convertir("sectores", SECTORES_EJEMPLO)
         
         # Cargar equipos
-        st.session_state.equipos = EQUIPOS_EJEMPLO.copy()
+        st.session_state.equipos = convertir("equipos", EQUIPOS_EJEMPLO)
         
         # Cargar familias
-        st.session_state.familias = FAMILIAS_EJEMPLO.copy()
+        st.session_state.familias = convertir("familias", FAMILIAS_EJEMPLO)
         
         # Cargar instituciones
-        st.session_state.instituciones = INSTITUCIONES_EJEMPLO.copy()
+        st.session_state.instituciones = convertir("instituciones", INSTITUCIONES_EJEMPLO)
         
         # Cargar diagnóstico
         st.session_state.diagnostico = DIAGNOSTICO_EJEMPLO.copy()
         
         # Cargar plan de intervención
-        st.session_state.plan_intervencion = PLAN_INTERVENCION_EJEMPLO.copy()
+        st.session_state.plan_intervencion = convertir("plan_intervencion", PLAN_INTERVENCION_EJEMPLO)
         
         # Cargar participación comunitaria
         st.session_state.participacion_comunitaria = PARTICIPACION_COMUNITARIA_EJEMPLO.copy()
@@ -1700,6 +1701,27 @@ def cargar_datos_ejemplo():
         st.info("Ahora puedes explorar todas las secciones de la aplicación con datos de ejemplo.")
         st.rerun()
 
+    with st.expander("🏙️ Cargar dataset grande (población sintética)"):
+        st.caption("Genera sectores, equipos, familias, instituciones, pacientes crónicos, casos de "
+                   "teletriage y registros de vigilancia a escala comunal, siempre iguales para la misma semilla.")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            num_familias = st.number_input("Familias", min_value=100, max_value=1000000, value=100000, step=10000,
+                                           key="sintetico_familias")
+        with col2:
+            num_sectores = st.number_input("Sectores", min_value=1, max_value=500, value=50, key="sintetico_sectores")
+        with col3:
+            semilla = st.number_input("Semilla", min_value=0, value=42, key="sintetico_semilla")
+
+        if st.button("🏙️ Cargar dataset grande"):
+            from generador_poblacion import estado_sesion, generar_poblacion
+
+            with st.spinner("Generando población sintética..."):
+                poblacion = generar_poblacion(int(num_familias), int(num_sectores), int(semilla))
+            st.session_state.update(estado_sesion(poblacion))
+            st.success(f"✅ {len(poblacion['familias']):,} familias sintéticas cargadas en {len(poblacion['sectores'])} sectores")
+            st.rerun()
+
 if __name__ == "__main__":
     print("Datos de ejemplo para el Simulador Comunitario")
     print("Este archivo contiene datos ficticios para demostrar la funcionalidad") 
\ No newline at end of file
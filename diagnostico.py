@@ -3,6 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from sesion_familias import obtener_almacen_familias
+from cache_figuras import mostrar_figura
+from core.diagnostico import diagnostico_por_sector, problemas_especificos
+from core.marcos import columnas, familias_flat
 from sistema_inteligente import analizar_datos_comunidad
 
 def mostrar_diagnostico():
@@ -46,53 +50,16 @@ def mostrar_diagnostico():
         total_poblacion = sum(s["poblacion_total"] for s in st.session_state.sectores)
         st.metric("Población Total", f"{total_poblacion:,}")
     
+    almacen = obtener_almacen_familias()
+    
     with col4:
-        familias_alto_riesgo = sum(1 for f in st.session_state.familias 
-                                 if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                 f["riesgos"]["sanitario"]["nivel"] == "Alto")
+        familias_alto_riesgo = almacen.contar_alto_riesgo()
         st.metric("Familias Alto Riesgo", familias_alto_riesgo)
     
     # Análisis por sectores
     st.markdown("### 🗺️ Análisis por Sectores")
     
-    diagnostico_data = []
-    for sector in st.session_state.sectores:
-        sector_nombre = sector["nombre"]
-        familias_sector = [f for f in st.session_state.familias if f["sector"] == sector_nombre]
-        
-        if familias_sector:
-            # Calcular estadísticas del sector
-            total_familias_sector = len(familias_sector)
-            familias_alto_riesgo_sector = sum(1 for f in familias_sector 
-                                            if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                            f["riesgos"]["sanitario"]["nivel"] == "Alto")
-            
-            # Problemas más frecuentes
-            problemas_frecuentes = []
-            for familia in familias_sector:
-                if familia["vivienda"]["hacinamiento"] == "Alto":
-                    problemas_frecuentes.append("Hacinamiento")
-                if familia["salud"]["violencia_intrafamiliar"]:
-                    problemas_frecuentes.append("Violencia Intrafamiliar")
-                if familia["salud"]["consumo_drogas"]:
-                    problemas_frecuentes.append("Consumo de Drogas")
-                if familia["salud"]["embarazo_adolescente"]:
-                    problemas_frecuentes.append("Embarazo Adolescente")
-            
-            # Contar problemas
-            from collections import Counter
-            problemas_count = Counter(problemas_frecuentes)
-            problema_principal = problemas_count.most_common(1)[0][0] if problemas_count else "Ninguno"
-            
-            diagnostico_data.append({
-                "Sector": sector_nombre,
-                "Total Familias": total_familias_sector,
-                "Familias Alto Riesgo": familias_alto_riesgo_sector,
-                "Porcentaje Alto Riesgo": (familias_alto_riesgo_sector / total_familias_sector) * 100,
-                "Problema Principal": problema_principal,
-                "Vulnerabilidad": sector["vulnerabilidad"],
-                "Tipo Territorio": sector["tipo_territorio"]
-            })
+    diagnostico_data = diagnostico_por_sector(almacen, st.session_state.sectores)
     
     if diagnostico_data:
         df_diagnostico = pd.DataFrame(diagnostico_data)
@@ -103,127 +70,114 @@ def mostrar_diagnostico():
         # Gráficos de diagnóstico
         col1, col2 = st.columns(2)
         
+        # Los gráficos dependen de las familias y de los sectores
         with col1:
-            fig_vulnerabilidad = px.bar(
-                df_diagnostico,
-                x="Sector",
-                y="Porcentaje Alto Riesgo",
-                title="Porcentaje de Familias en Alto Riesgo por Sector",
-                color="Vulnerabilidad",
-                color_discrete_map={"Alta": "red", "Media": "orange", "Baja": "green", "Crítica": "darkred"}
-            )
-            fig_vulnerabilidad.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_vulnerabilidad, use_container_width=True)
+            def figura_vulnerabilidad():
+                fig_vulnerabilidad = px.bar(
+                    df_diagnostico,
+                    x="Sector",
+                    y="Porcentaje Alto Riesgo",
+                    title="Porcentaje de Familias en Alto Riesgo por Sector",
+                    color="Vulnerabilidad",
+                    color_discrete_map={"Alta": "red", "Media": "orange", "Baja": "green", "Crítica": "darkred"}
+                )
+                fig_vulnerabilidad.update_layout(xaxis_tickangle=-45)
+                return fig_vulnerabilidad
+            mostrar_figura("diagnostico_vulnerabilidad", almacen, figura_vulnerabilidad, sectores=st.session_state.sectores)
         
         with col2:
-            fig_problemas = px.bar(
-                df_diagnostico,
-                x="Sector",
-                y="Familias Alto Riesgo",
-                title="Familias en Alto Riesgo por Sector",
-                color="Problema Principal",
-                color_discrete_map={
-                    "Hacinamiento": "orange",
-                    "Violencia Intrafamiliar": "red",
-                    "Consumo de Drogas": "purple",
-                    "Embarazo Adolescente": "pink",
-                    "Ninguno": "green"
-                }
-            )
-            fig_problemas.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_problemas, use_container_width=True)
+            def figura_problemas():
+                fig_problemas = px.bar(
+                    df_diagnostico,
+                    x="Sector",
+                    y="Familias Alto Riesgo",
+                    title="Familias en Alto Riesgo por Sector",
+                    color="Problema Principal",
+                    color_discrete_map={
+                        "Hacinamiento": "orange",
+                        "Violencia Intrafamiliar": "red",
+                        "Consumo de Drogas": "purple",
+                        "Embarazo Adolescente": "pink",
+                        "Ninguno": "green"
+                    }
+                )
+                fig_problemas.update_layout(xaxis_tickangle=-45)
+                return fig_problemas
+            mostrar_figura("diagnostico_problemas_sector", almacen, figura_problemas, sectores=st.session_state.sectores)
     
     # Análisis de factores de riesgo
     st.markdown("### 🚨 Análisis de Factores de Riesgo")
     
     if st.session_state.familias:
-        # Crear DataFrame para análisis
-        familias_data = []
-        for familia in st.session_state.familias:
-            familias_data.append({
-                "Sector": familia["sector"],
-                "Apellido": familia["apellido"],
-                "Riesgo Social": familia["riesgos"]["social"]["nivel"],
-                "Riesgo Sanitario": familia["riesgos"]["sanitario"]["nivel"],
-                "Puntaje Social": familia["riesgos"]["social"]["puntaje"],
-                "Puntaje Sanitario": familia["riesgos"]["sanitario"]["puntaje"],
-                "Hacinamiento": familia["vivienda"]["hacinamiento"],
-                "Red Apoyo": familia["vivienda"]["red_apoyo"],
-                "Participación Social": familia["vivienda"]["participacion_social"],
-                "Acceso APS": familia["vivienda"]["acceso_aps"],
-                "Violencia Intrafamiliar": familia["salud"]["violencia_intrafamiliar"],
-                "Consumo Drogas": familia["salud"]["consumo_drogas"],
-                "Embarazo Adolescente": familia["salud"]["embarazo_adolescente"],
-                "Desempleo": familia["salud"]["desempleo"]
+        # Crear DataFrame para análisis (solo si hay que construir un gráfico)
+        def marco_familias():
+            return columnas(familias_flat(almacen), {
+                "sector": "Sector",
+                "apellido": "Apellido",
+                "riesgo_social": "Riesgo Social",
+                "riesgo_sanitario": "Riesgo Sanitario",
+                "puntaje_social": "Puntaje Social",
+                "puntaje_sanitario": "Puntaje Sanitario",
+                "hacinamiento": "Hacinamiento",
+                "red_apoyo": "Red Apoyo",
+                "participacion_social": "Participación Social",
+                "acceso_aps": "Acceso APS",
+                "violencia_intrafamiliar": "Violencia Intrafamiliar",
+                "consumo_drogas": "Consumo Drogas",
+                "embarazo_adolescente": "Embarazo Adolescente",
+                "desempleo": "Desempleo"
             })
         
-        df_familias = pd.DataFrame(familias_data)
-        
         # Análisis de correlaciones
         col1, col2 = st.columns(2)
         
         with col1:
             # Distribución de riesgos
-            fig_riesgos = px.histogram(
-                df_familias,
+            mostrar_figura("diagnostico_riesgo_social", almacen, lambda: px.histogram(
+                marco_familias(),
                 x="Puntaje Social",
                 color="Riesgo Social",
                 title="Distribución de Riesgo Social",
                 color_discrete_map={"Alto": "red", "Medio": "orange", "Bajo": "green"}
-            )
-            st.plotly_chart(fig_riesgos, use_container_width=True)
+            ))
         
         with col2:
-            fig_riesgo_sanitario = px.histogram(
-                df_familias,
+            mostrar_figura("diagnostico_riesgo_sanitario", almacen, lambda: px.histogram(
+                marco_familias(),
                 x="Puntaje Sanitario",
                 color="Riesgo Sanitario",
                 title="Distribución de Riesgo Sanitario",
                 color_discrete_map={"Alto": "red", "Medio": "orange", "Bajo": "green"}
-            )
-            st.plotly_chart(fig_riesgo_sanitario, use_container_width=True)
+            ))
         
         # Análisis de problemas específicos
         st.markdown("### 📈 Análisis de Problemas Específicos")
         
-        problemas_data = {
-            "Problema": ["Violencia Intrafamiliar", "Consumo de Drogas", "Embarazo Adolescente", 
-                        "Desempleo", "Hacinamiento Alto", "Red de Apoyo Débil"],
-            "Cantidad": [
-                sum(1 for f in st.session_state.familias if f["salud"]["violencia_intrafamiliar"]),
-                sum(1 for f in st.session_state.familias if f["salud"]["consumo_drogas"]),
-                sum(1 for f in st.session_state.familias if f["salud"]["embarazo_adolescente"]),
-                sum(1 for f in st.session_state.familias if f["salud"]["desempleo"]),
-                sum(1 for f in st.session_state.familias if f["vivienda"]["hacinamiento"] == "Alto"),
-                sum(1 for f in st.session_state.familias if f["vivienda"]["red_apoyo"] == "Débil")
-            ]
-        }
-        
-        df_problemas = pd.DataFrame(problemas_data)
-        df_problemas["Porcentaje"] = (df_problemas["Cantidad"] / len(st.session_state.familias)) * 100
+        df_problemas = problemas_especificos(almacen)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_problemas_barras = px.bar(
-                df_problemas,
-                x="Problema",
-                y="Cantidad",
-                title="Problemas Identificados",
-                color="Cantidad",
-                color_continuous_scale="Reds"
-            )
-            fig_problemas_barras.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_problemas_barras, use_container_width=True)
+            def figura_problemas_barras():
+                fig_problemas_barras = px.bar(
+                    df_problemas,
+                    x="Problema",
+                    y="Cantidad",
+                    title="Problemas Identificados",
+                    color="Cantidad",
+                    color_continuous_scale="Reds"
+                )
+                fig_problemas_barras.update_layout(xaxis_tickangle=-45)
+                return fig_problemas_barras
+            mostrar_figura("diagnostico_problemas_barras", almacen, figura_problemas_barras)
         
         with col2:
-            fig_problemas_pie = px.pie(
+            mostrar_figura("diagnostico_problemas_pie", almacen, lambda: px.pie(
                 df_problemas,
                 values="Cantidad",
                 names="Problema",
                 title="Distribución de Problemas"
-            )
-            st.plotly_chart(fig_problemas_pie, use_container_width=True)
+            ))
     
     # Preguntas orientadoras para el diagnóstico
     st.markdown("### 🤔 Preguntas Orientadoras para el Diagnóstico")
@@ -355,10 +309,8 @@ def mostrar_diagnostico():
     st.markdown("### 💡 Recomendaciones para el Diagnóstico")
     
     if st.session_state.familias:
-        total_familias = len(st.session_state.familias)
-        familias_alto_riesgo = sum(1 for f in st.session_state.familias 
-                                 if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                 f["riesgos"]["sanitario"]["nivel"] == "Alto")
+        total_familias = len(almacen)
+        familias_alto_riesgo = almacen.contar_alto_riesgo()
         
         porcentaje_alto_riesgo = (familias_alto_riesgo / total_familias) * 100
         
@@ -372,16 +324,16 @@ def mostrar_diagnostico():
         # Recomendaciones específicas
         st.markdown("**Recomendaciones específicas:**")
         
-        if sum(1 for f in st.session_state.familias if f["salud"]["violencia_intrafamiliar"]) > 0:
+        if almacen.columna("violencia_intrafamiliar").any():
             st.error("• Implementar protocolos de detección y derivación de violencia intrafamiliar")
         
-        if sum(1 for f in st.session_state.familias if f["vivienda"]["hacinamiento"] == "Alto") > 0:
+        if almacen.mascara("hacinamiento", "Alto").any():
             st.warning("• Trabajar con servicios de vivienda para mejorar condiciones habitacionales")
         
-        if sum(1 for f in st.session_state.familias if f["salud"]["consumo_drogas"]) > 0:
+        if almacen.columna("consumo_drogas").any():
             st.error("• Establecer alianzas con programas de tratamiento de adicciones")
         
-        if sum(1 for f in st.session_state.familias if f["vivienda"]["red_apoyo"] == "Débil") > 0:
+        if almacen.mascara("red_apoyo", "Débil").any():
             st.info("• Fortalecer redes de apoyo comunitario")
     
     # Dashboard Inteligente
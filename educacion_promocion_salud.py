@@ -4,6 +4,17 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
+from persistencia import registrar_modulo, inicializar_modulo
+
+registrar_modulo("educacion_promocion_salud", {
+    "educacion_promocion_salud": lambda: {
+        'objetivos_smart': [],
+        'intervenciones_educativas': [],
+        'evaluacion_creencias': [],
+        'programas_ciclo_vida': [],
+        'indicadores_educacion': []
+    }
+})
 
 def mostrar_educacion_promocion_salud():
     """
@@ -14,15 +25,8 @@ def mostrar_educacion_promocion_salud():
     st.title("📚 Educación para la Salud y Promoción de la Salud")
     st.markdown("### Estrategias Educativas y Promocionales en APS - Enfoque TENS")
     
-    # Inicializar session state
-    if 'educacion_promocion_salud' not in st.session_state:
-        st.session_state.educacion_promocion_salud = {
-            'objetivos_smart': [],
-            'intervenciones_educativas': [],
-            'evaluacion_creencias': [],
-            'programas_ciclo_vida': [],
-            'indicadores_educacion': []
-        }
+    # Inicializar session state (carga diferida de los datos del usuario)
+    inicializar_modulo("educacion_promocion_salud")
     
     # Pestañas principales
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -4,20 +4,26 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
+from cache_figuras import mostrar_figura
+from instrumentacion import seccion
+from persistencia import registrar_modulo, inicializar_modulo
+
+registrar_modulo("epidemiologia", {
+    "epidemiologia": lambda: {
+        'indicadores_basicos': [],
+        'patologias_prioritarias': [],
+        'vigilancia_epidemiologica': [],
+        'factores_riesgo': [],
+        'analisis_geografico': []
+    }
+})
 
 def mostrar_epidemiologia():
     st.title("🦠 Epidemiología Comunitaria")
     st.markdown("---")
     
-    # Inicializar session state
-    if 'epidemiologia' not in st.session_state:
-        st.session_state.epidemiologia = {
-            'indicadores_basicos': [],
-            'patologias_prioritarias': [],
-            'vigilancia_epidemiologica': [],
-            'factores_riesgo': [],
-            'analisis_geografico': []
-        }
+    # Inicializar session state (carga diferida de los datos del usuario)
+    inicializar_modulo("epidemiologia")
     
     # Tabs para organizar las secciones
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -43,6 +49,7 @@ def mostrar_epidemiologia():
     with tab5:
         mostrar_analisis_geografico()
 
+@seccion("indicadores básicos")
 def mostrar_indicadores_basicos():
     st.header("📊 Indicadores Epidemiológicos Básicos")
     st.markdown("**Objetivo:** Calcular y analizar indicadores fundamentales de salud comunitaria.")
@@ -200,17 +207,17 @@ def mostrar_indicadores_basicos():
             st.metric("Indicadores Demográficos", demografico_count)
         
         # Gráfico de distribución por tipo
-        fig_tipos = px.pie(
+        mostrar_figura("epidemiologia_indicadores_tipo", st.session_state.epidemiologia['indicadores_basicos'], lambda: px.pie(
             df_indicadores.groupby('tipo').size().reset_index(name='count'),
             values='count',
             names='tipo',
             title="Distribución de Indicadores por Tipo"
-        )
-        st.plotly_chart(fig_tipos, use_container_width=True)
+        ))
         
         # Tabla de indicadores
         st.dataframe(df_indicadores[['tipo', 'fecha', 'sector', 'periodo']], use_container_width=True)
 
+@seccion("patologías prioritarias")
 def mostrar_patologias_prioritarias():
     st.header("🏥 Análisis de Patologías Prioritarias")
     st.markdown("**Objetivo:** Identificar y analizar las principales patologías de la comunidad.")
@@ -334,19 +341,19 @@ def mostrar_patologias_prioritarias():
         
         # Gráfico de prevalencia por patología
         if 'prevalencia' in df_patologias.columns:
-            fig_prevalencia = px.bar(
+            mostrar_figura("epidemiologia_patologias", st.session_state.epidemiologia['patologias_prioritarias'], lambda: px.bar(
                 df_patologias,
                 x='patologia',
                 y='prevalencia',
                 color='prioridad',
                 title="Prevalencia por Patología",
                 labels={'prevalencia': 'Prevalencia (por 1000 hab.)', 'patologia': 'Patología'}
-            )
-            st.plotly_chart(fig_prevalencia, use_container_width=True)
+            ))
         
         # Tabla de patologías
         st.dataframe(df_patologias[['patologia', 'sector', 'prioridad', 'tendencia', 'casos_activos', 'prevalencia']], use_container_width=True)
 
+@seccion("vigilancia epidemiológica")
 def mostrar_vigilancia_epidemiologica():
     st.header("📅 Vigilancia Epidemiológica")
     st.markdown("**Objetivo:** Monitorear tendencias temporales y detectar alertas epidemiológicas.")
@@ -483,7 +490,7 @@ def mostrar_vigilancia_epidemiologica():
             st.metric("Total Defunciones", total_defunciones)
         
         # Gráfico de nivel de alerta
-        fig_alertas = px.pie(
+        mostrar_figura("epidemiologia_alertas", st.session_state.epidemiologia['vigilancia_epidemiologica'], lambda: px.pie(
             df_vigilancia.groupby('nivel_alerta').size().reset_index(name='count'),
             values='count',
             names='nivel_alerta',
@@ -494,12 +501,12 @@ def mostrar_vigilancia_epidemiologica():
                 'Alerta': '#d62728',
                 'Emergencia': '#8b0000'
             }
-        )
-        st.plotly_chart(fig_alertas, use_container_width=True)
+        ))
         
         # Tabla de vigilancia
         st.dataframe(df_vigilancia[['evento', 'fecha_inicio', 'nivel_alerta', 'sector', 'casos_confirmados', 'defunciones']], use_container_width=True)
 
+@seccion("factores de riesgo")
 def mostrar_factores_riesgo():
     st.header("🎯 Análisis de Factores de Riesgo")
     st.markdown("**Objetivo:** Identificar y analizar factores de riesgo para la salud comunitaria.")
@@ -622,19 +629,19 @@ def mostrar_factores_riesgo():
             st.metric("En Aumento", en_aumento)
         
         # Gráfico de prevalencia por factor
-        fig_prevalencia_factor = px.bar(
+        mostrar_figura("epidemiologia_factores", st.session_state.epidemiologia['factores_riesgo'], lambda: px.bar(
             df_factores,
             x='factor',
             y='prevalencia',
             color='nivel_riesgo',
             title="Prevalencia de Factores de Riesgo",
             labels={'prevalencia': 'Prevalencia (%)', 'factor': 'Factor de Riesgo'}
-        )
-        st.plotly_chart(fig_prevalencia_factor, use_container_width=True)
+        ))
         
         # Tabla de factores
         st.dataframe(df_factores[['factor', 'sector', 'nivel_riesgo', 'tendencia', 'prevalencia', 'impacto_poblacional']], use_container_width=True)
 
+@seccion("análisis geográfico")
 def mostrar_analisis_geografico():
     st.header("🗺️ Análisis Geográfico Epidemiológico")
     st.markdown("**Objetivo:** Analizar la distribución geográfica de eventos de salud.")
@@ -781,36 +788,37 @@ def mostrar_analisis_geografico():
         
         # Gráfico de distribución por sector
         if len(df_geo) > 0:
-            # Crear datos para el gráfico
-            sectores_data = []
-            for _, row in df_geo.iterrows():
-                sectores_data.append({
-                    'Sector': 'Sector A',
-                    'Tasa': row['sector_a']['tasa'],
-                    'Evento': row['evento']
-                })
-                sectores_data.append({
-                    'Sector': 'Sector B',
-                    'Tasa': row['sector_b']['tasa'],
-                    'Evento': row['evento']
-                })
-                sectores_data.append({
-                    'Sector': 'Sector C',
-                    'Tasa': row['sector_c']['tasa'],
-                    'Evento': row['evento']
-                })
-            
-            df_sectores = pd.DataFrame(sectores_data)
-            
-            fig_sectores = px.bar(
-                df_sectores,
-                x='Sector',
-                y='Tasa',
-                color='Evento',
-                title="Distribución de Tasas por Sector",
-                labels={'Tasa': 'Tasa (por 1000 hab.)', 'Sector': 'Sector'}
-            )
-            st.plotly_chart(fig_sectores, use_container_width=True)
+            def figura_sectores():
+                # Crear datos para el gráfico
+                sectores_data = []
+                for _, row in df_geo.iterrows():
+                    sectores_data.append({
+                        'Sector': 'Sector A',
+                        'Tasa': row['sector_a']['tasa'],
+                        'Evento': row['evento']
+                    })
+                    sectores_data.append({
+                        'Sector': 'Sector B',
+                        'Tasa': row['sector_b']['tasa'],
+                        'Evento': row['evento']
+                    })
+                    sectores_data.append({
+                        'Sector': 'Sector C',
+                        'Tasa': row['sector_c']['tasa'],
+                        'Evento': row['evento']
+                    })
+                
+                df_sectores = pd.DataFrame(sectores_data)
+                
+                return px.bar(
+                    df_sectores,
+                    x='Sector',
+                    y='Tasa',
+                    color='Evento',
+                    title="Distribución de Tasas por Sector",
+                    labels={'Tasa': 'Tasa (por 1000 hab.)', 'Sector': 'Sector'}
+                )
+            mostrar_figura("epidemiologia_sectores", st.session_state.epidemiologia['analisis_geografico'], figura_sectores)
         
         # Tabla de análisis
         st.dataframe(df_geo[['evento', 'fecha', 'tipo_analisis', 'cluster', 'intervenciones']], use_container_width=True)
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from core.marcos import columnas, equipos_flat
+from persistencia import marcar_cambios
+from registros import Equipo
 
 def mostrar_equipo_cabecera():
     st.markdown("""
@@ -123,11 +126,12 @@ def mostrar_equipo_cabecera():
                 if equipo_existente:
                     # Actualizar equipo existente
                     index = st.session_state.equipos.index(equipo_existente)
-                    st.session_state.equipos[index] = nuevo_equipo
+                    st.session_state.equipos[index] = Equipo.desde_dict(nuevo_equipo)
+                    marcar_cambios("equipos", [index])
                     st.success(f"✅ Equipo del sector '{sector_seleccionado}' actualizado exitosamente!")
                 else:
                     # Agregar nuevo equipo
-                    st.session_state.equipos.append(nuevo_equipo)
+                    st.session_state.equipos.append(Equipo.desde_dict(nuevo_equipo))
                     st.success(f"✅ Equipo asignado al sector '{sector_seleccionado}' exitosamente!")
                 
                 st.rerun()
@@ -138,27 +142,20 @@ def mostrar_equipo_cabecera():
     if st.session_state.equipos:
         st.markdown("### 📊 Equipos Asignados")
         
-        # Crear DataFrame para visualización
-        equipos_data = []
-        for equipo in st.session_state.equipos:
-            composicion = equipo["composicion"]
-            total_profesionales = sum(composicion.values())
-            
-            equipos_data.append({
-                "Sector": equipo["sector"],
-                "Jefe de Equipo": equipo["informacion"]["jefe_equipo"],
-                "Total Profesionales": total_profesionales,
-                "Médicos": composicion["medicos"],
-                "Enfermeras": composicion["enfermeras"],
-                "TENS": composicion["tens"],
-                "Matronas": composicion["matronas"],
-                "Psicólogos": composicion["psicologos"],
-                "Otros": composicion["otros"],
-                "Microáreas": equipo["microareas"]["numero"],
-                "Familias por Microárea": equipo["microareas"]["familias_por_microarea"]
-            })
-        
-        df_equipos = pd.DataFrame(equipos_data)
+        # Crear DataFrame para visualización desde el marco compartido de equipos
+        df_equipos = columnas(equipos_flat(st.session_state.equipos), {
+            "sector": "Sector",
+            "informacion.jefe_equipo": "Jefe de Equipo",
+            "composicion.medicos": "Médicos",
+            "composicion.enfermeras": "Enfermeras",
+            "composicion.tens": "TENS",
+            "composicion.matronas": "Matronas",
+            "composicion.psicologos": "Psicólogos",
+            "composicion.otros": "Otros",
+            "microareas.numero": "Microáreas",
+            "microareas.familias_por_microarea": "Familias por Microárea"
+        })
+        df_equipos.insert(2, "Total Profesionales", df_equipos.loc[:, "Médicos":"Otros"].sum(axis=1))
         
         # Mostrar tabla
         st.dataframe(df_equipos, use_container_width=True)
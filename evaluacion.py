@@ -1,97 +1,38 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import json
-import io
 import base64
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+from sesion_familias import obtener_almacen_familias
+from core import reportes
+
+def _almacen_sesion():
+    return obtener_almacen_familias() if st.session_state.familias else None
 
 def generar_pdf():
     """Genera un PDF con el resumen completo del diagnóstico comunitario"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Título
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=30,
-        alignment=1
+    return reportes.generar_pdf(
+        st.session_state.sectores,
+        _almacen_sesion(),
+        st.session_state.get('diagnostico'),
+        st.session_state.plan_intervencion
     )
-    story.append(Paragraph("DIAGNÓSTICO COMUNITARIO EN APS", title_style))
-    story.append(Paragraph("Modelo MAIS - Salud Familiar y Comunitaria", styles['Heading2']))
-    story.append(Spacer(1, 20))
-    
-    # Información general
-    story.append(Paragraph("INFORMACIÓN GENERAL", styles['Heading2']))
-    story.append(Spacer(1, 12))
-    
-    if st.session_state.sectores:
-        story.append(Paragraph(f"Total de Sectores: {len(st.session_state.sectores)}", styles['Normal']))
-        total_poblacion = sum(s["poblacion_total"] for s in st.session_state.sectores)
-        story.append(Paragraph(f"Población Total: {total_poblacion:,}", styles['Normal']))
-        total_familias = sum(s["num_familias"] for s in st.session_state.sectores)
-        story.append(Paragraph(f"Total de Familias: {total_familias:,}", styles['Normal']))
-    
-    if st.session_state.familias:
-        story.append(Paragraph(f"Familias Registradas: {len(st.session_state.familias)}", styles['Normal']))
-        familias_alto_riesgo = sum(1 for f in st.session_state.familias 
-                                 if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                 f["riesgos"]["sanitario"]["nivel"] == "Alto")
-        story.append(Paragraph(f"Familias en Alto Riesgo: {familias_alto_riesgo}", styles['Normal']))
-    
-    story.append(Spacer(1, 20))
-    
-    # Diagnóstico
-    if hasattr(st.session_state, 'diagnostico') and st.session_state.diagnostico:
-        story.append(Paragraph("DIAGNÓSTICO COMUNITARIO", styles['Heading2']))
-        story.append(Spacer(1, 12))
-        
-        diagnostico = st.session_state.diagnostico
-        story.append(Paragraph(f"Problema Principal: {diagnostico['problema_principal']}", styles['Normal']))
-        story.append(Paragraph(f"Grupo Prioritario: {diagnostico['grupo_prioritario']}", styles['Normal']))
-        story.append(Paragraph(f"Enfoque de Intervención: {diagnostico['enfoque_intervencion']}", styles['Normal']))
-        
-        story.append(Spacer(1, 12))
-        story.append(Paragraph("Estrategias Propuestas:", styles['Normal']))
-        for estrategia in diagnostico['estrategias_propuestas']:
-            story.append(Paragraph(f"• {estrategia}", styles['Normal']))
-    
-    story.append(Spacer(1, 20))
-    
-    # Plan de intervención
-    if st.session_state.plan_intervencion:
-        story.append(Paragraph("PLAN DE INTERVENCIÓN", styles['Heading2']))
-        story.append(Spacer(1, 12))
-        
-        story.append(Paragraph(f"Total de Actividades: {len(st.session_state.plan_intervencion)}", styles['Normal']))
-        total_presupuesto = sum(a["presupuesto_estimado"] for a in st.session_state.plan_intervencion)
-        story.append(Paragraph(f"Presupuesto Total: ${total_presupuesto:,}", styles['Normal']))
-        
-        story.append(Spacer(1, 12))
-        story.append(Paragraph("Actividades Planificadas:", styles['Normal']))
-        for actividad in st.session_state.plan_intervencion:
-            story.append(Paragraph(f"• {actividad['nombre']} ({actividad['tipo']})", styles['Normal']))
-            story.append(Paragraph(f"  Objetivo: {actividad['objetivo_general']}", styles['Normal']))
-            story.append(Paragraph(f"  Responsables: {', '.join(actividad['responsables'])}", styles['Normal']))
-            story.append(Spacer(1, 6))
-    
-    # Fecha de generación
-    story.append(Spacer(1, 20))
-    story.append(Paragraph(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+
+def generar_excel():
+    """Genera un Excel con hojas de sectores, familias y plan de intervención"""
+    return reportes.generar_excel(st.session_state.sectores, _almacen_sesion(), st.session_state.plan_intervencion)
+
+def generar_json():
+    """Genera el JSON con todos los datos del proyecto"""
+    return reportes.generar_json({
+        "sectores": st.session_state.sectores,
+        "equipos": st.session_state.equipos,
+        "familias": st.session_state.familias,
+        "instituciones": st.session_state.instituciones,
+        "plan_intervencion": st.session_state.plan_intervencion,
+        "diagnostico": st.session_state.get('diagnostico'),
+        "autoevaluacion": st.session_state.get('autoevaluacion')
+    })
 
 def mostrar_evaluacion():
     st.markdown("""
@@ -196,9 +137,7 @@ def mostrar_evaluacion():
         
         with col3:
             if st.session_state.familias:
-                familias_alto_riesgo = sum(1 for f in st.session_state.familias 
-                                         if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                         f["riesgos"]["sanitario"]["nivel"] == "Alto")
+                familias_alto_riesgo = obtener_almacen_familias().contar_alto_riesgo()
                 st.metric("Alto Riesgo", familias_alto_riesgo)
             else:
                 st.metric("Alto Riesgo", 0)
@@ -229,8 +168,7 @@ def mostrar_evaluacion():
         max_puntos += 30
         if len(st.session_state.familias) >= 5:
             calidad_puntos += 15
-        if any(f["riesgos"]["social"]["nivel"] == "Alto" or f["riesgos"]["sanitario"]["nivel"] == "Alto" 
-               for f in st.session_state.familias):
+        if obtener_almacen_familias().contar_alto_riesgo() > 0:
             calidad_puntos += 15
     
     # Evaluar diagnóstico
@@ -416,50 +354,9 @@ def mostrar_evaluacion():
     col1, col2 = st.columns(2)
     
     with col1:
-        # Exportar a Excel
-        if st.session_state.sectores or st.session_state.familias:
-            # Crear Excel con múltiples hojas
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Hoja de sectores
-                if st.session_state.sectores:
-                    df_sectores = pd.DataFrame(st.session_state.sectores)
-                    df_sectores.to_excel(writer, sheet_name='Sectores', index=False)
-                
-                # Hoja de familias
-                if st.session_state.familias:
-                    familias_data = []
-                    for familia in st.session_state.familias:
-                        familias_data.append({
-                            "Sector": familia["sector"],
-                            "Apellido": familia["apellido"],
-                            "Integrantes": familia["num_integrantes"],
-                            "Riesgo Social": familia["riesgos"]["social"]["nivel"],
-                            "Riesgo Sanitario": familia["riesgos"]["sanitario"]["nivel"],
-                            "Hacinamiento": familia["vivienda"]["hacinamiento"],
-                            "Violencia Intrafamiliar": familia["salud"]["violencia_intrafamiliar"],
-                            "Consumo Drogas": familia["salud"]["consumo_drogas"]
-                        })
-                    df_familias = pd.DataFrame(familias_data)
-                    df_familias.to_excel(writer, sheet_name='Familias', index=False)
-                
-                # Hoja de plan de intervención
-                if st.session_state.plan_intervencion:
-                    plan_data = []
-                    for actividad in st.session_state.plan_intervencion:
-                        plan_data.append({
-                            "Actividad": actividad["nombre"],
-                            "Tipo": actividad["tipo"],
-                            "Objetivo": actividad["objetivo_general"],
-                            "Responsables": ", ".join(actividad["responsables"]),
-                            "Presupuesto": actividad["presupuesto_estimado"],
-                            "Fecha Inicio": actividad["cronograma"]["fecha_inicio"],
-                            "Fecha Fin": actividad["cronograma"]["fecha_fin"]
-                        })
-                    df_plan = pd.DataFrame(plan_data)
-                    df_plan.to_excel(writer, sheet_name='Plan_Intervencion', index=False)
-            
-            output.seek(0)
+        # Exportar a Excel (se genera solo al pedirlo)
+        if (st.session_state.sectores or st.session_state.familias) and st.button("📊 Preparar Excel"):
+            output = generar_excel()
             st.download_button(
                 label="📊 Descargar Excel",
                 data=output.getvalue(),
@@ -468,8 +365,8 @@ def mostrar_evaluacion():
             )
     
     with col2:
-        # Exportar a PDF
-        if st.session_state.sectores or st.session_state.familias:
+        # Exportar a PDF (se genera solo al pedirlo)
+        if (st.session_state.sectores or st.session_state.familias) and st.button("📄 Preparar PDF"):
             pdf_buffer = generar_pdf()
             st.download_button(
                 label="📄 Descargar PDF",
@@ -479,19 +376,8 @@ def mostrar_evaluacion():
             )
     
     # Exportar datos JSON
-    if st.session_state.sectores or st.session_state.familias:
-        datos_completos = {
-            "sectores": st.session_state.sectores,
-            "equipos": st.session_state.equipos,
-            "familias": st.session_state.familias,
-            "instituciones": st.session_state.instituciones,
-            "plan_intervencion": st.session_state.plan_intervencion,
-            "diagnostico": st.session_state.diagnostico if hasattr(st.session_state, 'diagnostico') else None,
-            "autoevaluacion": st.session_state.autoevaluacion if hasattr(st.session_state, 'autoevaluacion') else None,
-            "fecha_exportacion": datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
-        
-        json_data = json.dumps(datos_completos, indent=2, ensure_ascii=False)
+    if (st.session_state.sectores or st.session_state.familias) and st.button("💾 Preparar JSON"):
+        json_data = generar_json()
         st.download_button(
             label="💾 Descargar JSON",
             data=json_data,
@@ -508,9 +394,7 @@ def mostrar_evaluacion():
             st.write(f"• {paso}")
     
     if st.session_state.familias:
-        familias_alto_riesgo = sum(1 for f in st.session_state.familias 
-                                 if f["riesgos"]["social"]["nivel"] == "Alto" or 
-                                 f["riesgos"]["sanitario"]["nivel"] == "Alto")
+        familias_alto_riesgo = obtener_almacen_familias().contar_alto_riesgo()
         
         if familias_alto_riesgo > 0:
             st.info(f"• Priorizar la atención de {familias_alto_riesgo} familias en alto riesgo")
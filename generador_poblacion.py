@@ -0,0 +1,571 @@
+"""
+Generador de población sintética
+Crea sectores, equipos, familias, instituciones, pacientes crónicos, casos de
+teletriage y registros de vigilancia con los mismos esquemas que registran las
+páginas, para probar la aplicación con volúmenes de escala comunal. Es
+reproducible (semilla) y las distribuciones se pueden ajustar.
+
+Uso: python generador_poblacion.py --familias 100000 --sectores 50 --formato parquet --salida datos_sinteticos
+"""
+
+import copy
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from almacen_familias import EDAD_MAXIMA_JEFE, EDAD_MINIMA_JEFE, FACTORES_RIESGO
+from core.telemedicina import evaluar_urgencia_teletriage
+from motor_riesgo import calcular_riesgos_lote, cargar_reglas
+
+FECHA_BASE = date(2024, 1, 1)  # los registros se fechan dentro del año siguiente
+
+APELLIDOS = [
+    "González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez", "Sepúlveda",
+    "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya", "Flores", "Espinoza", "Valenzuela",
+    "Castillo", "Ramírez", "Reyes", "Gutiérrez", "Castro", "Vargas", "Álvarez", "Vásquez", "Tapia", "Fernández",
+    "Sánchez", "Carrasco", "Gómez", "Cortés", "Herrera", "Núñez", "Jara", "Vergara", "Rivera", "Figueroa"
+]
+NOMBRES = [
+    "María", "José", "Juan", "Ana", "Luis", "Carmen", "Jorge", "Rosa", "Carlos", "Patricia",
+    "Pedro", "Claudia", "Manuel", "Verónica", "Francisco", "Gloria", "Miguel", "Marcela", "Sergio", "Carolina",
+    "Roberto", "Paola", "Héctor", "Andrea", "Ricardo", "Daniela", "Cristián", "Camila", "Víctor", "Valentina"
+]
+
+# Probabilidades por categoría (se normalizan) y prevalencias independientes por ítem
+DISTRIBUCIONES = {
+    "sectores": {
+        "concentracion": 4.0,  # Dirichlet: valores bajos dan sectores de tamaños muy desiguales
+        "tipo_territorio": {"Urbano": 0.6, "Rural": 0.25, "Mixto": 0.1, "Indígena": 0.03, "Costero": 0.02},
+        "nivel_socioeconomico": {"Alto": 0.05, "Medio-Alto": 0.15, "Medio": 0.35, "Medio-Bajo": 0.3, "Bajo": 0.15},
+        "vulnerabilidad": {"Baja": 0.25, "Media": 0.4, "Alta": 0.25, "Crítica": 0.1},
+        "servicios": {
+            "agua_potable": 0.95, "electricidad": 0.98, "alcantarillado": 0.8, "transporte": 0.75,
+            "escuela": 0.7, "cesfam": 0.3, "organizaciones": 0.6, "areas_verdes": 0.5
+        },
+        "problemas": {
+            "Hacinamiento": 0.4, "Contaminación": 0.2, "Inseguridad": 0.35, "Falta de servicios básicos": 0.15,
+            "Desempleo": 0.4, "Violencia intrafamiliar": 0.25, "Consumo de drogas": 0.3,
+            "Embarazo adolescente": 0.15, "Obesidad": 0.45, "Diabetes": 0.35, "Hipertensión": 0.4
+        }
+    },
+    "familias": {
+        "integrantes_media": 2.3,  # integrantes = 1 + Poisson(media)
+        "edad_jefe": {"media": 47, "desviacion": 14},
+        "ocupacion_jefe": {
+            "Empleado": 0.3, "Obrero": 0.15, "Profesional": 0.1, "Dueño de casa": 0.15,
+            "Jubilado": 0.12, "Desempleado": 0.08, "Estudiante": 0.03, "Otro": 0.07
+        },
+        "tipo_vivienda": {"Casa": 0.6, "Departamento": 0.3, "Mediagua": 0.07, "Otro": 0.03},
+        "hacinamiento": {"Bajo": 0.5, "Medio": 0.3, "Alto": 0.15, "Crítico": 0.05},
+        "red_apoyo": {"Fuerte": 0.35, "Regular": 0.45, "Débil": 0.2},
+        "participacion_social": {"Alta": 0.15, "Media": 0.35, "Baja": 0.35, "Nula": 0.15},
+        "acceso_aps": {"Fácil": 0.5, "Regular": 0.35, "Difícil": 0.15},
+        "enfermedades": {
+            "Diabetes": 0.12, "Hipertensión": 0.25, "Obesidad": 0.2, "Enfermedad cardíaca": 0.05,
+            "Artritis": 0.07, "Asma": 0.06, "Tuberculosis": 0.005
+        },
+        "factores": {
+            "embarazo_adolescente": 0.02, "violencia_intrafamiliar": 0.06, "consumo_drogas": 0.05,
+            "desempleo": 0.1, "discapacidad": 0.06, "adulto_mayor": 0.2
+        }
+    },
+    "pacientes": {
+        "por_familia": 0.3,
+        "enfermedades": {
+            "Hipertensión Arterial": 0.5, "Diabetes Mellitus": 0.3, "Obesidad": 0.25, "Dislipidemia": 0.2,
+            "EPOC": 0.05, "Asma": 0.06, "Artritis": 0.08, "Depresión": 0.1, "Ansiedad": 0.08,
+            "Insuficiencia Cardíaca": 0.03, "Enfermedad Renal Crónica": 0.03, "Cáncer": 0.02
+        },
+        "nivel_riesgo": {"Bajo": 0.35, "Medio": 0.4, "Alto": 0.2, "Muy Alto": 0.05},
+        "estado_funcional": {
+            "Independiente": 0.7, "Dependencia Leve": 0.18, "Dependencia Moderada": 0.08, "Dependencia Severa": 0.04
+        }
+    },
+    "teletriage": {
+        "por_familia": 0.05,
+        "ubicacion": {"Zona Urbana": 0.6, "Zona Rural": 0.3, "Zona Mixta": 0.1},
+        "tiempo_sintomas": {"Menos de 1 hora": 0.1, "1-6 horas": 0.3, "6-24 horas": 0.35, "Más de 24 horas": 0.25},
+        "sintoma_principal": {
+            "Fiebre": 0.25, "Tos persistente": 0.2, "Dolor abdominal": 0.15, "Cefalea": 0.15,
+            "Dolor de pecho": 0.05, "Dificultad para respirar": 0.05, "Mareos": 0.1, "Dolor lumbar": 0.05
+        },
+        "sintomas": {
+            "fiebre": 0.3, "tos": 0.3, "dificultad_respirar": 0.08, "dolor_pecho": 0.06,
+            "perdida_conciencia": 0.01, "sangrado": 0.03
+        },
+        "factores_riesgo": {"diabetes": 0.12, "hipertension": 0.25, "embarazo": 0.03, "edad_avanzada": 0.2}
+    },
+    "vigilancia": {
+        "por_sector": 3,
+        "evento": {
+            "Infección Respiratoria": 0.35, "Gastroenteritis": 0.2, "Dengue": 0.03, "COVID-19": 0.15,
+            "Enfermedad Cardiovascular": 0.12, "Salud Mental": 0.1, "Otro": 0.05
+        },
+        "nivel_alerta": {"Normal": 0.5, "Atención": 0.3, "Alerta": 0.15, "Emergencia": 0.05},
+        "estado": {"Controlado": 0.5, "En seguimiento": 0.35, "Activo": 0.15}
+    },
+    "instituciones": {
+        "por_sector": 2,
+        "tipo": {
+            "Educación": 0.3, "Salud": 0.15, "Municipalidad": 0.05, "Organización Comunitaria": 0.25,
+            "Servicios Sociales": 0.1, "Seguridad": 0.05, "Deportes y Recreación": 0.08, "Otro": 0.02
+        },
+        "modalidad": {"Presencial": 0.6, "Híbrido": 0.25, "Virtual": 0.05, "Mixto": 0.1},
+        "nivel_coordinacion": {"Excelente": 0.15, "Buena": 0.35, "Regular": 0.3, "Débil": 0.15, "Sin coordinación": 0.05},
+        "frecuencia_contacto": {
+            "Diario": 0.05, "Semanal": 0.25, "Quincenal": 0.25, "Mensual": 0.3, "Ocasional": 0.1, "Sin contacto": 0.05
+        }
+    }
+}
+
+def combinar_distribuciones(cambios=None):
+    """DISTRIBUCIONES con los valores de 'cambios' reemplazados (a cualquier profundidad)"""
+    def combinar(base, nuevos):
+        for clave, valor in nuevos.items():
+            if isinstance(valor, dict) and isinstance(base.get(clave), dict):
+                combinar(base[clave], valor)
+            else:
+                base[clave] = valor
+        return base
+    return combinar(copy.deepcopy(DISTRIBUCIONES), cambios or {})
+
+
+# --- Muestreo vectorizado ---
+
+def _elegir(rng, probabilidades, n):
+    """n valores de un diccionario {categoría: probabilidad}"""
+    categorias = np.array(list(probabilidades), dtype=object)
+    pesos = np.array(list(probabilidades.values()), dtype=float)
+    return categorias[rng.choice(len(categorias), size=n, p=pesos / pesos.sum())]
+
+
+def _banderas(rng, prevalencias, n):
+    """Diccionario {ítem: arreglo booleano} con una prevalencia independiente por ítem"""
+    return {item: rng.random(n) < prevalencia for item, prevalencia in prevalencias.items()}
+
+
+def _listas(banderas, n):
+    """Lista de ítems presentes por fila; cada combinación distinta se arma una sola vez"""
+    items = list(banderas)
+    mascaras = np.zeros(n, dtype=np.int64)
+    for bit, item in enumerate(items):
+        mascaras |= banderas[item].astype(np.int64) << bit
+    combinaciones = {
+        mascara: [item for bit, item in enumerate(items) if mascara >> bit & 1]
+        for mascara in np.unique(mascaras).tolist()
+    }
+    return [list(combinaciones[mascara]) for mascara in mascaras.tolist()]
+
+
+def _fechas(rng, n, dias=365):
+    inicio = np.datetime64(FECHA_BASE)
+    return (inicio + rng.integers(0, dias, size=n).astype("timedelta64[D]")).astype(str).tolist()
+
+
+def _telefonos(rng, n):
+    numeros = rng.integers(10000000, 99999999, size=n).tolist()
+    return [f"+56 9 {numero // 10000} {numero % 10000:04d}" for numero in numeros]
+
+
+def _ruts(rng, n):
+    """RUT con dígito verificador válido (módulo 11)"""
+    cuerpos = rng.integers(5000000, 25000000, size=n)
+    suma = np.zeros(n, dtype=np.int64)
+    resto = cuerpos.copy()
+    for i in range(8):
+        suma += (resto % 10) * (2 + i % 6)
+        resto //= 10
+    digitos = 11 - suma % 11
+    verificadores = np.where(digitos == 11, "0", np.where(digitos == 10, "K", digitos.astype(str)))
+    return [f"{cuerpo}-{verificador}" for cuerpo, verificador in zip(cuerpos.tolist(), verificadores.tolist())]
+
+
+# --- Colecciones ---
+
+def generar_sectores(rng, nombres_sectores, tamanos, poblaciones, distribuciones):
+    config = distribuciones["sectores"]
+    n_sectores = len(nombres_sectores)
+    tipos = _elegir(rng, config["tipo_territorio"], n_sectores).tolist()
+    niveles = _elegir(rng, config["nivel_socioeconomico"], n_sectores).tolist()
+    vulnerabilidades = _elegir(rng, config["vulnerabilidad"], n_sectores).tolist()
+    servicios = {clave: valores.tolist() for clave, valores in _banderas(rng, config["servicios"], n_sectores).items()}
+    problemas = _listas(_banderas(rng, config["problemas"], n_sectores), n_sectores)
+    return [{
+        "nombre": nombres_sectores[i],
+        "poblacion_total": poblaciones[i],
+        "num_familias": tamanos[i],
+        "tipo_territorio": tipos[i],
+        "nivel_socioeconomico": niveles[i],
+        "vulnerabilidad": vulnerabilidades[i],
+        "servicios": {clave: valores[i] for clave, valores in servicios.items()},
+        "problemas": problemas[i]
+    } for i in range(n_sectores)]
+
+
+def generar_equipos(rng, sectores):
+    """Un equipo de cabecera por sector, dimensionado según sus familias"""
+    equipos = []
+    for sector, experiencia in zip(sectores, rng.integers(1, 20, size=len(sectores)).tolist()):
+        familias = sector["num_familias"]
+        microareas = max(1, -(-familias // 80))
+        equipos.append({
+            "sector": sector["nombre"],
+            "composicion": {
+                "medicos": max(1, familias // 1000),
+                "enfermeras": max(1, familias // 400),
+                "tens": max(1, familias // 150),
+                "matronas": max(1, familias // 1200),
+                "psicologos": familias // 1500,
+                "otros": familias // 2000
+            },
+            "informacion": {
+                "jefe_equipo": f"Equipo {sector['nombre']}",
+                "telefono": _telefonos(rng, 1)[0],
+                "horario": "Lunes a Viernes 8:00-17:00",
+                "modalidad": "Presencial",
+                "experiencia": experiencia,
+                "capacitacion_mais": experiencia >= 3
+            },
+            "microareas": {
+                "numero": microareas,
+                "familias_por_microarea": familias // microareas,
+                "responsable": "TENS"
+            }
+        })
+    return equipos
+
+
+def generar_familias(rng, n_familias, nombres_sectores, indices_sector, distribuciones):
+    """Familias con el esquema del registro y sus riesgos calculados con las reglas vigentes"""
+    config = distribuciones["familias"]
+    n = n_familias
+    apellidos = np.array(APELLIDOS, dtype=object)[rng.integers(0, len(APELLIDOS), size=n)]
+    nombres = np.array(NOMBRES, dtype=object)[rng.integers(0, len(NOMBRES), size=n)]
+    integrantes = np.minimum(1 + rng.poisson(config["integrantes_media"], size=n), 15)
+    edades = rng.normal(config["edad_jefe"]["media"], config["edad_jefe"]["desviacion"], size=n)
+    edades = np.clip(np.rint(edades), EDAD_MINIMA_JEFE, EDAD_MAXIMA_JEFE).astype(np.int64)
+
+    columnas = {
+        "ocupacion_jefe": _elegir(rng, config["ocupacion_jefe"], n),
+        "tipo_vivienda": _elegir(rng, config["tipo_vivienda"], n),
+        "hacinamiento": _elegir(rng, config["hacinamiento"], n),
+        "red_apoyo": _elegir(rng, config["red_apoyo"], n),
+        "participacion_social": _elegir(rng, config["participacion_social"], n),
+        "acceso_aps": _elegir(rng, config["acceso_aps"], n),
+    }
+    factores = _banderas(rng, {factor: config["factores"].get(factor, 0) for factor in FACTORES_RIESGO}, n)
+    enfermedades = np.empty(n, dtype=object)
+    enfermedades[:] = _listas(_banderas(rng, config["enfermedades"], n), n)
+
+    reglas = cargar_reglas()
+    riesgos = calcular_riesgos_lote({**columnas, **factores, "enfermedades_cronicas": enfermedades}, reglas)
+
+    sectores = np.array(nombres_sectores, dtype=object)[indices_sector].tolist()
+    fechas = _fechas(rng, n)
+    listas = {campo: valores.tolist() for campo, valores in columnas.items()}
+    listas.update({factor: valores.tolist() for factor, valores in factores.items()})
+    listas.update({campo: riesgos[campo].tolist() for campo in riesgos.columns})
+    apellidos, nombres, integrantes, edades = apellidos.tolist(), nombres.tolist(), integrantes.tolist(), edades.tolist()
+
+    return [{
+        "sector": sectores[i],
+        "apellido": apellidos[i],
+        "num_integrantes": integrantes[i],
+        "jefe_hogar": {
+            "nombre": f"{nombres[i]} {apellidos[i]}",
+            "edad": edades[i],
+            "ocupacion": listas["ocupacion_jefe"][i]
+        },
+        "vivienda": {
+            "tipo": listas["tipo_vivienda"][i],
+            "hacinamiento": listas["hacinamiento"][i],
+            "red_apoyo": listas["red_apoyo"][i],
+            "participacion_social": listas["participacion_social"][i],
+            "acceso_aps": listas["acceso_aps"][i]
+        },
+        "salud": {
+            "enfermedades_cronicas": enfermedades[i],
+            **{factor: listas[factor][i] for factor in FACTORES_RIESGO}
+        },
+        "riesgos": {
+            "social": {"nivel": listas["riesgo_social"][i], "puntaje": listas["puntaje_social"][i]},
+            "sanitario": {"nivel": listas["riesgo_sanitario"][i], "puntaje": listas["puntaje_sanitario"][i]},
+            "version": reglas["version"]
+        },
+        "observaciones": "",
+        "fecha_registro": fechas[i],
+        "responsable": "Generador sintético"
+    } for i in range(n)]
+
+
+def generar_instituciones(rng, nombres_sectores, distribuciones):
+    config = distribuciones["instituciones"]
+    n = len(nombres_sectores) * config["por_sector"]
+    tipos = _elegir(rng, config["tipo"], n).tolist()
+    modalidades = _elegir(rng, config["modalidad"], n).tolist()
+    coordinacion = _elegir(rng, config["nivel_coordinacion"], n).tolist()
+    frecuencias = _elegir(rng, config["frecuencia_contacto"], n).tolist()
+    telefonos = _telefonos(rng, n)
+    fechas = _fechas(rng, n)
+    sectores = np.array(nombres_sectores, dtype=object)
+    instituciones = []
+    for i in range(n):
+        # Cobertura: el sector propio y, a veces, sectores vecinos
+        propio = i // config["por_sector"]
+        cobertura = sectores[propio:propio + int(rng.integers(1, 4))].tolist()
+        instituciones.append({
+            "nombre": f"{tipos[i]} {i + 1}",
+            "tipo": tipos[i],
+            "sectores_cobertura": cobertura,
+            "contacto": {"nombre": f"Contacto {i + 1}", "telefono": telefonos[i], "email": f"contacto{i + 1}@institucion.cl"},
+            "informacion": {
+                "horario": "Lunes a Viernes 8:00-17:00",
+                "modalidad": modalidades[i],
+                "nivel_coordinacion": coordinacion[i],
+                "frecuencia_contacto": frecuencias[i]
+            },
+            "recursos": [],
+            "poblacion_objetivo": ["Familias"],
+            "programas_servicios": "",
+            "fortalezas": "",
+            "debilidades": "",
+            "oportunidades_trabajo": "",
+            "fecha_registro": fechas[i]
+        })
+    return instituciones
+
+
+def generar_pacientes_cronicos(rng, n, distribuciones):
+    """Pacientes con el esquema de Gestión Clínica APS (al menos una enfermedad cada uno)"""
+    config = distribuciones["pacientes"]
+    banderas = _banderas(rng, config["enfermedades"], n)
+    sin_enfermedad = ~np.logical_or.reduce(list(banderas.values())) if banderas else np.ones(n, dtype=bool)
+    principal = next(iter(config["enfermedades"]))
+    banderas[principal] = banderas[principal] | sin_enfermedad
+    enfermedades = _listas(banderas, n)
+
+    ruts = _ruts(rng, n)
+    nombres = np.array(NOMBRES, dtype=object)[rng.integers(0, len(NOMBRES), size=n)].tolist()
+    apellidos = np.array(APELLIDOS, dtype=object)[rng.integers(0, len(APELLIDOS), size=n)].tolist()
+    nacimientos = (np.datetime64("1935-01-01") + rng.integers(0, 365 * 65, size=n).astype("timedelta64[D]")).astype(str).tolist()
+    sexos = np.where(rng.random(n) < 0.55, "Femenino", "Masculino").tolist()
+    niveles = _elegir(rng, config["nivel_riesgo"], n).tolist()
+    estados = _elegir(rng, config["estado_funcional"], n).tolist()
+    telefonos = _telefonos(rng, n)
+    fechas = _fechas(rng, n)
+    return [{
+        "id": i + 1,
+        "rut": ruts[i],
+        "nombre": f"{nombres[i]} {apellidos[i]}",
+        "fecha_nacimiento": nacimientos[i],
+        "sexo": sexos[i],
+        "telefono": telefonos[i],
+        "direccion": "",
+        "enfermedades": enfermedades[i],
+        "nivel_riesgo": niveles[i],
+        "estado_funcional": estados[i],
+        "cuidador": "",
+        "medicamentos": "",
+        "alergias": "",
+        "antecedentes": "",
+        "observaciones": "",
+        "fecha_registro": fechas[i]
+    } for i in range(n)]
+
+
+def generar_casos_teletriage(rng, n, distribuciones):
+    """Casos de teletriage; la urgencia se evalúa con la misma regla de la página"""
+    config = distribuciones["teletriage"]
+    nombres = np.array(NOMBRES, dtype=object)[rng.integers(0, len(NOMBRES), size=n)].tolist()
+    apellidos = np.array(APELLIDOS, dtype=object)[rng.integers(0, len(APELLIDOS), size=n)].tolist()
+    edades = rng.integers(0, 95, size=n).tolist()
+    ubicaciones = _elegir(rng, config["ubicacion"], n).tolist()
+    tiempos = _elegir(rng, config["tiempo_sintomas"], n).tolist()
+    sintomas_principales = _elegir(rng, config["sintoma_principal"], n).tolist()
+    dolores = rng.integers(1, 11, size=n).tolist()
+    sintomas = {clave: valores.tolist() for clave, valores in _banderas(rng, config["sintomas"], n).items()}
+    factores = {clave: valores.tolist() for clave, valores in _banderas(rng, config["factores_riesgo"], n).items()}
+    minutos = rng.integers(8 * 60, 20 * 60, size=n)
+    fechas = [f"{fecha} {m // 60:02d}:{m % 60:02d}" for fecha, m in zip(_fechas(rng, n), minutos.tolist())]
+    telefonos = _telefonos(rng, n)
+
+    casos = []
+    for i in range(n):
+        sintomas_caso = {clave: valores[i] for clave, valores in sintomas.items()}
+        factores_caso = {clave: valores[i] for clave, valores in factores.items()}
+        urgencia, recomendacion, tiempo_espera = evaluar_urgencia_teletriage(
+            sintomas_principales[i], dolores[i], tiempos[i],
+            sintomas_caso.get("fiebre", False), sintomas_caso.get("tos", False),
+            sintomas_caso.get("dificultad_respirar", False), sintomas_caso.get("dolor_pecho", False),
+            sintomas_caso.get("perdida_conciencia", False), sintomas_caso.get("sangrado", False),
+            factores_caso.get("diabetes", False), factores_caso.get("hipertension", False),
+            factores_caso.get("embarazo", False), factores_caso.get("edad_avanzada", False)
+        )
+        casos.append({
+            "fecha": fechas[i],
+            "paciente": f"{nombres[i]} {apellidos[i]}",
+            "edad": edades[i],
+            "telefono": telefonos[i],
+            "ubicacion": ubicaciones[i],
+            "sintoma_principal": sintomas_principales[i],
+            "urgencia": urgencia,
+            "recomendacion": recomendacion,
+            "tiempo_espera": tiempo_espera,
+            "nivel_dolor": dolores[i],
+            "sintomas": sintomas_caso,
+            "factores_riesgo": factores_caso
+        })
+    return casos
+
+
+def generar_vigilancia(rng, sectores, distribuciones):
+    """Registros de vigilancia epidemiológica por sector"""
+    config = distribuciones["vigilancia"]
+    n = len(sectores) * config["por_sector"]
+    indices = np.repeat(np.arange(len(sectores)), config["por_sector"])
+    poblaciones = np.array([max(sector["poblacion_total"], 1) for sector in sectores], dtype=np.int64)[indices]
+    eventos = _elegir(rng, config["evento"], n).tolist()
+    niveles = _elegir(rng, config["nivel_alerta"], n).tolist()
+    estados = _elegir(rng, config["estado"], n).tolist()
+    sospechosos = rng.binomial(poblaciones, 0.02)
+    confirmados = rng.binomial(sospechosos, 0.6)
+    graves = rng.binomial(confirmados, 0.1)
+    defunciones = rng.binomial(graves, 0.05)
+    inicios = np.datetime64(FECHA_BASE) + rng.integers(0, 335, size=n).astype("timedelta64[D]")
+    fines = inicios + rng.integers(7, 31, size=n).astype("timedelta64[D]")
+    tasas = np.round(confirmados / poblaciones * 100, 2)
+    grupos = ["0-4 años", "5-14 años", "15-44 años", "45-64 años", "65+ años"]
+
+    registros = []
+    for i, (inicio, fin) in enumerate(zip(inicios.astype(str).tolist(), fines.astype(str).tolist())):
+        registros.append({
+            "id": i + 1,
+            "evento": eventos[i],
+            "fecha_inicio": inicio,
+            "fecha_fin": fin,
+            "nivel_alerta": niveles[i],
+            "sector": sectores[indices[i]]["nombre"],
+            "casos_sospechosos": int(sospechosos[i]),
+            "casos_confirmados": int(confirmados[i]),
+            "casos_graves": int(graves[i]),
+            "defunciones": int(defunciones[i]),
+            "poblacion_expuesta": int(poblaciones[i]),
+            "tasa_ataque": float(tasas[i]),
+            "grupo_edad": [grupos[j] for j in sorted(rng.choice(len(grupos), size=2, replace=False).tolist())],
+            "sintomas": [],
+            "factores_riesgo": [],
+            "acciones": [],
+            "estado": estados[i]
+        })
+    return registros
+
+
+def generar_poblacion(n_familias=10000, n_sectores=10, semilla=0, distribuciones=None,
+                      n_pacientes=None, n_teletriage=None):
+    """
+    Genera todas las colecciones con la misma semilla. Retorna un diccionario
+    {colección: lista de registros} (sectores, equipos, familias, instituciones,
+    pacientes_cronicos, casos_teletriage, vigilancia_epidemiologica). Por defecto
+    los pacientes y casos de teletriage son proporcionales al número de familias.
+    """
+    distribuciones = combinar_distribuciones(distribuciones)
+    rng = np.random.default_rng(semilla)
+
+    # Reparto de familias entre sectores (tamaños desiguales)
+    pesos = rng.dirichlet(np.full(n_sectores, distribuciones["sectores"]["concentracion"]))
+    indices_sector = np.sort(rng.choice(n_sectores, size=n_familias, p=pesos))
+    nombres_sectores = [f"Sector {i + 1:0{len(str(n_sectores))}d}" for i in range(n_sectores)]
+
+    familias = generar_familias(rng, n_familias, nombres_sectores, indices_sector, distribuciones)
+    integrantes = np.array([familia["num_integrantes"] for familia in familias], dtype=np.int64)
+    tamanos = np.bincount(indices_sector, minlength=n_sectores).tolist()
+    poblaciones = np.bincount(indices_sector, weights=integrantes, minlength=n_sectores).astype(np.int64).tolist()
+    sectores = generar_sectores(rng, nombres_sectores, tamanos, poblaciones, distribuciones)
+
+    if n_pacientes is None:
+        n_pacientes = int(n_familias * distribuciones["pacientes"]["por_familia"])
+    if n_teletriage is None:
+        n_teletriage = int(n_familias * distribuciones["teletriage"]["por_familia"])
+
+    return {
+        "sectores": sectores,
+        "equipos": generar_equipos(rng, sectores),
+        "familias": familias,
+        "instituciones": generar_instituciones(rng, nombres_sectores, distribuciones),
+        "pacientes_cronicos": generar_pacientes_cronicos(rng, n_pacientes, distribuciones),
+        "casos_teletriage": generar_casos_teletriage(rng, n_teletriage, distribuciones),
+        "vigilancia_epidemiologica": generar_vigilancia(rng, sectores, distribuciones),
+    }
+
+
+def estado_sesion(poblacion):
+    """Valores de session_state para cargar una población generada en la aplicación"""
+    from persistencia import modulos_registrados
+    from registros import convertir
+
+    registro = modulos_registrados()
+    gestion_clinica = registro["gestion_clinica_aps"]["gestion_clinica_aps"]()
+    gestion_clinica["pacientes_cronicos"] = poblacion["pacientes_cronicos"]
+    epidemiologia = registro["epidemiologia"]["epidemiologia"]()
+    epidemiologia["vigilancia_epidemiologica"] = poblacion["vigilancia_epidemiologica"]
+    return {
+        "sectores": convertir("sectores", poblacion["sectores"]),
+        "equipos": convertir("equipos", poblacion["equipos"]),
+        "familias": convertir("familias", poblacion["familias"]),
+        "instituciones": convertir("instituciones", poblacion["instituciones"]),
+        "gestion_clinica_aps": gestion_clinica,
+        "casos_teletriage": poblacion["casos_teletriage"],
+        "epidemiologia": epidemiologia,
+    }
+
+
+def guardar_poblacion(poblacion, directorio, formato="parquet"):
+    """
+    Escribe un archivo por colección. En Parquet los registros se aplanan con
+    columnas 'grupo.campo' (las familias se pueden cargar con la importación
+    masiva); en JSON se conserva el esquema anidado de la aplicación.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    rutas = []
+    for coleccion, registros in poblacion.items():
+        ruta = os.path.join(directorio, f"{coleccion}.{formato}")
+        if formato == "parquet":
+            pd.json_normalize(registros).to_parquet(ruta, index=False)
+        else:
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump(registros, archivo, ensure_ascii=False)
+        rutas.append(ruta)
+    return rutas
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Genera una población sintética para pruebas de carga")
+    parser.add_argument("--familias", type=int, default=10000)
+    parser.add_argument("--sectores", type=int, default=10)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--pacientes", type=int, default=None)
+    parser.add_argument("--teletriage", type=int, default=None)
+    parser.add_argument("--distribuciones", help="JSON con cambios a DISTRIBUCIONES")
+    parser.add_argument("--formato", choices=["parquet", "json"], default="parquet")
+    parser.add_argument("--salida", default="datos_sinteticos")
+    argumentos = parser.parse_args()
+
+    cambios = None
+    if argumentos.distribuciones:
+        with open(argumentos.distribuciones, encoding="utf-8") as archivo:
+            cambios = json.load(archivo)
+
+    inicio = time.perf_counter()
+    poblacion = generar_poblacion(
+        argumentos.familias, argumentos.sectores, argumentos.semilla, cambios,
+        argumentos.pacientes, argumentos.teletriage
+    )
+    for ruta in guardar_poblacion(poblacion, argumentos.salida, argumentos.formato):
+        print(f"✅ {ruta}")
+    print(f"Generado en {time.perf_counter() - inicio:.1f} s")
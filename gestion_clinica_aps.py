@@ -4,6 +4,18 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
+from persistencia import registrar_modulo, inicializar_modulo
+
+registrar_modulo("gestion_clinica_aps", {
+    "gestion_clinica_aps": lambda: {
+        'pacientes_cronicos': [],
+        'controles_realizados': [],
+        'educacion_salud': [],
+        'seguimientos_tratamiento': [],
+        'derivaciones': [],
+        'indicadores_clinicos': []
+    }
+})
 
 def mostrar_gestion_clinica_aps():
     """
@@ -14,16 +26,8 @@ def mostrar_gestion_clinica_aps():
     st.title("🏥 Gestión Clínica en APS")
     st.markdown("### Control de Pacientes Crónicos y Educación en Salud - Enfoque TENS")
     
-    # Inicializar session state
-    if 'gestion_clinica_aps' not in st.session_state:
-        st.session_state.gestion_clinica_aps = {
-            'pacientes_cronicos': [],
-            'controles_realizados': [],
-            'educacion_salud': [],
-            'seguimientos_tratamiento': [],
-            'derivaciones': [],
-            'indicadores_clinicos': []
-        }
+    # Inicializar session state (carga diferida de los datos del usuario)
+    inicializar_modulo("gestion_clinica_aps")
     
     # Pestañas principales
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
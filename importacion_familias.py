@@ -0,0 +1,472 @@
+"""
+Importación masiva de familias
+Lee extractos de censo o planillas (CSV o Parquet) por bloques, asigna sus
+columnas al esquema de familia, valida cada bloque con las reglas del
+formulario de registro en forma vectorizada, calcula los riesgos por lotes y
+agrega las familias válidas. Las filas rechazadas se informan con su motivo.
+"""
+
+import hashlib
+import io
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from almacen_familias import (
+    ACCESO_APS, EDAD_MAXIMA_JEFE, EDAD_MINIMA_JEFE, ENFERMEDADES_CRONICAS, FACTORES_RIESGO,
+    HACINAMIENTO, MAX_INTEGRANTES_HABITUAL, OCUPACIONES, PARTICIPACION_SOCIAL, RED_APOYO, TIPOS_VIVIENDA
+)
+from busqueda_familias import normalizar
+from motor_riesgo import calcular_riesgos_lote, cargar_reglas
+from registros import convertir
+
+TAMANO_BLOQUE = 5000
+LIMITE_DETALLE_RECHAZOS = 10000  # filas rechazadas que se guardan para el informe
+FILAS_MUESTRA_RECHAZOS = 100  # filas rechazadas que se muestran en pantalla
+
+# Campo del esquema -> (tipo, obligatorio, valores admitidos)
+CAMPOS_IMPORTACION = {
+    "sector": ("sector", True, None),
+    "apellido": ("texto", True, None),
+    "num_integrantes": ("entero", True, (1, None)),
+    "nombre_jefe": ("texto", True, None),
+    "edad_jefe": ("entero", True, (EDAD_MINIMA_JEFE, EDAD_MAXIMA_JEFE)),
+    "ocupacion_jefe": ("categoria", False, OCUPACIONES),
+    "tipo_vivienda": ("categoria", False, TIPOS_VIVIENDA),
+    "hacinamiento": ("categoria", False, HACINAMIENTO),
+    "red_apoyo": ("categoria", False, RED_APOYO),
+    "participacion_social": ("categoria", False, PARTICIPACION_SOCIAL),
+    "acceso_aps": ("categoria", False, ACCESO_APS),
+    "enfermedades_cronicas": ("lista", False, ENFERMEDADES_CRONICAS),
+    **{factor: ("booleano", False, None) for factor in FACTORES_RIESGO},
+    "observaciones": ("texto", False, None),
+    "fecha_registro": ("fecha", False, None),
+    "responsable": ("texto", False, None),
+}
+
+# Nombres de columna reconocidos automáticamente (normalizados: sin tildes, minúsculas, "_")
+ALIAS_COLUMNAS = {
+    "sector": ["sector", "nombre_sector"],
+    "apellido": ["apellido", "apellido_familia", "familia"],
+    "num_integrantes": ["num_integrantes", "integrantes", "n_integrantes", "numero_integrantes"],
+    "nombre_jefe": ["nombre_jefe", "jefe_hogar", "jefe_hogar.nombre", "nombre_jefe_hogar"],
+    "edad_jefe": ["edad_jefe", "edad", "jefe_hogar.edad", "edad_jefe_hogar"],
+    "ocupacion_jefe": ["ocupacion_jefe", "ocupacion", "jefe_hogar.ocupacion"],
+    "tipo_vivienda": ["tipo_vivienda", "vivienda", "vivienda.tipo"],
+    "enfermedades_cronicas": ["enfermedades_cronicas", "enfermedades", "salud.enfermedades_cronicas"],
+}
+for _campo in ["hacinamiento", "red_apoyo", "participacion_social", "acceso_aps"]:
+    ALIAS_COLUMNAS[_campo] = [_campo, f"vivienda.{_campo}"]
+for _campo in FACTORES_RIESGO:
+    ALIAS_COLUMNAS[_campo] = [_campo, f"salud.{_campo}"]
+for _campo in ["observaciones", "fecha_registro", "responsable"]:
+    ALIAS_COLUMNAS[_campo] = [_campo]
+
+_VERDADEROS = {"si", "s", "true", "verdadero", "1", "x", "yes"}
+_FALSOS = {"no", "n", "false", "falso", "0", ""}
+
+
+def _clave_columna(nombre):
+    return normalizar(nombre).replace(" ", "_")
+
+
+def mapear_columnas(columnas):
+    """Asigna automáticamente las columnas del archivo a los campos del esquema"""
+    disponibles = {_clave_columna(columna): columna for columna in columnas}
+    mapeo = {}
+    for campo, alias in ALIAS_COLUMNAS.items():
+        for nombre in alias:
+            if nombre in disponibles:
+                mapeo[campo] = disponibles[nombre]
+                break
+    return mapeo
+
+
+def campos_faltantes(mapeo):
+    return [campo for campo, (_, obligatorio, _) in CAMPOS_IMPORTACION.items() if obligatorio and campo not in mapeo]
+
+
+# --- Lectura por bloques ---
+
+def detectar_formato(nombre):
+    return "parquet" if str(nombre).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _abrir(origen):
+    """Retorna un archivo binario posicionable y su tamaño en bytes"""
+    archivo = open(origen, "rb") if isinstance(origen, (str, os.PathLike)) else origen
+    archivo.seek(0, io.SEEK_END)
+    tamano = archivo.tell()
+    archivo.seek(0)
+    return archivo, tamano
+
+
+def _formato_csv(archivo):
+    """Detecta codificación y separador leyendo solo el comienzo del archivo"""
+    muestra = archivo.read(65536)
+    archivo.seek(0)
+    try:
+        muestra.decode("utf-8")
+        codificacion = "utf-8-sig"
+    except UnicodeDecodeError as error:
+        # Un corte a mitad de un carácter al final de la muestra no es un error real
+        codificacion = "utf-8-sig" if error.start >= len(muestra) - 3 else "latin-1"
+    primera_linea = muestra.split(b"\n", 1)[0].decode(codificacion, errors="replace")
+    separador = max([",", ";", "\t", "|"], key=primera_linea.count)
+    return codificacion, separador
+
+
+def huella_archivo(origen):
+    """Huella del contenido de un archivo (leído por partes) para no importarlo dos veces"""
+    archivo, _ = _abrir(origen)
+    resumen = hashlib.blake2b(digest_size=16)
+    for parte in iter(lambda: archivo.read(1 << 20), b""):
+        resumen.update(parte)
+    archivo.seek(0)
+    return resumen.hexdigest()
+
+
+def leer_columnas(origen, formato):
+    """Nombres de columna del archivo sin leer sus datos"""
+    archivo, _ = _abrir(origen)
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        columnas = pq.ParquetFile(archivo).schema_arrow.names
+    else:
+        codificacion, separador = _formato_csv(archivo)
+        columnas = list(pd.read_csv(archivo, nrows=0, sep=separador, encoding=codificacion).columns)
+    archivo.seek(0)
+    return columnas
+
+
+def leer_bloques(origen, formato, tamano_bloque=TAMANO_BLOQUE):
+    """Genera (bloque, avance entre 0 y 1) sin cargar el archivo completo en un DataFrame"""
+    archivo, tamano = _abrir(origen)
+    if formato == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Para importar archivos Parquet se requiere el paquete 'pyarrow'")
+        parquet = pq.ParquetFile(archivo)
+        total = max(parquet.metadata.num_rows, 1)
+        leidas = 0
+        for lote in parquet.iter_batches(batch_size=tamano_bloque):
+            bloque = lote.to_pandas()
+            leidas += len(bloque)
+            yield bloque, leidas / total
+    else:
+        codificacion, separador = _formato_csv(archivo)
+        lector = pd.read_csv(
+            archivo, sep=separador, encoding=codificacion, dtype=str,
+            keep_default_na=False, chunksize=tamano_bloque
+        )
+        for bloque in lector:
+            yield bloque, min(archivo.tell() / max(tamano, 1), 1.0)
+
+
+# --- Validación vectorizada ---
+
+def _texto(serie):
+    """Columna como texto sin espacios sobrantes; los nulos quedan como cadena vacía"""
+    def como_texto(valor):
+        if isinstance(valor, (list, tuple, np.ndarray)):
+            return ",".join(str(parte) for parte in valor)
+        return valor
+    if serie.dtype == object:
+        serie = serie.map(como_texto)
+    return serie.astype("string").fillna("").str.strip()
+
+
+def _normalizar_unicos(serie):
+    """Normaliza una columna de texto calculando cada valor distinto una sola vez"""
+    unicos = pd.unique(serie)
+    return serie.map(dict(zip(unicos, (normalizar(valor) for valor in unicos))))
+
+
+def _fechas(valores):
+    """Texto de fecha -> 'AAAA-MM-DD' (ISO o día primero, como en las planillas locales)"""
+    valores = pd.Series(valores, dtype="string")
+    fechas = pd.to_datetime(valores, format="ISO8601", errors="coerce")
+    pendientes = fechas.isna() & (valores != "")
+    fechas[pendientes] = pd.to_datetime(valores[pendientes], format="mixed", dayfirst=True, errors="coerce")
+    return dict(zip(valores, fechas.dt.strftime("%Y-%m-%d")))
+
+
+def validar_bloque(bloque, mapeo, sectores=None, fila_inicial=1):
+    """
+    Valida un bloque con las reglas del formulario de registro.
+    Retorna (validas, rechazos, alertas): 'validas' tiene una columna por campo
+    del esquema con los valores ya convertidos; 'rechazos' la fila del archivo,
+    el motivo y los datos originales; 'alertas' cuántas filas válidas requieren
+    verificación (p. ej. más de MAX_INTEGRANTES_HABITUAL integrantes).
+    """
+    n = len(bloque)
+    bloque = bloque.reset_index(drop=True)
+    errores = []  # (máscara de filas, motivo)
+    validas = pd.DataFrame(index=bloque.index)
+
+    def rechazar(mascara, motivo):
+        errores.append((np.asarray(mascara, dtype=bool), motivo))
+
+    for campo, (tipo, obligatorio, admitidos) in CAMPOS_IMPORTACION.items():
+        columna = mapeo.get(campo)
+        texto = _texto(bloque[columna]) if columna in bloque.columns else pd.Series([""] * n, dtype="string")
+        vacio = (texto == "").to_numpy()
+        if obligatorio:
+            rechazar(vacio, f"falta {campo}")
+
+        if tipo == "texto":
+            validas[campo] = texto.astype(object)
+        elif tipo == "entero":
+            numeros = pd.to_numeric(texto.str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=float)
+            invalido = ~vacio & (np.isnan(numeros) | (numeros % 1 != 0))
+            rechazar(invalido, f"{campo} no es un número entero")
+            minimo, maximo = admitidos
+            fuera = ~vacio & ~invalido & (numeros < minimo)
+            if maximo is not None:
+                fuera |= ~vacio & ~invalido & (numeros > maximo)
+            rechazar(fuera, f"{campo} fuera de rango")
+            validas[campo] = np.where(np.isnan(numeros), -1, numeros).astype(np.int64)
+        elif tipo in ("categoria", "sector"):
+            if tipo == "sector" and not sectores:
+                validas[campo] = texto.astype(object)
+                continue
+            canonicos = {normalizar(valor): valor for valor in (sectores if tipo == "sector" else admitidos)}
+            valores = _normalizar_unicos(texto).map(canonicos)
+            invalido = ~vacio & valores.isna().to_numpy()
+            rechazar(invalido, f"{campo} no reconocido" if tipo == "categoria" else "sector no registrado")
+            validas[campo] = valores.astype(object).where(valores.notna(), None)
+        elif tipo == "booleano":
+            normalizados = _normalizar_unicos(texto)
+            verdadero = normalizados.isin(_VERDADEROS).to_numpy()
+            rechazar(~verdadero & ~normalizados.isin(_FALSOS).to_numpy(), f"{campo} debe ser sí/no")
+            validas[campo] = verdadero
+        elif tipo == "lista":
+            # Cada combinación distinta se interpreta una sola vez
+            canonicos = {normalizar(valor): valor for valor in admitidos}
+            listas = {}
+            for valor in pd.unique(texto):
+                partes = [normalizar(parte) for parte in re.split(r"[,;|]", valor) if parte.strip()]
+                reconocidas = [canonicos.get(parte) for parte in partes]
+                listas[valor] = None if None in reconocidas else list(dict.fromkeys(reconocidas))
+            listas = texto.map(listas)
+            rechazar(listas.isna().to_numpy(), f"{campo} con valores no reconocidos")
+            validas[campo] = listas.astype(object)
+        elif tipo == "fecha":
+            fechas = texto.map(_fechas(pd.unique(texto)))
+            rechazar(~vacio & fechas.isna().to_numpy(), f"{campo} no es una fecha válida")
+            validas[campo] = fechas.fillna(datetime.now().strftime("%Y-%m-%d")).astype(object)
+
+    rechazada = np.logical_or.reduce([mascara for mascara, _ in errores])
+    motivos = np.full(n, "", dtype=object)
+    for mascara, motivo in errores:
+        motivos[mascara] += motivo + "; "
+    rechazos = bloque[rechazada].copy()
+    rechazos.insert(0, "motivo", [motivo[:-2] for motivo in motivos[rechazada]])
+    rechazos.insert(0, "fila", np.flatnonzero(rechazada) + fila_inicial)
+    validas = validas[~rechazada]
+    alertas = int((validas["num_integrantes"] > MAX_INTEGRANTES_HABITUAL).sum())
+    return validas, rechazos, alertas
+
+
+def familias_desde_bloque(validas, version=None):
+    """Calcula los riesgos por lotes y construye los registros Familia del bloque"""
+    reglas = cargar_reglas()
+    riesgos = calcular_riesgos_lote(validas, reglas)
+    version = reglas["version"] if version is None else version
+    columnas = {campo: validas[campo].tolist() for campo in CAMPOS_IMPORTACION}
+    columnas.update({campo: riesgos[campo].tolist() for campo in riesgos.columns})
+    familias = []
+    for i in range(len(validas)):
+        familias.append({
+            "sector": columnas["sector"][i],
+            "apellido": columnas["apellido"][i],
+            "num_integrantes": columnas["num_integrantes"][i],
+            "jefe_hogar": {
+                "nombre": columnas["nombre_jefe"][i],
+                "edad": columnas["edad_jefe"][i],
+                "ocupacion": columnas["ocupacion_jefe"][i]
+            },
+            "vivienda": {
+                "tipo": columnas["tipo_vivienda"][i],
+                "hacinamiento": columnas["hacinamiento"][i],
+                "red_apoyo": columnas["red_apoyo"][i],
+                "participacion_social": columnas["participacion_social"][i],
+                "acceso_aps": columnas["acceso_aps"][i]
+            },
+            "salud": {
+                "enfermedades_cronicas": list(columnas["enfermedades_cronicas"][i]),
+                **{factor: bool(columnas[factor][i]) for factor in FACTORES_RIESGO}
+            },
+            "observaciones": columnas["observaciones"][i],
+            "fecha_registro": columnas["fecha_registro"][i],
+            "responsable": columnas["responsable"][i],
+            "riesgos": {
+                "social": {"nivel": columnas["riesgo_social"][i], "puntaje": columnas["puntaje_social"][i]},
+                "sanitario": {"nivel": columnas["riesgo_sanitario"][i], "puntaje": columnas["puntaje_sanitario"][i]},
+                "version": version
+            }
+        })
+    return convertir("familias", familias)
+
+
+def importar_familias(origen, destino, mapeo=None, sectores=None, formato=None,
+                      tamano_bloque=TAMANO_BLOQUE, al_avanzar=None):
+    """
+    Importa un archivo por bloques y agrega las familias válidas a la lista 'destino'
+    recién al terminar: si un bloque falla, 'destino' queda sin cambios.
+    'al_avanzar(avance, resumen)' se llama después de cada bloque.
+    Retorna un resumen con leídas, importadas, rechazadas, alertas y el detalle de rechazos.
+    """
+    formato = formato or detectar_formato(getattr(origen, "name", origen))
+    resumen = {"leidas": 0, "importadas": 0, "rechazadas": 0, "alertas": 0, "mapeo": mapeo}
+    nuevas = []
+    rechazos = []
+    guardados = 0
+
+    for bloque, avance in leer_bloques(origen, formato, tamano_bloque):
+        if resumen["mapeo"] is None:
+            resumen["mapeo"] = mapear_columnas(bloque.columns)
+        faltantes = campos_faltantes(resumen["mapeo"])
+        if faltantes:
+            raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+        validas, rechazadas, alertas = validar_bloque(bloque, resumen["mapeo"], sectores, resumen["leidas"] + 1)
+        nuevas.extend(familias_desde_bloque(validas))
+
+        resumen["leidas"] += len(bloque)
+        resumen["importadas"] += len(validas)
+        resumen["rechazadas"] += len(rechazadas)
+        resumen["alertas"] += alertas
+        if guardados < LIMITE_DETALLE_RECHAZOS and len(rechazadas):
+            rechazos.append(rechazadas.head(LIMITE_DETALLE_RECHAZOS - guardados))
+            guardados += len(rechazos[-1])
+        if al_avanzar:
+            al_avanzar(avance, resumen)
+
+    destino.extend(nuevas)
+    resumen["rechazos"] = pd.concat(rechazos, ignore_index=True) if rechazos else pd.DataFrame(columns=["fila", "motivo"])
+    return resumen
+
+
+def _descartar_informe():
+    """Libera el informe de rechazos de la sesión una vez descargado"""
+    st.session_state.pop("importacion_informe", None)
+
+
+def mostrar_importacion_masiva():
+    """Importación de familias desde archivos CSV o Parquet"""
+    st.markdown("### 📥 Importación Masiva de Familias")
+    st.markdown(
+        "Carga extractos de censo o planillas con una fila por familia. El archivo se procesa por "
+        "bloques: cada fila se valida con las reglas del formulario y se calculan sus riesgos."
+    )
+
+    archivo = st.file_uploader("Archivo CSV o Parquet", type=["csv", "parquet"], key="importacion_archivo")
+    if archivo is None:
+        with st.expander("📋 Columnas reconocidas"):
+            st.write(", ".join(f"`{campo}`" for campo in CAMPOS_IMPORTACION))
+            st.caption("Obligatorias: " + ", ".join(campos_faltantes({})))
+        return
+
+    formato = detectar_formato(archivo.name)
+    try:
+        columnas = leer_columnas(archivo, formato)
+    except Exception as error:
+        st.error(f"❌ No se pudo leer el archivo: {error}")
+        return
+
+    # Mapeo de columnas (propuesto automáticamente, editable)
+    mapeo_sugerido = mapear_columnas(columnas)
+    mapeo = {}
+    with st.expander("🔗 Asignación de columnas", expanded=bool(campos_faltantes(mapeo_sugerido))):
+        opciones = ["(sin asignar)"] + list(columnas)
+        col1, col2 = st.columns(2)
+        for i, campo in enumerate(CAMPOS_IMPORTACION):
+            with (col1 if i % 2 == 0 else col2):
+                sugerida = mapeo_sugerido.get(campo)
+                elegida = st.selectbox(
+                    campo + (" *" if CAMPOS_IMPORTACION[campo][1] else ""),
+                    opciones,
+                    index=opciones.index(sugerida) if sugerida in opciones else 0,
+                    key=f"importacion_mapeo_{campo}"
+                )
+                if elegida != "(sin asignar)":
+                    mapeo[campo] = elegida
+
+    faltantes = campos_faltantes(mapeo)
+    if faltantes:
+        st.warning(f"⚠️ Asigna las columnas obligatorias: {', '.join(faltantes)}")
+        return
+
+    tamano_bloque = st.number_input("Filas por bloque", min_value=500, max_value=100000, value=TAMANO_BLOQUE, step=500)
+
+    # Un archivo ya importado en la sesión no se vuelve a agregar (evita duplicar familias)
+    huella = huella_archivo(archivo)
+    importados = st.session_state.setdefault("importacion_archivos", set())
+    ya_importado = huella in importados
+    if ya_importado:
+        st.info("ℹ️ Este archivo ya se importó en esta sesión.")
+
+    if st.button("📥 Importar familias", type="primary", disabled=ya_importado):
+        barra = st.progress(0.0, text="Importando...")
+
+        def al_avanzar(avance, resumen):
+            barra.progress(avance, text=f"{resumen['leidas']:,} filas leídas · {resumen['importadas']:,} importadas")
+
+        sectores = [sector["nombre"] for sector in st.session_state.sectores]
+        try:
+            resumen = importar_familias(
+                archivo, st.session_state.familias, mapeo=mapeo, sectores=sectores,
+                formato=formato, tamano_bloque=int(tamano_bloque), al_avanzar=al_avanzar
+            )
+        except (ValueError, ImportError) as error:
+            st.error(f"❌ {error}")
+            return
+        barra.progress(1.0, text="Importación completada")
+        importados.add(huella)
+        # En la sesión quedan los totales, una muestra y el informe en CSV (hasta descargarlo)
+        rechazos = resumen.pop("rechazos")
+        resumen["detalle_rechazos"] = len(rechazos)
+        resumen["muestra_rechazos"] = rechazos.head(FILAS_MUESTRA_RECHAZOS)
+        st.session_state.importacion_resumen = resumen
+        if len(rechazos):
+            st.session_state.importacion_informe = rechazos.to_csv(index=False)
+        else:
+            st.session_state.pop("importacion_informe", None)
+
+    resumen = st.session_state.get("importacion_resumen")
+    if resumen:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Filas leídas", f"{resumen['leidas']:,}")
+        with col2:
+            st.metric("Importadas", f"{resumen['importadas']:,}")
+        with col3:
+            st.metric("Rechazadas", f"{resumen['rechazadas']:,}")
+        with col4:
+            st.metric("Requieren verificación", f"{resumen['alertas']:,}")
+
+        if resumen["rechazadas"]:
+            st.markdown("**🚫 Filas rechazadas**")
+            muestra = resumen["muestra_rechazos"]
+            if resumen["rechazadas"] > len(muestra):
+                st.caption(f"Se muestran las primeras {len(muestra):,} filas rechazadas.")
+            st.dataframe(muestra, use_container_width=True, hide_index=True)
+            informe = st.session_state.get("importacion_informe")
+            if informe is not None:
+                if resumen["rechazadas"] > resumen["detalle_rechazos"]:
+                    st.caption(f"El informe incluye las primeras {resumen['detalle_rechazos']:,} filas rechazadas.")
+                st.download_button(
+                    label="📊 Descargar informe de rechazos (CSV)",
+                    data=informe,
+                    file_name=f"rechazos_importacion_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                    mime="text/csv",
+                    on_click=_descartar_informe
+                )
+            else:
+                st.caption("El informe de rechazos ya se descargó.")
@@ -0,0 +1,187 @@
+"""
+Índices secundarios del almacén de familias
+Mapas de bits empaquetados (un bit por familia) por sector, nivel de riesgo,
+enfermedad crónica y factor de riesgo, más un índice ordenado por número de
+integrantes. Los filtros se resuelven como intersecciones de mapas de bits y
+los conteos se obtienen sin construir las filas.
+"""
+
+import numpy as np
+
+from almacen_familias import FACTORES_RIESGO
+from busqueda_familias import normalizar
+
+# Columnas categóricas con un mapa de bits por categoría
+COLUMNAS_INDEXADAS = ["sector", "riesgo_social", "riesgo_sanitario"]
+
+# Cantidad de bits encendidos por cada valor de byte
+_BITS_POR_BYTE = np.array([bin(valor).count("1") for valor in range(256)], dtype=np.uint8)
+
+
+def _bytes(n):
+    return (n + 7) // 8
+
+
+class IndiceFamilias:
+    """Índices de un AlmacenFamilias; el almacén los actualiza al agregar filas o riesgos"""
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self._n = 0
+        self._capacidad = 0
+        self._categorias = {nombre: {} for nombre in COLUMNAS_INDEXADAS}
+        self._enfermedades = {}
+        self._factores = {}
+        self._integrantes_orden = np.zeros(0, dtype=np.int64)
+        self._integrantes_valores = np.zeros(0, dtype=np.int32)
+        self._rangos = {}
+        self.extender(0, len(almacen))
+
+    # --- Mantenimiento ---
+
+    def _reservar(self, n):
+        if _bytes(n) <= self._capacidad:
+            return
+        capacidad = max(_bytes(n), self._capacidad * 2, 16)
+        for mapas in [*self._categorias.values(), self._enfermedades, self._factores]:
+            for clave, mapa in mapas.items():
+                nuevo = np.zeros(capacidad, dtype=np.uint8)
+                nuevo[:len(mapa)] = mapa
+                mapas[clave] = nuevo
+        self._capacidad = capacidad
+
+    def _escribir(self, mapas, clave, inicio, valores):
+        """Escribe los bits de las filas [inicio, inicio + len(valores)) de un mapa"""
+        mapa = mapas.get(clave)
+        if mapa is None:
+            if not valores.any():
+                return
+            mapa = mapas[clave] = np.zeros(self._capacidad, dtype=np.uint8)
+        primero = inicio // 8
+        desplazamiento = inicio - primero * 8
+        ultimo = _bytes(inicio + len(valores))
+        bloque = np.unpackbits(mapa[primero:ultimo], count=desplazamiento + len(valores), bitorder="little")
+        bloque[desplazamiento:] = valores
+        mapa[primero:ultimo] = np.packbits(bloque, bitorder="little")
+
+    def extender(self, inicio, fin):
+        """Incorpora las filas [inicio, fin) del almacén"""
+        if fin <= inicio:
+            return
+        self._reservar(fin)
+        almacen = self.almacen
+        for nombre in COLUMNAS_INDEXADAS:
+            codigos = almacen.columna(nombre)[inicio:fin]
+            for codigo in np.unique(codigos[codigos >= 0]).tolist():
+                self._escribir(self._categorias[nombre], codigo, inicio, codigos == codigo)
+
+        bits = almacen.columna("enfermedades")[inicio:fin]
+        for codigo in range(min(len(almacen.enfermedades.categorias), 63)):
+            self._escribir(self._enfermedades, codigo, inicio, (bits >> codigo) & 1 == 1)
+        for factor in FACTORES_RIESGO:
+            self._escribir(self._factores, factor, inicio, almacen.columna(factor)[inicio:fin])
+
+        # Índice ordenado: se insertan los nuevos valores en su lugar
+        nuevos = almacen.columna("num_integrantes")[inicio:fin]
+        orden_nuevos = np.argsort(nuevos, kind="stable")
+        lugares = np.searchsorted(self._integrantes_valores, nuevos[orden_nuevos], side="right")
+        self._integrantes_valores = np.insert(self._integrantes_valores, lugares, nuevos[orden_nuevos])
+        self._integrantes_orden = np.insert(self._integrantes_orden, lugares, orden_nuevos + inicio)
+        self._n = fin
+
+    def reconstruir_riesgos(self, posiciones=None):
+        """Actualiza los mapas de riesgo tras recalcular niveles (todas las filas o algunas)"""
+        for nombre in ("riesgo_social", "riesgo_sanitario"):
+            codigos = self.almacen.columna(nombre)
+            if posiciones is None:
+                self._categorias[nombre] = {}
+                for codigo in np.unique(codigos[codigos >= 0]).tolist():
+                    self._escribir(self._categorias[nombre], codigo, 0, codigos == codigo)
+                continue
+            posiciones = np.asarray(posiciones)
+            for codigo in set(np.unique(codigos[posiciones]).tolist()) | set(self._categorias[nombre]):
+                if codigo < 0:
+                    continue
+                mapa = self._categorias[nombre].get(codigo)
+                if mapa is None:
+                    mapa = self._categorias[nombre][codigo] = np.zeros(self._capacidad, dtype=np.uint8)
+                bits = np.unpackbits(mapa[:_bytes(self._n)], count=self._n, bitorder="little")
+                bits[posiciones] = codigos[posiciones] == codigo
+                mapa[:_bytes(self._n)] = np.packbits(bits, bitorder="little")
+
+    # --- Consultas ---
+
+    def vacio(self):
+        return np.zeros(_bytes(self._n), dtype=np.uint8)
+
+    def todos(self):
+        """Mapa con todas las familias"""
+        mapa = np.full(_bytes(self._n), 0xFF, dtype=np.uint8)
+        if self._n % 8:
+            mapa[-1] = (1 << (self._n % 8)) - 1
+        return mapa
+
+    def _copia(self, mapa):
+        return self.vacio() if mapa is None else mapa[:_bytes(self._n)].copy()
+
+    def categoria(self, nombre, valor):
+        """Familias cuya columna 'nombre' (sector, riesgo_social, riesgo_sanitario) vale 'valor'"""
+        codigo = self.almacen.codigo(nombre, valor)
+        return self._copia(self._categorias[nombre].get(codigo))
+
+    def enfermedades(self, enfermedades):
+        """Familias con al menos una de las enfermedades indicadas"""
+        resultado = self.vacio()
+        for enfermedad in enfermedades:
+            codigo = self.almacen.enfermedades.codigo(enfermedad, agregar=False)
+            mapa = self._enfermedades.get(codigo)
+            if mapa is not None:
+                resultado |= mapa[:len(resultado)]
+        return resultado
+
+    def factor(self, factor):
+        """Familias con el factor de riesgo indicado (p. ej. 'desempleo')"""
+        return self._copia(self._factores.get(factor))
+
+    def rango_integrantes(self, minimo, maximo):
+        """Familias con minimo <= num_integrantes <= maximo (búsqueda en el índice ordenado)"""
+        desde = np.searchsorted(self._integrantes_valores, minimo, side="left")
+        hasta = np.searchsorted(self._integrantes_valores, maximo, side="right")
+        if desde == 0 and hasta == self._n:
+            return self.todos()
+        bits = np.zeros(self._n, dtype=bool)
+        bits[self._integrantes_orden[desde:hasta]] = True
+        return np.packbits(bits, bitorder="little")
+
+    def contar(self, mapa):
+        """Cantidad de familias en un mapa de bits"""
+        return int(_BITS_POR_BYTE[mapa].sum())
+
+    def posiciones(self, mapa):
+        """Posiciones (en orden) de las familias de un mapa de bits"""
+        return np.flatnonzero(np.unpackbits(mapa, count=self._n, bitorder="little"))
+
+    def rangos(self, nombre):
+        """
+        Posición alfabética (sin tildes ni mayúsculas) de cada familia según una
+        columna de texto o categórica, para ordenar sin comparar textos en cada consulta
+        """
+        guardado = self._rangos.get(nombre)
+        if guardado is not None and guardado[0] == self._n:
+            return guardado[1]
+        if nombre in self.almacen.categorias:
+            categorias = self.almacen.categorias[nombre].categorias
+            orden = sorted(range(len(categorias)), key=lambda codigo: normalizar(categorias[codigo]))
+            tabla = np.empty(len(categorias) + 1, dtype=np.int64)
+            tabla[orden] = np.arange(len(categorias))
+            tabla[-1] = len(categorias)  # sin valor: al final
+            rangos = tabla[self.almacen.columna(nombre)]
+        else:
+            valores = np.array(self.almacen.columna(nombre), dtype=object)
+            unicos, inversos = np.unique(valores, return_inverse=True)
+            orden = np.argsort(np.array([normalizar(valor) for valor in unicos], dtype=object), kind="stable")
+            tabla = np.empty(len(unicos), dtype=np.int64)
+            tabla[orden] = np.arange(len(unicos))
+            rangos = tabla[inversos]
+        self._rangos[nombre] = (self._n, rangos)
+        return rangos
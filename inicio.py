@@ -0,0 +1,194 @@
+import streamlit as st
+
+def mostrar_inicio():
+    st.markdown("""
+    <div class="section-header">
+        <h2>Bienvenido al Simulador Comunitario</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("""
+        ### 🎯 Objetivo del Simulador
+        
+        Esta aplicación te permitirá practicar el proceso completo de elaboración de un 
+        **diagnóstico comunitario en Atención Primaria en Salud (APS)** siguiendo el 
+        **Modelo de Atención Integral en Salud Familiar (MAIS)**.
+        
+        ### 📋 ¿Qué aprenderás?
+        
+        1. **Sectorización del territorio**: Organizar y delimitar áreas geográficas
+        2. **Formación de equipos**: Asignar profesionales por sector
+        3. **Registro de familias**: Capturar información familiar relevante
+        4. **Identificación de riesgos**: Detectar factores de riesgo y protectores
+        5. **Trabajo en red**: Coordinar con instituciones comunitarias
+        6. **Participación comunitaria**: Encuestas, grupos focales y análisis FODA
+        7. **Epidemiología**: Indicadores, patologías prioritarias y vigilancia
+        8. **Plan de intervención**: Diseñar estrategias de intervención
+        9. **Casos clínicos**: Analizar situaciones reales de la práctica
+        10. **Telemedicina y TICS**: Implementar tecnologías para mejorar acceso en zonas rurales
+        
+        ### 🚀 Cómo usar el simulador
+        
+        Utiliza el menú lateral para navegar por cada etapa del proceso. 
+        Los datos que ingreses se guardarán automáticamente y podrás 
+        exportarlos al final del proceso.
+        """)
+    
+    with col2:
+        st.markdown("""
+        ### 📊 Progreso del Diagnóstico
+        """)
+        
+        # Mostrar progreso
+        total_pasos = 13
+        pasos_completados = 0
+        
+        if st.session_state.sectores:
+            pasos_completados += 1
+        if st.session_state.equipos:
+            pasos_completados += 1
+        if st.session_state.familias:
+            pasos_completados += 1
+        if st.session_state.instituciones:
+            pasos_completados += 1
+        if 'participacion_comunitaria' in st.session_state and st.session_state.participacion_comunitaria['encuestas']:
+            pasos_completados += 1
+        if 'epidemiologia' in st.session_state and st.session_state.epidemiologia['indicadores_basicos']:
+            pasos_completados += 1
+        if st.session_state.plan_intervencion:
+            pasos_completados += 1
+        
+        progreso = pasos_completados / total_pasos
+        st.progress(progreso)
+        st.write(f"**{pasos_completados}/{total_pasos}** pasos completados")
+        
+        if progreso == 1.0:
+            st.success("¡Diagnóstico completo! Puedes exportar tus resultados.")
+    
+    # Información del curso
+    st.markdown("""
+    <div class="info-box">
+        <h4>📚 Información del Curso</h4>
+        <p><strong>Curso:</strong> Salud Familiar y Comunitaria</p>
+        <p><strong>Público objetivo:</strong> Estudiantes TENS</p>
+        <p><strong>Enfoque:</strong> Modelo MAIS - Atención Primaria en Salud</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Botón para cargar datos de ejemplo
+    st.markdown("### 🎯 ¿Quieres ver un ejemplo completo?")
+    from datos_ejemplo import cargar_datos_ejemplo
+    cargar_datos_ejemplo()
+    
+    # Asistente Virtual Inteligente
+    st.markdown("---")
+    st.markdown("### 🤖 Asistente Virtual Inteligente")
+    
+    # Verificar progreso del usuario
+    pasos_completados = 0
+    total_pasos = 15  # Actualizado para incluir el nuevo módulo
+    
+    if st.session_state.sectores:
+        pasos_completados += 1
+    if st.session_state.equipos:
+        pasos_completados += 1
+    if st.session_state.familias:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'diagnostico') and st.session_state.diagnostico:
+        pasos_completados += 1
+    if st.session_state.instituciones:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'plan_intervencion') and st.session_state.plan_intervencion:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'participacion_comunitaria') and st.session_state.participacion_comunitaria:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'epidemiologia') and st.session_state.epidemiologia:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'casos_clinicos') and st.session_state.casos_clinicos:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'telemedicina_tics') and st.session_state.telemedicina_tics:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'salud_mental_comunitaria') and st.session_state.salud_mental_comunitaria:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'gestion_clinica_aps') and st.session_state.gestion_clinica_aps:
+        pasos_completados += 1
+    if hasattr(st.session_state, 'educacion_promocion_salud') and st.session_state.educacion_promocion_salud:
+        pasos_completados += 1
+
+    
+    progreso = (pasos_completados / total_pasos) * 100
+    
+    st.progress(progreso / 100)
+    st.write(f"**Progreso:** {pasos_completados}/{total_pasos} módulos completados ({progreso:.1f}%)")
+    
+    # Sugerencias del asistente
+    if progreso < 30:
+        st.info("🎯 **Sugerencia del Asistente:** Comienza con la sectorización del territorio para definir los límites de tu comunidad.")
+    elif progreso < 50:
+        st.info("👥 **Sugerencia del Asistente:** Ahora registra las familias para obtener datos que te permitan hacer un diagnóstico preciso.")
+    elif progreso < 70:
+        st.info("🔍 **Sugerencia del Asistente:** Realiza el diagnóstico comunitario para identificar problemas prioritarios.")
+    elif progreso < 90:
+        st.info("🤝 **Sugerencia del Asistente:** Trabaja en la red intersectoral y participación comunitaria para fortalecer las intervenciones.")
+    else:
+        st.success("🎉 **¡Excelente trabajo!** Has completado la mayoría de los módulos. Revisa el plan de intervención y la evaluación.")
+    
+    # Análisis inteligente rápido
+    if st.button("🔍 Análisis Rápido Inteligente", key="analisis_rapido"):
+        if st.session_state.familias:
+            from sistema_inteligente import generar_recomendaciones_personalizadas
+            with st.spinner("Analizando datos..."):
+                recomendaciones = generar_recomendaciones_personalizadas()
+                
+                if recomendaciones['diagnostico']['problemas_prioritarios']:
+                    st.warning("🚨 **Problemas identificados:**")
+                    for problema in recomendaciones['diagnostico']['problemas_prioritarios'][:3]:  # Solo mostrar los 3 primeros
+                        st.write(f"• {problema['problema'].title()}: {problema['porcentaje']:.1f}% de las familias")
+                    
+                    st.info("💡 **Recomendación:** Usa el módulo 'Plan Anual' para generar intervenciones específicas.")
+                else:
+                    st.success("✅ **Situación estable:** No se identificaron problemas prioritarios.")
+        else:
+            st.warning("⚠️ Necesitas registrar familias primero para realizar el análisis.")
+    
+    # Guía contextual
+    st.markdown("### 📚 Guía Contextual")
+    
+    with st.expander("❓ ¿Por dónde empezar?", expanded=False):
+        st.markdown("""
+        1. **Sectorización** → Define los límites de tu comunidad
+        2. **Equipo Cabecera** → Asigna profesionales por sector
+        3. **Registro Familias** → Recopila datos de las familias
+        4. **Diagnóstico** → Analiza los problemas identificados
+        5. **Red Intersectoral** → Identifica aliados comunitarios
+        6. **Participación Comunitaria** → Involucra a la comunidad
+        7. **Epidemiología** → Analiza datos de salud poblacional
+        8. **Salud Mental Comunitaria** → Diagnóstico e intervención comunitaria
+        9. **Gestión Clínica APS** → Control de pacientes crónicos y educación en salud
+        10. **Educación y Promoción de Salud** → Objetivos SMART, Modelo de Creencias, Ciclo de Vida
+        11. **Plan Intervención** → Diseña tu plan de acción
+        12. **Casos Clínicos** → Analiza situaciones reales
+        13. **Telemedicina y TICS** → Implementa tecnologías para zonas rurales
+        14. **Evaluación** → Evalúa el proceso y resultados
+        """)
+    
+    with st.expander("💡 Consejos para TENS", expanded=False):
+        st.markdown("""
+        • **Enfoque en prevención:** Prioriza intervenciones preventivas
+        • **Trabajo en equipo:** Coordina con otros profesionales
+        • **Participación comunitaria:** Involucra a las familias en las decisiones
+        • **Seguimiento:** Mantén un registro de las intervenciones
+        • **Evaluación continua:** Mide el impacto de tus acciones
+        """)
+    
+    with st.expander("🚨 Alertas importantes", expanded=False):
+        st.markdown("""
+        • **Confidencialidad:** Protege siempre la información de las familias
+        • **Derivación:** Identifica casos que requieren atención especializada
+        • **Documentación:** Registra todas las intervenciones realizadas
+        • **Redes de apoyo:** Fortalece las redes sociales de las familias
+        • **Autocuidado:** No olvides tu propio bienestar
+        """)
@@ -0,0 +1,342 @@
+"""
+Instrumentación de las ejecuciones de página
+Cada ejecución (rerun) de una página queda en un buffer circular compartido por
+el proceso: página, tiempo total y por sección, DataFrames y figuras
+construidos y tamaño aproximado de session_state. El panel "⏱️ Perfil" de la
+barra lateral (SIMULADOR_PERFIL=1) muestra las últimas ejecuciones, las
+descarga en JSON o en el formato de texto de Prometheus y captura un perfil
+(cProfile, o pyinstrument si está instalado) de la ejecución siguiente.
+Con SIMULADOR_PERFIL_ARCHIVO cada ejecución se agrega además a ese archivo JSONL.
+
+El módulo no depende de Streamlit: la sesión se recibe como argumento y el
+panel importa Streamlit al dibujarse.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+CAPACIDAD = int(os.environ.get("SIMULADOR_PERFIL_CAPACIDAD", "200"))
+PANEL_ACTIVO = os.environ.get("SIMULADOR_PERFIL", "0") == "1"
+ARCHIVO = os.environ.get("SIMULADOR_PERFIL_ARCHIVO")
+
+# Elementos medidos de cada colección grande al estimar su tamaño
+MUESTRA = 32
+
+# Medición en curso: Streamlit ejecuta el script de cada sesión en su propio hilo
+_actual = threading.local()
+
+
+class RegistroEjecuciones:
+    """
+    Buffer circular de mediciones (las más antiguas se descartan) y totales por
+    página desde el inicio del proceso, que solo crecen (contadores de Prometheus)
+    """
+
+    def __init__(self, capacidad=CAPACIDAD, archivo=ARCHIVO):
+        self._mediciones = deque(maxlen=max(1, capacidad))
+        self._totales = {}
+        self._bloqueo = threading.Lock()
+        self.archivo = archivo
+
+    def agregar(self, medicion):
+        with self._bloqueo:
+            self._mediciones.append(medicion)
+            totales = self._totales.setdefault(medicion["pagina"], {
+                "ejecuciones": 0, "duracion_s": 0.0, "dataframes": 0, "figuras": 0,
+                "figuras_construidas": 0, "secciones": {},
+            })
+            totales["ejecuciones"] += 1
+            for clave in ("duracion_s", "dataframes", "figuras", "figuras_construidas"):
+                totales[clave] += medicion[clave]
+            for nombre, segundos in medicion["secciones"].items():
+                totales["secciones"][nombre] = totales["secciones"].get(nombre, 0.0) + segundos
+            if self.archivo:
+                with open(self.archivo, "a", encoding="utf-8") as archivo:
+                    archivo.write(json.dumps(medicion, ensure_ascii=False) + "\n")
+
+    def ultimas(self, cantidad=None):
+        """Mediciones de la más antigua a la más reciente (las últimas 'cantidad')"""
+        with self._bloqueo:
+            mediciones = list(self._mediciones)
+        return mediciones if cantidad is None else mediciones[-cantidad:]
+
+    def vaciar(self):
+        """Descarta el buffer; los totales del proceso se conservan"""
+        with self._bloqueo:
+            self._mediciones.clear()
+
+    def totales(self):
+        """Por página: totales acumulados desde el inicio del proceso"""
+        with self._bloqueo:
+            return {pagina: dict(datos, secciones=dict(datos["secciones"])) for pagina, datos in self._totales.items()}
+
+    def resumen(self):
+        """Por página: ejecuciones, mediana y percentil 95 de la duración, último tamaño de sesión"""
+        paginas = {}
+        for medicion in self.ultimas():
+            paginas.setdefault(medicion["pagina"], []).append(medicion)
+        resumen = {}
+        for pagina, mediciones in paginas.items():
+            duraciones = sorted(medicion["duracion_s"] for medicion in mediciones)
+            resumen[pagina] = {
+                "ejecuciones": len(mediciones),
+                "mediana_s": statistics.median(duraciones),
+                "p95_s": duraciones[min(len(duraciones) - 1, int(len(duraciones) * 0.95))],
+                "total_s": sum(duraciones),
+                "dataframes": sum(medicion["dataframes"] for medicion in mediciones),
+                "figuras": sum(medicion["figuras"] for medicion in mediciones),
+                "figuras_construidas": sum(medicion["figuras_construidas"] for medicion in mediciones),
+                "sesion_bytes": mediciones[-1]["sesion_bytes"],
+                "secciones": _sumar_secciones(mediciones),
+            }
+        return resumen
+
+    def a_json(self):
+        return json.dumps({"mediciones": self.ultimas(), "resumen": self.resumen()}, ensure_ascii=False, indent=2)
+
+    def a_prometheus(self):
+        """
+        Métricas en el formato de texto de Prometheus: cuantiles de duración del
+        buffer reciente, contadores acumulados del proceso (sufijo _total) y el
+        último tamaño de sesión como gauge
+        """
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda, muestras):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for etiquetas, valor in muestras:
+                texto = ",".join(f'{clave}="{_escapar(valor_etiqueta)}"' for clave, valor_etiqueta in etiquetas.items())
+                lineas.append(f"{nombre}{{{texto}}} {valor}")
+
+        resumen = self.resumen()
+        totales = self.totales()
+        duracion = []
+        for pagina, datos in resumen.items():
+            duracion.append(({"pagina": pagina, "quantile": "0.5"}, datos["mediana_s"]))
+            duracion.append(({"pagina": pagina, "quantile": "0.95"}, datos["p95_s"]))
+        metrica("simulador_pagina_duracion_segundos", "summary",
+                "Duración de las ejecuciones de cada página (buffer reciente)", duracion)
+        # _sum y _count de un summary deben crecer siempre: salen de los totales del proceso
+        for pagina, datos in totales.items():
+            lineas.append(f'simulador_pagina_duracion_segundos_sum{{pagina="{_escapar(pagina)}"}} {datos["duracion_s"]}')
+            lineas.append(f'simulador_pagina_duracion_segundos_count{{pagina="{_escapar(pagina)}"}} {datos["ejecuciones"]}')
+        metrica("simulador_pagina_dataframes_total", "counter", "DataFrames construidos desde el inicio del proceso",
+                [({"pagina": pagina}, datos["dataframes"]) for pagina, datos in totales.items()])
+        metrica("simulador_pagina_figuras_total", "counter", "Figuras dibujadas desde el inicio del proceso",
+                [({"pagina": pagina}, datos["figuras"]) for pagina, datos in totales.items()])
+        metrica("simulador_pagina_figuras_construidas_total", "counter",
+                "Figuras construidas (no tomadas de la caché) desde el inicio del proceso",
+                [({"pagina": pagina}, datos["figuras_construidas"]) for pagina, datos in totales.items()])
+        metrica("simulador_sesion_bytes", "gauge", "Tamaño aproximado de session_state en la última ejecución",
+                [({"pagina": pagina}, datos["sesion_bytes"]) for pagina, datos in resumen.items()])
+        metrica("simulador_seccion_segundos_total", "counter", "Tiempo acumulado por sección de página desde el inicio del proceso",
+                [({"pagina": pagina, "seccion": seccion_pagina}, segundos)
+                 for pagina, datos in totales.items() for seccion_pagina, segundos in datos["secciones"].items()])
+        return "\n".join(lineas) + "\n"
+
+
+def _sumar_secciones(mediciones):
+    secciones = {}
+    for medicion in mediciones:
+        for nombre, segundos in medicion["secciones"].items():
+            secciones[nombre] = secciones.get(nombre, 0.0) + segundos
+    return secciones
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRO = RegistroEjecuciones()
+
+
+# --- Medición ---
+
+def medicion_actual():
+    return getattr(_actual, "medicion", None)
+
+
+def contar(metrica, cantidad=1):
+    """Suma a un contador de la ejecución en curso ('dataframes', 'figuras', ...); sin medición no hace nada"""
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion[metrica] = medicion.get(metrica, 0) + cantidad
+
+
+@contextmanager
+def seccion(nombre):
+    """Mide una sección de la página; sirve como bloque 'with' o como decorador"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion = medicion_actual()
+        if medicion is not None:
+            secciones = medicion["secciones"]
+            secciones[nombre] = secciones.get(nombre, 0.0) + time.perf_counter() - inicio
+
+
+@contextmanager
+def medir_ejecucion(pagina, sesion=None):
+    """
+    Mide una ejecución de 'pagina' y la agrega al registro. Si la sesión pidió
+    una captura (solicitar_captura), la ejecución se perfila. Dentro de otra
+    medición se comporta como una sección.
+    """
+    if medicion_actual() is not None:
+        with seccion(pagina):
+            yield medicion_actual()
+        return
+
+    medicion = {
+        "pagina": pagina,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "duracion_s": 0.0,
+        "secciones": {},
+        "dataframes": 0,
+        "figuras": 0,
+        "figuras_construidas": 0,
+        "sesion_bytes": 0,
+    }
+    perfil = _iniciar_captura() if sesion is not None and sesion.pop("_perfil_capturar", False) else None
+    _actual.medicion = medicion
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        medicion["duracion_s"] = time.perf_counter() - inicio
+        _actual.medicion = None
+        if perfil is not None:
+            sesion["_perfil_resultado"] = {"pagina": pagina, "fecha": medicion["fecha"], "reporte": _terminar_captura(perfil)}
+            medicion["perfilada"] = True
+        if sesion is not None:
+            medicion["sesion_bytes"] = tamano_sesion(sesion)
+        REGISTRO.agregar(medicion)
+
+
+# --- Captura de perfiles ---
+
+def solicitar_captura(sesion):
+    """Perfila la próxima ejecución de esta sesión"""
+    sesion["_perfil_capturar"] = True
+
+
+def _iniciar_captura():
+    try:
+        from pyinstrument import Profiler
+        perfilador = Profiler()
+    except ImportError:
+        perfilador = cProfile.Profile()
+    try:
+        if isinstance(perfilador, cProfile.Profile):
+            perfilador.enable()
+        else:
+            perfilador.start()
+    except (RuntimeError, ValueError):
+        # Otro perfilador activo (por ejemplo, la captura de otra sesión)
+        return None
+    return perfilador
+
+
+def _terminar_captura(perfilador, lineas=40):
+    if isinstance(perfilador, cProfile.Profile):
+        perfilador.disable()
+        salida = io.StringIO()
+        pstats.Stats(perfilador, stream=salida).sort_stats("cumulative").print_stats(lineas)
+        return salida.getvalue()
+    perfilador.stop()
+    return perfilador.output_text(unicode=True, color=False)
+
+
+# --- Tamaño de la sesión ---
+
+def tamano_aproximado(valor, _vistos=None, _profundidad=0):
+    """
+    Bytes aproximados de un valor: exacto para arreglos y DataFrames, por
+    muestreo para listas y diccionarios grandes (MUESTRA elementos)
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if hasattr(valor, "memory_usage") and hasattr(valor, "columns"):
+        return int(valor.memory_usage(index=True).sum())
+    if hasattr(valor, "nbytes") and not isinstance(valor, (bytes, bytearray)):
+        return int(valor.nbytes)
+    tamano = sys.getsizeof(valor)
+    if _profundidad > 8 or isinstance(valor, (str, bytes, bytearray, int, float, bool, type(None))):
+        return tamano
+    # Claves y valores por separado: tuplas temporales podrían reutilizar un id ya visto
+    if isinstance(valor, dict):
+        elementos = [*valor.keys(), *valor.values()]
+    elif isinstance(valor, (list, tuple, set, frozenset, deque)):
+        elementos = list(valor)
+    elif hasattr(valor, "__dict__"):
+        elementos = list(vars(valor).values())
+    elif hasattr(valor, "__slots__"):
+        nombres = [nombre for clase in type(valor).__mro__ for nombre in getattr(clase, "__slots__", ())]
+        elementos = [getattr(valor, nombre, None) for nombre in nombres]
+    else:
+        return tamano
+    if not elementos:
+        return tamano
+    paso = max(1, len(elementos) // MUESTRA)
+    muestra = elementos[::paso]
+    medido = sum(tamano_aproximado(elemento, vistos, _profundidad + 1) for elemento in muestra)
+    return tamano + int(medido * len(elementos) / len(muestra))
+
+
+def tamano_sesion(sesion):
+    """Tamaño aproximado de session_state (sin los resultados de perfiles)"""
+    vistos = set()
+    return sum(tamano_aproximado(sesion[clave], vistos) for clave in list(sesion.keys())
+               if clave != "_perfil_resultado")
+
+
+# --- Panel ---
+
+def mostrar_panel_perfil(sesion):
+    """Panel "⏱️ Perfil" de la barra lateral con las últimas ejecuciones del proceso"""
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Perfil", expanded=False):
+        mediciones = REGISTRO.ultimas(20)
+        if mediciones:
+            st.dataframe(pd.DataFrame([{
+                "Página": medicion["pagina"],
+                "ms": round(medicion["duracion_s"] * 1000, 1),
+                "DataFrames": medicion["dataframes"],
+                "Figuras": f"{medicion['figuras_construidas']}/{medicion['figuras']}",
+                "Sesión (MB)": round(medicion["sesion_bytes"] / 1e6, 2),
+                "Sección más lenta": max(medicion["secciones"], key=medicion["secciones"].get, default=""),
+            } for medicion in reversed(mediciones)]), use_container_width=True, hide_index=True)
+            st.caption("Figuras: construidas / dibujadas (el resto viene de la caché)")
+        else:
+            st.info("Aún no hay ejecuciones registradas.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📄 JSON", REGISTRO.a_json(), file_name="perfil_ejecuciones.json", mime="application/json")
+        with col2:
+            st.download_button("📈 Prometheus", REGISTRO.a_prometheus(), file_name="perfil_ejecuciones.prom", mime="text/plain")
+
+        if st.button("🔬 Perfilar la próxima ejecución"):
+            solicitar_captura(sesion)
+            st.rerun()
+
+        resultado = sesion.get("_perfil_resultado")
+        if resultado:
+            st.markdown(f"**Perfil de {resultado['pagina']}** ({resultado['fecha']})")
+            st.code(resultado["reporte"], language=None)
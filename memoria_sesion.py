@@ -0,0 +1,163 @@
+"""
+Contabilidad de memoria de las sesiones
+Al final de cada ejecución se mide el tamaño aproximado de cada clave de
+session_state y se publica en un registro del proceso, para que el
+administrador vea las sesiones más pesadas del servidor. Si una sesión supera
+su cuota (SIMULADOR_CUOTA_SESION_MB), el estado de los módulos usados hace más
+tiempo se guarda en el almacenamiento y se quita de la sesión: el módulo vuelve
+a quedar pendiente y persistencia lo recarga al abrir de nuevo su página.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from instrumentacion import tamano_aproximado
+from persistencia import marcar_modulo, modulos_pendientes, modulos_registrados
+
+CUOTA_MB = float(os.environ.get("SIMULADOR_CUOTA_SESION_MB", "64"))
+EXPIRACION_SEGUNDOS = float(os.environ.get("SIMULADOR_MEMORIA_EXPIRACION", "3600"))
+
+# id de sesión -> último informe de memoria de esa sesión
+_SESIONES = {}
+_BLOQUEO = threading.Lock()
+
+
+def tamanos_por_clave(sesion):
+    """Bytes aproximados de cada clave de la sesión, de mayor a menor"""
+    tamanos = {clave: tamano_aproximado(sesion[clave]) for clave in list(sesion.keys())}
+    return dict(sorted(tamanos.items(), key=lambda item: item[1], reverse=True))
+
+
+def cuota_bytes():
+    """Cuota de la sesión actual (_cuota_memoria_mb o la del servidor); 0 = sin límite"""
+    return int(st.session_state.get("_cuota_memoria_mb", CUOTA_MB) * 1024 * 1024)
+
+
+def modulos_frios(excluir=()):
+    """Módulos con estado cargado en la sesión, del uso más antiguo al más reciente"""
+    pendientes = modulos_pendientes()
+    uso = st.session_state.get("_uso_modulos", {})
+    cargados = [
+        nombre for nombre, claves in modulos_registrados().items()
+        if nombre not in pendientes and nombre not in excluir and any(clave in st.session_state for clave in claves)
+    ]
+    return sorted(cargados, key=lambda nombre: uso.get(nombre, 0))
+
+
+def liberar_modulos(nombres):
+    """
+    Guarda la sesión y quita de ella el estado de los módulos indicados, que
+    quedan pendientes de cargar. Requiere un usuario conectado (sin
+    almacenamiento los datos se perderían). Retorna True si se liberaron.
+    """
+    if not nombres or "user_id" not in st.session_state:
+        return False
+    from sistema_usuarios import SistemaUsuarios
+    # Se comparan completos: lo que no se guarde ahora se perdería al quitarlo de la sesión
+    for nombre in nombres:
+        marcar_modulo(nombre)
+    if not SistemaUsuarios().guardar_datos_usuario(st.session_state.user_id):
+        return False
+
+    registrados = modulos_registrados()
+    pendientes = st.session_state.setdefault("_modulos_pendientes", set())
+    rastreador = st.session_state.get("_rastreador_cambios")
+    for nombre in nombres:
+        for clave in registrados[nombre]:
+            if clave in st.session_state:
+                del st.session_state[clave]
+        if rastreador is not None:
+            # La base se vuelve a registrar al cargar el módulo; así no retiene el estado liberado
+            rastreador.olvidar(list(registrados[nombre]))
+        pendientes.add(nombre)
+    return True
+
+
+def contabilizar_sesion(excluir=()):
+    """
+    Mide la sesión actual, libera módulos fríos si supera la cuota (salvo los de
+    'excluir', que usa la página abierta) y publica el informe en el registro
+    del servidor. Retorna el informe.
+    """
+    tamanos = tamanos_por_clave(st.session_state)
+    total = sum(tamanos.values())
+    cuota = cuota_bytes()
+
+    liberar = []
+    if cuota and total > cuota and "user_id" in st.session_state:
+        registrados = modulos_registrados()
+        restante = total
+        for nombre in modulos_frios(excluir):
+            if restante <= cuota:
+                break
+            liberar.append(nombre)
+            restante -= sum(tamanos.get(clave, 0) for clave in registrados[nombre])
+        if liberar_modulos(liberar):
+            for nombre in liberar:
+                for clave in registrados[nombre]:
+                    tamanos.pop(clave, None)
+            total = sum(tamanos.values())
+            st.session_state._modulos_liberados = st.session_state.get("_modulos_liberados", 0) + len(liberar)
+        else:
+            liberar = []
+
+    id_sesion = st.session_state.setdefault("_id_sesion", uuid.uuid4().hex[:8])
+    informe = {
+        "sesion": id_sesion,
+        "usuario": st.session_state.get("nombre_usuario") or st.session_state.get("user_id") or "anónimo",
+        "bytes": total,
+        "cuota": cuota,
+        "excedida": bool(cuota) and total > cuota,
+        "claves": dict(list(tamanos.items())[:5]),
+        "liberados": liberar,
+        "modulos_liberados": st.session_state.get("_modulos_liberados", 0),
+        "actualizado": time.time(),
+    }
+    with _BLOQUEO:
+        vencimiento = informe["actualizado"] - EXPIRACION_SEGUNDOS
+        for sesion in [sesion for sesion, datos in _SESIONES.items() if datos["actualizado"] < vencimiento]:
+            del _SESIONES[sesion]
+        _SESIONES[id_sesion] = informe
+    return informe
+
+
+def sesiones_mas_pesadas(cantidad=10):
+    """Informes de las sesiones activas del servidor, de mayor a menor tamaño"""
+    with _BLOQUEO:
+        informes = list(_SESIONES.values())
+    return sorted(informes, key=lambda informe: informe["bytes"], reverse=True)[:cantidad]
+
+
+def mostrar_memoria_sesiones(cantidad=10):
+    """Vista de administración con las sesiones más pesadas del servidor"""
+    import pandas as pd
+
+    with _BLOQUEO:
+        total = sum(informe["bytes"] for informe in _SESIONES.values())
+        activas = len(_SESIONES)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Sesiones activas", activas)
+    with col2:
+        st.metric("Memoria total (MB)", f"{total / 1024 / 1024:.1f}")
+
+    informes = sesiones_mas_pesadas(cantidad)
+    if not informes:
+        st.info("Aún no hay sesiones medidas.")
+        return
+    st.dataframe(pd.DataFrame([{
+        "Sesión": informe["sesion"],
+        "Usuario": informe["usuario"],
+        "MB": round(informe["bytes"] / 1024 / 1024, 2),
+        "Cuota (MB)": round(informe["cuota"] / 1024 / 1024, 1) if informe["cuota"] else "∞",
+        "Excedida": "⚠️" if informe["excedida"] else "",
+        "Claves más pesadas": ", ".join(
+            f"{clave} ({tamano / 1024:.0f} KB)" for clave, tamano in list(informe["claves"].items())[:3]
+        ),
+        "Módulos liberados": informe["modulos_liberados"],
+        "Actualizada": time.strftime("%H:%M:%S", time.localtime(informe["actualizado"])),
+    } for informe in informes]), use_container_width=True, hide_index=True)
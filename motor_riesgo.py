@@ -0,0 +1,353 @@
+"""
+Motor de cálculo de riesgo familiar
+Define los pesos y umbrales del riesgo social y sanitario como tablas y los
+aplica de dos formas equivalentes: a una familia (diccionario) o a columnas
+completas (DataFrame, arreglos NumPy, lista de familias o almacén columnar)
+en una sola pasada vectorizada. Acepta el esquema anidado (vivienda/salud)
+y el esquema plano antiguo.
+
+Las reglas se leen de un archivo JSON versionado (reglas_riesgo.json o la ruta
+de SIMULADOR_REGLAS_RIESGO). Cada familia guarda la versión con que se puntuó
+y las que quedaron con una versión anterior se recalculan en bloque la primera
+vez que se leen. Las familias sin versión se consideran puntuadas con la
+versión base (VERSION_BASE), que corresponde a las reglas originales.
+"""
+
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from almacen_familias import AlmacenFamilias, factor_presente, valor_familia
+
+NIVELES = ["Bajo", "Medio", "Alto"]
+
+RUTA_REGLAS = os.environ.get(
+    "SIMULADOR_REGLAS_RIESGO",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "reglas_riesgo.json")
+)
+
+# Versión de las reglas originales: la que se asume para riesgos guardados sin versión
+VERSION_BASE = 1
+
+# Reglas por defecto si no existe el archivo (un valor que no aparece en la tabla suma 0)
+CONFIGURACION_RIESGO = {
+    "version": VERSION_BASE,
+    "social": {
+        "campos": {
+            "hacinamiento": {"Alto": 3, "Medio": 2, "Bajo": 1},
+            "red_apoyo": {"Débil": 3, "Regular": 2, "Fuerte": 1},
+            "participacion_social": {"Nula": 3, "Baja": 2, "Alta": 1},
+            "acceso_aps": {"Difícil": 3, "Regular": 2, "Fácil": 1},
+        },
+        "umbrales": {"Medio": 6, "Alto": 10},
+    },
+    "sanitario": {
+        "enfermedades": {
+            "Diabetes": 2,
+            "Hipertensión": 2,
+            "Obesidad": 1,
+            "Enfermedad pulmonar": 2,
+            "Enfermedad cardíaca": 3,
+        },
+        "factores": {
+            "embarazo_adolescente": 2,
+            "violencia_intrafamiliar": 3,
+            "consumo_drogas": 3,
+            "desempleo": 1,
+        },
+        "umbrales": {"Medio": 4, "Alto": 8},
+    },
+}
+
+
+_CACHE_REGLAS = {}  # ruta -> (fecha de modificación, reglas)
+
+
+def validar_reglas(reglas):
+    """Verifica la estructura de un archivo de reglas; lanza ValueError si no es válida"""
+    if "version" not in reglas:
+        raise ValueError("Las reglas de riesgo deben indicar una 'version'")
+    for tipo, secciones in (("social", ["campos"]), ("sanitario", ["enfermedades", "factores"])):
+        if tipo not in reglas:
+            raise ValueError(f"Faltan las reglas de riesgo '{tipo}'")
+        umbrales = reglas[tipo].get("umbrales", {})
+        if not {"Medio", "Alto"} <= set(umbrales) or umbrales["Medio"] > umbrales["Alto"]:
+            raise ValueError(f"Umbrales de riesgo '{tipo}' inválidos: se requiere Medio <= Alto")
+        for seccion in secciones:
+            if not isinstance(reglas[tipo].get(seccion), dict):
+                raise ValueError(f"Falta la sección '{seccion}' en las reglas de riesgo '{tipo}'")
+    return reglas
+
+
+def cargar_reglas(ruta=None):
+    """
+    Retorna las reglas de riesgo del archivo indicado (por defecto RUTA_REGLAS).
+    Se releen solo si el archivo cambió; sin archivo se usan las reglas por defecto.
+    """
+    ruta = ruta or RUTA_REGLAS
+    try:
+        modificado = os.stat(ruta).st_mtime_ns
+    except FileNotFoundError:
+        return CONFIGURACION_RIESGO
+    cache = _CACHE_REGLAS.get(ruta)
+    if cache and cache[0] == modificado:
+        return cache[1]
+    with open(ruta, 'r', encoding='utf-8') as f:
+        reglas = validar_reglas(json.load(f))
+    _CACHE_REGLAS[ruta] = (modificado, reglas)
+    return reglas
+
+
+def _nivel(puntaje, umbrales):
+    if puntaje >= umbrales["Alto"]:
+        return "Alto"
+    elif puntaje >= umbrales["Medio"]:
+        return "Medio"
+    return "Bajo"
+
+
+def _niveles(puntajes, umbrales):
+    """Niveles de un arreglo de puntajes (búsqueda binaria sobre los umbrales)"""
+    cortes = np.array([umbrales["Medio"], umbrales["Alto"]])
+    return np.array(NIVELES, dtype=object)[np.searchsorted(cortes, puntajes, side="right")]
+
+
+def riesgo_social(familia, configuracion=None):
+    """Retorna (nivel, puntaje) del riesgo social de una familia"""
+    config = (configuracion or cargar_reglas())["social"]
+    puntaje = sum(
+        pesos.get(valor_familia(familia, "vivienda", campo), 0)
+        for campo, pesos in config["campos"].items()
+    )
+    return _nivel(puntaje, config["umbrales"]), puntaje
+
+
+def riesgo_sanitario(familia, configuracion=None):
+    """Retorna (nivel, puntaje) del riesgo sanitario de una familia"""
+    config = (configuracion or cargar_reglas())["sanitario"]
+    enfermedades = valor_familia(familia, "salud", "enfermedades_cronicas", None) or []
+    puntaje = sum(peso for enfermedad, peso in config["enfermedades"].items() if enfermedad in enfermedades)
+    puntaje += sum(
+        peso for factor, peso in config["factores"].items()
+        if factor_presente(valor_familia(familia, "salud", factor))
+    )
+    return _nivel(puntaje, config["umbrales"]), puntaje
+
+
+# --- Cálculo por lotes ---
+
+def _columnas(datos, campos):
+    """
+    Extrae las columnas indicadas de cualquier fuente admitida. Cada campo se
+    busca como columna plana, como columna 'grupo.campo' (json_normalize) o
+    dentro de una columna de diccionarios o registros 'vivienda'/'salud'.
+    """
+    if isinstance(datos, np.ndarray) and datos.dtype.names:
+        datos = pd.DataFrame(datos)
+    if isinstance(datos, pd.DataFrame):
+        columnas = {}
+        for campo, grupo in campos.items():
+            anidado = f"{grupo}.{campo}"
+            if campo in datos.columns and anidado in datos.columns:
+                # Esquemas mezclados: como en valor_familia, el valor anidado tiene prioridad
+                columnas[campo] = datos[anidado].where(datos[anidado].notna(), datos[campo]).to_numpy()
+            elif campo in datos.columns:
+                columnas[campo] = datos[campo].to_numpy()
+            elif anidado in datos.columns:
+                columnas[campo] = datos[anidado].to_numpy()
+            elif grupo in datos.columns:
+                columnas[campo] = np.array(
+                    [valor.get(campo) if isinstance(valor, Mapping) else None for valor in datos[grupo]], dtype=object
+                )
+        return columnas, len(datos)
+    if isinstance(datos, dict):
+        columnas = {campo: np.asarray(datos[campo]) for campo in campos if campo in datos}
+        largos = {len(columna) for columna in columnas.values()}
+        if len(largos) > 1:
+            raise ValueError("Las columnas tienen largos distintos")
+        return columnas, largos.pop() if largos else 0
+    familias = list(datos)
+    columnas = {}
+    for campo, grupo in campos.items():
+        # Se llena un arreglo 1-D: np.array() anidaría listas de igual largo en una segunda dimensión
+        columna = np.empty(len(familias), dtype=object)
+        columna[:] = [valor_familia(f, grupo, campo) for f in familias]
+        columnas[campo] = columna
+    return columnas, len(familias)
+
+
+def _puntaje_categorico(columna, pesos):
+    """Suma el peso de cada valor mediante códigos categóricos y una tabla de búsqueda"""
+    categorias = list(pesos)
+    tabla = np.array([pesos[categoria] for categoria in categorias] + [0], dtype=np.int32)
+    # Los valores sin peso (otros o faltantes) toman el código -1, que apunta al 0 del final
+    codigos = pd.Index(categorias, dtype=object).get_indexer(pd.Series(columna, dtype=object))
+    return tabla[codigos]
+
+
+def _puntaje_factor(columna, peso):
+    """Peso de un factor por fila; los valores faltantes se tratan igual que en riesgo_sanitario"""
+    banderas = np.asarray(columna)
+    if banderas.dtype != bool:
+        banderas = np.fromiter((factor_presente(valor) for valor in banderas), dtype=bool, count=len(banderas))
+    return banderas.astype(np.int32) * peso
+
+
+def _puntaje_enfermedades(columna, pesos, n):
+    """Puntaje por enfermedades desde listas o textos separados por comas"""
+    serie = pd.Series(columna, dtype=object).map(
+        lambda valor: [parte.strip() for parte in valor.split(",")] if isinstance(valor, str) else valor
+    )
+    # Una fila por (familia, enfermedad); los duplicados dentro de una familia cuentan una vez
+    largas = serie.reset_index(drop=True).explode().dropna()
+    pares = pd.DataFrame({"fila": largas.index, "enfermedad": largas.to_numpy()}).drop_duplicates()
+    pares["peso"] = pares["enfermedad"].map(pesos).fillna(0)
+    puntajes = np.zeros(n, dtype=np.int32)
+    np.add.at(puntajes, pares["fila"].to_numpy(dtype=np.int64), pares["peso"].to_numpy(dtype=np.int32))
+    return puntajes
+
+
+def _calcular_almacen(almacen, config, posiciones=None):
+    """Ruta rápida: los códigos del almacén se usan directamente como índices de las tablas"""
+    def columna(nombre):
+        valores = almacen.columna(nombre)
+        return valores if posiciones is None else valores[posiciones]
+
+    n = len(almacen) if posiciones is None else len(posiciones)
+    social = np.zeros(n, dtype=np.int32)
+    for campo, pesos in config["social"]["campos"].items():
+        categorias = almacen.categorias[campo].categorias
+        tabla = np.array([pesos.get(categoria, 0) for categoria in categorias] + [0], dtype=np.int32)
+        social += tabla[columna(campo)]
+
+    sanitario = np.zeros(n, dtype=np.int32)
+    bits = columna("enfermedades")
+    for enfermedad, peso in config["sanitario"]["enfermedades"].items():
+        codigo = almacen.enfermedades.codigo(enfermedad, agregar=False)
+        if 0 <= codigo < 63:
+            sanitario += ((bits >> codigo) & 1).astype(np.int32) * peso
+    for factor, peso in config["sanitario"]["factores"].items():
+        sanitario += columna(factor).astype(np.int32) * peso
+    return social, sanitario
+
+
+def calcular_riesgos_lote(datos, configuracion=None, posiciones=None):
+    """
+    Calcula puntajes y niveles de riesgo de muchas familias en una sola pasada.
+
+    'datos' puede ser un DataFrame (columnas planas, 'vivienda.x'/'salud.x' o
+    columnas de diccionarios), un arreglo estructurado de NumPy, un diccionario
+    de columnas, una lista de familias o un AlmacenFamilias. Retorna un DataFrame
+    con riesgo_social, puntaje_social, riesgo_sanitario y puntaje_sanitario
+    idéntico a aplicar riesgo_social/riesgo_sanitario fila por fila. Con un
+    almacén, 'posiciones' limita el cálculo a esas filas.
+    """
+    config = configuracion or cargar_reglas()
+    if isinstance(datos, AlmacenFamilias):
+        social, sanitario = _calcular_almacen(datos, config, posiciones)
+        indice = None
+    else:
+        campos = {campo: "vivienda" for campo in config["social"]["campos"]}
+        campos["enfermedades_cronicas"] = "salud"
+        campos.update({factor: "salud" for factor in config["sanitario"]["factores"]})
+        columnas, n = _columnas(datos, campos)
+
+        social = np.zeros(n, dtype=np.int32)
+        for campo, pesos in config["social"]["campos"].items():
+            if campo in columnas:
+                social += _puntaje_categorico(columnas[campo], pesos)
+
+        sanitario = np.zeros(n, dtype=np.int32)
+        if "enfermedades_cronicas" in columnas:
+            sanitario += _puntaje_enfermedades(columnas["enfermedades_cronicas"], config["sanitario"]["enfermedades"], n)
+        for factor, peso in config["sanitario"]["factores"].items():
+            if factor in columnas:
+                sanitario += _puntaje_factor(columnas[factor], peso)
+        indice = datos.index if isinstance(datos, pd.DataFrame) else None
+
+    return pd.DataFrame({
+        "riesgo_social": _niveles(social, config["social"]["umbrales"]),
+        "puntaje_social": social,
+        "riesgo_sanitario": _niveles(sanitario, config["sanitario"]["umbrales"]),
+        "puntaje_sanitario": sanitario,
+    }, index=indice)
+
+
+def _escribir_riesgos(familias, resultado, version, posiciones=None):
+    """
+    Escribe el resultado de un lote en cada familia (todas o las de 'posiciones');
+    retorna las posiciones de las que cambiaron
+    """
+    cambiadas = []
+    posiciones = range(len(familias)) if posiciones is None else posiciones
+    filas = zip(
+        posiciones,
+        resultado["riesgo_social"], resultado["puntaje_social"].tolist(),
+        resultado["riesgo_sanitario"], resultado["puntaje_sanitario"].tolist(),
+    )
+    for posicion, nivel_social, puntaje_social, nivel_sanitario, puntaje_sanitario in filas:
+        familia = familias[posicion]
+        riesgos = {
+            "social": {"nivel": nivel_social, "puntaje": puntaje_social},
+            "sanitario": {"nivel": nivel_sanitario, "puntaje": puntaje_sanitario},
+            "version": version,
+        }
+        if familia.get("riesgos") != riesgos:
+            familia["riesgos"] = riesgos
+            cambiadas.append(posicion)
+    return cambiadas
+
+
+def recalcular_riesgos(familias, configuracion=None):
+    """
+    Recalcula en una llamada los riesgos de una lista de familias (p. ej. tras
+    cambiar los pesos) y los escribe en cada familia. Retorna cuántas cambiaron.
+    """
+    config = configuracion or cargar_reglas()
+    return len(_escribir_riesgos(familias, calcular_riesgos_lote(familias, config), config["version"]))
+
+
+def actualizar_riesgos_vencidos(almacen, familias, configuracion=None):
+    """
+    Recalcula en bloque las familias cuyo riesgo se calculó con otra versión de
+    reglas (o que nunca se puntuaron) y las etiqueta con la vigente. Solo revisa
+    las filas agregadas desde la última verificación, salvo que cambie la versión.
+    Retorna las posiciones de las familias cuyo riesgo cambió.
+    """
+    config = configuracion or cargar_reglas()
+    version = config["version"]
+    inicio = almacen.verificadas if almacen.version_verificada == version else 0
+    if inicio >= len(almacen):
+        return []
+
+    versiones = almacen.columna("version_riesgo")[inicio:]
+    vencidas = versiones != almacen.codigo("version_riesgo", version)
+    if version == VERSION_BASE:
+        vencidas &= versiones != -1
+    # Las familias que nunca se puntuaron también se calculan
+    vencidas |= almacen.columna("riesgo_social")[inicio:] == -1
+    vencidas = np.flatnonzero(vencidas) + inicio
+    cambiadas = []
+    if len(vencidas):
+        resultado = calcular_riesgos_lote(almacen, config, vencidas)
+        almacen.asignar_riesgos(resultado, vencidas, version)
+        cambiadas = _escribir_riesgos(familias, resultado, version, vencidas.tolist())
+    almacen.version_verificada = version
+    almacen.verificadas = len(almacen)
+    return cambiadas
+
+
+
+def recalcular_riesgos_almacen(almacen, familias, configuracion=None):
+    """
+    Recalcula con las reglas vigentes los riesgos de todas las familias de un
+    almacén y los escribe en el almacén y en 'familias'. Retorna las posiciones
+    de las familias cuyo riesgo cambió.
+    """
+    config = configuracion or cargar_reglas()
+    resultado = calcular_riesgos_lote(almacen, config)
+    almacen.asignar_riesgos(resultado, version=config["version"])
+    return _escribir_riesgos(familias, resultado, config["version"])
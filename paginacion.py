@@ -0,0 +1,33 @@
+"""
+Paginación de tablas en el servidor
+Controles de tamaño de página y número de página para que cada tabla construya
+y envíe al navegador solo las filas visibles.
+"""
+
+import streamlit as st
+
+TAMANOS_PAGINA = [25, 50, 100, 250]
+
+
+def controles_paginacion(total, clave, etiqueta="Filas por página", tamanos=TAMANOS_PAGINA, firma=None):
+    """
+    Muestra los controles de paginación y retorna (desplazamiento, tamano_pagina).
+    'firma' identifica la consulta actual (filtros, orden): si cambia, se vuelve a la página 1.
+    """
+    clave_pagina = f"{clave}_pagina"
+    clave_firma = f"{clave}_firma"
+    if firma is not None and st.session_state.get(clave_firma) != firma:
+        st.session_state[clave_firma] = firma
+        st.session_state[clave_pagina] = 1
+
+    col1, col2 = st.columns(2)
+    with col1:
+        tamano_pagina = st.selectbox(etiqueta, tamanos, key=f"{clave}_tamano_pagina")
+    total_paginas = max(1, (total - 1) // tamano_pagina + 1)
+    if st.session_state.get(clave_pagina, 1) > total_paginas:
+        st.session_state[clave_pagina] = total_paginas
+    with col2:
+        pagina = st.number_input("Página", min_value=1, max_value=total_paginas, key=clave_pagina)
+
+    st.caption(f"Página {pagina} de {total_paginas} · {total:,} registros")
+    return (pagina - 1) * tamano_pagina, tamano_pagina
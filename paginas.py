@@ -0,0 +1,194 @@
+"""
+Registro de páginas de la aplicación
+Cada página declara su etiqueta en el menú, dónde está su función (módulo y
+nombre, o la función misma), las colecciones de session_state que lee y los
+módulos de persistencia cuyo estado necesita. app.py y app_streamlit_cloud.py
+arman su menú con el mismo registro: el módulo de una página se importa recién
+al abrirla (o al precargarla) y cada visita queda medida en instrumentacion.
+"""
+
+import importlib
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from instrumentacion import medir_ejecucion, seccion
+from persistencia import inicializar_modulo, marcar_modulo
+
+# Colecciones principales de la sesión y su valor inicial
+COLECCIONES = {
+    "sectores": list,
+    "equipos": list,
+    "familias": list,
+    "instituciones": list,
+    "plan_intervencion": list,
+}
+
+
+def inicializar_colecciones(claves=COLECCIONES):
+    """Crea las colecciones que aún no están en session_state"""
+    for clave in claves:
+        if clave not in st.session_state:
+            st.session_state[clave] = COLECCIONES[clave]()
+
+
+class Pagina:
+    """
+    Una entrada del menú. 'destino' es "modulo:funcion" (carga diferida) o una
+    función; 'estado' son los módulos registrados en persistencia que la página usa.
+    """
+
+    def __init__(self, etiqueta, destino, colecciones=(), estado=()):
+        self.etiqueta = etiqueta
+        self.destino = destino
+        self.colecciones = tuple(colecciones)
+        self.estado = tuple(estado)
+
+    @property
+    def visitas(self):
+        """Visitas a la página en la sesión actual"""
+        return st.session_state.get("_visitas_paginas", {}).get(self.etiqueta, (0, None))[0]
+
+    @property
+    def ultima_duracion(self):
+        """Duración en segundos de la última visita en la sesión actual"""
+        return st.session_state.get("_visitas_paginas", {}).get(self.etiqueta, (0, None))[1]
+
+    @property
+    def modulo(self):
+        return self.destino.split(":")[0] if isinstance(self.destino, str) else None
+
+    def cargar(self):
+        """Importa el módulo de la página (solo la primera vez) y retorna su función"""
+        if not isinstance(self.destino, str):
+            return self.destino
+        modulo, funcion = self.destino.split(":")
+        return getattr(importlib.import_module(modulo), funcion)
+
+    def mostrar(self):
+        """
+        Prepara la sesión que necesita la página y la dibuja; la ejecución queda
+        en el registro de instrumentacion (tiempo, DataFrames, figuras, sesión)
+        """
+        inicio = time.perf_counter()
+        with medir_ejecucion(self.etiqueta, st.session_state):
+            try:
+                with seccion("preparación"):
+                    inicializar_colecciones(self.colecciones)
+                    for nombre in self.estado:
+                        # El módulo declara su estado al importarse (persistencia.registrar_modulo)
+                        importlib.import_module(nombre)
+                        inicializar_modulo(nombre)
+                    funcion = self.cargar()
+                funcion()
+            finally:
+                # La página pudo editar el estado de sus módulos en el lugar
+                for nombre in self.estado:
+                    marcar_modulo(nombre)
+                # Los contadores son de la sesión: la instancia de Pagina la comparten todas
+                visitas = st.session_state.setdefault("_visitas_paginas", {})
+                visitas[self.etiqueta] = (self.visitas + 1, time.perf_counter() - inicio)
+
+
+# Módulos cuya precarga ya se lanzó en este proceso (aunque la importación haya fallado)
+_PRECARGA_INTENTADA = set()
+_BLOQUEO_PRECARGA = threading.Lock()
+
+
+class Menu:
+    """Selector de páginas en la barra lateral; también sirve de submenú dentro de otro menú"""
+
+    def __init__(self, paginas, titulo="Navegación", etiqueta=None):
+        self.paginas = {pagina.etiqueta: pagina for pagina in paginas}
+        self.titulo = titulo
+        self.etiqueta = etiqueta
+
+    def elegir(self):
+        """Dibuja el selector y retorna la página elegida"""
+        return self.paginas[st.sidebar.selectbox(self.titulo, list(self.paginas))]
+
+    def mostrar(self):
+        self.elegir().mostrar()
+
+    def hojas(self, etiquetas=None):
+        """Páginas del menú (todas o las indicadas), con las de cada submenú"""
+        for etiqueta in etiquetas if etiquetas is not None else self.paginas:
+            pagina = self.paginas[etiqueta]
+            if isinstance(pagina, Menu):
+                yield from pagina.hojas()
+            else:
+                yield pagina
+
+    def precargar(self, etiquetas=None):
+        """
+        Importa en segundo plano los módulos aún no cargados de las páginas
+        indicadas (todas por defecto) para que la primera visita no espere la
+        importación. Cada módulo se intenta una sola vez por proceso. Retorna el
+        hilo, o None si no hay nada que importar.
+        """
+        with _BLOQUEO_PRECARGA:
+            modulos = [pagina.modulo for pagina in self.hojas(etiquetas)
+                       if pagina.modulo and pagina.modulo not in sys.modules
+                       and pagina.modulo not in _PRECARGA_INTENTADA]
+            _PRECARGA_INTENTADA.update(modulos)
+        if not modulos:
+            return None
+
+        def importar():
+            for modulo in modulos:
+                try:
+                    importlib.import_module(modulo)
+                except Exception:
+                    # La precarga es opcional: si falla, la visita a la página mostrará el error
+                    pass
+
+        hilo = threading.Thread(target=importar, name="precarga-paginas", daemon=True)
+        hilo.start()
+        return hilo
+
+    def vecinas(self, etiqueta):
+        """Páginas anterior y siguiente en el menú (candidatas a precargar)"""
+        etiquetas = list(self.paginas)
+        posicion = etiquetas.index(etiqueta)
+        return etiquetas[max(0, posicion - 1):posicion] + etiquetas[posicion + 1:posicion + 2]
+
+
+# --- Registro compartido por ambos puntos de entrada ---
+
+TODAS = tuple(COLECCIONES)
+
+PAGINAS = {pagina.etiqueta: pagina for pagina in [
+    Pagina("🏠 Inicio", "inicio:mostrar_inicio", TODAS),
+    Pagina("🗺️ Sectorización", "sectorizacion:mostrar_sectorizacion", ["sectores"]),
+    Pagina("👥 Equipo de Cabecera", "equipo_cabecera:mostrar_equipo_cabecera", ["sectores", "equipos"]),
+    Pagina("👨‍👩‍👧‍👦 Registro de Familias", "registro_familias:mostrar_registro_familias", ["sectores", "familias"]),
+    Pagina("🔍 Diagnóstico", "diagnostico:mostrar_diagnostico", ["sectores", "familias"]),
+    Pagina("🌐 Trabajo en Red", "trabajo_red:mostrar_trabajo_red", ["sectores", "instituciones"]),
+    Pagina("🏘️ Participación Comunitaria", "participacion_comunitaria:mostrar_participacion_comunitaria",
+           estado=["participacion_comunitaria"]),
+    Pagina("🦠 Epidemiología", "epidemiologia:mostrar_epidemiologia", estado=["epidemiologia"]),
+    Pagina("🧠 Salud Mental Comunitaria", "salud_mental_comunitaria:mostrar_salud_mental_comunitaria",
+           estado=["salud_mental_comunitaria"]),
+    Pagina("🏥 Gestión Clínica APS", "gestion_clinica_aps:mostrar_gestion_clinica_aps",
+           estado=["gestion_clinica_aps"]),
+    Pagina("📚 Educación y Promoción de Salud", "educacion_promocion_salud:mostrar_educacion_promocion_salud",
+           estado=["educacion_promocion_salud"]),
+    Pagina("📋 Plan de Intervención", "plan_intervencion:mostrar_plan_intervencion", ["sectores", "instituciones", "plan_intervencion"]),
+    Pagina("🏥 Casos Clínicos", "casos_clinicos:mostrar_casos_clinicos"),
+    Pagina("📱 Telemedicina y TICS", "telemedicina_tics:mostrar_telemedicina_tics",
+           estado=["telemedicina_tics"]),
+]}
+
+EVALUACION = Menu([
+    Pagina("🎓 Autoevaluación General", "evaluacion:mostrar_evaluacion", TODAS),
+    Pagina("📋 Evaluación MAIS Oficial", "evaluacion_mais_oficial:mostrar_evaluacion_mais_oficial"),
+], titulo="Tipo de Evaluación", etiqueta="📊 Evaluación")
+PAGINAS[EVALUACION.etiqueta] = EVALUACION
+
+
+def menu(etiquetas, paginas_propias=(), titulo="Navegación"):
+    """Menú con las páginas del registro indicadas, en orden, más páginas propias del punto de entrada"""
+    propias = {pagina.etiqueta: pagina for pagina in paginas_propias}
+    return Menu([propias[etiqueta] if etiqueta in propias else PAGINAS[etiqueta] for etiqueta in etiquetas], titulo)
@@ -2,27 +2,31 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
-from sistema_inteligente import generar_recomendaciones_personalizadas, timedelta
+from datetime import datetime, timedelta
+from sistema_inteligente import generar_recomendaciones_personalizadas
 import json
+from persistencia import registrar_modulo, inicializar_modulo
+
+registrar_modulo("participacion_comunitaria", {
+    "participacion_comunitaria": lambda: {
+        'encuestas': [],
+        'grupos_focales': [],
+        'analisis_foda': {
+            'fortalezas': [],
+            'oportunidades': [],
+            'debilidades': [],
+            'amenazas': []
+        },
+        'plan_anual': []
+    }
+})
 
 def mostrar_participacion_comunitaria():
     st.title("🏘️ Participación Comunitaria y Análisis FODA")
     st.markdown("---")
     
-    # Inicializar session state
-    if 'participacion_comunitaria' not in st.session_state:
-        st.session_state.participacion_comunitaria = {
-            'encuestas': [],
-            'grupos_focales': [],
-            'analisis_foda': {
-                'fortalezas': [],
-                'oportunidades': [],
-                'debilidades': [],
-                'amenazas': []
-            },
-            'plan_anual': []
-        }
+    # Inicializar session state (carga diferida de los datos del usuario)
+    inicializar_modulo("participacion_comunitaria")
     
     # Tabs para organizar las secciones
     tab1, tab2, tab3, tab4 = st.tabs([
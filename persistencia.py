@@ -0,0 +1,105 @@
+"""
+Registro de persistencia por módulo
+Cada módulo declara las claves de session_state que guarda junto con su valor
+inicial. Al iniciar sesión solo se cargan las colecciones principales; los datos
+de cada módulo se leen del almacenamiento la primera vez que se abre su página.
+"""
+
+import importlib
+import time
+
+import streamlit as st
+
+# Módulos de página que declaran estado propio (se importan al resolver el registro completo)
+MODULOS_CON_ESTADO = [
+    "epidemiologia",
+    "participacion_comunitaria",
+    "gestion_clinica_aps",
+    "salud_mental_comunitaria",
+    "educacion_promocion_salud",
+    "telemedicina_tics",
+]
+
+_REGISTRO = {}
+
+
+def registrar_modulo(nombre, claves):
+    """
+    Declara el estado persistente de un módulo.
+    'claves' es un diccionario {clave_session_state: función que crea el valor inicial}
+    """
+    _REGISTRO[nombre] = claves
+
+
+def modulos_registrados():
+    """Retorna el registro completo, importando los módulos que aún no se han declarado"""
+    for modulo in MODULOS_CON_ESTADO:
+        if modulo not in _REGISTRO:
+            importlib.import_module(modulo)
+    return _REGISTRO
+
+
+def modulos_pendientes():
+    """Módulos cuyos datos del usuario aún no se han leído del almacenamiento"""
+    return st.session_state.get("_modulos_pendientes", set())
+
+
+def marcar_modulos_pendientes():
+    """Al iniciar sesión: descarta el estado de módulos anterior y difiere su carga"""
+    for claves in modulos_registrados().values():
+        for clave in claves:
+            if clave in st.session_state:
+                del st.session_state[clave]
+    st.session_state._modulos_pendientes = set(_REGISTRO)
+
+
+def claves_a_guardar():
+    """
+    Claves de módulos que deben guardarse: las de módulos ya cargados y, de los
+    pendientes, solo las que se asignaron en la sesión (por ejemplo, datos de ejemplo)
+    """
+    pendientes = modulos_pendientes()
+    claves_guardar = []
+    for nombre, claves in modulos_registrados().items():
+        for clave in claves:
+            if nombre not in pendientes or clave in st.session_state:
+                claves_guardar.append(clave)
+    return claves_guardar
+
+
+def marcar_cambios(clave, posiciones=None):
+    """
+    Anota para el próximo guardado que cambió una clave de la sesión: solo las
+    posiciones indicadas de una lista, o toda la clave (None). Lo agregado al final
+    de una lista y las claves reasignadas se detectan sin marcar.
+    """
+    rastreador = st.session_state.get("_rastreador_cambios")
+    if rastreador is not None:
+        rastreador.marcar(clave, posiciones)
+
+
+def marcar_modulo(nombre):
+    """Marca como modificado el estado de un módulo (tras dibujar su página, que puede editarlo)"""
+    for clave in _REGISTRO.get(nombre, ()):
+        if clave in st.session_state:
+            marcar_cambios(clave)
+
+
+def inicializar_modulo(nombre):
+    """
+    Deja listo el estado de un módulo al abrir su página: si hay un usuario conectado
+    y el módulo está pendiente, carga sus datos; las claves faltantes toman su valor inicial.
+    También anota el último uso, que memoria_sesion consulta para liberar los módulos fríos.
+    """
+    claves = _REGISTRO[nombre]
+    pendientes = modulos_pendientes()
+    st.session_state.setdefault("_uso_modulos", {})[nombre] = time.time()
+
+    if nombre in pendientes and "user_id" in st.session_state:
+        from sistema_usuarios import SistemaUsuarios
+        SistemaUsuarios().cargar_datos_modulo(st.session_state.user_id, nombre)
+        pendientes.discard(nombre)
+
+    for clave, valor_inicial in claves.items():
+        if clave not in st.session_state:
+            st.session_state[clave] = valor_inicial()
@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
+from cache_figuras import mostrar_figura
+from registros import ActividadPlan
 
 def mostrar_plan_intervencion():
     st.markdown("""
@@ -272,7 +274,7 @@ def mostrar_plan_intervencion():
                         "estado": "Planificada"
                     }
                     
-                    st.session_state.plan_intervencion.append(nueva_actividad)
+                    st.session_state.plan_intervencion.append(ActividadPlan.desde_dict(nueva_actividad))
                     st.success(f"✅ Actividad '{nombre_actividad}' agregada al plan de intervención!")
                     
                     # Resetear contadores después de guardar
@@ -360,59 +362,62 @@ def mostrar_plan_intervencion():
         
         with col1:
             # Gráfico por tipo de actividad
-            fig_tipo = px.pie(
+            mostrar_figura("plan_tipos", st.session_state.plan_intervencion, lambda: px.pie(
                 df_plan,
                 names="Tipo",
                 title="Distribución por Tipo de Actividad"
-            )
-            st.plotly_chart(fig_tipo, use_container_width=True)
+            ))
         
         with col2:
             # Gráfico de presupuesto
-            df_plan_numeric = df_plan.copy()
-            df_plan_numeric["Presupuesto_Numeric"] = df_plan_numeric["Presupuesto"].str.replace("$", "").str.replace(",", "").astype(float)
-            
-            fig_presupuesto = px.bar(
-                df_plan_numeric,
-                x="Actividad",
-                y="Presupuesto_Numeric",
-                title="Presupuesto por Actividad",
-                labels={"Presupuesto_Numeric": "Presupuesto ($)"}
-            )
-            fig_presupuesto.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_presupuesto, use_container_width=True)
+            def figura_presupuesto():
+                df_plan_numeric = df_plan.copy()
+                df_plan_numeric["Presupuesto_Numeric"] = df_plan_numeric["Presupuesto"].str.replace("$", "").str.replace(",", "").astype(float)
+                
+                fig_presupuesto = px.bar(
+                    df_plan_numeric,
+                    x="Actividad",
+                    y="Presupuesto_Numeric",
+                    title="Presupuesto por Actividad",
+                    labels={"Presupuesto_Numeric": "Presupuesto ($)"}
+                )
+                fig_presupuesto.update_layout(xaxis_tickangle=-45)
+                return fig_presupuesto
+            mostrar_figura("plan_presupuesto", st.session_state.plan_intervencion, figura_presupuesto)
         
         # Cronograma visual
         st.markdown("### 📅 Cronograma de Actividades")
         
         # Crear gráfico de Gantt simple
-        fig_gantt = go.Figure()
-        
-        for i, actividad in enumerate(st.session_state.plan_intervencion):
-            fecha_inicio = datetime.strptime(actividad["cronograma"]["fecha_inicio"], "%Y-%m-%d")
-            fecha_fin = datetime.strptime(actividad["cronograma"]["fecha_fin"], "%Y-%m-%d")
+        def figura_gantt():
+            fig_gantt = go.Figure()
             
-            fig_gantt.add_trace(go.Bar(
-                name=actividad["nombre"],
-                x=[(fecha_fin - fecha_inicio).days],
-                y=[actividad["nombre"]],
-                orientation='h',
-                text=f"{actividad['cronograma']['fecha_inicio']} - {actividad['cronograma']['fecha_fin']}",
-                textposition='auto',
-                hovertemplate=f"<b>{actividad['nombre']}</b><br>" +
-                             f"Inicio: {actividad['cronograma']['fecha_inicio']}<br>" +
-                             f"Fin: {actividad['cronograma']['fecha_fin']}<br>" +
-                             f"Frecuencia: {actividad['cronograma']['frecuencia']}<extra></extra>"
-            ))
-        
-        fig_gantt.update_layout(
-            title="Cronograma de Actividades",
-            xaxis_title="Duración (días)",
-            yaxis_title="Actividades",
-            height=400
-        )
+            for i, actividad in enumerate(st.session_state.plan_intervencion):
+                fecha_inicio = datetime.strptime(actividad["cronograma"]["fecha_inicio"], "%Y-%m-%d")
+                fecha_fin = datetime.strptime(actividad["cronograma"]["fecha_fin"], "%Y-%m-%d")
+                
+                fig_gantt.add_trace(go.Bar(
+                    name=actividad["nombre"],
+                    x=[(fecha_fin - fecha_inicio).days],
+                    y=[actividad["nombre"]],
+                    orientation='h',
+                    text=f"{actividad['cronograma']['fecha_inicio']} - {actividad['cronograma']['fecha_fin']}",
+                    textposition='auto',
+                    hovertemplate=f"<b>{actividad['nombre']}</b><br>" +
+                                 f"Inicio: {actividad['cronograma']['fecha_inicio']}<br>" +
+                                 f"Fin: {actividad['cronograma']['fecha_fin']}<br>" +
+                                 f"Frecuencia: {actividad['cronograma']['frecuencia']}<extra></extra>"
+                ))
+            
+            fig_gantt.update_layout(
+                title="Cronograma de Actividades",
+                xaxis_title="Duración (días)",
+                yaxis_title="Actividades",
+                height=400
+            )
+            return fig_gantt
         
-        st.plotly_chart(fig_gantt, use_container_width=True)
+        mostrar_figura("plan_gantt", st.session_state.plan_intervencion, figura_gantt)
         
         # Resumen ejecutivo del plan
         st.markdown("### 📊 Resumen Ejecutivo del Plan")
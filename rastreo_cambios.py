@@ -0,0 +1,213 @@
+"""
+Rastreo de cambios en las colecciones de la sesión
+Guarda una huella por registro persistido para que cada guardado escriba
+solo las colecciones y registros que realmente cambiaron. Las páginas y los
+formularios marcan lo que modifican; un guardado calcula huellas solo de lo
+marcado, de lo agregado y de lo reemplazado, no de toda la sesión.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+
+from registros import Registro
+
+# Marca de una colección completa (reemplazada o marcada sin posiciones)
+TODAS = "todas"
+
+_SIN_BASE = object()
+
+
+def _serializable(valor):
+    return valor.a_dict() if isinstance(valor, Registro) else str(valor)
+
+
+def huella(valor):
+    """Retorna una huella corta y estable del contenido de un registro"""
+    texto = json.dumps(valor, sort_keys=True, ensure_ascii=False, default=_serializable)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RastreadorCambios:
+    """
+    Compara el estado de las colecciones con el último estado persistido sin
+    recorrerlas: solo se calculan huellas de las posiciones marcadas como
+    modificadas (marcar), de las agregadas al final de una lista y de las
+    colecciones reemplazadas por otro objeto.
+
+    Los cambios se describen por colección:
+    - listas: {"tipo": "lista", "registros": {posicion: registro}, "longitud": n}
+    - objetos: {"tipo": "objeto", "valor": valor}
+
+    El hilo del script marca, retira pendientes y copia lo pedido; el hilo de
+    autoguardado calcula sobre esa copia, confirma y, si una escritura falla,
+    olvida. Un bloqueo protege el estado compartido.
+    """
+
+    def __init__(self):
+        self.huellas = {}      # coleccion -> {posicion: huella} (listas) o huella (objetos)
+        self.longitudes = {}   # coleccion -> longitud persistida de cada lista
+        self.valores = {}      # coleccion -> objeto ya considerado (un reemplazo se compara completo)
+        self.marcas = {}       # coleccion -> posiciones modificadas, o TODAS
+        self.forzadas = set()  # colecciones que se deben escribir aunque sus registros no difieran
+        self._bloqueo = threading.Lock()
+
+    def registrar_base(self, datos):
+        """
+        Marca los datos indicados como ya persistidos (tras cargar). Las huellas de
+        los registros de una lista se calculan recién cuando se marcan.
+        """
+        huellas = {
+            coleccion: {} if isinstance(valor, list) else huella(valor) for coleccion, valor in datos.items()
+        }
+        with self._bloqueo:
+            for coleccion, valor in datos.items():
+                self.valores[coleccion] = valor
+                self.huellas[coleccion] = huellas[coleccion]
+                self.marcas.pop(coleccion, None)
+                self.forzadas.discard(coleccion)
+                if isinstance(valor, list):
+                    self.longitudes[coleccion] = len(valor)
+
+    def olvidar(self, colecciones=None):
+        """Descarta la base de las colecciones indicadas (o de todas): se escribirán completas"""
+        with self._bloqueo:
+            for coleccion in list(self.valores) if colecciones is None else colecciones:
+                for estado in (self.huellas, self.longitudes, self.valores, self.marcas):
+                    estado.pop(coleccion, None)
+                self.forzadas.discard(coleccion)
+
+    def marcar(self, coleccion, posiciones=None):
+        """Anota que cambió una colección: solo las posiciones indicadas, o toda (None)"""
+        with self._bloqueo:
+            self._marcar(coleccion, posiciones)
+
+    def _marcar(self, coleccion, posiciones):
+        if posiciones is None:
+            self.marcas[coleccion] = TODAS
+            return
+        marcas = self.marcas.setdefault(coleccion, set())
+        if marcas is not TODAS:
+            marcas.update(posiciones)
+
+    def pendientes(self, datos):
+        """
+        Retira las marcas y retorna lo que hay que comparar para guardar 'datos':
+        {coleccion: (valor, posiciones o TODAS, forzar, longitud)}. 'forzar' indica
+        que la colección se escribe aunque ningún registro difiera (otra longitud o
+        sin base). Solo consulta identidades, longitudes y marcas: no recorre registros.
+        """
+        pedido = {}
+        with self._bloqueo:
+            for coleccion, valor in datos.items():
+                marcas = self.marcas.pop(coleccion, None)
+                reemplazada = self.valores.get(coleccion, _SIN_BASE) is not valor
+                forzada = coleccion not in self.huellas or coleccion in self.forzadas
+                self.valores[coleccion] = valor
+                self.forzadas.discard(coleccion)
+                if isinstance(valor, list):
+                    longitud = self.longitudes.get(coleccion)
+                    self.longitudes[coleccion] = len(valor)
+                    if reemplazada or marcas is TODAS or longitud is None:
+                        posiciones = TODAS
+                    else:
+                        posiciones = set(marcas or ())
+                        posiciones.update(range(longitud, len(valor)))
+                    forzar = forzada or longitud != len(valor)
+                    if posiciones or forzar:
+                        pedido[coleccion] = (valor, posiciones, forzar, len(valor))
+                elif reemplazada or marcas is not None or forzada:
+                    pedido[coleccion] = (valor, TODAS, forzada, None)
+        return pedido
+
+    def devolver(self, pedido):
+        """Restituye las marcas de un pedido que no se pudo guardar, para reintentarlo"""
+        with self._bloqueo:
+            for coleccion, (valor, posiciones, forzar, longitud) in pedido.items():
+                if forzar:
+                    self.forzadas.add(coleccion)
+                self._marcar(coleccion, None if posiciones is TODAS else posiciones)
+
+    def copiar(self, pedido):
+        """
+        Retorna el pedido con copias de lo que hay que comparar: solo las posiciones
+        pedidas de cada lista ({posicion: registro}) y los objetos completos. Se llama
+        en el hilo del script para que otro hilo calcule sobre un estado coherente.
+        """
+        copia = {}
+        for coleccion, (valor, posiciones, forzar, longitud) in pedido.items():
+            if longitud is None:
+                copia[coleccion] = (copy.deepcopy(valor), posiciones, forzar, longitud)
+                continue
+            disponibles = min(longitud, len(valor))
+            seleccion = range(disponibles) if posiciones is TODAS else sorted(p for p in posiciones if p < disponibles)
+            registros = {posicion: copy.deepcopy(valor[posicion]) for posicion in seleccion}
+            copia[coleccion] = (registros, posiciones, forzar, longitud)
+        return copia
+
+    def calcular_cambios(self, pedido, copiar=True):
+        """
+        Calcula las huellas de lo pedido y retorna (cambios, huellas_nuevas) con
+        solo lo que difiere de la base. Los registros de 'cambios' son copias, de
+        modo que la sesión se puede seguir modificando mientras se escriben; con
+        un pedido ya copiado (copiar()) se usa 'copiar=False'.
+        """
+        cambios = {}
+        huellas_nuevas = {}
+        for coleccion, (valor, posiciones, forzar, longitud) in pedido.items():
+            with self._bloqueo:
+                anterior = self.huellas.get(coleccion)
+            if longitud is not None:
+                anteriores = anterior if isinstance(anterior, dict) else {}
+                if isinstance(valor, dict):
+                    seleccion = sorted(valor)
+                else:
+                    # La lista pudo acortarse después de tomar el pedido: lo que falte se escribe en el próximo
+                    disponibles = min(longitud, len(valor))
+                    seleccion = [
+                        posicion for posicion in sorted(range(disponibles) if posiciones is TODAS else posiciones)
+                        if posicion < disponibles
+                    ]
+                registros = {}
+                huellas = {}
+                for posicion in seleccion:
+                    registro = valor[posicion]
+                    actual = huella(registro)
+                    if anteriores.get(posicion) != actual:
+                        registros[posicion] = copy.deepcopy(registro) if copiar else registro
+                        huellas[posicion] = actual
+                if registros or forzar:
+                    cambios[coleccion] = {"tipo": "lista", "registros": registros, "longitud": longitud}
+                huellas_nuevas[coleccion] = (longitud, huellas)
+            else:
+                actual = huella(valor)
+                if forzar or actual != anterior:
+                    cambios[coleccion] = {"tipo": "objeto", "valor": copy.deepcopy(valor) if copiar else valor}
+                huellas_nuevas[coleccion] = (None, actual)
+        return cambios, huellas_nuevas
+
+    def confirmar(self, huellas_nuevas):
+        """Registra como persistidas las huellas de un guardado (o de uno ya encolado)"""
+        with self._bloqueo:
+            for coleccion, (longitud, huellas) in huellas_nuevas.items():
+                if longitud is None:
+                    self.huellas[coleccion] = huellas
+                    continue
+                anteriores = self.huellas.get(coleccion)
+                anteriores = {
+                    posicion: valor for posicion, valor in anteriores.items() if posicion < longitud
+                } if isinstance(anteriores, dict) else {}
+                anteriores.update(huellas)
+                self.huellas[coleccion] = anteriores
+
+
+def cambios_completos(datos):
+    """Describe 'datos' como cambios completos (todas las posiciones de cada colección)"""
+    cambios = {}
+    for coleccion, valor in datos.items():
+        if isinstance(valor, list):
+            cambios[coleccion] = {"tipo": "lista", "registros": dict(enumerate(valor)), "longitud": len(valor)}
+        else:
+            cambios[coleccion] = {"tipo": "objeto", "valor": valor}
+    return cambios
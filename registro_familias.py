@@ -4,83 +4,39 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date
 import numpy as np
+from almacen_familias import (
+    factor_presente, valor_familia,
+    ACCESO_APS, EDAD_MINIMA_JEFE, EDAD_MAXIMA_JEFE, ENFERMEDADES_CRONICAS, HACINAMIENTO,
+    MAX_INTEGRANTES_HABITUAL, OCUPACIONES, PARTICIPACION_SOCIAL, RED_APOYO, TIPOS_VIVIENDA
+)
+from cache_figuras import mostrar_figura
+from core.diagnostico import tabla_sectores
+from core.marcos import columnas, familias_flat
+from importacion_familias import mostrar_importacion_masiva
+from instrumentacion import seccion
+from motor_riesgo import cargar_reglas, riesgo_social, riesgo_sanitario
+from paginacion import controles_paginacion
+from registros import Familia
+from sesion_familias import actualizar_familia, eliminar_familia, obtener_almacen_familias
+
+# Criterios de orden de la tabla de resultados -> columna del almacén
+COLUMNAS_ORDEN = {
+    "Apellido": "apellido",
+    "Sector": "sector",
+    "Integrantes": "num_integrantes",
+    "Riesgo Social": "puntaje_social",
+    "Riesgo Sanitario": "puntaje_sanitario"
+}
 
 def calcular_riesgo_social(familia):
-    """Calcula el riesgo social basado en factores familiares"""
-    puntaje = 0
-    
-    # Factores de riesgo social
-    if familia["hacinamiento"] == "Alto":
-        puntaje += 3
-    elif familia["hacinamiento"] == "Medio":
-        puntaje += 2
-    elif familia["hacinamiento"] == "Bajo":
-        puntaje += 1
-    
-    if familia["red_apoyo"] == "Débil":
-        puntaje += 3
-    elif familia["red_apoyo"] == "Regular":
-        puntaje += 2
-    elif familia["red_apoyo"] == "Fuerte":
-        puntaje += 1
-    
-    if familia["participacion_social"] == "Nula":
-        puntaje += 3
-    elif familia["participacion_social"] == "Baja":
-        puntaje += 2
-    elif familia["participacion_social"] == "Alta":
-        puntaje += 1
-    
-    if familia["acceso_aps"] == "Difícil":
-        puntaje += 3
-    elif familia["acceso_aps"] == "Regular":
-        puntaje += 2
-    elif familia["acceso_aps"] == "Fácil":
-        puntaje += 1
-    
-    # Determinar nivel de riesgo
-    if puntaje >= 10:
-        return "Alto", puntaje
-    elif puntaje >= 6:
-        return "Medio", puntaje
-    else:
-        return "Bajo", puntaje
+    """Calcula el riesgo social basado en factores familiares (esquema anidado o plano)"""
+    return riesgo_social(familia)
 
 def calcular_riesgo_sanitario(familia):
-    """Calcula el riesgo sanitario basado en condiciones de salud"""
-    puntaje = 0
-    
-    # Enfermedades crónicas
-    enfermedades = familia["enfermedades_cronicas"]
-    if "Diabetes" in enfermedades:
-        puntaje += 2
-    if "Hipertensión" in enfermedades:
-        puntaje += 2
-    if "Obesidad" in enfermedades:
-        puntaje += 1
-    if "Enfermedad pulmonar" in enfermedades:
-        puntaje += 2
-    if "Enfermedad cardíaca" in enfermedades:
-        puntaje += 3
-    
-    # Factores adicionales
-    if familia["embarazo_adolescente"]:
-        puntaje += 2
-    if familia["violencia_intrafamiliar"]:
-        puntaje += 3
-    if familia["consumo_drogas"]:
-        puntaje += 3
-    if familia["desempleo"]:
-        puntaje += 1
-    
-    # Determinar nivel de riesgo
-    if puntaje >= 8:
-        return "Alto", puntaje
-    elif puntaje >= 4:
-        return "Medio", puntaje
-    else:
-        return "Bajo", puntaje
+    """Calcula el riesgo sanitario basado en condiciones de salud (esquema anidado o plano)"""
+    return riesgo_sanitario(familia)
 
+@seccion("dashboard")
 def mostrar_dashboard_familias():
     """Muestra un dashboard interactivo con estadísticas de las familias"""
     if not st.session_state.familias:
@@ -88,25 +44,26 @@ def mostrar_dashboard_familias():
     
     st.markdown("### 📊 Dashboard de Familias")
     
-    # Crear DataFrame para análisis
-    df_familias = pd.DataFrame(st.session_state.familias)
+    # Almacén columnar de familias
+    almacen = obtener_almacen_familias()
     
     # Métricas principales
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Familias", len(df_familias))
+        st.metric("Total Familias", len(almacen))
     
     with col2:
-        total_integrantes = df_familias['num_integrantes'].sum()
+        integrantes = almacen.columna('num_integrantes')
+        total_integrantes = int(integrantes[integrantes > 0].sum())
         st.metric("Total Integrantes", total_integrantes)
     
     with col3:
-        riesgo_alto = len(df_familias[df_familias['riesgos'].apply(lambda x: x['social']['nivel'] == 'Alto')])
+        riesgo_alto = int(almacen.mascara('riesgo_social', 'Alto').sum())
         st.metric("Riesgo Social Alto", riesgo_alto)
     
     with col4:
-        riesgo_sanitario_alto = len(df_familias[df_familias['riesgos'].apply(lambda x: x['sanitario']['nivel'] == 'Alto')])
+        riesgo_sanitario_alto = int(almacen.mascara('riesgo_sanitario', 'Alto').sum())
         st.metric("Riesgo Sanitario Alto", riesgo_sanitario_alto)
     
     # Gráficos interactivos
@@ -114,45 +71,50 @@ def mostrar_dashboard_familias():
     
     with col1:
         # Distribución por sector
-        sector_counts = df_familias['sector'].value_counts()
-        fig_sector = px.pie(
-            values=sector_counts.values, 
-            names=sector_counts.index,
-            title="Distribución por Sector",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig_sector.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_sector, use_container_width=True)
+        def figura_sector():
+            sector_counts = pd.Series(almacen.contar('sector')).sort_values(ascending=False)
+            fig_sector = px.pie(
+                values=sector_counts.values, 
+                names=sector_counts.index,
+                title="Distribución por Sector",
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            fig_sector.update_traces(textposition='inside', textinfo='percent+label')
+            return fig_sector
+        mostrar_figura("familias_sector", almacen, figura_sector)
     
     with col2:
         # Distribución de riesgo social
-        riesgo_social = [f['riesgos']['social']['nivel'] for f in st.session_state.familias]
-        riesgo_counts = pd.Series(riesgo_social).value_counts()
-        fig_riesgo = px.bar(
-            x=riesgo_counts.index,
-            y=riesgo_counts.values,
-            title="Distribución de Riesgo Social",
-            color=riesgo_counts.values,
-            color_continuous_scale='RdYlGn_r'
-        )
-        fig_riesgo.update_layout(xaxis_title="Nivel de Riesgo", yaxis_title="Número de Familias")
-        st.plotly_chart(fig_riesgo, use_container_width=True)
+        def figura_riesgo():
+            riesgo_counts = pd.Series(almacen.contar('riesgo_social')).sort_values(ascending=False)
+            fig_riesgo = px.bar(
+                x=riesgo_counts.index,
+                y=riesgo_counts.values,
+                title="Distribución de Riesgo Social",
+                color=riesgo_counts.values,
+                color_continuous_scale='RdYlGn_r'
+            )
+            fig_riesgo.update_layout(xaxis_title="Nivel de Riesgo", yaxis_title="Número de Familias")
+            return fig_riesgo
+        mostrar_figura("familias_riesgo_social", almacen, figura_riesgo)
     
     # Gráfico de correlación entre riesgos
-    riesgo_social_puntajes = [f['riesgos']['social']['puntaje'] for f in st.session_state.familias]
-    riesgo_sanitario_puntajes = [f['riesgos']['sanitario']['puntaje'] for f in st.session_state.familias]
-    
-    fig_correlacion = px.scatter(
-        x=riesgo_social_puntajes,
-        y=riesgo_sanitario_puntajes,
-        title="Correlación Riesgo Social vs Sanitario",
-        labels={'x': 'Puntaje Riesgo Social', 'y': 'Puntaje Riesgo Sanitario'},
-        color=riesgo_social_puntajes,
-        size=riesgo_sanitario_puntajes,
-        hover_data=[df_familias['apellido']]
-    )
-    st.plotly_chart(fig_correlacion, use_container_width=True)
+    def figura_correlacion():
+        riesgo_social_puntajes = almacen.columna('puntaje_social')
+        riesgo_sanitario_puntajes = almacen.columna('puntaje_sanitario')
+        
+        return px.scatter(
+            x=riesgo_social_puntajes,
+            y=riesgo_sanitario_puntajes,
+            title="Correlación Riesgo Social vs Sanitario",
+            labels={'x': 'Puntaje Riesgo Social', 'y': 'Puntaje Riesgo Sanitario'},
+            color=riesgo_social_puntajes,
+            size=riesgo_sanitario_puntajes,
+            hover_data=[almacen.columna('apellido')]
+        )
+    mostrar_figura("familias_correlacion", almacen, figura_correlacion)
 
+@seccion("búsqueda")
 def mostrar_filtros_avanzados():
     """Muestra filtros avanzados para buscar familias"""
     if not st.session_state.familias:
@@ -164,7 +126,7 @@ def mostrar_filtros_avanzados():
     
     with col1:
         # Filtro por sector
-        sectores = list(set([f['sector'] for f in st.session_state.familias]))
+        sectores = list(obtener_almacen_familias().contar('sector'))
         sector_filtro = st.selectbox("Filtrar por Sector", ["Todos"] + sectores)
         
         # Filtro por riesgo social
@@ -186,76 +148,110 @@ def mostrar_filtros_avanzados():
             ["Embarazo adolescente", "Violencia intrafamiliar", "Consumo drogas", "Desempleo", "Discapacidad", "Adulto mayor"]
         )
         
-        # Búsqueda por apellido
-        busqueda_apellido = st.text_input("Buscar por apellido", placeholder="Ej: González")
+        # Búsqueda por apellido o nombre del jefe de hogar
+        busqueda_apellido = st.text_input("Buscar por apellido o jefe de hogar", placeholder="Ej: González")
     
-    # Aplicar filtros
-    familias_filtradas = st.session_state.familias.copy()
+    # Aplicar filtros como intersecciones de los índices del almacén
+    almacen = obtener_almacen_familias()
+    indice = almacen.indice()
+    seleccion = indice.rango_integrantes(min_integrantes, max_integrantes)
     
     if sector_filtro != "Todos":
-        familias_filtradas = [f for f in familias_filtradas if f['sector'] == sector_filtro]
+        seleccion &= indice.categoria('sector', sector_filtro)
     
     if riesgo_social_filtro != "Todos":
-        familias_filtradas = [f for f in familias_filtradas if f['riesgos']['social']['nivel'] == riesgo_social_filtro]
-    
-    familias_filtradas = [f for f in familias_filtradas if min_integrantes <= f['num_integrantes'] <= max_integrantes]
+        seleccion &= indice.categoria('riesgo_social', riesgo_social_filtro)
     
     if enfermedad_filtro:
-        familias_filtradas = [f for f in familias_filtradas if any(enfermedad in f['enfermedades_cronicas'] for enfermedad in enfermedad_filtro)]
-    
-    if factores_riesgo:
-        for factor in factores_riesgo:
-            if factor == "Embarazo adolescente":
-                familias_filtradas = [f for f in familias_filtradas if f['embarazo_adolescente']]
-            elif factor == "Violencia intrafamiliar":
-                familias_filtradas = [f for f in familias_filtradas if f['violencia_intrafamiliar']]
-            elif factor == "Consumo drogas":
-                familias_filtradas = [f for f in familias_filtradas if f['consumo_drogas']]
-            elif factor == "Desempleo":
-                familias_filtradas = [f for f in familias_filtradas if f['desempleo']]
-            elif factor == "Discapacidad":
-                familias_filtradas = [f for f in familias_filtradas if f['discapacidad']]
-            elif factor == "Adulto mayor":
-                familias_filtradas = [f for f in familias_filtradas if f['adulto_mayor']]
-    
+        seleccion &= indice.enfermedades(enfermedad_filtro)
+    
+    columnas_factores = {
+        "Embarazo adolescente": "embarazo_adolescente",
+        "Violencia intrafamiliar": "violencia_intrafamiliar",
+        "Consumo drogas": "consumo_drogas",
+        "Desempleo": "desempleo",
+        "Discapacidad": "discapacidad",
+        "Adulto mayor": "adulto_mayor"
+    }
+    for factor in factores_riesgo:
+        seleccion &= indice.factor(columnas_factores[factor])
+    
+    posiciones = None
     if busqueda_apellido:
-        familias_filtradas = [f for f in familias_filtradas if busqueda_apellido.lower() in f['apellido'].lower()]
+        # Índice de trigramas (sin tildes); resultados ordenados por relevancia
+        posiciones = almacen.busqueda().buscar(busqueda_apellido, posiciones=indice.posiciones(seleccion))
+        total_resultados = len(posiciones)
+    else:
+        total_resultados = indice.contar(seleccion)
     
     # Mostrar resultados
-    st.markdown(f"**Resultados encontrados: {len(familias_filtradas)} familias**")
-    
-    if familias_filtradas:
-        # Crear tabla interactiva
-        datos_tabla = []
-        for familia in familias_filtradas:
-            datos_tabla.append({
-                "Apellido": familia['apellido'],
-                "Sector": familia['sector'],
-                "Integrantes": familia['num_integrantes'],
-                "Riesgo Social": familia['riesgos']['social']['nivel'],
-                "Riesgo Sanitario": familia['riesgos']['sanitario']['nivel'],
-                "Enfermedades": ", ".join(familia.get('enfermedades_cronicas', [])) if familia.get('enfermedades_cronicas') else "Ninguna",
-                "Observaciones": familia['observaciones'][:50] + "..." if len(familia['observaciones']) > 50 else familia['observaciones']
-            })
+    st.markdown(f"**Resultados encontrados: {total_resultados} familias**")
+    
+    if total_resultados:
+        # Orden y paginación: solo se construye la página visible
+        col1, col2 = st.columns(2)
+        with col1:
+            criterios = (["Relevancia"] if busqueda_apellido else []) + ["Registro"] + list(COLUMNAS_ORDEN)
+            criterio_orden = st.selectbox("Ordenar por", criterios, key="filtros_orden")
+        with col2:
+            descendente = st.checkbox("Orden descendente", key="filtros_descendente")
         
-        df_resultados = pd.DataFrame(datos_tabla)
-        st.dataframe(df_resultados, use_container_width=True)
+        if posiciones is None:
+            posiciones = indice.posiciones(seleccion)
+        posiciones = ordenar_posiciones(almacen, posiciones, criterio_orden, descendente)
+        
+        firma = (sector_filtro, riesgo_social_filtro, min_integrantes, max_integrantes,
+                 tuple(enfermedad_filtro), tuple(factores_riesgo), busqueda_apellido, criterio_orden, descendente)
+        desplazamiento, tamano_pagina = controles_paginacion(
+            total_resultados, "filtros", etiqueta="Familias por página", firma=firma
+        )
+        pagina = posiciones[desplazamiento:desplazamiento + tamano_pagina]
+        
+        # Crear tabla a partir de las columnas del almacén
+        df = almacen.a_dataframe(pagina)
+        observaciones = df['observaciones'].astype(str)
+        df_resultados = pd.DataFrame({
+            "Apellido": df['apellido'],
+            "Sector": df['sector'],
+            "Integrantes": df['num_integrantes'],
+            "Riesgo Social": df['riesgo_social'],
+            "Riesgo Sanitario": df['riesgo_sanitario'],
+            "Enfermedades": df['enfermedades_cronicas'].replace("", "Ninguna"),
+            "Observaciones": observaciones.where(observaciones.str.len() <= 50, observaciones.str[:50] + "...")
+        })
+        st.dataframe(df_resultados, use_container_width=True, hide_index=True)
+        mostrar_edicion_familia(almacen, pagina)
     else:
         st.info("No se encontraron familias con los filtros aplicados.")
 
+def ordenar_posiciones(almacen, posiciones, criterio, descendente=False):
+    """Ordena las posiciones de un resultado según un criterio de la tabla sin construir las filas"""
+    posiciones = np.asarray(posiciones)
+    if criterio not in COLUMNAS_ORDEN:
+        # Relevancia o registro: se conserva el orden recibido
+        return posiciones[::-1] if descendente else posiciones
+    
+    nombre = COLUMNAS_ORDEN[criterio]
+    if nombre in ("apellido", "sector"):
+        claves = almacen.indice().rangos(nombre)[posiciones]
+    else:
+        claves = almacen.columna(nombre)[posiciones].astype(np.int64)
+    orden = np.argsort(-claves if descendente else claves, kind="stable")
+    return posiciones[orden]
+
 def validar_datos_familia(familia_data):
     """Valida los datos ingresados y retorna sugerencias"""
     sugerencias = []
     alertas = []
     
     # Validaciones básicas
-    if familia_data['num_integrantes'] > 10:
+    if familia_data['num_integrantes'] > MAX_INTEGRANTES_HABITUAL:
         alertas.append("⚠️ Número de integrantes muy alto. Verificar datos.")
     
-    if familia_data['jefe_hogar']['edad'] < 18:
+    if familia_data['jefe_hogar']['edad'] < EDAD_MINIMA_JEFE:
         alertas.append("⚠️ Edad del jefe de hogar muy baja. Verificar datos.")
     
-    if familia_data['jefe_hogar']['edad'] > 100:
+    if familia_data['jefe_hogar']['edad'] > EDAD_MAXIMA_JEFE:
         alertas.append("⚠️ Edad del jefe de hogar muy alta. Verificar datos.")
     
     # Validaciones de riesgo
@@ -268,13 +264,13 @@ def validar_datos_familia(familia_data):
     if riesgo_sanitario == "Alto":
         sugerencias.append("🔴 **Alto riesgo sanitario detectado:** Requiere seguimiento médico")
     
-    if familia_data['violencia_intrafamiliar']:
+    if valor_familia(familia_data, 'salud', 'violencia_intrafamiliar', False):
         alertas.append("🚨 **Violencia intrafamiliar:** Derivar a especialista inmediatamente")
     
-    if familia_data['embarazo_adolescente']:
+    if valor_familia(familia_data, 'salud', 'embarazo_adolescente', False):
         sugerencias.append("👶 **Embarazo adolescente:** Requiere apoyo especializado")
     
-    if familia_data['hacinamiento'] == "Alto":
+    if valor_familia(familia_data, 'vivienda', 'hacinamiento') == "Alto":
         sugerencias.append("🏠 **Hacinamiento alto:** Considerar apoyo habitacional")
     
     return sugerencias, alertas
@@ -306,7 +302,7 @@ def mostrar_registro_familias():
         st.markdown("---")
     
     # Pestañas para diferentes funcionalidades
-    tab1, tab2, tab3 = st.tabs(["📝 Registrar Familia", "🔍 Buscar Familias", "📊 Análisis Avanzado"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📝 Registrar Familia", "🔍 Buscar Familias", "📊 Análisis Avanzado", "📥 Importación Masiva"])
     
     with tab1:
         mostrar_formulario_registro()
@@ -316,105 +312,169 @@ def mostrar_registro_familias():
     
     with tab3:
         mostrar_analisis_avanzado()
+    
+    with tab4:
+        mostrar_importacion_masiva()
+
+def _indice(opciones, valor):
+    return opciones.index(valor) if valor in opciones else 0
 
+def campos_familia(familia=None, clave="registro"):
+    """
+    Dibuja los campos del formulario de familia (vacíos o con los datos de 'familia')
+    dentro del formulario actual y retorna los datos ingresados, sin riesgos ni fecha
+    """
+    familia = familia or {}
+    sectores = [s["nombre"] for s in st.session_state.sectores]
+    enfermedades = valor_familia(familia, "salud", "enfermedades_cronicas") or []
+    
+    # Información básica
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        sector = st.selectbox("Sector", sectores, index=_indice(sectores, familia.get("sector")), key=f"{clave}_sector")
+        apellido_familia = st.text_input("Apellido de la Familia", value=familia.get("apellido") or "", placeholder="Ej: González", key=f"{clave}_apellido")
+        num_integrantes = st.number_input("Número de Integrantes", min_value=1, max_value=15, value=min(max(int(familia.get("num_integrantes") or 3), 1), 15), key=f"{clave}_integrantes")
+    
+    with col2:
+        nombre_jefe = st.text_input("Nombre del Jefe de Hogar", value=valor_familia(familia, "jefe_hogar", "nombre") or "", placeholder="Ej: Roberto González", key=f"{clave}_jefe")
+        edad = valor_familia(familia, "jefe_hogar", "edad") or 35
+        edad_jefe = st.number_input("Edad del Jefe de Hogar", min_value=EDAD_MINIMA_JEFE, max_value=EDAD_MAXIMA_JEFE, value=min(max(int(edad), EDAD_MINIMA_JEFE), EDAD_MAXIMA_JEFE), key=f"{clave}_edad")
+        ocupacion_jefe = st.selectbox("Ocupación del Jefe de Hogar", OCUPACIONES, index=_indice(OCUPACIONES, valor_familia(familia, "jefe_hogar", "ocupacion")), key=f"{clave}_ocupacion")
+    
+    # Información de vivienda
+    st.markdown("**🏠 Información de Vivienda**")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        tipo_vivienda = st.selectbox("Tipo de Vivienda", TIPOS_VIVIENDA, index=_indice(TIPOS_VIVIENDA, valor_familia(familia, "vivienda", "tipo")), key=f"{clave}_vivienda")
+        hacinamiento = st.selectbox("Nivel de Hacinamiento", HACINAMIENTO, index=_indice(HACINAMIENTO, valor_familia(familia, "vivienda", "hacinamiento")), key=f"{clave}_hacinamiento")
+    
+    with col2:
+        red_apoyo = st.selectbox("Red de Apoyo", RED_APOYO, index=_indice(RED_APOYO, valor_familia(familia, "vivienda", "red_apoyo")), key=f"{clave}_red")
+        participacion_social = st.selectbox("Participación Social", PARTICIPACION_SOCIAL, index=_indice(PARTICIPACION_SOCIAL, valor_familia(familia, "vivienda", "participacion_social")), key=f"{clave}_participacion")
+    
+    with col3:
+        acceso_aps = st.selectbox("Acceso a APS", ACCESO_APS, index=_indice(ACCESO_APS, valor_familia(familia, "vivienda", "acceso_aps")), key=f"{clave}_acceso")
+    
+    # Información de salud
+    st.markdown("**🏥 Información de Salud**")
+    col1, col2 = st.columns(2)
+    
+    def factor(etiqueta, campo):
+        return st.checkbox(etiqueta, value=factor_presente(valor_familia(familia, "salud", campo)), key=f"{clave}_{campo}")
+    
+    with col1:
+        enfermedades_cronicas = st.multiselect("Enfermedades Crónicas", ENFERMEDADES_CRONICAS,
+                                             default=[e for e in enfermedades if e in ENFERMEDADES_CRONICAS], key=f"{clave}_enfermedades")
+        embarazo_adolescente = factor("Embarazo Adolescente", "embarazo_adolescente")
+        violencia_intrafamiliar = factor("Violencia Intrafamiliar", "violencia_intrafamiliar")
+    
+    with col2:
+        consumo_drogas = factor("Consumo de Drogas", "consumo_drogas")
+        desempleo = factor("Desempleo", "desempleo")
+        discapacidad = factor("Discapacidad", "discapacidad")
+        adulto_mayor = factor("Adulto Mayor", "adulto_mayor")
+    
+    # Información adicional
+    observaciones = st.text_area("Observaciones", value=familia.get("observaciones") or "", placeholder="Observaciones importantes sobre la familia...", key=f"{clave}_observaciones")
+    responsable = st.text_input("Responsable del Registro", value=familia.get("responsable") or "", placeholder="Ej: TENS Ana Martínez", key=f"{clave}_responsable")
+    
+    return {
+        "sector": sector,
+        "apellido": apellido_familia,
+        "num_integrantes": num_integrantes,
+        "jefe_hogar": {
+            "nombre": nombre_jefe,
+            "edad": edad_jefe,
+            "ocupacion": ocupacion_jefe
+        },
+        "vivienda": {
+            "tipo": tipo_vivienda,
+            "hacinamiento": hacinamiento,
+            "red_apoyo": red_apoyo,
+            "participacion_social": participacion_social,
+            "acceso_aps": acceso_aps
+        },
+        "salud": {
+            "enfermedades_cronicas": enfermedades_cronicas,
+            "embarazo_adolescente": embarazo_adolescente,
+            "violencia_intrafamiliar": violencia_intrafamiliar,
+            "consumo_drogas": consumo_drogas,
+            "desempleo": desempleo,
+            "discapacidad": discapacidad,
+            "adulto_mayor": adulto_mayor
+        },
+        "observaciones": observaciones,
+        "responsable": responsable
+    }
+
+def riesgos_familia(familia_data):
+    """Riesgos de una familia con las reglas vigentes, en el formato que se guarda"""
+    riesgo_social, puntaje_social = calcular_riesgo_social(familia_data)
+    riesgo_sanitario, puntaje_sanitario = calcular_riesgo_sanitario(familia_data)
+    return {
+        "social": {"nivel": riesgo_social, "puntaje": puntaje_social},
+        "sanitario": {"nivel": riesgo_sanitario, "puntaje": puntaje_sanitario},
+        "version": cargar_reglas()["version"]
+    }
+
+def mostrar_edicion_familia(almacen, pagina):
+    """Modifica o elimina una familia de la página visible; el almacén y el autoguardado se actualizan solo en esa fila"""
+    with st.expander("✏️ Modificar o eliminar una familia"):
+        opciones = {
+            f"{st.session_state.familias[p].get('apellido', '')} · {st.session_state.familias[p].get('sector', '')} (#{p + 1})": int(p)
+            for p in pagina
+        }
+        elegida = st.selectbox("Familia", list(opciones), key="edicion_familia_posicion")
+        if elegida is None:
+            return
+        posicion = opciones[elegida]
+        familia = st.session_state.familias[posicion]
+        
+        # La revisión en la clave evita que los campos conserven los valores de otra familia tras una eliminación
+        clave = f"edicion_{posicion}_{almacen.revision}"
+        with st.form(clave):
+            familia_data = campos_familia(familia, clave=clave)
+            col1, col2 = st.columns(2)
+            with col1:
+                guardar = st.form_submit_button("💾 Guardar cambios", type="primary")
+            with col2:
+                eliminar = st.form_submit_button("🗑️ Eliminar familia")
+        
+        if guardar:
+            if not (familia_data["apellido"] and familia_data["jefe_hogar"]["nombre"]):
+                st.error("❌ Por favor completa los campos obligatorios (apellido y nombre del jefe de hogar)")
+                return
+            familia_data["fecha_registro"] = familia.get("fecha_registro")
+            familia_data["riesgos"] = riesgos_familia(familia_data)
+            actualizar_familia(posicion, familia_data)
+            st.toast(f"✅ Familia {familia_data['apellido']} actualizada")
+            st.rerun()
+        if eliminar:
+            eliminar_familia(posicion)
+            st.toast(f"🗑️ Familia {familia.get('apellido', '')} eliminada")
+            st.rerun()
+
+@seccion("formulario de registro")
 def mostrar_formulario_registro():
     """Muestra el formulario de registro con validación inteligente"""
     st.markdown("### 📝 Registrar Nueva Familia")
     
     with st.form("registro_familia", clear_on_submit=True):
-        # Información básica
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            sector = st.selectbox("Sector", [s["nombre"] for s in st.session_state.sectores])
-            apellido_familia = st.text_input("Apellido de la Familia", placeholder="Ej: González")
-            num_integrantes = st.number_input("Número de Integrantes", min_value=1, max_value=15, value=3)
-        
-        with col2:
-            nombre_jefe = st.text_input("Nombre del Jefe de Hogar", placeholder="Ej: Roberto González")
-            edad_jefe = st.number_input("Edad del Jefe de Hogar", min_value=18, max_value=100, value=35)
-            ocupacion_jefe = st.selectbox("Ocupación del Jefe de Hogar", 
-                                        ["Empleado", "Obrero", "Profesional", "Dueño de casa", "Jubilado", "Desempleado", "Estudiante", "Otro"])
-        
-        # Información de vivienda
-        st.markdown("**🏠 Información de Vivienda**")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            tipo_vivienda = st.selectbox("Tipo de Vivienda", ["Casa", "Departamento", "Mediagua", "Otro"])
-            hacinamiento = st.selectbox("Nivel de Hacinamiento", ["Bajo", "Medio", "Alto", "Crítico"])
-        
-        with col2:
-            red_apoyo = st.selectbox("Red de Apoyo", ["Fuerte", "Regular", "Débil"])
-            participacion_social = st.selectbox("Participación Social", ["Alta", "Media", "Baja", "Nula"])
-        
-        with col3:
-            acceso_aps = st.selectbox("Acceso a APS", ["Fácil", "Regular", "Difícil", "Muy difícil"])
-        
-        # Información de salud
-        st.markdown("**🏥 Información de Salud**")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            enfermedades_cronicas = st.multiselect("Enfermedades Crónicas", 
-                                                 ["Diabetes", "Hipertensión", "Obesidad", "Enfermedad pulmonar", "Enfermedad cardíaca", "Artritis", "Asma", "Tuberculosis"])
-            embarazo_adolescente = st.checkbox("Embarazo Adolescente")
-            violencia_intrafamiliar = st.checkbox("Violencia Intrafamiliar")
-        
-        with col2:
-            consumo_drogas = st.checkbox("Consumo de Drogas")
-            desempleo = st.checkbox("Desempleo")
-            discapacidad = st.checkbox("Discapacidad")
-            adulto_mayor = st.checkbox("Adulto Mayor")
-        
-        # Información adicional
-        observaciones = st.text_area("Observaciones", placeholder="Observaciones importantes sobre la familia...")
-        responsable = st.text_input("Responsable del Registro", placeholder="Ej: TENS Ana Martínez")
+        familia_data = campos_familia()
         
         # Botón de envío
         submitted = st.form_submit_button("💾 Registrar Familia", type="primary")
         
         if submitted:
-            if apellido_familia and nombre_jefe:
-                # Crear diccionario con datos de la familia
-                familia_data = {
-                    "sector": sector,
-                    "apellido": apellido_familia,
-                    "num_integrantes": num_integrantes,
-                    "jefe_hogar": {
-                        "nombre": nombre_jefe,
-                        "edad": edad_jefe,
-                        "ocupacion": ocupacion_jefe
-                    },
-                    "vivienda": {
-                        "tipo": tipo_vivienda,
-                        "hacinamiento": hacinamiento,
-                        "red_apoyo": red_apoyo,
-                        "participacion_social": participacion_social,
-                        "acceso_aps": acceso_aps
-                    },
-                    "salud": {
-                        "enfermedades_cronicas": enfermedades_cronicas,
-                        "embarazo_adolescente": embarazo_adolescente,
-                        "violencia_intrafamiliar": violencia_intrafamiliar,
-                        "consumo_drogas": consumo_drogas,
-                        "desempleo": desempleo,
-                        "discapacidad": discapacidad,
-                        "adulto_mayor": adulto_mayor
-                    },
-                    "observaciones": observaciones,
-                    "fecha_registro": datetime.now().strftime("%Y-%m-%d"),
-                    "responsable": responsable
-                }
+            if familia_data["apellido"] and familia_data["jefe_hogar"]["nombre"]:
+                familia_data["fecha_registro"] = datetime.now().strftime("%Y-%m-%d")
                 
                 # Calcular riesgos
-                riesgo_social, puntaje_social = calcular_riesgo_social(familia_data)
-                riesgo_sanitario, puntaje_sanitario = calcular_riesgo_sanitario(familia_data)
-                
-                familia_data["riesgos"] = {
-                    "social": {"nivel": riesgo_social, "puntaje": puntaje_social},
-                    "sanitario": {"nivel": riesgo_sanitario, "puntaje": puntaje_sanitario}
-                }
+                riesgos = familia_data["riesgos"] = riesgos_familia(familia_data)
+                riesgo_social, puntaje_social = riesgos["social"]["nivel"], riesgos["social"]["puntaje"]
+                riesgo_sanitario, puntaje_sanitario = riesgos["sanitario"]["nivel"], riesgos["sanitario"]["puntaje"]
                 
                 # Validación inteligente
                 sugerencias, alertas = validar_datos_familia(familia_data)
@@ -429,8 +489,8 @@ def mostrar_formulario_registro():
                         st.info(sugerencia)
                 
                 # Guardar familia
-                st.session_state.familias.append(familia_data)
-                st.success(f"✅ Familia {apellido_familia} registrada exitosamente!")
+                st.session_state.familias.append(Familia.desde_dict(familia_data))
+                st.success(f"✅ Familia {familia_data['apellido']} registrada exitosamente!")
                 
                 # Mostrar resumen de riesgos
                 col1, col2 = st.columns(2)
@@ -442,6 +502,7 @@ def mostrar_formulario_registro():
             else:
                 st.error("❌ Por favor completa los campos obligatorios (apellido y nombre del jefe de hogar)")
 
+@seccion("análisis avanzado")
 def mostrar_analisis_avanzado():
     """Muestra análisis avanzado de las familias registradas"""
     if not st.session_state.familias:
@@ -450,6 +511,8 @@ def mostrar_analisis_avanzado():
     
     st.markdown("### 📊 Análisis Avanzado")
     
+    almacen = obtener_almacen_familias()
+    
     # Análisis de correlaciones
     col1, col2 = st.columns(2)
     
@@ -457,134 +520,110 @@ def mostrar_analisis_avanzado():
         st.markdown("**🔗 Correlaciones de Riesgo**")
         
         # Crear matriz de correlación
-        df_analisis = pd.DataFrame([
-            {
-                'Riesgo_Social': f['riesgos']['social']['puntaje'],
-                'Riesgo_Sanitario': f['riesgos']['sanitario']['puntaje'],
-                'Integrantes': f['num_integrantes'],
-                'Edad_Jefe': f['jefe_hogar']['edad']
-            }
-            for f in st.session_state.familias
-        ])
-        
-        correlacion = df_analisis.corr()
-        
-        fig_corr = px.imshow(
-            correlacion,
-            title="Matriz de Correlación",
-            color_continuous_scale='RdBu',
-            aspect="auto"
-        )
-        st.plotly_chart(fig_corr, use_container_width=True)
+        def figura_correlacion():
+            df_analisis = columnas(familias_flat(almacen), {
+                'puntaje_social': 'Riesgo_Social',
+                'puntaje_sanitario': 'Riesgo_Sanitario',
+                'num_integrantes': 'Integrantes',
+                'edad_jefe': 'Edad_Jefe'
+            })
+            
+            correlacion = df_analisis.corr()
+            
+            return px.imshow(
+                correlacion,
+                title="Matriz de Correlación",
+                color_continuous_scale='RdBu',
+                aspect="auto"
+            )
+        mostrar_figura("analisis_correlacion", almacen, figura_correlacion)
     
     with col2:
         st.markdown("**📈 Distribución de Edades**")
         
-        edades = [f['jefe_hogar']['edad'] for f in st.session_state.familias]
-        fig_edades = px.histogram(
-            x=edades,
-            title="Distribución de Edades del Jefe de Hogar",
-            nbins=10,
-            color_discrete_sequence=['#1f77b4']
-        )
-        fig_edades.update_layout(xaxis_title="Edad", yaxis_title="Frecuencia")
-        st.plotly_chart(fig_edades, use_container_width=True)
+        def figura_edades():
+            edades = almacen.columna('edad_jefe')
+            fig_edades = px.histogram(
+                x=edades,
+                title="Distribución de Edades del Jefe de Hogar",
+                nbins=10,
+                color_discrete_sequence=['#1f77b4']
+            )
+            fig_edades.update_layout(xaxis_title="Edad", yaxis_title="Frecuencia")
+            return fig_edades
+        mostrar_figura("analisis_edades", almacen, figura_edades)
     
     # Análisis de vulnerabilidad por sector
     st.markdown("**🎯 Análisis de Vulnerabilidad por Sector**")
     
-    vulnerabilidad_sector = {}
-    for familia in st.session_state.familias:
-        sector = familia['sector']
-        if sector not in vulnerabilidad_sector:
-            vulnerabilidad_sector[sector] = {
-                'total_familias': 0,
-                'riesgo_alto_social': 0,
-                'riesgo_alto_sanitario': 0,
-                'violencia': 0,
-                'embarazo_adolescente': 0
-            }
+    # Tabla agrupada por sector (compartida con el diagnóstico y el PDF)
+    tabla = tabla_sectores(almacen)
+    
+    if tabla.empty:
+        st.info("Las familias registradas no tienen sector asignado.")
+    else:
+        # Crear gráfico de vulnerabilidad
+        def figura_vulnerabilidad():
+            sectores = tabla.index.tolist()
+            riesgo_social_porcentaje = (tabla['alto_riesgo_social'] / tabla['total'] * 100).tolist()
+            riesgo_sanitario_porcentaje = (tabla['alto_riesgo_sanitario'] / tabla['total'] * 100).tolist()
+            
+            fig_vulnerabilidad = go.Figure()
+            fig_vulnerabilidad.add_trace(go.Bar(
+                name='Riesgo Social Alto (%)',
+                x=sectores,
+                y=riesgo_social_porcentaje,
+                marker_color='red'
+            ))
+            fig_vulnerabilidad.add_trace(go.Bar(
+                name='Riesgo Sanitario Alto (%)',
+                x=sectores,
+                y=riesgo_sanitario_porcentaje,
+                marker_color='orange'
+            ))
+            
+            fig_vulnerabilidad.update_layout(
+                title="Porcentaje de Familias en Alto Riesgo por Sector",
+                barmode='group',
+                xaxis_title="Sector",
+                yaxis_title="Porcentaje (%)"
+            )
+            return fig_vulnerabilidad
+        mostrar_figura("analisis_vulnerabilidad", almacen, figura_vulnerabilidad)
         
-        vulnerabilidad_sector[sector]['total_familias'] += 1
+        # Recomendaciones automáticas
+        st.markdown("### 💡 Recomendaciones Automáticas")
         
-        if familia['riesgos']['social']['nivel'] == 'Alto':
-            vulnerabilidad_sector[sector]['riesgo_alto_social'] += 1
+        # Identificar sector más vulnerable
+        sector_mas_vulnerable = (tabla['alto_riesgo_social'] + tabla['alto_riesgo_sanitario']).idxmax()
         
-        if familia['riesgos']['sanitario']['nivel'] == 'Alto':
-            vulnerabilidad_sector[sector]['riesgo_alto_sanitario'] += 1
+        st.info(f"🎯 **Sector más vulnerable:** {sector_mas_vulnerable}")
         
-        if familia['violencia_intrafamiliar']:
-            vulnerabilidad_sector[sector]['violencia'] += 1
+        # Recomendaciones específicas
+        if tabla.at[sector_mas_vulnerable, 'violencia_intrafamiliar'] > 0:
+            st.warning(f"🚨 **Violencia intrafamiliar detectada en {sector_mas_vulnerable}:** Implementar programa de prevención y derivación")
         
-        if familia['embarazo_adolescente']:
-            vulnerabilidad_sector[sector]['embarazo_adolescente'] += 1
-    
-    # Crear gráfico de vulnerabilidad
-    sectores = list(vulnerabilidad_sector.keys())
-    riesgo_social_porcentaje = [vulnerabilidad_sector[s]['riesgo_alto_social'] / vulnerabilidad_sector[s]['total_familias'] * 100 for s in sectores]
-    riesgo_sanitario_porcentaje = [vulnerabilidad_sector[s]['riesgo_alto_sanitario'] / vulnerabilidad_sector[s]['total_familias'] * 100 for s in sectores]
-    
-    fig_vulnerabilidad = go.Figure()
-    fig_vulnerabilidad.add_trace(go.Bar(
-        name='Riesgo Social Alto (%)',
-        x=sectores,
-        y=riesgo_social_porcentaje,
-        marker_color='red'
-    ))
-    fig_vulnerabilidad.add_trace(go.Bar(
-        name='Riesgo Sanitario Alto (%)',
-        x=sectores,
-        y=riesgo_sanitario_porcentaje,
-        marker_color='orange'
-    ))
-    
-    fig_vulnerabilidad.update_layout(
-        title="Porcentaje de Familias en Alto Riesgo por Sector",
-        barmode='group',
-        xaxis_title="Sector",
-        yaxis_title="Porcentaje (%)"
-    )
-    
-    st.plotly_chart(fig_vulnerabilidad, use_container_width=True)
-    
-    # Recomendaciones automáticas
-    st.markdown("### 💡 Recomendaciones Automáticas")
-    
-    # Identificar sector más vulnerable
-    sector_mas_vulnerable = max(vulnerabilidad_sector.keys(), 
-                              key=lambda s: vulnerabilidad_sector[s]['riesgo_alto_social'] + vulnerabilidad_sector[s]['riesgo_alto_sanitario'])
-    
-    st.info(f"🎯 **Sector más vulnerable:** {sector_mas_vulnerable}")
-    
-    # Recomendaciones específicas
-    if vulnerabilidad_sector[sector_mas_vulnerable]['violencia'] > 0:
-        st.warning(f"🚨 **Violencia intrafamiliar detectada en {sector_mas_vulnerable}:** Implementar programa de prevención y derivación")
-    
-    if vulnerabilidad_sector[sector_mas_vulnerable]['embarazo_adolescente'] > 0:
-        st.warning(f"👶 **Embarazo adolescente en {sector_mas_vulnerable}:** Fortalecer programa de salud sexual y reproductiva")
+        if tabla.at[sector_mas_vulnerable, 'embarazo_adolescente'] > 0:
+            st.warning(f"👶 **Embarazo adolescente en {sector_mas_vulnerable}:** Fortalecer programa de salud sexual y reproductiva")
     
     # Exportar datos
     if st.button("📥 Exportar Análisis"):
-        # Crear DataFrame para exportación
-        datos_export = []
-        for familia in st.session_state.familias:
-            datos_export.append({
-                'Apellido': familia['apellido'],
-                'Sector': familia['sector'],
-                'Integrantes': familia['num_integrantes'],
-                'Edad_Jefe': familia['jefe_hogar']['edad'],
-                'Ocupacion_Jefe': familia['jefe_hogar']['ocupacion'],
-                'Riesgo_Social': familia['riesgos']['social']['nivel'],
-                'Puntaje_Social': familia['riesgos']['social']['puntaje'],
-                'Riesgo_Sanitario': familia['riesgos']['sanitario']['nivel'],
-                'Puntaje_Sanitario': familia['riesgos']['sanitario']['puntaje'],
-                'Enfermedades_Cronicas': ', '.join(familia['enfermedades_cronicas']),
-                'Violencia_Intrafamiliar': familia['violencia_intrafamiliar'],
-                'Embarazo_Adolescente': familia['embarazo_adolescente'],
-                'Fecha_Registro': familia['fecha_registro']
-            })
-        
-        df_export = pd.DataFrame(datos_export)
+        # Exportar el marco compartido de familias
+        df_export = columnas(familias_flat(almacen), {
+            'apellido': 'Apellido',
+            'sector': 'Sector',
+            'num_integrantes': 'Integrantes',
+            'edad_jefe': 'Edad_Jefe',
+            'ocupacion_jefe': 'Ocupacion_Jefe',
+            'riesgo_social': 'Riesgo_Social',
+            'puntaje_social': 'Puntaje_Social',
+            'riesgo_sanitario': 'Riesgo_Sanitario',
+            'puntaje_sanitario': 'Puntaje_Sanitario',
+            'enfermedades_cronicas': 'Enfermedades_Cronicas',
+            'violencia_intrafamiliar': 'Violencia_Intrafamiliar',
+            'embarazo_adolescente': 'Embarazo_Adolescente',
+            'fecha_registro': 'Fecha_Registro'
+        })
         csv = df_export.to_csv(index=False)
         
         st.download_button(
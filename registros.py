@@ -0,0 +1,481 @@
+"""
+Registros compactos de las entidades principales
+Familias, sectores, equipos, instituciones y actividades del plan se guardan en
+la sesión como registros con __slots__ en lugar de diccionarios anidados: sin
+diccionario por objeto, con los textos categóricos ("Alto", "Sector Norte")
+internados y con el esquema validado al construirlos (desde_dict). Los
+registros se comportan como diccionarios (registro["vivienda"]["tipo"], .get,
+asignación), así que el código existente los usa sin cambios; a_dict retorna
+el diccionario anidado que se persiste.
+
+Los campos que faltan toman su valor por defecto y las familias también
+responden a las claves planas antiguas (familia["hacinamiento"]), de modo que
+los registros en uno u otro esquema se leen igual.
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+
+from almacen_familias import FACTORES_RIESGO
+
+
+# Marca de campo opcional ausente
+_AUSENTE = object()
+
+
+# --- Tipos de campo: convierten el valor recibido (None = ausente) o lanzan ValueError ---
+
+def TEXTO(valor):
+    if valor is None:
+        return ""
+    if not isinstance(valor, str):
+        raise ValueError(f"se esperaba texto, no {valor!r}")
+    return valor
+
+
+def CATEGORIA(valor):
+    """Texto de pocos valores distintos: se interna para que todos los registros compartan el mismo objeto"""
+    if type(valor) is str:
+        return sys.intern(valor)
+    if valor is None:
+        return None
+    if not isinstance(valor, str):
+        raise ValueError(f"se esperaba texto, no {valor!r}")
+    return sys.intern(str(valor))
+
+
+def VERSION(valor):
+    """Versión de las reglas de riesgo: número entero o texto"""
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    return CATEGORIA(valor)
+
+
+def ENTERO(valor):
+    if valor is None:
+        return None
+    try:
+        entero = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"se esperaba un número entero, no {valor!r}") from None
+    if entero != valor and not isinstance(valor, str):
+        raise ValueError(f"se esperaba un número entero, no {valor!r}")
+    return entero
+
+
+def NUMERO(valor):
+    if valor is None or isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"se esperaba un número, no {valor!r}") from None
+
+
+def BOOLEANO(valor):
+    return bool(valor)
+
+
+def LISTA(valor):
+    if valor is None:
+        return []
+    if not isinstance(valor, (list, tuple)):
+        raise ValueError(f"se esperaba una lista, no {valor!r}")
+    return list(valor)
+
+
+def CATEGORIAS(valor):
+    """Lista de valores categóricos (enfermedades, sectores, responsables...)"""
+    return [sys.intern(elemento) if type(elemento) is str else CATEGORIA(elemento) for elemento in LISTA(valor)]
+
+
+class Registro(MutableMapping):
+    """
+    Base de los registros. Cada subclase declara ESQUEMA {campo: tipo o
+    subclase de Registro}, los campos REQUERIDOS y los OPCIONALES (que pueden
+    faltar y entonces no aparecen en el registro). Las claves fuera del esquema
+    se conservan aparte, tal como vienen.
+    """
+
+    __slots__ = ("_extras",)
+    ESQUEMA = {}
+    REQUERIDOS = ()
+    OPCIONALES = ()
+    # Claves planas antiguas -> (grupo, campo) del esquema anidado
+    PLANOS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Conversión precompilada de cada campo: (campo, convertir, opcional, requerido)
+        cls._CAMPOS = tuple(
+            (campo, tipo.desde_dict if isinstance(tipo, type) and issubclass(tipo, Registro) else tipo,
+             campo in cls.OPCIONALES, campo in cls.REQUERIDOS)
+            for campo, tipo in cls.ESQUEMA.items()
+        )
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Construye y valida un registro desde un diccionario (anidado o con claves planas)"""
+        if type(datos) is not dict:
+            if isinstance(datos, cls):
+                return datos
+            if datos is None:
+                datos = {}
+            elif not isinstance(datos, Mapping):
+                raise ValueError(f"{cls.__name__}: se esperaba un diccionario, no {type(datos).__name__}")
+
+        registro = cls.__new__(cls)
+        planos = None
+        extras = None
+        esquema = cls.ESQUEMA
+        for clave in () if esquema.keys() >= datos.keys() else datos:
+            if clave in esquema:
+                continue
+            if clave in cls.PLANOS:
+                grupo, campo = cls.PLANOS[clave]
+                planos = planos or {}
+                planos.setdefault(grupo, {})[campo] = datos[clave]
+            else:
+                extras = extras or {}
+                extras[clave] = datos[clave]
+        registro._extras = extras
+
+        for campo, convertir, opcional, requerido in cls._CAMPOS:
+            valor = datos.get(campo, _AUSENTE)
+            if planos and campo in planos:
+                # El grupo anidado prevalece sobre las claves planas
+                valor = {**planos[campo], **(valor if isinstance(valor, Mapping) else {})}
+            elif valor is _AUSENTE:
+                if opcional:
+                    continue
+                valor = None
+            if requerido and (valor is None or valor == ""):
+                raise ValueError(f"{cls.__name__}: falta el campo obligatorio '{campo}'")
+            try:
+                setattr(registro, campo, convertir(valor))
+            except ValueError as error:
+                raise ValueError(f"{cls.__name__}.{campo}: {error}") from None
+        return registro
+
+    @classmethod
+    def _convertir(cls, campo, valor):
+        for nombre, convertir, _, requerido in cls._CAMPOS:
+            if nombre == campo:
+                if requerido and (valor is None or valor == ""):
+                    raise ValueError(f"{cls.__name__}: falta el campo obligatorio '{campo}'")
+                try:
+                    return convertir(valor)
+                except ValueError as error:
+                    raise ValueError(f"{cls.__name__}.{campo}: {error}") from None
+
+    def a_dict(self):
+        """Diccionario anidado con el formato de persistencia"""
+        datos = {}
+        for campo, _, _, _ in self._CAMPOS:
+            valor = getattr(self, campo, _AUSENTE)
+            if valor is not _AUSENTE:
+                datos[campo] = valor.a_dict() if isinstance(valor, Registro) else valor
+        if self._extras:
+            datos.update({clave: valor.a_dict() if isinstance(valor, Registro) else valor
+                          for clave, valor in self._extras.items()})
+        return datos
+
+    def copy(self):
+        """Copia superficial (los grupos anidados se comparten, como en dict.copy)"""
+        copia = type(self).__new__(type(self))
+        for campo in self.ESQUEMA:
+            valor = getattr(self, campo, _AUSENTE)
+            if valor is not _AUSENTE:
+                setattr(copia, campo, valor)
+        copia._extras = dict(self._extras) if self._extras else None
+        return copia
+
+    def __getitem__(self, clave):
+        if clave in self.ESQUEMA:
+            try:
+                return getattr(self, clave)
+            except AttributeError:
+                raise KeyError(clave) from None
+        if clave in self.PLANOS:
+            grupo, campo = self.PLANOS[clave]
+            return getattr(self, grupo)[campo]
+        if self._extras and clave in self._extras:
+            return self._extras[clave]
+        raise KeyError(clave)
+
+    def get(self, clave, defecto=None):
+        if clave in self.ESQUEMA:
+            return getattr(self, clave, defecto)
+        try:
+            return self[clave]
+        except KeyError:
+            return defecto
+
+    def __setitem__(self, clave, valor):
+        if clave in self.ESQUEMA:
+            setattr(self, clave, self._convertir(clave, valor))
+        elif clave in self.PLANOS:
+            grupo, campo = self.PLANOS[clave]
+            getattr(self, grupo)[campo] = valor
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[clave] = valor
+
+    def __delitem__(self, clave):
+        if clave in self.ESQUEMA:
+            if clave in self.OPCIONALES:
+                if not hasattr(self, clave):
+                    raise KeyError(clave)
+                delattr(self, clave)
+            else:
+                # Los campos del esquema siempre existen: vuelven a su valor por defecto
+                setattr(self, clave, self._convertir(clave, None))
+        elif self._extras and clave in self._extras:
+            del self._extras[clave]
+        else:
+            raise KeyError(clave)
+
+    def __iter__(self):
+        for campo in self.ESQUEMA:
+            if hasattr(self, campo):
+                yield campo
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.a_dict()!r})"
+
+    def __getstate__(self):
+        return self.a_dict()
+
+    def __setstate__(self, datos):
+        registro = self.desde_dict(datos)
+        for campo in self.ESQUEMA:
+            valor = getattr(registro, campo, _AUSENTE)
+            if valor is not _AUSENTE:
+                setattr(self, campo, valor)
+        self._extras = registro._extras
+
+
+
+# --- Familias ---
+
+class JefeHogar(Registro):
+    __slots__ = ("nombre", "edad", "ocupacion")
+    ESQUEMA = {"nombre": TEXTO, "edad": ENTERO, "ocupacion": CATEGORIA}
+
+
+class Vivienda(Registro):
+    __slots__ = ("tipo", "hacinamiento", "red_apoyo", "participacion_social", "acceso_aps")
+    ESQUEMA = {campo: CATEGORIA for campo in __slots__}
+
+
+class Salud(Registro):
+    __slots__ = ("enfermedades_cronicas",) + tuple(FACTORES_RIESGO)
+    ESQUEMA = {"enfermedades_cronicas": CATEGORIAS, **{factor: BOOLEANO for factor in FACTORES_RIESGO}}
+
+
+class NivelRiesgo(Registro):
+    __slots__ = ("nivel", "puntaje")
+    ESQUEMA = {"nivel": CATEGORIA, "puntaje": ENTERO}
+
+
+class Riesgos(Registro):
+    __slots__ = ("social", "sanitario", "version")
+    ESQUEMA = {"social": NivelRiesgo, "sanitario": NivelRiesgo, "version": VERSION}
+    OPCIONALES = ("version",)
+
+
+class Familia(Registro):
+    __slots__ = ("sector", "apellido", "num_integrantes", "jefe_hogar", "vivienda", "salud",
+                 "riesgos", "observaciones", "fecha_registro", "responsable")
+    ESQUEMA = {
+        "sector": CATEGORIA,
+        "apellido": TEXTO,
+        "num_integrantes": ENTERO,
+        "jefe_hogar": JefeHogar,
+        "vivienda": Vivienda,
+        "salud": Salud,
+        "riesgos": Riesgos,
+        "observaciones": TEXTO,
+        "fecha_registro": CATEGORIA,
+        "responsable": CATEGORIA,
+    }
+    REQUERIDOS = ("sector",)
+    OPCIONALES = ("riesgos",)
+    PLANOS = {
+        "nombre_jefe": ("jefe_hogar", "nombre"),
+        "edad_jefe": ("jefe_hogar", "edad"),
+        "ocupacion_jefe": ("jefe_hogar", "ocupacion"),
+        "tipo_vivienda": ("vivienda", "tipo"),
+        **{campo: ("vivienda", campo) for campo in ["hacinamiento", "red_apoyo", "participacion_social", "acceso_aps"]},
+        "enfermedades_cronicas": ("salud", "enfermedades_cronicas"),
+        **{factor: ("salud", factor) for factor in FACTORES_RIESGO},
+    }
+
+
+# --- Sectores y equipos de cabecera ---
+
+class ServiciosSector(Registro):
+    __slots__ = ("agua_potable", "electricidad", "alcantarillado", "transporte", "escuela",
+                 "cesfam", "organizaciones", "areas_verdes")
+    ESQUEMA = {campo: BOOLEANO for campo in __slots__}
+
+
+class Sector(Registro):
+    __slots__ = ("nombre", "poblacion_total", "num_familias", "tipo_territorio",
+                 "nivel_socioeconomico", "vulnerabilidad", "servicios", "problemas")
+    ESQUEMA = {
+        "nombre": CATEGORIA,
+        "poblacion_total": ENTERO,
+        "num_familias": ENTERO,
+        "tipo_territorio": CATEGORIA,
+        "nivel_socioeconomico": CATEGORIA,
+        "vulnerabilidad": CATEGORIA,
+        "servicios": ServiciosSector,
+        "problemas": CATEGORIAS,
+    }
+    REQUERIDOS = ("nombre",)
+
+
+class ComposicionEquipo(Registro):
+    __slots__ = ("medicos", "enfermeras", "tens", "matronas", "psicologos", "otros")
+    ESQUEMA = {campo: ENTERO for campo in __slots__}
+
+
+class InformacionEquipo(Registro):
+    __slots__ = ("jefe_equipo", "telefono", "horario", "modalidad", "experiencia", "capacitacion_mais")
+    ESQUEMA = {
+        "jefe_equipo": TEXTO,
+        "telefono": TEXTO,
+        "horario": CATEGORIA,
+        "modalidad": CATEGORIA,
+        "experiencia": ENTERO,
+        "capacitacion_mais": BOOLEANO,
+    }
+
+
+class Microareas(Registro):
+    __slots__ = ("numero", "familias_por_microarea", "responsable")
+    ESQUEMA = {"numero": ENTERO, "familias_por_microarea": ENTERO, "responsable": CATEGORIA}
+
+
+class Equipo(Registro):
+    __slots__ = ("sector", "composicion", "informacion", "microareas")
+    ESQUEMA = {
+        "sector": CATEGORIA,
+        "composicion": ComposicionEquipo,
+        "informacion": InformacionEquipo,
+        "microareas": Microareas,
+    }
+    REQUERIDOS = ("sector",)
+
+
+# --- Trabajo en red ---
+
+class ContactoInstitucion(Registro):
+    __slots__ = ("nombre", "telefono", "email")
+    ESQUEMA = {campo: TEXTO for campo in __slots__}
+
+
+class InformacionInstitucion(Registro):
+    __slots__ = ("horario", "modalidad", "nivel_coordinacion", "frecuencia_contacto")
+    ESQUEMA = {campo: CATEGORIA for campo in __slots__}
+
+
+class Institucion(Registro):
+    __slots__ = ("nombre", "tipo", "sectores_cobertura", "contacto", "informacion", "recursos",
+                 "poblacion_objetivo", "programas_servicios", "fortalezas", "debilidades",
+                 "oportunidades_trabajo", "fecha_registro")
+    ESQUEMA = {
+        "nombre": TEXTO,
+        "tipo": CATEGORIA,
+        "sectores_cobertura": CATEGORIAS,
+        "contacto": ContactoInstitucion,
+        "informacion": InformacionInstitucion,
+        "recursos": CATEGORIAS,
+        "poblacion_objetivo": CATEGORIAS,
+        "programas_servicios": TEXTO,
+        "fortalezas": TEXTO,
+        "debilidades": TEXTO,
+        "oportunidades_trabajo": TEXTO,
+        "fecha_registro": CATEGORIA,
+    }
+    REQUERIDOS = ("nombre",)
+
+
+# --- Plan de intervención ---
+
+class Cronograma(Registro):
+    __slots__ = ("fecha_inicio", "fecha_fin", "frecuencia")
+    ESQUEMA = {campo: CATEGORIA for campo in __slots__}
+
+
+class Metas(Registro):
+    __slots__ = ("cuantitativa", "cualitativa")
+    ESQUEMA = {campo: TEXTO for campo in __slots__}
+
+
+class ActividadPlan(Registro):
+    __slots__ = ("nombre", "tipo", "objetivo_general", "sectores_objetivo", "poblacion_objetivo",
+                 "objetivos_especificos", "actividades_especificas", "responsables",
+                 "instituciones_participantes", "recursos_necesarios", "presupuesto_estimado",
+                 "cronograma", "indicadores", "metas", "riesgos_contingencias", "fecha_creacion", "estado")
+    ESQUEMA = {
+        "nombre": TEXTO,
+        "tipo": CATEGORIA,
+        "objetivo_general": TEXTO,
+        "sectores_objetivo": CATEGORIAS,
+        "poblacion_objetivo": CATEGORIAS,
+        "objetivos_especificos": LISTA,
+        "actividades_especificas": LISTA,
+        "responsables": CATEGORIAS,
+        "instituciones_participantes": CATEGORIAS,
+        "recursos_necesarios": CATEGORIAS,
+        "presupuesto_estimado": NUMERO,
+        "cronograma": Cronograma,
+        "indicadores": LISTA,
+        "metas": Metas,
+        "riesgos_contingencias": TEXTO,
+        "fecha_creacion": TEXTO,
+        "estado": CATEGORIA,
+    }
+    REQUERIDOS = ("nombre",)
+
+
+# Colección de session_state -> tipo de registro
+REGISTROS = {
+    "familias": Familia,
+    "sectores": Sector,
+    "equipos": Equipo,
+    "instituciones": Institucion,
+    "plan_intervencion": ActividadPlan,
+}
+
+
+def convertir(coleccion, datos, estricto=True):
+    """
+    Lista de registros de una colección. Con estricto=False los elementos que no
+    pasan la validación se conservan tal como vienen (datos guardados antiguos).
+    """
+    tipo = REGISTROS[coleccion]
+    if estricto:
+        return [tipo.desde_dict(elemento) for elemento in datos or []]
+    registros = []
+    for elemento in datos or []:
+        try:
+            registros.append(tipo.desde_dict(elemento))
+        except ValueError:
+            registros.append(elemento)
+    return registros
+
+
+def a_json(valor):
+    """Para default= de json.dumps: los registros se serializan como su diccionario"""
+    if isinstance(valor, Registro):
+        return valor.a_dict()
+    raise TypeError(f"{type(valor).__name__} no es serializable en JSON")
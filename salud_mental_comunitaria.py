@@ -4,6 +4,17 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
+from persistencia import registrar_modulo, inicializar_modulo
+
+registrar_modulo("salud_mental_comunitaria", {
+    "salud_mental_comunitaria": lambda: {
+        'diagnosticos_comunitarios': [],
+        'intervenciones_grupales': [],
+        'redes_apoyo': [],
+        'indicadores_comunitarios': [],
+        'seguimientos': []
+    }
+})
 
 def mostrar_salud_mental_comunitaria():
     """
@@ -14,15 +25,8 @@ def mostrar_salud_mental_comunitaria():
     st.title("🧠 Salud Mental Comunitaria")
     st.markdown("### Diagnóstico e Intervención Comunitaria - Enfoque No Médico")
     
-    # Inicializar session state
-    if 'salud_mental_comunitaria' not in st.session_state:
-        st.session_state.salud_mental_comunitaria = {
-            'diagnosticos_comunitarios': [],
-            'intervenciones_grupales': [],
-            'redes_apoyo': [],
-            'indicadores_comunitarios': [],
-            'seguimientos': []
-        }
+    # Inicializar session state (carga diferida de los datos del usuario)
+    inicializar_modulo("salud_mental_comunitaria")
     
     # Pestañas principales
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from core.marcos import sectores_flat
+from registros import Sector
 
 def mostrar_sectorizacion():
     st.markdown("""
@@ -94,7 +95,7 @@ def mostrar_sectorizacion():
                     "problemas": problemas
                 }
                 
-                st.session_state.sectores.append(nuevo_sector)
+                st.session_state.sectores.append(Sector.desde_dict(nuevo_sector))
                 
 
                 
@@ -108,7 +109,7 @@ def mostrar_sectorizacion():
         st.markdown("### 📊 Sectores Registrados")
         
         # Crear DataFrame para visualización
-        df_sectores = pd.DataFrame(st.session_state.sectores)
+        df_sectores = sectores_flat(st.session_state.sectores)
         
         # Mostrar tabla
         st.dataframe(
@@ -0,0 +1,63 @@
+"""
+Familias de la sesión de Streamlit
+Mantiene el almacén columnar sincronizado con st.session_state.familias y anota
+en el rastreo de cambios cada familia modificada. Es el único punto donde el
+almacén, el motor de riesgo y los agregados se conectan con la sesión.
+"""
+
+import streamlit as st
+
+from almacen_familias import AlmacenFamilias
+from motor_riesgo import actualizar_riesgos_vencidos, recalcular_riesgos_almacen
+from persistencia import marcar_cambios
+from registros import Familia
+
+
+def obtener_almacen_familias():
+    """
+    Retorna el almacén columnar sincronizado con st.session_state.familias.
+    Las familias agregadas al final de la lista se incorporan sin reconstruir
+    (para modificar o eliminar, usar actualizar_familia y eliminar_familia); si
+    la lista se reemplaza o se acorta por otra vía, el almacén se reconstruye. Las familias
+    puntuadas con reglas de riesgo anteriores se recalculan en bloque al leerlas.
+    """
+    familias = st.session_state.get("familias", [])
+    almacen = st.session_state.get("_almacen_familias")
+    if almacen is None or almacen.origen is not familias or len(almacen) > len(familias):
+        almacen = AlmacenFamilias(familias)
+        almacen.origen = familias
+        st.session_state._almacen_familias = almacen
+    elif len(almacen) < len(familias):
+        almacen.extender(familias[len(almacen):])
+
+    cambiadas = actualizar_riesgos_vencidos(almacen, familias)
+    if cambiadas:
+        marcar_cambios("familias", cambiadas)
+    return almacen
+
+
+def actualizar_familia(posicion, familia):
+    """Reemplaza una familia de la sesión y la fila correspondiente del almacén"""
+    familia = Familia.desde_dict(familia)
+    almacen = obtener_almacen_familias()
+    st.session_state.familias[posicion] = familia
+    almacen.actualizar(posicion, familia)
+    marcar_cambios("familias", [posicion])
+
+
+def eliminar_familia(posicion):
+    """Elimina una familia de la sesión sin reconstruir el almacén"""
+    almacen = obtener_almacen_familias()
+    del st.session_state.familias[posicion]
+    almacen.eliminar(posicion)
+    # Las familias siguientes se corren una posición
+    marcar_cambios("familias", range(posicion, len(st.session_state.familias)))
+
+
+def recalcular_riesgos_sesion():
+    """Recalcula con las reglas vigentes los riesgos de todas las familias de la sesión"""
+    if not st.session_state.get("familias"):
+        return 0
+    cambiadas = recalcular_riesgos_almacen(obtener_almacen_familias(), st.session_state.familias)
+    marcar_cambios("familias", cambiadas)
+    return len(cambiadas)
@@ -4,11 +4,22 @@ import json
 import os
 from datetime import datetime
 import hashlib
+from almacenamiento import (
+    DIRECTORIO_USUARIOS, COLECCIONES_LISTA, COLECCIONES_OBJETO,
+    crear_almacenamiento, datos_iniciales
+)
+from rastreo_cambios import RastreadorCambios
+from registros import REGISTROS, convertir
+from persistencia import claves_a_guardar, marcar_modulos_pendientes, modulos_registrados
+from autoguardado import vaciar_pendientes
+from paginacion import controles_paginacion
+from memoria_sesion import mostrar_memoria_sesiones
 
 class SistemaUsuarios:
-    def __init__(self):
-        self.directorio_usuarios = "datos_usuarios"
+    def __init__(self, almacenamiento=None):
+        self.directorio_usuarios = DIRECTORIO_USUARIOS
         self.crear_directorio_usuarios()
+        self.almacenamiento = almacenamiento or crear_almacenamiento(directorio=self.directorio_usuarios)
     
     def crear_directorio_usuarios(self):
         """Crea el directorio para almacenar datos de usuarios"""
@@ -24,47 +35,42 @@ class SistemaUsuarios:
         """Registra un nuevo usuario"""
         user_id = self.generar_id_usuario(nombre, email)
         
-        datos_usuario = {
+        perfil = {
             "user_id": user_id,
             "nombre": nombre,
             "email": email,
             "curso": curso,
-            "fecha_registro": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "datos": {
-                "sectores": [],
-                "equipos": [],
-                "familias": [],
-                "instituciones": [],
-                "plan_intervencion": [],
-                "diagnostico": None,
-                "autoevaluacion": None,
-                "evaluacion_mais": None
-            }
+            "fecha_registro": datetime.now().strftime("%Y-%m-%d %H:%M")
         }
         
         # Guardar datos del usuario
-        archivo_usuario = f"{self.directorio_usuarios}/{user_id}.json"
-        with open(archivo_usuario, 'w', encoding='utf-8') as f:
-            json.dump(datos_usuario, f, indent=2, ensure_ascii=False)
+        self.almacenamiento.crear_usuario(perfil, datos_iniciales())
         
         return user_id
     
     def cargar_datos_usuario(self, user_id):
         """Carga los datos de un usuario específico"""
-        archivo_usuario = f"{self.directorio_usuarios}/{user_id}.json"
+        # Evita leer datos antiguos si quedan escrituras en el autoguardado
+        vaciar_pendientes()
+        perfil = self.almacenamiento.cargar_perfil(user_id)
         
-        if os.path.exists(archivo_usuario):
-            with open(archivo_usuario, 'r', encoding='utf-8') as f:
-                datos_usuario = json.load(f)
-            
+        if perfil:
             # Cargar datos en session state
             st.session_state.user_id = user_id
-            st.session_state.nombre_usuario = datos_usuario["nombre"]
-            st.session_state.email_usuario = datos_usuario["email"]
-            st.session_state.curso_usuario = datos_usuario["curso"]
+            st.session_state.nombre_usuario = perfil["nombre"]
+            st.session_state.email_usuario = perfil["email"]
+            st.session_state.curso_usuario = perfil["curso"]
             
-            # Cargar datos del proyecto
-            datos = datos_usuario["datos"]
+            # Cargar datos del proyecto (los módulos se cargan al abrir su página)
+            datos = self.almacenamiento.cargar_datos(user_id, COLECCIONES_LISTA + COLECCIONES_OBJETO)
+            # Las colecciones se convierten antes de tomar la base para que las huellas coincidan
+            for coleccion in REGISTROS:
+                if datos.get(coleccion):
+                    datos[coleccion] = convertir(coleccion, datos[coleccion], estricto=False)
+            rastreador = RastreadorCambios()
+            rastreador.registrar_base(datos)
+            st.session_state._rastreador_cambios = rastreador
+            marcar_modulos_pendientes()
             st.session_state.sectores = datos.get("sectores", [])
             st.session_state.equipos = datos.get("equipos", [])
             st.session_state.familias = datos.get("familias", [])
@@ -77,45 +83,57 @@ class SistemaUsuarios:
             return True
         return False
     
+    def cargar_datos_modulo(self, user_id, nombre_modulo):
+        """Carga desde el almacenamiento las claves de session_state declaradas por un módulo"""
+        claves = modulos_registrados()[nombre_modulo]
+        datos = self.almacenamiento.cargar_datos(user_id, list(claves)) or {}
+        rastreador = st.session_state.get("_rastreador_cambios") or RastreadorCambios()
+        
+        for clave in claves:
+            # Un valor asignado en la sesión después del login (p. ej. datos de ejemplo) tiene prioridad
+            if clave in datos and clave not in st.session_state:
+                st.session_state[clave] = datos[clave]
+                rastreador.registrar_base({clave: datos[clave]})
+        
+        st.session_state._rastreador_cambios = rastreador
+    
+    @staticmethod
+    def datos_sesion():
+        """Retorna las colecciones persistentes de la sesión actual"""
+        datos = {coleccion: st.session_state.get(coleccion, []) for coleccion in COLECCIONES_LISTA}
+        datos.update({coleccion: st.session_state.get(coleccion) for coleccion in COLECCIONES_OBJETO})
+        datos.update({clave: st.session_state[clave] for clave in claves_a_guardar() if clave in st.session_state})
+        return datos
+    
     def guardar_datos_usuario(self, user_id):
-        """Guarda los datos actuales del usuario"""
-        archivo_usuario = f"{self.directorio_usuarios}/{user_id}.json"
+        """Guarda solo las colecciones y registros modificados desde la última carga o guardado"""
+        # Primero se escriben los cambios ya enviados al autoguardado, para conservar el orden
+        vaciar_pendientes()
+        datos = self.datos_sesion()
         
-        if os.path.exists(archivo_usuario):
-            with open(archivo_usuario, 'r', encoding='utf-8') as f:
-                datos_usuario = json.load(f)
-            
-            # Actualizar datos del proyecto
-            datos_usuario["datos"] = {
-                "sectores": st.session_state.get("sectores", []),
-                "equipos": st.session_state.get("equipos", []),
-                "familias": st.session_state.get("familias", []),
-                "instituciones": st.session_state.get("instituciones", []),
-                "plan_intervencion": st.session_state.get("plan_intervencion", []),
-                "diagnostico": st.session_state.get("diagnostico"),
-                "autoevaluacion": st.session_state.get("autoevaluacion"),
-                "evaluacion_mais": st.session_state.get("evaluacion_mais")
-            }
-            
-            # Guardar archivo actualizado
-            with open(archivo_usuario, 'w', encoding='utf-8') as f:
-                json.dump(datos_usuario, f, indent=2, ensure_ascii=False)
-    
-    def listar_usuarios(self):
-        """Lista todos los usuarios registrados"""
-        usuarios = []
-        for archivo in os.listdir(self.directorio_usuarios):
-            if archivo.endswith('.json'):
-                with open(f"{self.directorio_usuarios}/{archivo}", 'r', encoding='utf-8') as f:
-                    datos_usuario = json.load(f)
-                    usuarios.append({
-                        "user_id": datos_usuario["user_id"],
-                        "nombre": datos_usuario["nombre"],
-                        "email": datos_usuario["email"],
-                        "curso": datos_usuario["curso"],
-                        "fecha_registro": datos_usuario["fecha_registro"]
-                    })
-        return usuarios
+        # Sin rastreador (sesión anterior al rastreo) se escribe todo
+        rastreador = st.session_state.get("_rastreador_cambios") or RastreadorCambios()
+        pedido = rastreador.pendientes(datos)
+        cambios, huellas_nuevas = rastreador.calcular_cambios(pedido)
+        try:
+            guardado = self.almacenamiento.aplicar_cambios(user_id, cambios)
+        except Exception:
+            rastreador.devolver(pedido)
+            raise
+        if not guardado:
+            rastreador.devolver(pedido)
+            return False
+        rastreador.confirmar(huellas_nuevas)
+        st.session_state._rastreador_cambios = rastreador
+        return True
+    
+    def listar_usuarios(self, limite=None, desplazamiento=0):
+        """Lista los usuarios registrados desde el catálogo (sin cargar sus datos)"""
+        return self.almacenamiento.listar_perfiles(limite, desplazamiento)
+    
+    def estadisticas_usuarios(self):
+        """Retorna total de usuarios, cursos distintos y fecha del último registro"""
+        return self.almacenamiento.estadisticas_catalogo()
 
 def mostrar_login():
     """Interfaz de login/registro"""
@@ -145,6 +163,9 @@ def mostrar_login():
         
         with col2:
             if st.button("🚪 Cerrar Sesión"):
+                # Guardar lo último antes de cerrar
+                sistema.guardar_datos_usuario(st.session_state.user_id)
+                
                 # Limpiar session state
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
@@ -201,28 +222,31 @@ def mostrar_admin():
     st.markdown("## 👨‍🏫 Panel de Administración")
     
     sistema = SistemaUsuarios()
-    usuarios = sistema.listar_usuarios()
+    estadisticas = sistema.estadisticas_usuarios()
     
-    if usuarios:
+    if estadisticas["total_usuarios"]:
         st.markdown("### 📊 Usuarios Registrados")
         
+        # Paginación sobre el catálogo
+        desplazamiento, tamano_pagina = controles_paginacion(
+            estadisticas["total_usuarios"], "admin", etiqueta="Usuarios por página", tamanos=[25, 50, 100]
+        )
+        usuarios = sistema.listar_usuarios(limite=tamano_pagina, desplazamiento=desplazamiento)
         df_usuarios = pd.DataFrame(usuarios)
         st.dataframe(df_usuarios, use_container_width=True)
         
         # Estadísticas
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Usuarios", len(usuarios))
+            st.metric("Total Usuarios", estadisticas["total_usuarios"])
         with col2:
-            cursos_unicos = df_usuarios["curso"].nunique()
-            st.metric("Cursos", cursos_unicos)
+            st.metric("Cursos", estadisticas["cursos"])
         with col3:
-            fecha_mas_reciente = max(usuarios, key=lambda x: x["fecha_registro"])
-            st.metric("Último Registro", str(fecha_mas_reciente["fecha_registro"][:10]))
+            st.metric("Último Registro", str((estadisticas["ultimo_registro"] or "")[:10]))
         
         # Exportar datos
         if st.button("📤 Exportar Datos de Usuarios"):
-            csv_data = df_usuarios.to_csv(index=False)
+            csv_data = pd.DataFrame(sistema.listar_usuarios()).to_csv(index=False)
             st.download_button(
                 label="💾 Descargar CSV",
                 data=csv_data,
@@ -231,6 +255,9 @@ def mostrar_admin():
             )
     else:
         st.info("📝 No hay usuarios registrados aún.")
+    
+    st.markdown("### 🧠 Memoria de las Sesiones")
+    mostrar_memoria_sesiones()
 
 if __name__ == "__main__":
     mostrar_login() 
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Configuración común de las pruebas: módulos de la raíz y datos sintéticos pequeños"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def perfil():
+    """Construye el perfil de un usuario de prueba"""
+    def construir(user_id, fecha="2025-01-01 10:00"):
+        return {"user_id": user_id, "nombre": f"Usuario {user_id}", "email": f"{user_id}@correo.cl",
+                "curso": "TENS", "fecha_registro": fecha}
+    return construir
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def almacenamiento(request, tmp_path):
+    from almacenamiento import ARCHIVO_SQLITE, AlmacenamientoJSON, AlmacenamientoSQLite
+    if request.param == "json":
+        return AlmacenamientoJSON(str(tmp_path))
+    return AlmacenamientoSQLite(str(tmp_path / ARCHIVO_SQLITE))
+
+
+@pytest.fixture(scope="session")
+def poblacion():
+    from generador_poblacion import generar_poblacion
+    return generar_poblacion(n_familias=400, n_sectores=5, semilla=7, n_pacientes=0, n_teletriage=0)
+
+
+@pytest.fixture
+def familias(poblacion):
+    import copy
+    return copy.deepcopy(poblacion["familias"])
@@ -0,0 +1,79 @@
+"""Los contadores incrementales coinciden con los de un almacén construido desde cero"""
+
+import numpy as np
+
+from almacen_familias import AlmacenFamilias
+from motor_riesgo import calcular_riesgos_lote
+
+
+def por_sector(almacen, conteos):
+    sectores = almacen.categorias["sector"].categorias
+    return {sector: int(conteo) for sector, conteo in zip(sectores, conteos) if conteo}
+
+
+def resumen(almacen):
+    agregados = almacen.agregados
+    return {
+        "problemas": agregados.problemas.tolist(),
+        "alto_riesgo": agregados.alto_riesgo,
+        "niveles": {nombre: agregados.niveles(nombre) for nombre in ("riesgo_social", "riesgo_sanitario")},
+        "sector_total": por_sector(almacen, agregados.sector_total),
+        "sector_alto_riesgo": por_sector(almacen, agregados.sector_alto_riesgo),
+        "sector_problemas": {
+            sector: fila.tolist()
+            for sector, fila in zip(almacen.categorias["sector"].categorias, agregados.sector_problemas)
+            if fila.any()
+        },
+    }
+
+
+def test_construccion_igual_a_recuento(familias):
+    almacen = AlmacenFamilias(familias)
+    assert almacen.contar_alto_riesgo() == int(almacen.mascara_alto_riesgo().sum())
+    assert por_sector(almacen, almacen.agregados.sector_total) == almacen.contar("sector")
+
+
+def test_tras_extender(familias):
+    almacen = AlmacenFamilias(familias[:50])
+    almacen.extender(familias[50:])
+    almacen.agregar(dict(familias[0], sector="Sector nuevo"))
+    familias.append(dict(familias[0], sector="Sector nuevo"))
+    assert resumen(almacen) == resumen(AlmacenFamilias(familias))
+
+
+def test_tras_editar(familias):
+    almacen = AlmacenFamilias(familias)
+    editada = dict(
+        familias[5],
+        sector=familias[6]["sector"],
+        vivienda=dict(familias[5]["vivienda"], hacinamiento="Alto", red_apoyo="Débil"),
+        salud=dict(familias[5]["salud"], enfermedades_cronicas=["Diabetes", "Obesidad"], desempleo=True),
+        riesgos={"social": {"nivel": "Alto", "puntaje": 12}, "sanitario": {"nivel": "Alto", "puntaje": 11}},
+    )
+    almacen.actualizar(5, editada)
+    familias[5] = editada
+    assert resumen(almacen) == resumen(AlmacenFamilias(familias))
+
+
+def test_tras_eliminar(familias):
+    almacen = AlmacenFamilias(familias)
+    for posicion in (0, 17, -1):
+        almacen.eliminar(posicion)
+        del familias[posicion]
+    assert len(almacen) == len(familias)
+    assert resumen(almacen) == resumen(AlmacenFamilias(familias))
+
+
+def test_tras_asignar_riesgos(familias):
+    almacen = AlmacenFamilias(familias)
+    posiciones = np.arange(0, len(familias), 2)
+    resultado = calcular_riesgos_lote(almacen, posiciones=posiciones)
+    almacen.asignar_riesgos(resultado, posiciones=posiciones)
+    for posicion, social, sanitario in zip(posiciones.tolist(), resultado["riesgo_social"], resultado["riesgo_sanitario"]):
+        riesgos = familias[posicion]["riesgos"]
+        riesgos["social"]["nivel"] = social
+        riesgos["sanitario"]["nivel"] = sanitario
+    esperado = resumen(AlmacenFamilias(familias))
+    obtenido = resumen(almacen)
+    for clave in ("alto_riesgo", "niveles", "sector_alto_riesgo"):
+        assert obtenido[clave] == esperado[clave]
@@ -0,0 +1,86 @@
+"""Backends JSON y SQLite y migración entre ellos"""
+
+from almacenamiento import (
+    ARCHIVO_SQLITE, AlmacenamientoJSON, AlmacenamientoSQLite, crear_almacenamiento,
+    datos_iniciales, migrar_json_a_sqlite
+)
+from rastreo_cambios import cambios_completos
+
+
+def test_crear_y_cargar_usuario(almacenamiento, perfil):
+    datos = datos_iniciales()
+    datos["sectores"] = [{"nombre": "Norte"}, {"nombre": "Sur"}]
+    datos["diagnostico"] = {"problemas": ["agua"]}
+    almacenamiento.crear_usuario(perfil("u1"), datos)
+
+    assert almacenamiento.existe_usuario("u1")
+    assert not almacenamiento.existe_usuario("otro")
+    assert almacenamiento.cargar_perfil("u1") == perfil("u1")
+    assert almacenamiento.cargar_perfil("otro") is None
+    assert almacenamiento.cargar_datos("u1") == datos
+    assert almacenamiento.cargar_datos("u1", ["sectores"]) == {"sectores": datos["sectores"]}
+    assert almacenamiento.cargar_datos("otro") is None
+
+
+def test_aplicar_cambios_parciales(almacenamiento, perfil):
+    almacenamiento.crear_usuario(perfil("u1"), {"familias": [{"i": 0}, {"i": 1}, {"i": 2}], "diagnostico": None})
+
+    cambios = {
+        "familias": {"tipo": "lista", "registros": {1: {"i": 10}, 3: {"i": 3}}, "longitud": 4},
+        "diagnostico": {"tipo": "objeto", "valor": {"a": 1}},
+    }
+    assert almacenamiento.aplicar_cambios("u1", cambios)
+    assert almacenamiento.cargar_datos("u1") == {
+        "familias": [{"i": 0}, {"i": 10}, {"i": 2}, {"i": 3}], "diagnostico": {"a": 1}
+    }
+
+    # Una longitud menor descarta los registros sobrantes
+    assert almacenamiento.aplicar_cambios("u1", {"familias": {"tipo": "lista", "registros": {}, "longitud": 2}})
+    assert almacenamiento.cargar_datos("u1", ["familias"]) == {"familias": [{"i": 0}, {"i": 10}]}
+
+    assert almacenamiento.aplicar_cambios("u1", {})
+    assert not almacenamiento.aplicar_cambios("otro", cambios)
+
+
+def test_guardar_datos_completos(almacenamiento, perfil):
+    almacenamiento.crear_usuario(perfil("u1"))
+    assert almacenamiento.guardar_datos("u1", {"equipos": [{"n": 1}], "autoevaluacion": {"x": 2}})
+    datos = almacenamiento.cargar_datos("u1", ["equipos", "autoevaluacion", "sectores"])
+    assert datos == {"equipos": [{"n": 1}], "autoevaluacion": {"x": 2}, "sectores": []}
+
+
+def test_migrar_json_a_sqlite(tmp_path, perfil):
+    origen = AlmacenamientoJSON(str(tmp_path))
+    origen.crear_usuario(perfil("u1"), {"familias": [{"apellido": "Soto"}], "diagnostico": {"a": 1}})
+    origen.crear_usuario(perfil("u2"), {"sectores": [{"nombre": "Sur"}]})
+    destino = AlmacenamientoSQLite(str(tmp_path / ARCHIVO_SQLITE))
+
+    assert not destino.migracion_completa()
+    assert migrar_json_a_sqlite(origen, destino) == 2
+    assert destino.migracion_completa()
+    for user_id in ("u1", "u2"):
+        assert destino.cargar_perfil(user_id) == origen.cargar_perfil(user_id)
+        assert destino.cargar_datos(user_id) == origen.cargar_datos(user_id)
+
+    # Repetir la migración no copia de nuevo ni pisa lo guardado después en SQLite
+    destino.guardar_datos("u1", {"familias": []})
+    assert migrar_json_a_sqlite(origen, destino) == 0
+    assert destino.cargar_datos("u1", ["familias"]) == {"familias": []}
+
+
+def test_crear_almacenamiento_migra_mientras_falte_la_marca(tmp_path, perfil):
+    AlmacenamientoJSON(str(tmp_path)).crear_usuario(perfil("u1"), {"sectores": [{"nombre": "Norte"}]})
+
+    almacenamiento = crear_almacenamiento("sqlite", directorio=str(tmp_path))
+    assert isinstance(almacenamiento, AlmacenamientoSQLite)
+    assert almacenamiento.migracion_completa()
+    assert almacenamiento.cargar_datos("u1", ["sectores"]) == {"sectores": [{"nombre": "Norte"}]}
+    assert crear_almacenamiento("sqlite", directorio=str(tmp_path)) is almacenamiento
+
+
+def test_cambios_completos():
+    cambios = cambios_completos({"lista": ["a", "b"], "objeto": {"x": 1}})
+    assert cambios == {
+        "lista": {"tipo": "lista", "registros": {0: "a", 1: "b"}, "longitud": 2},
+        "objeto": {"tipo": "objeto", "valor": {"x": 1}},
+    }
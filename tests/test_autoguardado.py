@@ -0,0 +1,158 @@
+"""Autoguardado: agrupación de ráfagas, contrapresión, copia en el hilo del script y término del hilo"""
+
+import threading
+
+import pytest
+
+from almacenamiento import AlmacenamientoJSON
+from autoguardado import GestorAutoguardado, combinar_cambios
+from rastreo_cambios import RastreadorCambios
+
+
+class AlmacenamientoRetenido(AlmacenamientoJSON):
+    """Almacén cuyas escrituras esperan una señal, para llenar la cola a voluntad"""
+
+    def __init__(self, directorio):
+        super().__init__(directorio)
+        self.escribiendo = threading.Event()
+        self.continuar = threading.Event()
+
+    def aplicar_cambios(self, user_id, cambios):
+        self.escribiendo.set()
+        assert self.continuar.wait(10)
+        return super().aplicar_cambios(user_id, cambios)
+
+
+class AlmacenamientoFallido(AlmacenamientoJSON):
+    def aplicar_cambios(self, user_id, cambios):
+        raise OSError("disco lleno")
+
+
+def lista(registros, longitud):
+    return {"tipo": "lista", "registros": registros, "longitud": longitud}
+
+
+@pytest.fixture
+def almacenamiento(tmp_path):
+    almacenamiento = AlmacenamientoJSON(str(tmp_path))
+    almacenamiento.crear_usuario({"user_id": "u1", "nombre": "n", "email": "e", "curso": "c"}, {"familias": []})
+    return almacenamiento
+
+
+def test_combinar_cambios():
+    pendientes = {"familias": lista({0: "a", 3: "d"}, 4), "diagnostico": {"tipo": "objeto", "valor": 1}}
+    combinar_cambios(pendientes, {"familias": lista({1: "b"}, 3), "diagnostico": {"tipo": "objeto", "valor": 2}})
+    assert pendientes == {"familias": lista({0: "a", 1: "b"}, 3), "diagnostico": {"tipo": "objeto", "valor": 2}}
+
+
+def test_rafaga_se_agrupa_en_una_escritura(almacenamiento):
+    gestor = GestorAutoguardado(almacenamiento, ventana=30, capacidad=16)
+    try:
+        for i in range(5):
+            assert gestor.notificar("u1", {"familias": lista({i: {"i": i}}, i + 1)})
+        assert gestor.vaciar()
+        metricas = gestor.metricas()
+        assert metricas["notificaciones"] == 5
+        assert metricas["agrupadas"] == 4
+        assert metricas["escrituras"] == 1
+        assert almacenamiento.cargar_datos("u1", ["familias"]) == {"familias": [{"i": i} for i in range(5)]}
+    finally:
+        gestor.detener()
+
+
+def test_cola_llena_rechaza_sin_bloquear(tmp_path):
+    almacenamiento = AlmacenamientoRetenido(str(tmp_path))
+    almacenamiento.continuar.set()
+    almacenamiento.crear_usuario({"user_id": "u1", "nombre": "n", "email": "e", "curso": "c"}, {"familias": []})
+    almacenamiento.continuar.clear()
+    almacenamiento.escribiendo.clear()
+
+    gestor = GestorAutoguardado(almacenamiento, ventana=0, capacidad=1)
+    try:
+        assert gestor.notificar("u1", {"familias": lista({0: "a"}, 1)})
+        assert almacenamiento.escribiendo.wait(10)
+        # El hilo está escribiendo: cabe una notificación más en la cola y la siguiente se rechaza
+        assert gestor.notificar("u1", {"familias": lista({1: "b"}, 2)})
+        assert not gestor.notificar("u1", {"familias": lista({2: "c"}, 3)})
+        assert gestor.metricas()["rechazadas"] == 1
+        assert gestor.metricas()["max_profundidad_cola"] == 1
+    finally:
+        almacenamiento.continuar.set()
+        gestor.detener()
+    assert almacenamiento.cargar_datos("u1", ["familias"]) == {"familias": ["a", "b"]}
+
+
+def test_huellas_se_calculan_en_el_hilo_de_escritura(almacenamiento):
+    datos = {"familias": [{"i": 0}, {"i": 1}]}
+    rastreador = RastreadorCambios()
+    rastreador.registrar_base({"familias": []})
+    gestor = GestorAutoguardado(almacenamiento, ventana=0, capacidad=4)
+    try:
+        assert gestor.notificar("u1", rastreador.copiar(rastreador.pendientes(datos)), rastreador)
+        assert gestor.vaciar()
+        assert almacenamiento.cargar_datos("u1", ["familias"]) == datos
+
+        # Ya confirmado: una posición marcada sin cambios no se vuelve a escribir
+        rastreador.marcar("familias", [0])
+        assert gestor.notificar("u1", rastreador.copiar(rastreador.pendientes(datos)), rastreador)
+        assert gestor.vaciar()
+        assert gestor.metricas()["escrituras"] == 1
+    finally:
+        gestor.detener()
+
+
+def test_la_copia_aisla_cambios_posteriores(tmp_path):
+    almacenamiento = AlmacenamientoRetenido(str(tmp_path))
+    almacenamiento.continuar.set()
+    almacenamiento.crear_usuario({"user_id": "u1", "nombre": "n", "email": "e", "curso": "c"}, {"familias": []})
+    almacenamiento.continuar.clear()
+
+    datos = {"familias": [{"i": 0}, {"i": 1}]}
+    rastreador = RastreadorCambios()
+    rastreador.registrar_base({"familias": []})
+    gestor = GestorAutoguardado(almacenamiento, ventana=0, capacidad=4)
+    try:
+        assert gestor.notificar("u1", rastreador.copiar(rastreador.pendientes(datos)), rastreador)
+        # La próxima ejecución modifica la sesión mientras el hilo todavía no escribe
+        datos["familias"][1]["i"] = 99
+        datos["familias"].append({"i": 2})
+        almacenamiento.continuar.set()
+        assert gestor.vaciar()
+    finally:
+        almacenamiento.continuar.set()
+        gestor.detener()
+    assert almacenamiento.cargar_datos("u1", ["familias"]) == {"familias": [{"i": 0}, {"i": 1}]}
+
+    # Las huellas confirmadas son las de la copia: el cambio posterior se escribe al marcarlo
+    rastreador.marcar("familias", [1])
+    cambios, _ = rastreador.calcular_cambios(rastreador.pendientes(datos))
+    assert cambios["familias"]["registros"] == {1: {"i": 99}, 2: {"i": 2}}
+
+
+def test_detener_escribe_lo_pendiente_y_termina(almacenamiento):
+    gestor = GestorAutoguardado(almacenamiento, ventana=30, capacidad=4)
+    assert gestor.notificar("u1", {"familias": lista({0: "a"}, 1)})
+    assert gestor.detener(timeout=5)
+    assert not gestor._hilo.is_alive()
+    assert almacenamiento.cargar_datos("u1", ["familias"]) == {"familias": ["a"]}
+
+
+def test_escritura_fallida_olvida_la_base(tmp_path):
+    almacenamiento = AlmacenamientoFallido(str(tmp_path))
+    datos = {"familias": [{"i": 0}, {"i": 1}]}
+    rastreador = RastreadorCambios()
+    rastreador.registrar_base(datos)
+    datos["familias"][1]["i"] = 10
+    rastreador.marcar("familias", [1])
+
+    gestor = GestorAutoguardado(almacenamiento, ventana=0, capacidad=4)
+    try:
+        assert gestor.notificar("u1", rastreador.copiar(rastreador.pendientes(datos)), rastreador)
+        assert gestor.vaciar()
+        assert gestor.metricas()["errores"] == 1
+    finally:
+        gestor.detener()
+
+    # El próximo guardado reescribe la colección completa
+    cambios, _ = rastreador.calcular_cambios(rastreador.pendientes(datos))
+    assert cambios["familias"]["registros"] == {0: {"i": 0}, 1: {"i": 10}}
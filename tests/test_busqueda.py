@@ -0,0 +1,64 @@
+"""La búsqueda por trigramas entrega lo mismo que un filtro lineal sobre las familias"""
+
+import pytest
+
+from almacen_familias import AlmacenFamilias
+from busqueda_familias import normalizar
+
+
+def filtrar(familias, condicion):
+    return [posicion for posicion, familia in enumerate(familias) if condicion(familia)]
+
+
+def coincide(consulta, familia):
+    """Oráculo: cada palabra es inicio de una palabra del campo o, si tiene 3 letras o más, parte del texto"""
+    partes = normalizar(consulta).split()
+    if not partes:
+        return False
+    for texto in (familia.get("apellido", ""), (familia.get("jefe_hogar") or {}).get("nombre", "")):
+        texto = normalizar(texto)
+        palabras = texto.split()
+        if all(any(palabra.startswith(parte) for palabra in palabras) or (len(parte) >= 3 and parte in texto)
+               for parte in partes):
+            return True
+    return False
+
+
+def test_busqueda_igual_a_filtro_lineal(familias):
+    familias.append(dict(familias[0], apellido="Núñez Ñandú", jefe_hogar={"nombre": "José Pérez"}))
+    almacen = AlmacenFamilias(familias)
+    busqueda = almacen.busqueda()
+    apellido = familias[0]["apellido"]
+    for consulta in [apellido, apellido[:2], apellido[1:5].upper(), "nunez", "NANDU jo", "ose per", "a", "zzz", "   "]:
+        resultado = busqueda.buscar(consulta)
+        assert sorted(resultado) == filtrar(familias, lambda f: coincide(consulta, f)), consulta
+        assert len(set(resultado)) == len(resultado)
+
+
+def test_busqueda_ordena_por_relevancia(familias):
+    familias.extend([
+        dict(familias[0], apellido="Zaldívar Riquelme", jefe_hogar={"nombre": "Ana"}),
+        dict(familias[0], apellido="Zaldivar", jefe_hogar={"nombre": "Ana"}),
+        dict(familias[0], apellido="Lazaldivar", jefe_hogar={"nombre": "Ana"}),
+    ])
+    almacen = AlmacenFamilias(familias)
+    resultado = almacen.busqueda().buscar("zaldivar")
+    n = len(familias)
+    exacta, inicio, contenida = n - 2, n - 3, n - 1
+    assert resultado.index(exacta) < resultado.index(inicio) < resultado.index(contenida)
+    assert almacen.busqueda().buscar("Zaldívar", limite=2)[0] == exacta
+
+
+@pytest.mark.parametrize("consulta", ["soto", "an"])
+def test_busqueda_restringida_a_posiciones(familias, consulta):
+    almacen = AlmacenFamilias(familias)
+    posiciones = list(range(0, len(familias), 3))
+    completo = almacen.busqueda().buscar(consulta)
+    assert almacen.busqueda().buscar(consulta, posiciones=posiciones) == [p for p in completo if p in set(posiciones)]
+
+
+def test_busqueda_tras_registrar(familias):
+    almacen = AlmacenFamilias(familias[:100])
+    almacen.busqueda()
+    almacen.extender(familias[100:])
+    assert sorted(almacen.busqueda().buscar("ma")) == filtrar(familias, lambda f: coincide("ma", f))
@@ -0,0 +1,31 @@
+"""Catálogo de usuarios: listado paginado y estadísticas sin leer cada perfil"""
+
+import os
+
+from almacenamiento import AlmacenamientoJSON
+
+
+def test_catalogo_y_estadisticas(almacenamiento, perfil):
+    for i, fecha in enumerate(["2025-01-03 09:00", "2025-01-01 09:00", "2025-01-02 09:00"]):
+        almacenamiento.crear_usuario(perfil(f"u{i}", fecha))
+    almacenamiento.guardar_datos("u1", {"sectores": [{"nombre": "Norte"}]})
+
+    perfiles = almacenamiento.listar_perfiles()
+    assert [p["user_id"] for p in perfiles] == ["u0", "u2", "u1"]
+    assert all(p["ultimo_guardado"] and p["tamano_datos"] > 0 for p in perfiles)
+    assert [p["user_id"] for p in almacenamiento.listar_perfiles(limite=1, desplazamiento=1)] == ["u2"]
+    assert almacenamiento.estadisticas_catalogo() == {
+        "total_usuarios": 3, "cursos": 1, "ultimo_registro": "2025-01-03 09:00"
+    }
+
+
+def test_catalogo_json_conserva_la_ultima_entrada(tmp_path, perfil):
+    almacenamiento = AlmacenamientoJSON(str(tmp_path))
+    almacenamiento.crear_usuario(perfil("u1"))
+    for i in range(5):
+        almacenamiento.guardar_datos("u1", {"sectores": [{"nombre": "Norte"}] * (i + 1)})
+
+    # Otra instancia lee el mismo catálogo: un usuario, con el tamaño del último guardado
+    perfiles = AlmacenamientoJSON(str(tmp_path)).listar_perfiles()
+    assert len(perfiles) == 1
+    assert perfiles[0]["tamano_datos"] == os.path.getsize(tmp_path / "u1.json")
@@ -0,0 +1,83 @@
+"""Importación masiva: familias válidas, informe de rechazos e importación atómica"""
+
+import io
+
+import pytest
+
+from importacion_familias import huella_archivo, importar_familias
+
+ENCABEZADO = "Sector;Apellido;Integrantes;Nombre jefe;Edad;Enfermedades;Desempleo;Hacinamiento\n"
+FILAS = [
+    "Norte;Soto;4;Ana Soto;40;Diabetes, Hipertensión;sí;Alto",    # 1 válida
+    "Sur;Rojas;;Luis Rojas;35;;no;",                               # 2 falta num_integrantes
+    "Norte;Díaz;3;Eva Díaz;7;;no;",                                # 3 edad_jefe fuera de rango
+    "Oeste;Vera;2;Juan Vera;50;;no;",                              # 4 sector no registrado
+    "sur;Pérez;dos;Rosa Pérez;61;Gripe;tal vez;Medio",             # 5 varios motivos
+    "SUR;Muñoz;5;Pía Muñoz;29;obesidad;x;Bajo",                    # 6 válida (sin tildes ni mayúsculas)
+]
+
+
+def archivo(filas=FILAS, nombre="familias.csv"):
+    contenido = io.BytesIO((ENCABEZADO + "\n".join(filas) + "\n").encode("utf-8"))
+    contenido.name = nombre
+    return contenido
+
+
+def test_importa_validas_y_reporta_rechazos():
+    destino = []
+    resumen = importar_familias(archivo(), destino, sectores=["Norte", "Sur"], tamano_bloque=4)
+
+    assert (resumen["leidas"], resumen["importadas"], resumen["rechazadas"]) == (6, 2, 4)
+    assert [familia["apellido"] for familia in destino] == ["Soto", "Muñoz"]
+    familia_munoz = destino[1]
+    assert familia_munoz["sector"] == "Sur"
+    assert familia_munoz["salud"]["enfermedades_cronicas"] == ["Obesidad"]
+    assert familia_munoz["salud"]["desempleo"] is True
+    assert destino[0]["salud"]["enfermedades_cronicas"] == ["Diabetes", "Hipertensión"]
+
+    rechazos = resumen["rechazos"]
+    assert list(rechazos.columns[:2]) == ["fila", "motivo"]
+    motivos = dict(zip(rechazos["fila"].tolist(), rechazos["motivo"]))
+    assert sorted(motivos) == [2, 3, 4, 5]
+    assert motivos[2] == "falta num_integrantes"
+    assert motivos[3] == "edad_jefe fuera de rango"
+    assert motivos[4] == "sector no registrado"
+    for motivo in ("num_integrantes no es un número entero", "enfermedades_cronicas con valores no reconocidos",
+                   "desempleo debe ser sí/no"):
+        assert motivo in motivos[5]
+    # Los datos originales acompañan al motivo
+    assert rechazos.loc[rechazos["fila"] == 4, "Apellido"].tolist() == ["Vera"]
+
+
+def test_sin_rechazos_informe_vacio():
+    resumen = importar_familias(archivo([FILAS[0], FILAS[5]]), [], sectores=["Norte", "Sur"])
+    assert resumen["rechazadas"] == 0
+    assert list(resumen["rechazos"].columns) == ["fila", "motivo"]
+
+
+def test_columnas_obligatorias_faltantes():
+    contenido = io.BytesIO(b"Sector;Apellido\nNorte;Soto\n")
+    contenido.name = "incompleto.csv"
+    with pytest.raises(ValueError, match="num_integrantes"):
+        importar_familias(contenido, [])
+
+
+def test_error_en_un_bloque_no_deja_importacion_parcial():
+    destino = ["existente"]
+
+    def fallar(avance, resumen):
+        if resumen["leidas"] > 2:
+            raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        importar_familias(archivo(), destino, sectores=["Norte", "Sur"], tamano_bloque=2, al_avanzar=fallar)
+    assert destino == ["existente"]
+
+
+def test_huella_archivo():
+    original = archivo()
+    original.read(10)
+    huella = huella_archivo(original)
+    assert original.tell() == 0
+    assert huella == huella_archivo(archivo())
+    assert huella != huella_archivo(archivo(FILAS[:-1]))
@@ -0,0 +1,73 @@
+"""Los mapas de bits del almacén entregan lo mismo que un filtro lineal sobre las familias"""
+
+from almacen_familias import FACTORES_RIESGO, AlmacenFamilias, valor_familia
+
+
+def filtrar(familias, condicion):
+    return [posicion for posicion, familia in enumerate(familias) if condicion(familia)]
+
+
+def nivel(familia, tipo):
+    return ((familia.get("riesgos") or {}).get(tipo) or {}).get("nivel")
+
+
+def consultas(familias):
+    """Pares (mapa del índice, filtro lineal) sobre el mismo criterio"""
+    sectores = sorted({familia["sector"] for familia in familias})
+    pares = [
+        (lambda indice, s=s: indice.categoria("sector", s), lambda f, s=s: f["sector"] == s)
+        for s in sectores + ["Sector inexistente"]
+    ]
+    for nivel_riesgo in ("Bajo", "Medio", "Alto"):
+        pares.append((lambda indice, n=nivel_riesgo: indice.categoria("riesgo_social", n),
+                      lambda f, n=nivel_riesgo: nivel(f, "social") == n))
+    for enfermedades in (["Diabetes"], ["Hipertensión", "Obesidad"], ["Inexistente"]):
+        pares.append((lambda indice, e=enfermedades: indice.enfermedades(e),
+                      lambda f, e=enfermedades: bool(set(e) & set(valor_familia(f, "salud", "enfermedades_cronicas", []) or []))))
+    for factor in FACTORES_RIESGO:
+        pares.append((lambda indice, x=factor: indice.factor(x),
+                      lambda f, x=factor: bool(valor_familia(f, "salud", x))))
+    for minimo, maximo in ((1, 2), (3, 5), (0, 100)):
+        pares.append((lambda indice, a=minimo, b=maximo: indice.rango_integrantes(a, b),
+                      lambda f, a=minimo, b=maximo: a <= f["num_integrantes"] <= b))
+    # Filtros combinados: intersección de mapas de bits
+    pares.append((
+        lambda indice: indice.categoria("sector", sectores[0]) & indice.rango_integrantes(3, 6)
+        & indice.enfermedades(["Diabetes", "Hipertensión"]),
+        lambda f: f["sector"] == sectores[0] and 3 <= f["num_integrantes"] <= 6
+        and bool({"Diabetes", "Hipertensión"} & set(valor_familia(f, "salud", "enfermedades_cronicas", []) or [])),
+    ))
+    return pares
+
+
+def comparar(almacen, familias):
+    indice = almacen.indice()
+    for mapa, condicion in consultas(familias):
+        esperadas = filtrar(familias, condicion)
+        resultado = mapa(indice)
+        assert indice.posiciones(resultado).tolist() == esperadas
+        assert indice.contar(resultado) == len(esperadas)
+
+
+def test_filtros_igual_a_filtro_lineal(familias):
+    comparar(AlmacenFamilias(familias), familias)
+
+
+def test_filtros_tras_extender(familias):
+    almacen = AlmacenFamilias(familias[:150])
+    almacen.indice()
+    # El índice se mantiene al agregar filas (también en posiciones que no caen en un byte nuevo)
+    almacen.extender(familias[150:153])
+    almacen.extender(familias[153:])
+    comparar(almacen, familias)
+
+
+def test_filtros_tras_editar_y_eliminar(familias):
+    almacen = AlmacenFamilias(familias)
+    almacen.indice()
+    editada = dict(familias[10], sector=familias[0]["sector"], num_integrantes=9)
+    almacen.actualizar(10, editada)
+    familias[10] = editada
+    almacen.eliminar(3)
+    del familias[3]
+    comparar(almacen, familias)
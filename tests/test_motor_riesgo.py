@@ -0,0 +1,80 @@
+"""El cálculo por lotes coincide con riesgo_social/riesgo_sanitario familia por familia"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from almacen_familias import FACTORES_RIESGO, AlmacenFamilias
+from motor_riesgo import calcular_riesgos_lote, riesgo_sanitario, riesgo_social
+from registros import convertir
+
+
+def escalar(familias):
+    filas = []
+    for familia in familias:
+        nivel_social, puntaje_social = riesgo_social(familia)
+        nivel_sanitario, puntaje_sanitario = riesgo_sanitario(familia)
+        filas.append((nivel_social, puntaje_social, nivel_sanitario, puntaje_sanitario))
+    return filas
+
+
+def por_lote(resultado):
+    return list(zip(
+        resultado["riesgo_social"], resultado["puntaje_social"].tolist(),
+        resultado["riesgo_sanitario"], resultado["puntaje_sanitario"].tolist()
+    ))
+
+
+def familias_borde():
+    """Valores faltantes, fuera de catálogo y en esquema plano"""
+    valores = [None, np.nan, pd.NA, True, False, "", "sí", 0, 1]
+    familias = []
+    for i, valor in enumerate(valores):
+        familias.append({
+            "sector": "Norte",
+            "vivienda": {"hacinamiento": ["Alto", None, "Desconocido"][i % 3], "red_apoyo": valor if i % 2 else "Débil"},
+            "salud": {
+                "enfermedades_cronicas": [["Diabetes", "Diabetes"], [], None][i % 3],
+                **{factor: valor for factor in FACTORES_RIESGO},
+            },
+        })
+    familias.append({"hacinamiento": "Crítico", "acceso_aps": "Muy difícil", "desempleo": True,
+                     "enfermedades_cronicas": ["Hipertensión", "Asma"]})
+    return familias
+
+
+@pytest.mark.parametrize("fuente", ["lista", "dataframe", "registros", "almacen"])
+def test_lote_igual_a_escalar(familias, fuente):
+    if fuente == "registros":
+        # Columnas 'vivienda'/'salud' con registros Vivienda/Salud (Mapping, no dict);
+        # las familias de borde no son registros válidos
+        familias = convertir("familias", familias)
+        datos = pd.DataFrame([dict(familia) for familia in familias])
+    else:
+        familias = familias + familias_borde()
+        if fuente == "lista":
+            datos = familias
+        elif fuente == "dataframe":
+            datos = pd.json_normalize(familias)
+        else:
+            datos = AlmacenFamilias(familias)
+    assert por_lote(calcular_riesgos_lote(datos)) == escalar(familias)
+
+
+def test_factores_faltantes_no_suman(familias):
+    familia = {"salud": {factor: np.nan for factor in FACTORES_RIESGO}, "vivienda": {}}
+    assert riesgo_sanitario(familia)[1] == 0
+    assert calcular_riesgos_lote([familia])["puntaje_sanitario"].tolist() == [0]
+
+
+def test_posiciones_del_almacen(familias):
+    almacen = AlmacenFamilias(familias)
+    posiciones = np.array([3, 10, 42])
+    resultado = calcular_riesgos_lote(almacen, posiciones=posiciones)
+    assert por_lote(resultado) == escalar([familias[p] for p in posiciones])
+
+
+def test_diccionario_de_columnas():
+    columnas = {"hacinamiento": ["Alto", "Bajo"], "desempleo": [True, False], "enfermedades_cronicas": ["Diabetes", ""]}
+    familias = [{k: v[i] for k, v in columnas.items()} for i in range(2)]
+    assert por_lote(calcular_riesgos_lote(columnas)) == escalar(familias)
@@ -0,0 +1,159 @@
+"""Rastreo de cambios: solo lo marcado, agregado o reemplazado se compara y se escribe"""
+
+from rastreo_cambios import TODAS, RastreadorCambios, huella
+from registros import convertir
+
+
+def base(datos):
+    rastreador = RastreadorCambios()
+    rastreador.registrar_base(datos)
+    return rastreador
+
+
+def guardar(rastreador, datos):
+    """Un guardado completo: retira lo pendiente, calcula y confirma"""
+    cambios, huellas = rastreador.calcular_cambios(rastreador.pendientes(datos))
+    rastreador.confirmar(huellas)
+    return cambios
+
+
+def test_sin_cambios_no_hay_pedido():
+    datos = {"familias": [{"i": i} for i in range(5)], "diagnostico": {"a": 1}}
+    rastreador = base(datos)
+    assert rastreador.pendientes(datos) == {}
+
+
+def test_sin_marcar_no_se_recorren_los_registros():
+    datos = {"familias": [{"i": i} for i in range(5)]}
+    rastreador = base(datos)
+    # Modificar en el lugar sin marcar pasa inadvertido: por eso las páginas marcan
+    datos["familias"][2]["i"] = 20
+    assert guardar(rastreador, datos) == {}
+
+
+def test_posicion_marcada():
+    datos = {"familias": [{"i": i} for i in range(5)]}
+    rastreador = base(datos)
+    datos["familias"][2]["i"] = 20
+    rastreador.marcar("familias", [2])
+
+    pedido = rastreador.pendientes(datos)
+    assert pedido["familias"][1] == {2}
+    cambios, huellas = rastreador.calcular_cambios(pedido)
+    assert cambios == {"familias": {"tipo": "lista", "registros": {2: {"i": 20}}, "longitud": 5}}
+    rastreador.confirmar(huellas)
+
+    # Marcar sin cambiar el contenido no escribe nada
+    rastreador.marcar("familias", [2])
+    assert guardar(rastreador, datos) == {}
+
+
+def test_los_cambios_son_copias():
+    datos = {"familias": [{"i": 0}]}
+    rastreador = base(datos)
+    rastreador.marcar("familias")
+    datos["familias"][0]["i"] = 1
+    cambios, _ = rastreador.calcular_cambios(rastreador.pendientes(datos))
+    datos["familias"][0]["i"] = 2
+    assert cambios["familias"]["registros"][0] == {"i": 1}
+
+
+def test_agregar_y_acortar():
+    datos = {"familias": [{"i": i} for i in range(3)]}
+    rastreador = base(datos)
+
+    datos["familias"].append({"i": 3})
+    assert guardar(rastreador, datos) == {
+        "familias": {"tipo": "lista", "registros": {3: {"i": 3}}, "longitud": 4}
+    }
+
+    del datos["familias"][1:]
+    assert guardar(rastreador, datos) == {"familias": {"tipo": "lista", "registros": {}, "longitud": 1}}
+
+
+def test_coleccion_reemplazada_se_compara_completa():
+    datos = {"sectores": [{"n": 1}, {"n": 2}]}
+    rastreador = base(datos)
+
+    datos["sectores"] = [{"n": 1}, {"n": 3}]
+    pedido = rastreador.pendientes(datos)
+    assert pedido["sectores"][1] == TODAS
+    cambios, huellas = rastreador.calcular_cambios(pedido)
+    rastreador.confirmar(huellas)
+    # Sin huellas previas de esa lista, se escriben todos sus registros
+    assert sorted(cambios["sectores"]["registros"]) == [0, 1]
+
+    datos["sectores"] = list(datos["sectores"])
+    assert guardar(rastreador, datos) == {}
+
+
+def test_objetos():
+    datos = {"diagnostico": {"a": 1}}
+    rastreador = base(datos)
+
+    datos["diagnostico"] = {"a": 1}
+    assert guardar(rastreador, datos) == {}
+
+    datos["diagnostico"]["a"] = 2
+    rastreador.marcar("diagnostico")
+    assert guardar(rastreador, datos) == {"diagnostico": {"tipo": "objeto", "valor": {"a": 2}}}
+
+
+def test_devolver_reintenta_el_pedido():
+    datos = {"familias": [{"i": 0}, {"i": 1}], "diagnostico": {"a": 1}}
+    rastreador = base(datos)
+    datos["familias"][1]["i"] = 10
+    rastreador.marcar("familias", [1])
+    datos["diagnostico"] = {"a": 2}
+
+    pedido = rastreador.pendientes(datos)
+    rastreador.devolver(pedido)
+    cambios = guardar(rastreador, datos)
+    assert cambios["familias"]["registros"] == {1: {"i": 10}}
+    assert cambios["diagnostico"]["valor"] == {"a": 2}
+
+
+def test_olvidar_fuerza_escritura_completa():
+    datos = {"familias": [{"i": 0}, {"i": 1}]}
+    rastreador = base(datos)
+    rastreador.olvidar(["familias"])
+    cambios = guardar(rastreador, datos)
+    assert cambios["familias"]["registros"] == {0: {"i": 0}, 1: {"i": 1}}
+    assert guardar(rastreador, datos) == {}
+
+
+def test_lista_acortada_despues_del_pedido():
+    datos = {"familias": [{"i": i} for i in range(4)]}
+    rastreador = base(datos)
+    rastreador.marcar("familias", [3])
+    pedido = rastreador.pendientes(datos)
+    # El hilo del script elimina mientras el de autoguardado aún no calcula
+    del datos["familias"][3]
+    cambios, huellas = rastreador.calcular_cambios(pedido)
+    rastreador.confirmar(huellas)
+    assert cambios == {}
+    assert guardar(rastreador, datos) == {"familias": {"tipo": "lista", "registros": {}, "longitud": 3}}
+
+
+def test_huella_de_registros_igual_a_la_del_diccionario(familias):
+    registros = convertir("familias", familias[:20])
+    assert [huella(registro) for registro in registros] == [huella(registro.a_dict()) for registro in registros]
+
+
+def test_copiar_solo_lo_pedido():
+    datos = {"familias": [{"i": i} for i in range(5)], "diagnostico": {"a": [1]}}
+    rastreador = base(datos)
+    rastreador.marcar("familias", [1])
+    datos["familias"].append({"i": 5})
+    datos["diagnostico"]["a"].append(2)
+    rastreador.marcar("diagnostico")
+    copia = rastreador.copiar(rastreador.pendientes(datos))
+
+    registros, posiciones, _, longitud = copia["familias"]
+    assert registros == {1: {"i": 1}, 5: {"i": 5}} and longitud == 6
+    assert registros[1] is not datos["familias"][1]
+    assert copia["diagnostico"][0] == {"a": [1, 2]} and copia["diagnostico"][0] is not datos["diagnostico"]
+
+    cambios, _ = rastreador.calcular_cambios(copia, copiar=False)
+    assert cambios["familias"]["registros"] == {1: {"i": 1}, 5: {"i": 5}}
+    assert cambios["familias"]["registros"][1] is registros[1]
@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from cache_figuras import mostrar_figura
+from registros import Institucion
 
 def mostrar_trabajo_red():
     st.markdown("""
@@ -132,7 +134,7 @@ def mostrar_trabajo_red():
                     "fecha_registro": datetime.now().strftime("%Y-%m-%d")
                 }
                 
-                st.session_state.instituciones.append(nueva_institucion)
+                st.session_state.instituciones.append(Institucion.desde_dict(nueva_institucion))
                 st.success(f"✅ Institución '{nombre_institucion}' registrada exitosamente!")
                 st.rerun()
             else:
@@ -203,30 +205,31 @@ def mostrar_trabajo_red():
         
         with col1:
             # Gráfico por tipo de institución
-            fig_tipo = px.pie(
+            mostrar_figura("red_tipos", st.session_state.instituciones, lambda: px.pie(
                 df_instituciones,
                 names="Tipo",
                 title="Distribución por Tipo de Institución"
-            )
-            st.plotly_chart(fig_tipo, use_container_width=True)
+            ))
         
         with col2:
             # Gráfico de nivel de coordinación
-            fig_coordinacion = px.bar(
-                df_instituciones,
-                x="Tipo",
-                color="Nivel Coordinación",
-                title="Nivel de Coordinación por Tipo de Institución",
-                color_discrete_map={
-                    "Excelente": "green",
-                    "Buena": "lightgreen", 
-                    "Regular": "yellow",
-                    "Débil": "orange",
-                    "Sin coordinación": "red"
-                }
-            )
-            fig_coordinacion.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_coordinacion, use_container_width=True)
+            def figura_coordinacion():
+                fig_coordinacion = px.bar(
+                    df_instituciones,
+                    x="Tipo",
+                    color="Nivel Coordinación",
+                    title="Nivel de Coordinación por Tipo de Institución",
+                    color_discrete_map={
+                        "Excelente": "green",
+                        "Buena": "lightgreen", 
+                        "Regular": "yellow",
+                        "Débil": "orange",
+                        "Sin coordinación": "red"
+                    }
+                )
+                fig_coordinacion.update_layout(xaxis_tickangle=-45)
+                return fig_coordinacion
+            mostrar_figura("red_coordinacion", st.session_state.instituciones, figura_coordinacion)
         
         # Análisis de la red
         st.markdown("### 🔗 Análisis de la Red Intersectorial")
@@ -256,59 +259,61 @@ def mostrar_trabajo_red():
         # Mapa de red (simulado)
         st.markdown("### 🗺️ Mapa de Red Intersectorial")
         
-        # Crear un gráfico de red simple
-        fig_red = go.Figure()
-        
-        # Posiciones de instituciones por tipo
-        posiciones = {
-            "Salud": (0, 2),
-            "Educación": (2, 2), 
-            "Municipalidad": (1, 0),
-            "Organización Comunitaria": (-2, 1),
-            "Servicios Sociales": (2, 0),
-            "Seguridad": (-1, -1),
-            "Deportes y Recreación": (0, -2),
-            "Otro": (3, 1)
-        }
-        
-        # Agregar nodos (instituciones)
-        for institucion in st.session_state.instituciones:
-            tipo = institucion["tipo"]
-            if tipo in posiciones:
-                x, y = posiciones[tipo]
-                
-                # Color según nivel de coordinación
-                color_map = {
-                    "Excelente": "green",
-                    "Buena": "lightgreen",
-                    "Regular": "yellow", 
-                    "Débil": "orange",
-                    "Sin coordinación": "red"
-                }
-                color = color_map.get(institucion["informacion"]["nivel_coordinacion"], "blue")
-                
-                fig_red.add_trace(go.Scatter(
-                    x=[x], y=[y],
-                    mode='markers+text',
-                    marker=dict(size=15, color=color),
-                    text=institucion["nombre"][:20] + "..." if len(institucion["nombre"]) > 20 else institucion["nombre"],
-                    textposition="top center",
-                    name=institucion["nombre"],
-                    hovertemplate=f"<b>{institucion['nombre']}</b><br>" +
-                                 f"Tipo: {institucion['tipo']}<br>" +
-                                 f"Coordinación: {institucion['informacion']['nivel_coordinacion']}<br>" +
-                                 f"Contacto: {institucion['contacto']['nombre']}<extra></extra>"
-                ))
-        
-        fig_red.update_layout(
-            title="Red Intersectorial - Mapa de Instituciones",
-            xaxis_title="",
-            yaxis_title="",
-            showlegend=False,
-            height=500
-        )
+        def figura_red():
+            # Crear un gráfico de red simple
+            fig_red = go.Figure()
+            
+            # Posiciones de instituciones por tipo
+            posiciones = {
+                "Salud": (0, 2),
+                "Educación": (2, 2), 
+                "Municipalidad": (1, 0),
+                "Organización Comunitaria": (-2, 1),
+                "Servicios Sociales": (2, 0),
+                "Seguridad": (-1, -1),
+                "Deportes y Recreación": (0, -2),
+                "Otro": (3, 1)
+            }
+            
+            # Agregar nodos (instituciones)
+            for institucion in st.session_state.instituciones:
+                tipo = institucion["tipo"]
+                if tipo in posiciones:
+                    x, y = posiciones[tipo]
+                    
+                    # Color según nivel de coordinación
+                    color_map = {
+                        "Excelente": "green",
+                        "Buena": "lightgreen",
+                        "Regular": "yellow", 
+                        "Débil": "orange",
+                        "Sin coordinación": "red"
+                    }
+                    color = color_map.get(institucion["informacion"]["nivel_coordinacion"], "blue")
+                    
+                    fig_red.add_trace(go.Scatter(
+                        x=[x], y=[y],
+                        mode='markers+text',
+                        marker=dict(size=15, color=color),
+                        text=institucion["nombre"][:20] + "..." if len(institucion["nombre"]) > 20 else institucion["nombre"],
+                        textposition="top center",
+                        name=institucion["nombre"],
+                        hovertemplate=f"<b>{institucion['nombre']}</b><br>" +
+                                     f"Tipo: {institucion['tipo']}<br>" +
+                                     f"Coordinación: {institucion['informacion']['nivel_coordinacion']}<br>" +
+                                     f"Contacto: {institucion['contacto']['nombre']}<extra></extra>"
+                    ))
+            
+            fig_red.update_layout(
+                title="Red Intersectorial - Mapa de Instituciones",
+                xaxis_title="",
+                yaxis_title="",
+                showlegend=False,
+                height=500
+            )
+            return fig_red
         
-        st.plotly_chart(fig_red, use_container_width=True)
+        mostrar_figura("red_mapa", st.session_state.instituciones, figura_red)
         
         # Análisis de fortalezas y oportunidades
         st.markdown("### 💪 Fortalezas y Oportunidades de la Red")
@@ -325,14 +330,16 @@ def mostrar_trabajo_red():
             col1, col2 = st.columns(2)
             
             with col1:
-                fig_recursos = px.bar(
-                    x=list(recursos_count.keys()),
-                    y=list(recursos_count.values()),
-                    title="Recursos Disponibles en la Red",
-                    labels={"x": "Recurso", "y": "Cantidad de Instituciones"}
-                )
-                fig_recursos.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_recursos, use_container_width=True)
+                def figura_recursos():
+                    fig_recursos = px.bar(
+                        x=list(recursos_count.keys()),
+                        y=list(recursos_count.values()),
+                        title="Recursos Disponibles en la Red",
+                        labels={"x": "Recurso", "y": "Cantidad de Instituciones"}
+                    )
+                    fig_recursos.update_layout(xaxis_tickangle=-45)
+                    return fig_recursos
+                mostrar_figura("red_recursos", st.session_state.instituciones, figura_recursos)
             
             with col2:
                 # Población objetivo
@@ -342,12 +349,11 @@ def mostrar_trabajo_red():
                 
                 if todas_poblaciones:
                     poblaciones_count = Counter(todas_poblaciones)
-                    fig_poblacion = px.pie(
+                    mostrar_figura("red_poblacion", st.session_state.instituciones, lambda: px.pie(
                         values=list(poblaciones_count.values()),
                         names=list(poblaciones_count.keys()),
                         title="Población Objetivo de la Red"
-                    )
-                    st.plotly_chart(fig_poblacion, use_container_width=True)
+                    ))
         
         # Recomendaciones para fortalecer la red
         st.markdown("### 🎯 Recomendaciones para Fortalecer la Red")